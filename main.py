@@ -3,25 +3,23 @@ from ui.stats import StatsWindow
 from src.screen_utils import window_geometry
 import os
 import sys
-import cv2
 import time
 import datetime
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QLabel, QPushButton, QFrame, QProgressBar, QListWidget,
                              QScrollArea, QSizePolicy)
-from PyQt6.QtCore import QTimer, Qt, QThread, pyqtSignal
+from PyQt6.QtCore import QTimer, Qt, QThread, QEvent, pyqtSignal
 from PyQt6.QtGui import QShortcut, QImage, QPixmap, QFont, QColor, QIcon
 from PyQt6.QtWidgets import QSystemTrayIcon, QMenu
 from src.notifications import NotificationManager, ToastNotification
 from ui.settings import SettingsWindow
 from ui.calibration import CalibrationDialog
-from src.database import DatabaseManager
 from src.calibration_manager import CalibrationManager
 from src.sound_manager import sound_manager
 from src.logger import logger
 from gui_about import AboutDialog
-from build_utils import resource_path
 from src.attention_tracker import AttentionTracker
+from src.engine import NeuroFocusEngine
 
 PITCH_OFFSET = 5.0
 PITCH_THRESHOLD = 0.0
@@ -230,704 +228,71 @@ class ModernProgressBar(QProgressBar):
 
 
 class VideoThread(QThread):
+    """
+    Qt-адаптер над NeuroFocusEngine: запускает движок в QThread и
+    переотправляет его колбэки сигналами в UI-поток.
+    """
     change_pixmap_signal = pyqtSignal(QImage)
-    update_data_signal = pyqtSignal(dict)
+    update_data_signal = pyqtSignal(object)     # FrameResult
     calibration_progress_signal = pyqtSignal(str, int)
     calibration_done_signal = pyqtSignal(str)
+    notification_signal = pyqtSignal(str, str)
     error_signal = pyqtSignal(str)
 
-    def __init__(self):
+    def __init__(self, notification_manager=None):
         super().__init__()
-        self._run_flag = True
-        self._paused = False          # True = анализ заморожен, камера работает
-        self._force_close = False
-        self._initialized = False
-        self._init_processors()
-        
-        self.session_start_time = time.time()
-        self.face_lost_time = None
-        self._last_calibration_status = {"face": False, "hand": False}
-        self._last_face_state = True
-        self._yawn_cooldown_end = 0.0  # debounce зевка: игнорировать до этого времени
-
-        self._error_count = 0
-        self._max_errors = 10
-
-        # Дебаунс потери лица: переключаем face_detected=False только после
-        # FACE_LOST_DEBOUNCE последовательных кадров без лица (~0.5 сек при 30fps)
-        self._face_not_detected_frames = 0
-        self._FACE_LOST_DEBOUNCE = 15
-
+        self.engine = NeuroFocusEngine(
+            notification_manager=notification_manager,
+            on_data=self.update_data_signal.emit,
+            on_frame=self._emit_frame,
+            on_calibration_progress=self.calibration_progress_signal.emit,
+            on_calibration_done=self.calibration_done_signal.emit,
+            on_notification=self.notification_signal.emit,
+            on_error=self.error_signal.emit,
+        )
         logger.info("VideoThread инициализирован")
-    
-    def _init_processors(self):
-        try:
-            from src.processors import FaceProcessor, EmotionProcessor, FatigueProcessor, PostureProcessor, HandProcessor
-
-            self.face_processor = FaceProcessor()
-            self.emotion_processor = EmotionProcessor()
-            # Keep old processors as fallback
-            self.fatigue_processor = FatigueProcessor()
-            self.posture_processor = PostureProcessor()
-            self.hand_processor = None
-
-            self.face_detector = self.face_processor.detector
-            self.db = DatabaseManager("session_data.db")
-
-            self.calibration_manager = None
-
-            self.last_save_time = time.time()
-            self.frame_counter = 0
-
-            # --- Performance tuning ---
-            # Тяжёлые ML-модели (LSTM, Dense posture) — каждые 8 кадров (~4 Hz)
-            self._ml_update_interval   = 8
-            # Рука/жесты — каждый кадр (30 Hz).
-            # model_complexity=0 даёт ~5 ms/frame — укладываемся в бюджет 33 ms.
-            # Interval=1 устраняет мигание landmarks (при 2 они пропадали через кадр).
-            self._hand_update_interval = 1
-            self._last_data = {}  # кэш аналитики для кадров без ML
-            self._last_hand_data: dict = {}  # кэш для кадров без hand update
-
-            # --- ML Classifiers (neurofocus) ---
-            self._ml_ready = False
-            try:
-                import os
-                os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
-                from neurofocus.ml.fatigue_classifier import FatigueClassifier
-                from neurofocus.ml.posture_classifier import PostureClassifier
-                from neurofocus.ml.ml_coordinator import MLCoordinator
-                from neurofocus.detectors.pose_detector import PoseDetector
-
-                self.fatigue_classifier = FatigueClassifier()
-                self.posture_classifier = PostureClassifier(
-                    model_path=resource_path('models/posture_model.keras')
-                )
-                self.pose_detector = PoseDetector(
-                    model_path=resource_path('models/pose_landmarker_lite.task')
-                )
-
-                # ML Coordinator: manages warm-up, personalized thresholds, ML blend
-                self.ml_coordinator = MLCoordinator(
-                    self.fatigue_classifier, self.posture_classifier
-                )
-
-                self._ml_ready = True
-                logger.info("ML классификаторы + Online Learning загружены")
-            except Exception as ml_err:
-                logger.warning(f"ML классификаторы недоступны, используются пороговые значения: {ml_err}")
-                self.fatigue_classifier = None
-                self.posture_classifier = None
-                self.pose_detector = None
-                self.ml_coordinator = None
-
-            self._initialized = True
-
-        except Exception as e:
-            logger.error(f"Ошибка инициализации процессоров: {e}")
-            self._initialized = False
-    
-    def set_calibration_manager(self, calibration_manager):
-        self.calibration_manager = calibration_manager
-        try:
-            from src.processors import HandProcessor
-            self.hand_processor = HandProcessor(calibration_manager=calibration_manager)
-        except Exception as e:
-            logger.error(f"Ошибка инициализации HandProcessor: {e}")
-        # Передаём calibration_manager в PostureProcessor для персонального pitch
-        try:
-            if hasattr(self, 'posture_processor') and self.posture_processor:
-                self.posture_processor.set_calibration_manager(calibration_manager)
-        except Exception as e:
-            logger.error(f"Ошибка передачи calibration_manager в PostureProcessor: {e}")
-        # Передаём calibration_manager в FatigueProcessor для калибровки EAR/MAR
-        try:
-            if hasattr(self, 'fatigue_processor') and self.fatigue_processor:
-                self.fatigue_processor.set_calibration_manager(calibration_manager)
-        except Exception as e:
-            logger.error(f"Ошибка передачи calibration_manager в FatigueProcessor: {e}")
-    
-    def _get_calibration_overlay(self, frame):
-        if not self.calibration_manager:
-            return None
-        
-        try:
-            if self.calibration_manager._is_calibrating_face:
-                progress = len(self.calibration_manager._face_samples)
-                pct = int(progress / 20 * 100)
-                return {"type": "face", "progress": progress, "pct": pct}
-
-            if self.calibration_manager._is_calibrating_hand:
-                progress = len(self.calibration_manager._hand_samples)
-                pct = int(progress / 20 * 100)
-                return {"type": "hand", "progress": progress, "pct": pct}
-        except Exception as e:
-            logger.error(f"Ошибка отрисовки калибровки: {e}")
-        
-        return None
 
-    def run(self):
-        if not self._initialized:
-            logger.error("VideoThread: процессоры не инициализированы")
-            return
-        
-        cap = None
-        try:
-            cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-            if not cap.isOpened():
-                logger.error("VideoThread: не удалось открыть камеру")
-                self.error_signal.emit("Не удалось открыть камеру")
-                return
-            
-            # 1280×720 даёт MediaPipe ~2× больше пикселей на руку/лицо →
-            # детекция надёжнее. Большинство веб-камер поддерживают 720p @ 30 fps.
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH,  1280)
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-            cap.set(cv2.CAP_PROP_FPS, 30)       # 30 fps стабильнее 60 на 720p
-            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1) # всегда берём самый свежий кадр
-
-            actual_fps = cap.get(cv2.CAP_PROP_FPS)
-            actual_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            actual_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            logger.info(f"VideoThread: камера запущена {actual_w}x{actual_h} @ {actual_fps:.0f} FPS")
-        except Exception as e:
-            logger.error(f"VideoThread: ошибка инициализации камеры: {e}")
-            self.error_signal.emit(f"Ошибка камеры: {e}")
-            return
-
-        # --- Default data for frames before first ML run ---
-        default_data = {
-            "ear": 0.35, "mar": 0.0, "pitch": 0.0, "emotion": "...",
-            "event": None, "posture_alert": False,
-            "posture_score": 0, "posture_level": "good",
-            "face_detected": False, "hand_detected": False,
-            "fatigue_status": "Awake", "fatigue_score": 0,
-            "blink_rate": 0, "yawning": False, "microsleep_detected": False,
-            "model_used": "geometric", "posture_status": "Good",
-            "ml_warmup_progress": 0,
-        }
-        self._last_data = dict(default_data)
-
-        while self._run_flag:
-            frame = None
-            try:
-                ret, frame = cap.read()
-                if not ret or frame is None:
-                    self._error_count += 1
-                    if self._error_count >= self._max_errors:
-                        logger.error("VideoThread: слишком много ошибок чтения камеры")
-                        break
-                    continue
-
-                self._error_count = 0
-                frame = cv2.flip(frame, 1)
-
-            except Exception as e:
-                logger.error(f"VideoThread: ошибка чтения камеры: {e}")
-                continue
-
-            # ---- LIGHT PATH (every frame): face detect → render ----
-            try:
-                image, results = self.face_detector.process_frame(frame, draw=True)
-            except Exception as e:
-                logger.error(f"VideoThread: ошибка обнаружения лица: {e}")
-                image = frame
-                results = None
-
-            face_data = None
-            is_face_valid = False
-            try:
-                face_data = self.face_processor.process(frame, results)
-                is_face_valid = face_data['valid']
-            except Exception as e:
-                logger.error(f"VideoThread: ошибка face_processor: {e}")
-
-            # Дебаунс потери лица: не переключаем на "нет лица" мгновенно,
-            # а только после FACE_LOST_DEBOUNCE последовательных пустых кадров.
-            # Это устраняет мерцание при закрытии лица рукой.
-            if is_face_valid:
-                self._face_not_detected_frames = 0
-                effective_face_detected = True
-            else:
-                self._face_not_detected_frames += 1
-                effective_face_detected = (
-                    self._face_not_detected_frames < self._FACE_LOST_DEBOUNCE
-                )
-
-            # Determine if this frame should run heavy ML
-            do_ml = (self.frame_counter % self._ml_update_interval == 0)
-
-            if do_ml:
-                data = self._run_heavy_ml(
-                    frame, image, face_data, is_face_valid, default_data
-                )
-                # Всегда синхронизируем face_detected с дебаунс-флагом
-                data["face_detected"] = effective_face_detected
-            else:
-                # Reuse cached analytics from last full run
-                data = dict(self._last_data)
-                # face_detected обновляем КАЖДЫЙ кадр (не из кэша!) — иначе
-                # 7 некэшированных кадров будут показывать устаревший статус
-                data["face_detected"] = effective_face_detected
-                if face_data and is_face_valid:
-                    data["ear"] = face_data.get("ear", self._last_data.get("ear", 0.35))
-                    data["mar"] = face_data.get("mar", self._last_data.get("mar", 0.0))
-                    data["pitch"] = face_data.get("pitch", self._last_data.get("pitch", 0.0))
-
-            # ---- Calibration (every frame, lightweight) ----
-            try:
-                if self.calibration_manager and is_face_valid:
-                    ear_val   = face_data.get("ear",   0.3)
-                    mar_val   = face_data.get("mar",   0.15)
-                    pitch_val = face_data.get("pitch", 0.0)
-
-                    # Используем реальный размер руки если он уже был измерен
-                    hand_size_val = (
-                        getattr(self.hand_processor, '_hand_size', None)
-                        if self.hand_processor else None
-                    )
-
-                    # Авто-калибровка: не мешает ручной, возвращает (face_done, hand_done)
-                    was_face_calib = self.calibration_manager.face_calibration["calibrated"]
-                    was_hand_calib = self.calibration_manager.hand_calibration["calibrated"]
-                    face_done, hand_done = self.calibration_manager.auto_calibrate_if_needed(
-                        ear_val, mar_val, pitch_val, hand_size_val
-                    )
-
-                    # Сигнал о прогрессе авто-калибровки лица
-                    if not was_face_calib and not self.calibration_manager._is_calibrating_face:
-                        auto_progress = len(self.calibration_manager._face_samples)
-                        if auto_progress > 0:
-                            self.calibration_progress_signal.emit("face_auto", auto_progress)
-                    if face_done:
-                        self.calibration_done_signal.emit("face")
-                        logger.info("Авто-калибровка лица завершена")
-                    if hand_done:
-                        self.calibration_done_signal.emit("hand")
-                        logger.info("Авто-калибровка руки завершена")
-
-                    # Ручная калибровка лица
-                    if self.calibration_manager._is_calibrating_face:
-                        self.calibration_manager.add_face_sample(ear_val, mar_val, pitch_val)
-                        progress = len(self.calibration_manager._face_samples)
-                        self.calibration_progress_signal.emit("face", progress)
-
-                        if progress >= 20:
-                            self.calibration_manager.finish_face_calibration()
-                            self.calibration_done_signal.emit("face")
-                            logger.info("Калибровка лица завершена")
-
-                    # Ручная калибровка осанки
-                    if self.calibration_manager._is_calibrating_posture:
-                        self.calibration_manager.add_posture_sample(pitch_val)
-                        progress = len(self.calibration_manager._posture_samples)
-                        self.calibration_progress_signal.emit("posture", progress)
-
-                        if progress >= 20:
-                            self.calibration_manager.finish_posture_calibration()
-                            self.calibration_done_signal.emit("posture")
-                            logger.info("Калибровка осанки завершена")
-            except Exception as e:
-                logger.error(f"VideoThread: ошибка калибровки лица: {e}")
-
-            try:
-                calib = self.calibration_manager.face_calibration["calibrated"] if self.calibration_manager else False
-                if calib != self._last_calibration_status["face"]:
-                    self._last_calibration_status["face"] = calib
-            except Exception:
-                pass
-
-            try:
-                calib_info = self._get_calibration_overlay(image)
-                if calib_info:
-                    data["calibration_info"] = calib_info
-            except Exception as e:
-                logger.error(f"VideoThread: ошибка отрисовки калибровки: {e}")
-
-            # ---- Hand / Gesture — каждые _hand_update_interval кадров ----
-            # Вынесено из _run_heavy_ml: жесты должны обновляться ~15 Hz,
-            # а не 4 Hz как тяжёлые ML-модели. Иначе курсор «скачет».
-            do_hand = (self.frame_counter % self._hand_update_interval == 0)
-            try:
-                if self.hand_processor and do_hand:
-                    hand_data = self.hand_processor.process(
-                        image, frame.shape[1], frame.shape[0]
-                    )
-                    self._last_hand_data = hand_data
-
-                    data["hand_detected"]   = hand_data['detected']
-                    data["current_gesture"] = hand_data.get('current_gesture', 'none')
-
-                    # Наложение жеста на кадр
-                    gesture_label = hand_data.get('gesture', 'none')
-                    if gesture_label and gesture_label != 'none':
-                        cv2.rectangle(image, (5, 5), (200, 35), (0, 0, 0), -1)
-                        cv2.putText(image, f"[{gesture_label.upper()}]", (10, 28),
-                                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-
-                    # Сбор сэмплов для ручной калибровки руки
-                    if (self.calibration_manager
-                            and self.calibration_manager._is_calibrating_hand
-                            and hand_data.get('hand_size')):
-                        self.calibration_manager.add_hand_sample(hand_data['hand_size'])
-                        progress = len(self.calibration_manager._hand_samples)
-                        self.calibration_progress_signal.emit("hand", progress)
-                        if progress >= 20:
-                            self.calibration_manager.finish_hand_calibration()
-                            self.calibration_done_signal.emit("hand")
-                            logger.info("Калибровка руки завершена")
-
-                    # Сбор сэмплов для калибровки активной зоны жестов
-                    if (self.calibration_manager
-                            and self.calibration_manager._is_calibrating_zone
-                            and hand_data.get('palm_x') is not None):
-                        px = hand_data['palm_x']
-                        py = hand_data['palm_y']
-                        cm = self.calibration_manager
-                        cm.add_zone_sample(px, py)
-                        step = cm._zone_step
-                        if step == 'topleft':
-                            progress = len(cm._zone_topleft_samples)
-                            self.calibration_progress_signal.emit("zone_topleft", progress)
-                        elif step == 'bottomright':
-                            progress = len(cm._zone_bottomright_samples)
-                            self.calibration_progress_signal.emit("zone_bottomright", progress)
-                            if progress >= 15:
-                                cm.finish_gesture_zone_calibration()
-                                self.calibration_done_signal.emit("zone")
-                                logger.info("Калибровка зоны жестов завершена")
-                                # После смены зоны сбрасываем позицию жестового контроллера,
-                                # чтобы outlier-фильтр не заморозил курсор
-                                if (self.hand_processor
-                                        and self.hand_processor.gesture_controller):
-                                    gc = self.hand_processor.gesture_controller
-                                    gc.prev_x = gc.screen_width  // 2
-                                    gc.prev_y = gc.screen_height // 2
-                                    gc._outlier_consecutive = 0
-                                    gc._gesture_buf.clear()
-
-                elif self.hand_processor and self._last_hand_data:
-                    # Кадр без hand update — используем кэш для UI, жест не двигает мышь
-                    data["hand_detected"]   = self._last_hand_data.get('detected', False)
-                    data["current_gesture"] = self._last_hand_data.get('current_gesture', 'none')
-            except Exception as e:
-                logger.error(f"VideoThread: ошибка обработки руки: {e}")
+    def _emit_frame(self, buf):
+        # QImage смотрит прямо в буфер превью; UI вызывает preview.release()
+        # после QPixmap.fromImage, и только тогда буфер переиспользуется
+        h, w = buf.shape[:2]
+        self.change_pixmap_signal.emit(
+            QImage(buf.data, w, h, buf.strides[0], QImage.Format.Format_BGR888)
+        )
 
-            try:
-                h, w, ch = image.shape
-                rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-                bytes_per_line = ch * w
-                qt_image = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
-                scaled_image = qt_image.scaled(800, 600, Qt.AspectRatioMode.KeepAspectRatio)
+    # Доступ UI к процессорам и сервисам движка
+    @property
+    def preview(self):
+        return self.engine.preview
 
-                self.change_pixmap_signal.emit(scaled_image)
-                self.update_data_signal.emit(data)
+    @property
+    def db(self):
+        return self.engine.db
 
-                self.frame_counter += 1
+    @property
+    def hand_processor(self):
+        return getattr(self.engine, 'hand_processor', None)
 
-            except Exception as e:
-                logger.error(f"VideoThread: ошибка отправки изображения: {e}")
+    @property
+    def fatigue_processor(self):
+        return getattr(self.engine, 'fatigue_processor', None)
 
-        if cap:
-            try:
-                cap.release()
-            except Exception:
-                pass
+    @property
+    def posture_processor(self):
+        return getattr(self.engine, 'posture_processor', None)
 
-        logger.info("VideoThread: завершен")
+    def set_calibration_manager(self, calibration_manager):
+        self.engine.set_calibration_manager(calibration_manager)
 
     def toggle_pause(self):
         """Переключить паузу анализа."""
-        self._paused = not self._paused
-        return self._paused
-
-    def _run_heavy_ml(self, frame, image, face_data, is_face_valid, default_data):
-        """Run heavy ML models (LSTM, pose, posture, emotion) — called every N frames."""
-        # Если анализ на паузе — возвращаем кешированные данные
-        if self._paused:
-            cached = dict(self._last_data)
-            cached['analysis_paused'] = True
-            return cached
-        data = dict(default_data)
-        current_time = time.time()
-        ear = 0.35
-        mar = 0.15
-        pitch = 0.0
-        emotion = "..."
-        pose_landmarks = None
-
-        if not is_face_valid or face_data is None:
-            # Обновляем кэш, чтобы не-ML кадры тоже получили актуальный face_detected=False
-            self._last_data = data
-            return data
-
-        ear = face_data.get('ear', 0.35)
-        mar = face_data.get('mar', 0.15)
-        pitch = face_data.get('pitch', 0.0)
-        data["ear"] = ear
-        data["mar"] = mar
-        data["pitch"] = pitch
-        data["face_detected"] = face_data.get('detected', False)
-
-        # --- Online Learning: feed features into ML coordinator ---
-        # Передаём face_is_visible, чтобы ThresholdAdapter ставил warm-up
-        # на паузу при потере лица (не копит мусорные сэмплы).
-        if self._ml_ready and self.ml_coordinator is not None:
-            self.ml_coordinator.update(
-                ear, mar, pitch, current_time,
-                face_is_visible=is_face_valid,
-            )
-            data["ml_warmup_progress"] = self.ml_coordinator.get_calibration_progress()
-
-        # --- Emotion ---
-        try:
-            emotion = self.emotion_processor.process(frame, face_data['landmarks'])
-        except Exception:
-            pass
-        data["emotion"] = emotion
-
-        # --- Fatigue: ML (LSTM) or threshold fallback ---
-        fatigue_data = {}
-        if self._ml_ready and self.fatigue_classifier is not None:
-            try:
-                ml_fatigue = self.fatigue_classifier.predict(face_data['landmarks'], frame)
-                _f_status   = ml_fatigue.get('status', 'awake')
-                _yawning    = ml_fatigue.get('yawning', False)
-                _microsleep = ml_fatigue.get('microsleep_detected', False)
-
-                # Маппинг статуса на уровень (нужен online learning и update_dashboard)
-                _level_map = {'awake': 'normal', 'drowsy': 'moderate', 'sleeping': 'severe'}
-                _f_level = _level_map.get(_f_status, 'normal')
-
-                # Генерация события (аналог FatigueProcessor, но из ML)
-                _f_event = None
-                # ── Зевок с debounce: один зевок = одно событие (cooldown 5 сек) ──
-                if _yawning and current_time > self._yawn_cooldown_end:
-                    _f_event = "Зевок"
-                    self._yawn_cooldown_end = current_time + 5.0  # 5 сек cooldown
-                elif _microsleep:
-                    _f_event = "Сильная усталость"
-                elif _f_status == 'sleeping':
-                    _f_event = "Сильная усталость"
-                elif _f_status == 'drowsy':
-                    _f_event = "Усталость"
-
-                # ── ЗАЩИТА: подавляем ложные события усталости ──
-                # 1) При нормальном EAR (>0.28) глаза точно открыты
-                # 2) При сильном наклоне головы (|pitch| > 20°) EAR может быть
-                #    неточным из-за ракурса — не считаем это усталостью
-                if _f_event in ("Сильная усталость", "Усталость"):
-                    if ear > 0.28 or abs(pitch) > 20:
-                        _f_event = None
-
-                fatigue_data = {
-                    'fatigue_status': _f_status.capitalize(),
-                    'fatigue_score':  ml_fatigue.get('fatigue_score', 0),
-                    'fatigue_level':  _f_level,
-                    'blink_rate':     ml_fatigue.get('blink_rate', 0),
-                    'ear': ear,
-                    'mar': mar,
-                    'yawning':             _yawning,
-                    'microsleep_detected': _microsleep,
-                    'model_used':          ml_fatigue.get('model_used', 'geometric'),
-                    'event':               _f_event,
-                }
-            except Exception as ml_e:
-                logger.warning(f"ML fatigue error, fallback: {ml_e}")
-                fatigue_data = self.fatigue_processor.process(ear, mar, pitch, emotion, current_time)
-        else:
-            fatigue_data = self.fatigue_processor.process(ear, mar, pitch, emotion, current_time)
-        data.update(fatigue_data)
-
-        # --- Online Learning: collect labeled sample for background retraining ---
-        # Вызывается каждый heavy-ML кадр (~4 Hz). Фоновый поток запустит
-        # дообучение, когда наберётся 500 сэмплов (RETRAIN_THRESHOLD).
-        if self._ml_ready and self.ml_coordinator is not None:
-            try:
-                self.ml_coordinator.collect_sample(
-                    ear, mar, pitch,
-                    fatigue_data.get('fatigue_level', 'normal'),
-                    current_time,
-                )
-            except Exception as ol_e:
-                # Online learning не должен ломать основной цикл
-                logger.warning(f"Online learning collect error: {ol_e}")
-
-        # --- Posture: ML (Dense) with Pose or face-mesh fallback ---
-        posture_data = {}
-        if self._ml_ready and self.posture_classifier is not None and self.pose_detector is not None:
-            ml_weight = self.ml_coordinator.get_ml_blend_weight() if self.ml_coordinator else 0.0
-            try:
-                _, pose_results = self.pose_detector.process_frame(frame, draw=False)
-                pose_landmarks = self.pose_detector.get_landmarks(pose_results)
-
-                # Проверяем, что плечи видны (nose=0, l_shoulder=11, r_shoulder=12).
-                # get_landmarks() возвращает список, поэтому hasattr(..., 'landmark') = False.
-                # Бёдра (23, 24) на вебкамере не видны — не требуем их здесь;
-                # extract_pose_features сам откажется от ML если бёдра невидны.
-                pose_usable = (
-                    pose_landmarks is not None
-                    and isinstance(pose_landmarks, list)
-                    and len(pose_landmarks) >= 13
-                    and getattr(pose_landmarks[11], 'visibility', 0) > 0.3
-                    and getattr(pose_landmarks[12], 'visibility', 0) > 0.3
-                )
-
-                if pose_usable:
-                    ml_posture = self.posture_classifier.predict(pose_landmarks, ml_weight=ml_weight)
-                    used = 'ml_progressive' if 0 < ml_weight < 1 else ('ml_pure' if ml_weight >= 1.0 else 'ml_dense')
-                    posture_data = {
-                        'posture_status': ml_posture.get('status', 'good').capitalize(),
-                        'posture_score': int(ml_posture.get('confidence', 0) * 100),
-                        'posture_level': ml_posture.get('status', 'good'),
-                        'posture_alert': ml_posture.get('status') == 'bad',
-                        'model_used_posture': used,
-                    }
-                else:
-                    # Pose landmarks недоступны или неполные —
-                    # используем геометрический анализ по Face Mesh
-                    # с компенсацией угла камеры из калибровки
-                    baseline_pitch = 0.0
-                    if self.calibration_manager:
-                        baseline_pitch = self.calibration_manager.posture_calibration.get(
-                            'baseline_pitch', 0.0
-                        )
-                    pm = self.posture_classifier.predict_from_face_mesh(
-                        face_data['landmarks'], frame.shape[1], frame.shape[0],
-                        calibration_baseline_pitch=baseline_pitch,
-                        head_pitch=pitch,
-                    )
-                    posture_data = {
-                        'posture_status': pm.get('status', 'good').capitalize(),
-                        'posture_score': int(pm.get('confidence', 0) * 100),
-                        'posture_level': pm.get('status', 'good'),
-                        'posture_alert': pm.get('status') == 'bad',
-                        'model_used_posture': 'face_mesh_geometric',
-                    }
-            except Exception as ml_pe:
-                logger.warning(f"ML posture error, fallback: {ml_pe}")
-                posture_data = self.posture_processor.process(
-                    face_data['landmarks'], frame.shape[1], frame.shape[0], pitch, current_time
-                )
-        else:
-            posture_data = self.posture_processor.process(
-                face_data['landmarks'], frame.shape[1], frame.shape[0], pitch, current_time
-            )
+        return self.engine.toggle_pause()
 
-        # ── Pitch-защита: при сильном наклоне вниз/вверх переопределяем
-        # любой ML-результат, даже если ML считает осанку хорошей.
-        PITCH_FWD_THRESHOLD = 25.0  # наклон вниз (смотреть на стол)
-        PITCH_UP_THRESHOLD  = -15.0 # запрокидывание назад/вверх
-        if pitch > PITCH_FWD_THRESHOLD or pitch < PITCH_UP_THRESHOLD:
-            old_level = posture_data.get('posture_level') or \
-                        posture_data.get('posture_status', '').lower()
-            old_score = posture_data.get('posture_score', 0)
-            pitch_deg = pitch
-            posture_data.update({
-                'posture_status':      'Bad',
-                'posture_score':       int(max(old_score, 85)),
-                'posture_level':       'bad',
-                'posture_alert':       True,
-                'pitch_alert':         True,
-                'model_used_posture':  posture_data.get('model_used_posture', 'pitch_guard'),
-            })
-            logger.info(
-                f"Pitch guard: pitch={pitch_deg:.1f}° (fwd>{PITCH_FWD_THRESHOLD}° "
-                f"| up<{PITCH_UP_THRESHOLD}°), "
-                f"overrode old_level={old_level}"
-            )
-
-        data.update(posture_data)
-
-        # Нормализуем posture_alert: ML возвращает разные ключи и регистры.
-        # posture_processor (fallback) использует 'is_bad', ML-путь — 'posture_alert',
-        # а сравнение статуса должно быть case-insensitive.
-        # ИСПРАВЛЕНО: добавлен уровень posture_alert_level ('fair' vs 'bad')
-        _ps = posture_data.get('posture_status', '').lower()
-        _pl = posture_data.get('posture_level', '').lower()
-
-        data['posture_alert'] = bool(
-            posture_data.get('posture_alert', False)
-            or posture_data.get('is_bad', False)
-            or posture_data.get('pitch_alert', False)
-            or _ps in ('bad', 'bad posture', 'fair')
-            or _pl in ('bad', 'fair')
-        )
-
-        # Новый ключ: уровень серьёзности проблемы с осанкой
-        # 'bad' = высокая опасность, 'fair' = предупреждение
-        if _ps in ('bad', 'bad posture') or _pl == 'bad':
-            data['posture_alert_level'] = 'bad'
-        elif _ps == 'fair' or _pl == 'fair':
-            data['posture_alert_level'] = 'fair'
-        else:
-            data['posture_alert_level'] = None
-
-        # Выбор события для отображения в логе.
-        # Осанка имеет приоритет (у неё 30 с кулдаун), усталость — 2 с.
-        # Если осанка не выдала событие, показываем событие усталости.
-        _posture_ev = posture_data.get('event')
-        _fatigue_ev = data.get('event')   # уже заполнено из fatigue_data.update()
-        if _posture_ev:
-            data['event'] = _posture_ev
-        elif _fatigue_ev:
-            data['event'] = _fatigue_ev
-        else:
-            data['event'] = None
-
-        # ── DIAGNOSTIC: log first 5 heavy-ML cycles ──────────────
-        if self.frame_counter < 40 and self.frame_counter % 8 == 0:
-            logger.info(
-                f"[DIAG] frame={self.frame_counter} | "
-                f"ear={ear:.3f} mar={mar:.3f} pitch={pitch:.2f} | "
-                f"fatigue={fatigue_data.get('status', 'N/A')} "
-                f"score={fatigue_data.get('fatigue_score', 0):.0f} "
-                f"model={fatigue_data.get('model_used', 'N/A')} | "
-                f"posture={posture_data.get('posture_status', 'N/A')} "
-                f"level={posture_data.get('posture_level', 'N/A')} "
-                f"model={posture_data.get('model_used_posture', 'N/A')} | "
-                f"blink_rate={fatigue_data.get('blink_rate', 0)}"
-            )
-
-
-        # --- DB save (every ~1s) ---
-        if time.time() - self.last_save_time > 1.0:
-            posture_raw = posture_data.get('posture_status', 'Good')
-            posture_lower = posture_raw.lower()
-            if posture_lower == 'bad':
-                posture_db = 'Bad Posture'
-            elif posture_lower == 'fair':
-                posture_db = 'Fair Posture'
-            else:
-                posture_db = posture_raw
-
-            fatigue_raw = fatigue_data.get('fatigue_status', 'Awake')
-            mar_val = fatigue_data.get('mar', 0)
-            if mar_val > 0.6:
-                fatigue_db = 'Yawning'
-            elif fatigue_raw.lower() == 'sleeping':
-                fatigue_db = 'Eyes Closed'
-            else:
-                fatigue_db = fatigue_raw
-
-            # Добавляем информацию об использованной модели в статус
-            model_used = fatigue_data.get('model_used', 'geometric')
-            posture_model_used = posture_data.get('model_used_posture', 'geometric')
-            fatigue_db = f"{fatigue_db} [{model_used}]"
-            posture_db = f"{posture_db} [{posture_model_used}]"
-
-            self.db.save_log(
-                ear=ear, mar=mar, pitch=pitch, emotion=emotion,
-                fatigue_status=fatigue_db, posture_status=posture_db
-            )
-            self.last_save_time = time.time()
-
-        # Cache the result for lightweight frames
-        self._last_data = data
-        return data
+    def run(self):
+        self.engine.run()
 
     def stop(self):
-        self._run_flag = False
+        self.engine.stop()
         self.wait(3000)
 
 
@@ -1033,6 +398,10 @@ class MainWindow(QMainWindow):
         self.image_label.setMinimumSize(320, 240)
         self.image_label.setStyleSheet(f"background-color: #121215; border-radius: 0 0 16px 16px;")
         self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        # Размер метки задаёт layout, а не pixmap — иначе превью размером
+        # с виджет раздувало бы его на каждом кадре
+        self.image_label.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
+        self.image_label.installEventFilter(self)
         video_layout.addWidget(self.image_label, stretch=1)
 
         left_layout.addWidget(video_container, stretch=1)
@@ -1336,10 +705,6 @@ class MainWindow(QMainWindow):
         self._last_face_state = True
         self._analysis_paused = False
 
-        self.notify_timer = QTimer(self)
-        self.notify_timer.setInterval(10000)
-        self.notify_timer.timeout.connect(self.check_notifications)
-        self.notify_timer.start()
 
         self.session_timer = QTimer(self)
         self.session_timer.setInterval(1000)
@@ -1354,12 +719,14 @@ class MainWindow(QMainWindow):
 
         self.calibration_manager = CalibrationManager()
         
-        self.video_thread = VideoThread()
+        self.video_thread = VideoThread(notification_manager=self.notify_manager)
         self.video_thread.set_calibration_manager(self.calibration_manager)
         self.video_thread.change_pixmap_signal.connect(self.update_image)
+        self._sync_preview()
         self.video_thread.update_data_signal.connect(self.update_dashboard)
         self.video_thread.calibration_progress_signal.connect(self.on_calibration_progress)
         self.video_thread.calibration_done_signal.connect(self.on_calibration_done)
+        self.video_thread.notification_signal.connect(self.on_notification)
         self.video_thread.start()
         
         self.shortcut_escape = QShortcut(Qt.Key.Key_Escape, self)
@@ -1456,13 +823,56 @@ class MainWindow(QMainWindow):
             self.event_list.takeItem(25)
 
     def update_image(self, qt_img):
-        self.image_label.setPixmap(QPixmap.fromImage(qt_img))
+        # fromImage копирует пиксели — после этого буфер превью можно переиспользовать
+        if self.isVisible() and not self.isMinimized():
+            self.image_label.setPixmap(QPixmap.fromImage(qt_img))
+        self.video_thread.preview.release()
+
+    # ── Preview visibility ─────────────────────────────────────
+
+    def _sync_preview(self):
+        """Передать видеопотоку видимость окна, размер виджета и частоту экрана."""
+        video_thread = getattr(self, 'video_thread', None)
+        if video_thread is None:
+            return
+        preview = video_thread.preview
+        preview.set_visible(self.isVisible() and not self.isMinimized())
+        size = self.image_label.size()
+        preview.set_target_size(size.width(), size.height())
+        screen = self.screen()
+        if screen is not None and screen.refreshRate() > 0:
+            preview.set_max_fps(screen.refreshRate())
+
+    def eventFilter(self, obj, event):
+        if obj is getattr(self, 'image_label', None) and event.type() == QEvent.Type.Resize:
+            self._sync_preview()
+        return super().eventFilter(obj, event)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._sync_preview()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._sync_preview()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange:
+            self._sync_preview()
 
     def update_dashboard(self, data):
-        emotion = data["emotion"]
+        """Обновить карточки по FrameResult и вернуть его в пул движка."""
+        try:
+            self._update_dashboard(data)
+        finally:
+            data.release()
+
+    def _update_dashboard(self, data):
+        emotion = data.emotion
         self.emotion_card.update_value(emotion)
         
-        face_detected = data.get("face_detected", True)
+        face_detected = data.face_detected
         
         if self._analysis_paused:
             self.status_dot.setStyleSheet(f"background-color: {DARK_COLORS['warning']}; border-radius: 5px;")
@@ -1496,7 +906,7 @@ class MainWindow(QMainWindow):
                     self.add_log_event("⚠️ Лицо потеряно >5 сек", DARK_COLORS['warning'])
                     logger.warning(f"Лицо пользователя потеряно на {lost_duration:.1f} секунд")
         
-        fatigue_level = data.get("fatigue_level", "normal")
+        fatigue_level = data.fatigue.fatigue_level
         
         if emotion in ["Нейтрально", "Спокойствие"]:
             self.emotion_card.update_status("good")
@@ -1509,7 +919,7 @@ class MainWindow(QMainWindow):
         else:
             self.emotion_card.update_status("normal")
 
-        fatigue_score = data.get("fatigue_score", 0)
+        fatigue_score = data.fatigue.fatigue_score
         if self._analysis_paused:
             attention_level = self._attention_level
         else:
@@ -1532,10 +942,10 @@ class MainWindow(QMainWindow):
             
         self.attention_card.update_value(f"{attention_level}", "%")
 
-        pitch = data["pitch"]
+        pitch = data.pitch
 
         # ИСПРАВЛЕНО: posture_alert теперь имеет уровни 'fair' и 'bad'
-        posture_alert_level = data.get('posture_alert_level')
+        posture_alert_level = data.posture.posture_alert_level
 
         if posture_alert_level == 'bad':
             # Плохая осанка — красный, восклицательный знак
@@ -1558,7 +968,7 @@ class MainWindow(QMainWindow):
             self.posture_icon.setStyleSheet(f"color: {DARK_COLORS['good']};")
             self.posture_value.setStyleSheet(f"color: {DARK_COLORS['text_primary']};")
 
-        current_event = data["event"]
+        current_event = data.event
         if current_event:
             now = time.time()
             ev_lower = current_event.lower()
@@ -1568,7 +978,7 @@ class MainWindow(QMainWindow):
             _posture_keywords = ("осанка", "наклон", "отклонение", "голова", "поза")
             if any(kw in ev_lower for kw in _posture_keywords):
                 tracking_key = "posture_any"
-                posture_level = data.get('posture_alert_level')
+                posture_level = posture_alert_level
                 cooldown = float(n.settings.get("posture_cooldown", 30))
                 color = DARK_COLORS['danger'] if posture_level == 'bad' else DARK_COLORS['warning']
             else:
@@ -1624,9 +1034,6 @@ class MainWindow(QMainWindow):
 
         self.tray_icon.hide()
 
-        if hasattr(self, 'notify_timer'):
-            self.notify_timer.stop()
-
         if hasattr(self, 'session_timer'):
             self.session_timer.stop()
 
@@ -1814,25 +1221,21 @@ class MainWindow(QMainWindow):
             except Exception:
                 pass
 
-    def check_notifications(self):
-        if self._analysis_paused:
-            return
-        result = self.notify_manager.check_conditions()
-        if result:
-            title, msg = result
-            title_l = title.lower()
-            msg_l   = msg.lower()
-            # Подбираем цвет акцента по теме уведомления
-            if 'осанк' in title_l or 'осанк' in msg_l:
-                accent = '#F87171'   # danger — осанка
-            elif 'сильная' in title_l or 'сонли' in msg_l or 'сонли' in title_l:
-                accent = '#F87171'   # danger — сильная усталость
-            elif 'устал' in title_l or 'зева' in msg_l:
-                accent = '#FBBF24'  # warning — усталость / зевки
-            else:
-                accent = '#6B8AFE'  # accent — перерыв/общее
-            self.show_notification(title, msg, accent=accent)
-            sound_manager.notification()
+    def on_notification(self, title, msg):
+        """Правило уведомлений сработало в движке (проверка раз в 10 с, не на паузе)."""
+        title_l = title.lower()
+        msg_l   = msg.lower()
+        # Подбираем цвет акцента по теме уведомления
+        if 'осанк' in title_l or 'осанк' in msg_l:
+            accent = '#F87171'   # danger — осанка
+        elif 'сильная' in title_l or 'сонли' in msg_l or 'сонли' in title_l:
+            accent = '#F87171'   # danger — сильная усталость
+        elif 'устал' in title_l or 'зева' in msg_l:
+            accent = '#FBBF24'  # warning — усталость / зевки
+        else:
+            accent = '#6B8AFE'  # accent — перерыв/общее
+        self.show_notification(title, msg, accent=accent)
+        sound_manager.notification()
 
     def show_notification(self, title, msg, accent=None):
         self.toast = ToastNotification(title, msg, accent_color=accent)
@@ -68,20 +68,28 @@ class PoseDetector:
     def is_available(self) -> bool:
         return self.available
     
-    def process_frame(self, frame, draw: bool = True):
-        """Process frame and detect pose."""
+    def process_frame(self, frame, draw: bool = True, rgb=None):
+        """Process frame and detect pose.
+
+        ``rgb`` — optional precomputed RGB of ``frame``.  With ``draw=False``
+        the input frame is returned as is (no copy).
+        """
         if self._detector is None:
             return frame, None
             
         try:
-            rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_image)
+            rgb_image = rgb if rgb is not None else cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB,
+                                data=np.ascontiguousarray(rgb_image))
             
             result = self._detector.detect(mp_image)
             
+            if not draw:
+                return frame, result
+
             annotated_frame = frame.copy()
             
-            if draw and result.pose_landmarks:
+            if result.pose_landmarks:
                 self._draw_pose(annotated_frame, result.pose_landmarks)
             
             return annotated_frame, result
@@ -0,0 +1,158 @@
+"""
+Command line entry point for the headless NeuroFocus engine.
+
+    python -m neurofocus.engine --duration 60 --output run.jsonl
+    python -m neurofocus.engine --source clip.mp4 --output run.sqlite --no-db
+    python -m neurofocus.engine --source frames/ --fast --output bench.jsonl
+    python -m neurofocus.engine --duration 3600 --record day.nflm
+    python -m neurofocus.engine --replay-landmarks day.nflm --output replay.jsonl
+
+Runs ``src.engine.NeuroFocusEngine`` without PyQt or a display server and
+prints throughput statistics on exit — for benchmarks, CI and soak tests.
+``--replay-landmarks`` skips capture and MediaPipe entirely and feeds a
+landmark recording straight into the face / fatigue / posture analytics.
+Must be started from the project root (the engine lives in ``src``).
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m neurofocus.engine",
+        description="Headless NeuroFocus analysis engine",
+    )
+    parser.add_argument("--source", default=None,
+                        help="индекс камеры, путь к видео или каталог изображений "
+                             "(по умолчанию camera.index из config)")
+    parser.add_argument("--fast", action="store_true",
+                        help="файл/каталог: без темпа реального времени и без потерь кадров")
+    parser.add_argument("--loop", action="store_true",
+                        help="файл/каталог: начинать сначала по достижении конца")
+    parser.add_argument("--duration", type=float, default=None,
+                        help="время работы в секундах (по умолчанию — до Ctrl+C)")
+    parser.add_argument("--output", default=None,
+                        help="файл результатов (.jsonl или .sqlite)")
+    parser.add_argument("--format", choices=("jsonl", "sqlite"), default=None,
+                        help="формат вывода (по умолчанию по расширению --output)")
+    parser.add_argument("--no-db", action="store_true",
+                        help="не писать face_logs в data/session_data.db")
+    parser.add_argument("--notifications", action="store_true",
+                        help="проверять правила уведомлений и печатать их в stdout")
+    parser.add_argument("--record", default=None,
+                        help="записывать landmarks лица/руки/позы в файл (.nflm)")
+    parser.add_argument("--record-quantized", action="store_true",
+                        help="хранить координаты в int16 вместо float32 (вдвое меньше)")
+    parser.add_argument("--face-tracker", choices=("face_mesh", "landmarker"), default=None,
+                        help="трекер лица: Face Mesh или FaceLandmarker task "
+                             "(по умолчанию face.tracker из config)")
+    parser.add_argument("--replay-landmarks", default=None, metavar="PATH",
+                        help="прогнать запись landmarks через аналитику без камеры и MediaPipe")
+    return parser
+
+
+def replay(path: str, sink=None) -> int:
+    """Аналитика по записи landmarks: FaceProcessor + ML-классификаторы."""
+    from src.landmark_recording import LandmarkRecording, replay_analytics
+    from src.processors.face_processor import FaceProcessor
+
+    recording = LandmarkRecording(path)
+    fatigue_classifier = posture_classifier = None
+    try:
+        from neurofocus.ml.fatigue_classifier import FatigueClassifier
+        from neurofocus.ml.posture_classifier import PostureClassifier
+        from build_utils import resource_path
+        fatigue_classifier = FatigueClassifier()
+        posture_classifier = PostureClassifier(
+            model_path=resource_path('models/posture_model.keras')
+        )
+    except Exception as e:
+        print(f"[warning] ML классификаторы недоступны: {e}", file=sys.stderr, flush=True)
+
+    stats = replay_analytics(
+        recording, FaceProcessor(), fatigue_classifier, posture_classifier,
+        on_result=sink.write if sink is not None else None,
+    )
+    stats["recording_s"] = round(recording.duration, 1)
+    print(json.dumps(stats, ensure_ascii=False, indent=2))
+    return 0
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    from src.engine import NeuroFocusEngine
+    from src.result_sink import open_sink
+
+    sink = open_sink(args.output, args.format) if args.output else None
+
+    def on_data(result):
+        # Sink пишет синхронно — после записи FrameResult можно вернуть в пул
+        sink.write(result)
+        result.release()
+
+    if args.replay_landmarks:
+        try:
+            return replay(args.replay_landmarks, sink)
+        finally:
+            if sink is not None:
+                sink.close()
+
+    notification_manager = None
+    if args.notifications:
+        from src.notification_manager import NotificationManager
+        notification_manager = NotificationManager()
+
+    def on_notification(title, message):
+        print(f"[notification] {title}: {message}", flush=True)
+
+    engine = NeuroFocusEngine(
+        source=args.source,
+        realtime=not args.fast,
+        loop=args.loop,
+        db_name=None if args.no_db else "session_data.db",
+        notification_manager=notification_manager,
+        on_data=on_data if sink is not None else None,
+        on_notification=on_notification,
+        on_error=lambda message: print(f"[error] {message}", file=sys.stderr, flush=True),
+        record_path=args.record,
+        record_quantized=args.record_quantized,
+        face_tracker=args.face_tracker,
+    )
+
+    started = time.monotonic()
+    worker = threading.Thread(
+        target=engine.run, kwargs={"duration": args.duration},
+        name="NeuroFocus-Engine", daemon=True,
+    )
+    worker.start()
+    try:
+        while worker.is_alive():
+            worker.join(0.5)
+    except KeyboardInterrupt:
+        engine.stop()
+        worker.join(5.0)
+    elapsed = time.monotonic() - started
+
+    if sink is not None:
+        sink.close()
+    if engine.db is not None:
+        engine.db.stop(timeout=5.0)
+
+    summary = {
+        "elapsed_s": round(elapsed, 1),
+        "frames": engine.frame_counter,
+        "fps": round(engine.frame_counter / elapsed, 1) if elapsed > 0 else 0.0,
+        "pipeline": engine.pipeline.get_stats() if engine.pipeline else None,
+        "governor": engine.governor.get_stats() if engine.initialized else None,
+    }
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 0 if engine.initialized else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,12 +11,14 @@ from .preprocessing import (
     prepare_face_image,
     calculate_ear_from_landmarks,
     calculate_mar_from_landmarks,
+    extract_face_mesh_posture_features,
 )
 
 # Online learning modules
 from .blink_tracker import BlinkTracker
 from .microsleep_detector import MicrosleepDetector
 from .temporal_features import TemporalFeatureExtractor
+from .fatigue_signals import FatigueSignals
 from .user_profile import UserProfile
 from .threshold_adapter import ThresholdAdapter
 from .online_learner import OnlineLearner
@@ -30,10 +32,12 @@ __all__ = [
     "prepare_face_image",
     "calculate_ear_from_landmarks",
     "calculate_mar_from_landmarks",
+    "extract_face_mesh_posture_features",
     # Online learning
     "BlinkTracker",
     "MicrosleepDetector",
     "TemporalFeatureExtractor",
+    "FatigueSignals",
     "UserProfile",
     "ThresholdAdapter",
     "OnlineLearner",
@@ -35,8 +35,10 @@ class BlinkTracker:
         self.open_threshold = open_thresh
         self.closed_threshold = closed_thresh
 
-    def get_blink_rate_per_minute(self, window: float = 60.0) -> int:
-        now = time.time()
+    def get_blink_rate_per_minute(self, window: float = 60.0, now: float = None) -> int:
+        """now — часы, в которых пришли timestamps update(); None — time.time()."""
+        if now is None:
+            now = time.time()
         recent = [t for t in self.blink_timestamps if now - t < window]
         if len(recent) < 2:
             return 0
@@ -44,3 +46,9 @@ class BlinkTracker:
         if span < 1.0:
             span = 1.0
         return int(len(recent) / span * 60)
+
+    def recent_blinks(self, seconds: float, now: float = None) -> int:
+        """Число морганий за последние seconds секунд."""
+        if now is None:
+            now = time.time()
+        return sum(1 for t in self.blink_timestamps if now - t < seconds)
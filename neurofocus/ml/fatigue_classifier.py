@@ -8,8 +8,21 @@ import numpy as np
 import mediapipe
 from collections import deque
 import os
-import time
 from build_utils import resource_path
+from src.frame_result import FatigueResult
+from src.inference_backend import KerasBackend, inference_config, input_shape_of, load_model_backend
+from src.lstm_stream import MODE_STREAMING, LSTMStream
+
+
+def _landmark_array(face_landmarks):
+    """
+    Массив (N, 3) у LandmarkFrame (src/landmark_frame.py), иначе None.
+
+    LandmarkFrame уже хранит EAR / MAR, посчитанные FaceProcessor, —
+    классификатор берёт их оттуда, а не пересчитывает по точкам.
+    """
+    points = getattr(face_landmarks, 'points', None)
+    return points if isinstance(points, np.ndarray) else None
 
 
 class FatigueClassifier:
@@ -28,7 +41,8 @@ class FatigueClassifier:
     """
     
     def __init__(self, model_path: str = None, user_profile_manager=None):
-        self.model = None
+        self.model = None           # Keras CNN (для train / save)
+        self.cnn_backend = None     # InferenceBackend для инференса CNN
         self.model_path = model_path or resource_path('models/fatigue_cnn.keras')
         self.classes = ['awake', 'drowsy', 'sleeping']
         self.input_size = (64, 64)
@@ -39,31 +53,35 @@ class FatigueClassifier:
         # Prediction smoothing (сокращено — было 10, слишком инертно)
         self.prediction_history = deque(maxlen=5)
 
-        # NEW: Temporal components
-        from .blink_tracker import BlinkTracker
-        from .microsleep_detector import MicrosleepDetector
-        from .temporal_features import TemporalFeatureExtractor
-        from .user_profile import UserProfile
-        from .threshold_adapter import ThresholdAdapter
+        # Per-frame стадия (observe): моргания, микросны, временные признаки
+        from .fatigue_signals import FatigueSignals
 
-        self.blink_tracker = BlinkTracker()
-        self.microsleep_detector = MicrosleepDetector()
-        self.temporal_extractor = TemporalFeatureExtractor(window_size=30)
+        self.signals = FatigueSignals(window_size=30)
+        self.blink_tracker = self.signals.blink_tracker
+        self.microsleep_detector = self.signals.microsleep_detector
+        self.temporal_extractor = self.signals.temporal_extractor
+        # observe() уже был вызван для кадра, который пойдёт в predict()
+        self._observed = False
 
         # User profile & online-learning adapter (wired by MLCoordinator)
         self.user_profile = None
         self.threshold_adapter = None
 
-        # Frame buffer for LSTM (if used)
-        self.frame_buffer = deque(maxlen=30)
+        # Окно признаков LSTM: кольцевой буфер + пошаговое состояние
+        # (LSTMStream, создаётся в _init_lstm вместе с backend)
+        self.lstm_stream = None
+        self._lstm_row = np.zeros(16, np.float32)
 
         # CRITICAL: Track consecutive frames with low EAR for forced sleep override
         self._consecutive_low_ear_frames = 0
         self._ear_low_threshold = 0.18  # EAR ниже = глаза закрыты
         self._ear_low_frame_threshold = 5  # кадров подряд = принудительный сон
 
-        # LSTM model for temporal analysis
+        # LSTM model for temporal analysis: инференс через lstm_backend
+        # (TFLite / ONNX / Keras), lstm_model — Keras-модель для дообучения
+        # (None, если backend загружен из кэша без TensorFlow — см. keras_lstm)
         self.lstm_model = None
+        self.lstm_backend = None
         self.lstm_model_path = resource_path('models/fatigue_lstm.keras')
         self._use_lstm = False
         self._init_lstm()
@@ -116,24 +134,75 @@ class FatigueClassifier:
         """Initialize LSTM model for temporal analysis."""
         if os.path.exists(self.lstm_model_path):
             try:
-                import tensorflow as tf
-                self.lstm_model = tf.keras.models.load_model(self.lstm_model_path, compile=False)
-                self._use_lstm = True
-                print(f"LSTM Fatigue model loaded from {self.lstm_model_path}")
+                self.lstm_backend = load_model_backend(self.lstm_model_path)
             except Exception as e:
                 print(f"Failed to load LSTM model: {e}")
+                self.lstm_backend = None
+            if self.lstm_backend is not None:
+                self.lstm_model = self.lstm_backend.keras_model
+                self._use_lstm = True
+                self.lstm_stream = self._create_lstm_stream(self.lstm_backend)
+                print(f"LSTM Fatigue model loaded from {self.lstm_model_path} "
+                      f"({self.lstm_backend.name} backend, {self.lstm_stream.mode} mode)")
+            else:
                 self._use_lstm = False
         else:
             print("LSTM model not found, using CNN only")
             self._use_lstm = False
+
+    @staticmethod
+    def _create_lstm_stream(backend):
+        """inference.lstm_mode: streaming (шаг LSTM на строку) / window."""
+        cfg = inference_config()
+        shape = input_shape_of(backend) or (None, 30, 16)
+        return LSTMStream(
+            backend,
+            window=int(shape[1] or 30),
+            features=int(shape[2] or 16),
+            mode=cfg.get('lstm_mode', MODE_STREAMING),
+            resync_interval=cfg.get('lstm_resync_interval', 30),
+        )
+
+    def keras_lstm(self):
+        """
+        Keras-модель LSTM для дообучения (OnlineLearner).  Если backend
+        загружен из кэша, TensorFlow импортируется только здесь — в фоновом
+        потоке дообучения, а не при старте.
+        """
+        if self.lstm_model is None and os.path.exists(self.lstm_model_path):
+            import tensorflow as tf
+            self.lstm_model = tf.keras.models.load_model(self.lstm_model_path, compile=False)
+        return self.lstm_model
+
+    def refresh_lstm_backend(self, model):
+        """
+        Подменить backend дообученной моделью.  Конвертируется в отдельный
+        файл кэша (*_online), чтобы следующий запуск снова начинал с
+        исходного fatigue_lstm.keras.
+        """
+        online_path = os.path.splitext(self.lstm_model_path)[0] + '_online.keras'
+        try:
+            backend = load_model_backend(online_path, keras_model=model)
+        except Exception as e:
+            print(f"LSTM backend refresh failed, using Keras: {e}")
+            backend = KerasBackend(model)
+        self.lstm_model = model
+        self.lstm_backend = backend
+        if self.lstm_stream is not None:
+            # Применится в потоке аналитики на следующем кадре
+            self.lstm_stream.set_backend(backend)
+
     def _load_model(self, model_path: str):
         """Load TensorFlow/Keras model."""
         try:
-            import tensorflow as tf
-            self.model = tf.keras.models.load_model(model_path, compile=False)
-            print(f"TF Fatigue model loaded from {model_path}")
+            self.cnn_backend = load_model_backend(model_path)
         except Exception as e:
             print(f"Failed to load fatigue model: {e}")
+            self.cnn_backend = None
+        if self.cnn_backend is not None:
+            self.model = self.cnn_backend.keras_model
+            print(f"TF Fatigue model loaded from {model_path} ({self.cnn_backend.name} backend)")
+        else:
             # Do NOT build a random untrained CNN — LSTM will handle prediction
             self.model = None
     
@@ -176,61 +245,72 @@ class FatigueClassifier:
             )
             
             self.model = model
+            self.cnn_backend = KerasBackend(model)
             print("TF Fatigue CNN model built and ready")
             
         except Exception as e:
             print(f"Failed to build CNN model: {e}")
             self.model = None
+            self.cnn_backend = None
     
     @property
     def is_ready(self) -> bool:
-        return self.model is not None
+        return self.cnn_backend is not None
     
-    def _extract_eye_region(self, frame, face_landmarks):
+    def _extract_eye_region(self, frame, face_landmarks, gray=None):
         """
         Extract eye region from face using MediaPipe landmarks.
         
         Args:
             frame: BGR image from OpenCV
             face_landmarks: MediaPipe face landmarks (list or object with .landmark)
+            gray: optional precomputed grayscale of the whole frame
         
         Returns:
             grayscale image of eye region, or None
         """
-        if face_landmarks is None:
+        if face_landmarks is None or (frame is None and gray is None):
             return None
         
         try:
             import cv2
             
-            h, w = frame.shape[:2]
-            
-            # Handle both list and object formats
-            if hasattr(face_landmarks, 'landmark'):
-                # Object format (has .landmark attribute)
-                landmarks = face_landmarks.landmark
-            elif isinstance(face_landmarks, list):
-                # List format
-                landmarks = face_landmarks
-            else:
-                return None
-            
-            if len(landmarks) < 374:
-                return None
+            h, w = (gray if gray is not None else frame).shape[:2]
             
             # Eye landmark indices
             left_eye_idx = [33, 133, 160, 144, 158, 153]
             right_eye_idx = [362, 263, 385, 380, 387, 373]
             all_eye_idx = left_eye_idx + right_eye_idx
             
-            # Get bounding box - use .x and .y attributes
-            x_coords = []
-            y_coords = []
-            for i in all_eye_idx:
-                if i < len(landmarks):
-                    x_coords.append(landmarks[i].x * w)
-                    y_coords.append(landmarks[i].y * h)
-            
+            points = _landmark_array(face_landmarks)
+            if points is not None:
+                if len(points) < 374:
+                    return None
+                eye_xy = points[all_eye_idx, :2] * (w, h)
+                x_coords = eye_xy[:, 0].tolist()
+                y_coords = eye_xy[:, 1].tolist()
+            else:
+                # Handle both list and object formats
+                if hasattr(face_landmarks, 'landmark'):
+                    # Object format (has .landmark attribute)
+                    landmarks = face_landmarks.landmark
+                elif isinstance(face_landmarks, list):
+                    # List format
+                    landmarks = face_landmarks
+                else:
+                    return None
+
+                if len(landmarks) < 374:
+                    return None
+
+                # Get bounding box - use .x and .y attributes
+                x_coords = []
+                y_coords = []
+                for i in all_eye_idx:
+                    if i < len(landmarks):
+                        x_coords.append(landmarks[i].x * w)
+                        y_coords.append(landmarks[i].y * h)
+
             if not x_coords:
                 return None
             
@@ -247,6 +327,10 @@ class FatigueClassifier:
             y_max = min(h, y_max + pad_y)
             
             # Extract and convert to grayscale
+            if gray is not None:
+                eye_gray = gray[y_min:y_max, x_min:x_max]
+                return eye_gray if eye_gray.size else None
+
             eye_region = frame[y_min:y_max, x_min:x_max]
             
             if eye_region.size == 0:
@@ -282,16 +366,49 @@ class FatigueClassifier:
         except Exception as e:
             return None
     
-    def predict(self, face_landmarks, frame=None):
+    def observe(self, face_landmarks, timestamp=None, ear=None, mar=None):
+        """
+        Per-frame signal stage: дёшево, вызывается на каждом кадре с лицом.
+
+        Обновляет BlinkTracker, MicrosleepDetector, временные признаки и
+        строку LSTM (один шаг окна = один кадр).  ear / mar — уже
+        посчитанные FaceProcessor значения; timestamp — время кадра.
+        Решение LSTM / CNN принимает predict() на тяжёлом пути.
+
+        Returns:
+            temporal features dict or None without landmarks.
+        """
+        if face_landmarks is None:
+            return None
+        if ear is None:
+            ear = self._calculate_ear(face_landmarks)
+        if mar is None:
+            mar = self._calculate_mar(face_landmarks)
+        head_features = self._calculate_head_features(face_landmarks)
+        temporal_features = self.signals.update(
+            ear, mar,
+            head_droop=head_features.get('head_droop', 0),
+            head_tilt=head_features.get('head_tilt', 0),
+            timestamp=timestamp,
+        )
+        self._add_to_lstm_buffer(ear, mar, head_features, temporal_features)
+        self._observed = True
+        return temporal_features
+
+    def predict(self, face_landmarks, frame=None, gray=None):
         """
         Predict fatigue level using TensorFlow CNN + temporal features.
+
+        Uses the signal stage state left by observe() for this frame; when
+        the caller does not run observe() per frame, predict() runs it first.
         
         Args:
             face_landmarks: MediaPipe face landmarks
             frame: BGR image from OpenCV
+            gray: optional precomputed grayscale of ``frame``
         
         Returns:
-            dict with all required fields for UI:
+            FatigueResult (src/frame_result.py) with the fields for UI:
             - status: 'awake', 'drowsy', 'sleeping'
             - confidence: prediction confidence
             - raw_scores: array of class probabilities
@@ -305,86 +422,69 @@ class FatigueClassifier:
             - yawning: boolean
             - temporal_features: dict with temporal analysis
         """
-        current_time = time.time()
-
         if face_landmarks is None:
             # Reset low EAR counter when face is lost
             self._consecutive_low_ear_frames = 0
-            result = self._unknown_result()
-            result['ear'] = 0.35
-            result['mar'] = 0.0
-            result['blink_rate'] = 0
-            result['fatigue_score'] = 0
-            result['fatigue_level'] = 'normal'
-            result['trend'] = 'stable'
-            result['microsleep_detected'] = False
-            result['yawning'] = False
-            return result
-
-        # Calculate EAR and MAR
-        ear = self._calculate_ear(face_landmarks)
-        mar = self._calculate_mar(face_landmarks)
-        
-        # Get head pose features
-        head_features = self._calculate_head_features(face_landmarks)
-        
-        # NEW: Update temporal components
-        self.blink_tracker.update(ear, current_time)
-        self.microsleep_detector.update(ear, current_time)
-        
-        temporal_features = self.temporal_extractor.update(
-            ear=ear,
-            mar=mar,
-            head_droop=head_features.get('head_droop', 0),
-            head_tilt=head_features.get('head_tilt', 0),
-            current_time=current_time
-        )
-        
-        # Get real blink rate from tracker
-        blink_rate = self.blink_tracker.get_blink_rate_per_minute()
-        
-        # Get microsleep info
-        microsleep_info = self.microsleep_detector.get_statistics()
+            self._observed = False
+            return FatigueResult(fatigue_status='Unknown', raw_scores=[0.0, 0.0, 0.0])
+
+        if not self._observed:
+            self.observe(face_landmarks)
+        self._observed = False
+
+        # Сигналы последнего кадра из per-frame стадии
+        signals = self.signals
+        ear = signals.ear
+        mar = signals.mar
+        head_features = {'head_droop': signals.head_droop, 'head_tilt': signals.head_tilt}
+        temporal_features = signals.temporal_features
+        blink_rate = signals.blink_rate()
+        microsleep_info = signals.microsleep_statistics()
         
         # Check yawning (from temporal features)
         yawning = temporal_features.get('yawning', False)
-        
-        # Always update LSTM buffer — uses only EAR/MAR/head, no eye region needed
-        self._add_to_lstm_buffer(ear, mar, head_features, temporal_features)
 
         # Try LSTM prediction (requires 30-frame buffer)
         lstm_result = self._predict_lstm()
 
         def _build_result(base_result, model_used):
-            base_result['ear'] = ear
-            base_result['mar'] = mar
-            base_result['blink_rate'] = blink_rate
-            base_result['model_used'] = model_used
-            base_result['microsleep_detected'] = microsleep_info['danger_level'] == 'danger'
-            base_result['microsleep_count'] = microsleep_info['microsleeps_per_minute']
-            base_result['yawning'] = yawning
-            base_result['head_droop'] = head_features.get('head_droop', 0)
-            base_result['head_tilt'] = head_features.get('head_tilt', 0)
-            base_result['temporal_features'] = temporal_features
-            fatigue_score = self._status_to_fatigue_score(base_result['status'], base_result['confidence'])
+            status = base_result['status']
+            confidence = base_result['confidence']
+            fatigue_score = self._status_to_fatigue_score(status, confidence)
             if self.user_profile_manager:
                 personalization = self.user_profile_manager.apply_personalization(ear, mar, blink_rate)
                 fatigue_score = int(fatigue_score * personalization.get('personal_fatigue_factor', 1.0))
-            base_result['fatigue_score'] = min(100, fatigue_score)
-            base_result['fatigue_level'] = base_result['status']
             ear_trend = temporal_features.get('ear_trend', 0)
             if ear_trend < -0.01:
-                base_result['trend'] = 'decreasing'
+                trend = 'decreasing'
             elif ear_trend > 0.01:
-                base_result['trend'] = 'increasing'
+                trend = 'increasing'
             else:
-                base_result['trend'] = 'stable'
-            return base_result
+                trend = 'stable'
+            return FatigueResult(
+                fatigue_status=status.capitalize(),
+                fatigue_score=min(100, fatigue_score),
+                fatigue_level=status,
+                blink_rate=blink_rate,
+                yawning=yawning,
+                microsleep_detected=microsleep_info['danger_level'] == 'danger',
+                model_used=model_used,
+                status=status,
+                confidence=confidence,
+                ear=ear,
+                mar=mar,
+                trend=trend,
+                microsleep_count=microsleep_info['microsleeps_per_minute'],
+                head_droop=head_features.get('head_droop', 0),
+                head_tilt=head_features.get('head_tilt', 0),
+                raw_scores=base_result.get('raw_scores'),
+                temporal_features=temporal_features,
+            )
 
         # Extract eye region for CNN (optional — CNN may not be available)
-        eye_region = self._extract_eye_region(frame, face_landmarks)
+        eye_region = self._extract_eye_region(frame, face_landmarks, gray=gray)
 
-        if eye_region is not None and self.model is not None:
+        if eye_region is not None and self.cnn_backend is not None:
             img = self._preprocess_image(eye_region)
             if img is not None:
                 cnn_result = self._predict_cnn(img)
@@ -420,17 +520,22 @@ class FatigueClassifier:
 
         # Fallback to geometric calculation
         result = self._predict_geometric(face_landmarks, ear, mar)
-        result['ear'] = ear
-        result['mar'] = mar
-        result['blink_rate'] = blink_rate
-        result['fatigue_score'] = self._status_to_fatigue_score(result['status'], result['confidence'])
-        result['fatigue_level'] = result['status']
-        result['trend'] = 'stable'
-        
-        return result
+        return FatigueResult(
+            fatigue_status=result['status'].capitalize(),
+            fatigue_score=self._status_to_fatigue_score(result['status'], result['confidence']),
+            fatigue_level=result['status'],
+            blink_rate=blink_rate,
+            status=result['status'],
+            confidence=result['confidence'],
+            ear=ear,
+            mar=mar,
+            raw_scores=result['raw_scores'],
+        )
     
     def _calculate_ear(self, face_landmarks):
         """Calculate Eye Aspect Ratio from face landmarks."""
+        if _landmark_array(face_landmarks) is not None:
+            return face_landmarks.ear
         try:
             LEFT_EYE = [33, 133, 160, 144, 158, 153]
             RIGHT_EYE = [362, 263, 385, 380, 387, 373]
@@ -472,6 +577,8 @@ class FatigueClassifier:
     
     def _calculate_mar(self, face_landmarks):
         """Calculate Mouth Aspect Ratio from face landmarks."""
+        if _landmark_array(face_landmarks) is not None:
+            return face_landmarks.mar
         try:
             MOUTH = [61, 291, 13, 14]
             
@@ -503,40 +610,44 @@ class FatigueClassifier:
     
     def _calculate_blink_rate(self):
         """Get real blink rate from BlinkTracker."""
-        if hasattr(self, 'blink_tracker'):
-            return self.blink_tracker.get_blink_rate_per_minute()
+        if hasattr(self, 'signals'):
+            return self.signals.blink_rate()
         return 15
     
     def _calculate_head_features(self, face_landmarks):
         """Extract head pose features for fatigue detection."""
         try:
-            # Handle both list and object formats
-            if hasattr(face_landmarks, 'landmark'):
-                landmarks = face_landmarks.landmark
-            elif isinstance(face_landmarks, list):
-                landmarks = face_landmarks
+            key_idx = [1, 152, 10, 234, 454]    # nose, chin, forehead, left/right ear
+            points = _landmark_array(face_landmarks)
+            if points is not None:
+                if len(points) < 455:
+                    return {'head_droop': 0, 'head_tilt': 0, 'is_drooping': False}
+                key_points = points[key_idx, :2].tolist()
             else:
-                return {'head_droop': 0, 'head_tilt': 0, 'is_drooping': False}
-            
-            if len(landmarks) < 455:
-                return {'head_droop': 0, 'head_tilt': 0, 'is_drooping': False}
-            
-            # Key points for head pose
-            nose = landmarks[1]
-            chin = landmarks[152]
-            forehead = landmarks[10]
-            left_ear = landmarks[234]
-            right_ear = landmarks[454]
-            
+                # Handle both list and object formats
+                if hasattr(face_landmarks, 'landmark'):
+                    landmarks = face_landmarks.landmark
+                elif isinstance(face_landmarks, list):
+                    landmarks = face_landmarks
+                else:
+                    return {'head_droop': 0, 'head_tilt': 0, 'is_drooping': False}
+
+                if len(landmarks) < 455:
+                    return {'head_droop': 0, 'head_tilt': 0, 'is_drooping': False}
+                key_points = [(landmarks[i].x, landmarks[i].y) for i in key_idx]
+
+            # Key points for head pose, (x, y)
+            nose, chin, forehead, left_ear, right_ear = key_points
+
             # Head droop (forward tilt) - normalized position of nose relative to face height
-            face_height = chin.y - forehead.y
+            face_height = chin[1] - forehead[1]
             if face_height > 0:
-                nose_position = (nose.y - forehead.y) / face_height
+                nose_position = (nose[1] - forehead[1]) / face_height
                 # Normal nose position is around 0.35-0.4, lower means droop
                 head_droop = max(0, 0.4 - nose_position) * 90  # degrees
             
             # Head tilt (side tilt) - asymmetry of ears
-            head_tilt = abs(right_ear.x - left_ear.x) * 45  # degrees
+            head_tilt = abs(right_ear[0] - left_ear[0]) * 45  # degrees
             
             return {
                 'head_droop': float(head_droop),
@@ -548,64 +659,42 @@ class FatigueClassifier:
             return {'head_droop': 0, 'head_tilt': 0, 'is_drooping': False}
     
     def _add_to_lstm_buffer(self, ear, mar, head_features, temporal_features):
-        """Add current frame features to LSTM buffer."""
-        frame_data = {
-            'ear_mean': ear,
-            'ear_std': temporal_features.get('ear_std', 0.0),
-            'ear_min': temporal_features.get('ear_min', ear),
-            'ear_max': temporal_features.get('ear_max', ear),
-            'ear_trend': temporal_features.get('ear_trend', 0.0),
-            'mar_mean': mar,
-            'mar_max': temporal_features.get('mar_max', mar),
-            'mar_trend': temporal_features.get('mar_trend', 0.0),
-            'eyes_closed_ratio': 1.0 if ear < 0.22 else 0.0,
-            'eyes_very_closed_ratio': 1.0 if ear < 0.18 else 0.0,
-            'yawning': float(temporal_features.get('yawning', False)),
-            'yawn_intensity': temporal_features.get('yawn_intensity', 0.0),
-            'ear_variance_long': temporal_features.get('ear_variance_long', 0.0),
-            'ear_stability': temporal_features.get('ear_stability', 1.0),
-            'estimated_blink_rate': temporal_features.get('estimated_blink_rate', 0) / 60.0,
-            'head_droop': head_features.get('head_droop', 0) / 90.0,
-        }
-        self.frame_buffer.append(frame_data)
-        
-        return len(self.frame_buffer) >= 30
+        """Add current frame features to LSTM buffer (одна строка = один шаг LSTM)."""
+        if self.lstm_stream is None:
+            return False
+        # Порядок признаков — как при обучении (train_models, 16 признаков)
+        row = self._lstm_row
+        row[:] = (
+            ear,                                                    # ear_mean
+            temporal_features.get('ear_std', 0.0),
+            temporal_features.get('ear_min', ear),
+            temporal_features.get('ear_max', ear),
+            temporal_features.get('ear_trend', 0.0),
+            mar,                                                    # mar_mean
+            temporal_features.get('mar_max', mar),
+            temporal_features.get('mar_trend', 0.0),
+            1.0 if ear < 0.22 else 0.0,                             # eyes_closed_ratio
+            1.0 if ear < 0.18 else 0.0,                             # eyes_very_closed_ratio
+            float(temporal_features.get('yawning', False)),
+            temporal_features.get('yawn_intensity', 0.0),
+            temporal_features.get('ear_variance_long', 0.0),
+            temporal_features.get('ear_stability', 1.0),
+            temporal_features.get('estimated_blink_rate', 0) / 60.0,
+            head_features.get('head_droop', 0) / 90.0,
+        )
+        self.lstm_stream.push(row)
+
+        return self.lstm_stream.ready
     
     def _predict_lstm(self):
         """Predict using LSTM model if available and buffer is full."""
-        if not self._use_lstm or self.lstm_model is None:
-            return None
-            
-        if len(self.frame_buffer) < 30:
+        if not self._use_lstm or self.lstm_stream is None:
             return None
         
         try:
-            features = []
-            for frame in self.frame_buffer:
-                feature_vec = [
-                    frame.get('ear_mean', 0.3),
-                    frame.get('ear_std', 0.0),
-                    frame.get('ear_min', 0.3),
-                    frame.get('ear_max', 0.3),
-                    frame.get('ear_trend', 0.0),
-                    frame.get('mar_mean', 0.15),
-                    frame.get('mar_max', 0.15),
-                    frame.get('mar_trend', 0.0),
-                    frame.get('eyes_closed_ratio', 0.0),
-                    frame.get('eyes_very_closed_ratio', 0.0),
-                    frame.get('yawning', 0.0),
-                    frame.get('yawn_intensity', 0.0),
-                    frame.get('ear_variance_long', 0.0),
-                    frame.get('ear_stability', 1.0),
-                    frame.get('estimated_blink_rate', 0.0),
-                    frame.get('head_droop', 0.0),
-                ]
-                features.append(feature_vec)
-            
-            features = np.array(features, dtype=np.float32)
-            features = np.expand_dims(features, axis=0)
-            
-            predictions = self.lstm_model.predict(features, verbose=0)[0]
+            predictions = self.lstm_stream.predict()
+            if predictions is None:
+                return None
             
             status_idx = np.argmax(predictions)
             status = self.classes[status_idx]
@@ -696,14 +785,12 @@ class FatigueClassifier:
     
     def _predict_cnn(self, img):
         """Run CNN prediction."""
-        if self.model is None:
+        if self.cnn_backend is None:
             return self._unknown_result()
         
         try:
-            import tensorflow as tf
-            
             # Run inference
-            preds = self.model.predict(img, verbose=0)[0]
+            preds = self.cnn_backend.predict(img)[0]
             
             # Get result
             status_idx = np.argmax(preds)
@@ -756,6 +843,13 @@ class FatigueClassifier:
             epochs: training epochs
             save_path: path to save trained model
         """
+        if self.model is None and self.cnn_backend is not None and os.path.exists(self.model_path):
+            # Backend загружен из кэша — для обучения нужна Keras-модель
+            try:
+                import tensorflow as tf
+                self.model = tf.keras.models.load_model(self.model_path, compile=False)
+            except Exception as e:
+                print(f"Failed to load fatigue model for training: {e}")
         if self.model is None:
             print("No model to train")
             return False
@@ -784,6 +878,9 @@ class FatigueClassifier:
             save_path = save_path or self.model_path
             self.model.save(save_path)
             print(f"Model saved to {save_path}")
+            # До перезапуска — прямой Keras; сохранённый файл новее кэша и
+            # будет сконвертирован заново при следующей загрузке
+            self.cnn_backend = KerasBackend(self.model)
             
             return True
             
@@ -868,10 +965,7 @@ class FatigueClassifier:
         # Mid-range EAR cannot mean sleeping — it's either a blink
         # mid-phase or model confusion on out-of-distribution data.
         if 0.18 <= ear <= ear_clearly_open and status == 'sleeping':
-            recent_blinks = len([
-                t for t in self.blink_tracker.blink_timestamps
-                if time.time() - t < 3.0
-            ])
+            recent_blinks = self.signals.recent_blinks(3.0)
             if recent_blinks <= 3:
                 return {
                     'status': 'awake',
@@ -890,10 +984,8 @@ class FatigueClassifier:
         # ── Rule 3: EAR < 0.18 AND LSTM says "awake" ──────────────────────────
         # Различаем быстрое моргание (длится < 300мс) от реального закрытия глаз.
         if ear < 0.18 and status == 'awake':
-            recent_blinks = len([
-                t for t in self.blink_tracker.blink_timestamps
-                if time.time() - t < 0.3   # только очень свежие морганья (≤300мс)
-            ])
+            # только очень свежие морганья (≤300мс)
+            recent_blinks = self.signals.recent_blinks(0.3)
             if recent_blinks >= 1:
                 # Быстрое моргание — LSTM ошибается, считаем бодрствованием
                 return {
@@ -938,10 +1030,7 @@ class FatigueClassifier:
 
         # ── Rule 3c: EAR 0.18-0.26 AND LSTM says "drowsy" → likely mid-blink ──
         if ear < 0.26 and status == 'drowsy':
-            recent_blinks = len([
-                t for t in self.blink_tracker.blink_timestamps
-                if time.time() - t < 2.0
-            ])
+            recent_blinks = self.signals.recent_blinks(2.0)
             if recent_blinks <= 2:
                 return {
                     'status': 'awake',
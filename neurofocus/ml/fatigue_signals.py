@@ -0,0 +1,95 @@
+"""
+Per-frame fatigue signal stage.
+
+Blinks last 100–300 ms, so ``BlinkTracker`` and ``MicrosleepDetector``
+have to see every camera frame. When they were only updated from
+``FatigueClassifier.predict`` (heavy ML, ~4 Hz) most blinks fell between
+samples. ``FatigueSignals`` is the cheap part of fatigue analysis and runs
+every frame on the EAR / MAR that ``FaceProcessor`` has already computed:
+
+    signals.update(ear, mar, head_droop, head_tilt, timestamp)
+    signals.blink_rate()            # blinks per minute
+    signals.microsleep_statistics()
+    signals.temporal_features       # TemporalFeatureExtractor output (last sample)
+
+The temporal window is measured in time, not frames: ``TemporalFeatureExtractor``
+gets one sample every ``sample_interval`` seconds of frame time (0.25 s, the
+old heavy-path rate), so its 30 samples still span ~7.5 s whatever the camera
+FPS.  Blinks and microsleeps are still tracked on every frame.
+
+Timestamps are the frame times (media time for files), and all rates are
+measured against the latest frame time rather than ``time.time()``, so
+file replays give the same blink rate as the live camera.
+"""
+
+import time
+from typing import Optional
+
+from .blink_tracker import BlinkTracker
+from .microsleep_detector import MicrosleepDetector
+from .temporal_features import TemporalFeatureExtractor
+
+# Шаг отсчётов временных признаков, с: 30 отсчётов ≈ 7.5 с окна
+TEMPORAL_SAMPLE_INTERVAL = 0.25
+
+
+class FatigueSignals:
+    """Моргания, микросны и временные признаки — по каждому кадру."""
+
+    def __init__(self, window_size: int = 30,
+                 sample_interval: float = TEMPORAL_SAMPLE_INTERVAL):
+        self.blink_tracker = BlinkTracker()
+        self.microsleep_detector = MicrosleepDetector()
+        self.temporal_extractor = TemporalFeatureExtractor(window_size=window_size)
+        self.sample_interval = sample_interval
+        self._next_sample: Optional[float] = None     # время следующего отсчёта
+        self.now: Optional[float] = None       # время последнего кадра
+        self.ear = 0.35
+        self.mar = 0.15
+        self.head_droop = 0.0
+        self.head_tilt = 0.0
+        self.temporal_features: dict = {}
+        self.frames = 0
+
+    def update(self, ear: float, mar: float, head_droop: float = 0.0,
+               head_tilt: float = 0.0, timestamp: Optional[float] = None) -> dict:
+        """Один кадр; timestamp — время кадра (None — time.time())."""
+        now = time.time() if timestamp is None else timestamp
+        self.now = now
+        self.ear = ear
+        self.mar = mar
+        self.head_droop = head_droop
+        self.head_tilt = head_tilt
+        self.blink_tracker.update(ear, now)
+        self.microsleep_detector.update(ear, now)
+        if self._sample_due(now):
+            self.temporal_features = self.temporal_extractor.update(
+                ear=ear, mar=mar, head_droop=head_droop, head_tilt=head_tilt,
+                current_time=now,
+            )
+        self.frames += 1
+        return self.temporal_features
+
+    def _sample_due(self, now: float) -> bool:
+        """
+        Пора ли добавить отсчёт во временное окно.  Расписание кратно
+        sample_interval, так что средний шаг не зависит от FPS; время
+        назад (перемотка записи) начинает расписание заново.
+        """
+        due = self._next_sample
+        if due is not None and due - 1e-6 <= now < due + self.sample_interval:
+            self._next_sample = due + self.sample_interval
+            return True
+        if due is None or now >= due or now < due - 2 * self.sample_interval:
+            self._next_sample = now + self.sample_interval
+            return True
+        return False
+
+    def blink_rate(self) -> int:
+        return self.blink_tracker.get_blink_rate_per_minute(now=self.now)
+
+    def recent_blinks(self, seconds: float) -> int:
+        return self.blink_tracker.recent_blinks(seconds, now=self.now)
+
+    def microsleep_statistics(self) -> dict:
+        return self.microsleep_detector.get_statistics(now=self.now)
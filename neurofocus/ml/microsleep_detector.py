@@ -42,8 +42,9 @@ class MicrosleepDetector:
     def set_threshold(self, value: float):
         self.threshold = value
 
-    def get_statistics(self) -> dict:
-        now = time.time()
+    def get_statistics(self, now: float = None) -> dict:
+        if now is None:
+            now = time.time()
         recent = [t for t in self.microsleep_times if now - t < 60.0]
         count = len(recent)
         if count >= 3:
@@ -5,6 +5,7 @@ Manages warm-up, computes ML blend weights, exposes calibration progress.
 
 import time
 
+from src.inference_backend import keras_available
 from .user_profile import UserProfile
 from .threshold_adapter import ThresholdAdapter
 
@@ -29,6 +30,12 @@ class MLCoordinator:
         self.online_learner = OnlineLearner(
             model_type="fatigue_lstm",
             model=getattr(self.fc, 'lstm_model', None) or getattr(self.fc, 'model', None),
+            # LSTM-backend из кэша (NumPy / TFLite / ONNX) — Keras-модель
+            # грузится лениво при дообучении, результат возвращается в
+            # backend.  Без TensorFlow дообучения нет.
+            model_loader=getattr(self.fc, 'keras_lstm', None)
+            if getattr(self.fc, 'lstm_backend', None) is not None and keras_available() else None,
+            on_retrained=getattr(self.fc, 'refresh_lstm_backend', None),
         )
 
         self.warmup_started = False
@@ -121,7 +128,7 @@ class MLCoordinator:
                                  (used as a pseudo-label)
             current_time       — wall-clock timestamp
         """
-        if self.online_learner is None or self.online_learner.model is None:
+        if self.online_learner is None or not self.online_learner.has_model:
             return
 
         import numpy as np
@@ -30,10 +30,15 @@ class OnlineLearner:
     """
 
     def __init__(self, model_type: str = "fatigue_lstm", model=None,
-                 window_size: int = WINDOW_SIZE):
+                 window_size: int = WINDOW_SIZE, model_loader=None, on_retrained=None):
         self.model_type = model_type
         self.model = model
         self.window_size = window_size
+        # model_loader() → Keras-модель, если её нет в памяти (инференс идёт
+        # через TFLite / ONNX backend); вызывается в фоновом потоке дообучения.
+        # on_retrained(model) — обновить backend дообученной моделью.
+        self.model_loader = model_loader
+        self.on_retrained = on_retrained
 
         # Raw sample buffer (individual frames)
         self._raw_buffer: deque = deque(maxlen=5_000)
@@ -90,9 +95,13 @@ class OnlineLearner:
     def can_retrain(self) -> bool:
         return (self.ready_to_retrain()
                 and time.time() - self.last_retrain_time > RETRAIN_COOLDOWN
-                and self.model is not None
+                and self.has_model
                 and not self.is_training)
 
+    @property
+    def has_model(self) -> bool:
+        return self.model is not None or self.model_loader is not None
+
     def start_retrain(self):
         """Start fine-tuning in a background thread — does not block caller."""
         if not self.can_retrain():
@@ -115,6 +124,9 @@ class OnlineLearner:
                 print("[OnlineLearner] Not enough windows after re-lock, skipping.")
                 return
 
+            if self.model is None:
+                self.model = self.model_loader()
+
             X = np.array([w[0] for w in windows], dtype=np.float32)
             y = np.array([w[1] for w in windows], dtype=np.int32)
 
@@ -137,6 +149,9 @@ class OnlineLearner:
             for layer in self.model.layers:
                 layer.trainable = True
 
+            if self.on_retrained is not None:
+                self.on_retrained(self.model)
+
             self.last_retrain_time = time.time()
             print(f"[OnlineLearner] Fine-tuned {self.model_type} "
                   f"on {X.shape[0]} windows ({X.shape}).")
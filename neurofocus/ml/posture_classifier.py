@@ -10,6 +10,11 @@ import numpy as np
 import mediapipe
 from collections import deque
 from build_utils import resource_path
+from src.geometry import FACE_MESH_POSTURE_FEATURES, as_points, face_mesh_posture_features
+from src.inference_backend import load_model_backend
+
+# Угол линии ушей (234 → 454), радианы — столбец признаков осанки по face mesh
+_EAR_LINE_ANGLE = FACE_MESH_POSTURE_FEATURES.index('shoulder_angle')
 
 
 class PostureClassifier:
@@ -25,7 +30,8 @@ class PostureClassifier:
     """
     
     def __init__(self, model_path: str = None, use_tf_hub: bool = False):
-        self.model = None
+        self.model = None           # Keras-модель (None, если backend из кэша)
+        self.backend = None         # InferenceBackend для инференса
         self.model_path = model_path
         self.classes = ['good', 'fair', 'bad']
         
@@ -64,31 +70,36 @@ class PostureClassifier:
             self._tf_hub_estimator = None
     
     def _load_model(self, model_path: str):
-        """Load TensorFlow/Keras model."""
+        """Load the model through an inference backend (TFLite / ONNX / Keras)."""
         try:
-            import tensorflow as tf
-            self.model = tf.keras.models.load_model(model_path, compile=False)
-            self._use_fallback = False
-            print(f"Posture model loaded from {model_path}")
+            self.backend = load_model_backend(model_path)
         except Exception as e:
             print(f"Failed to load posture model: {e}")
+            self.backend = None
+        if self.backend is None:
             # Try alternate LSTM model path
             lstm_alt = os.path.join(os.path.dirname(model_path or ''), 'posture_lstm.keras')
             if not os.path.exists(lstm_alt):
                 lstm_alt = resource_path('models/posture_lstm.keras')
-            if os.path.exists(lstm_alt):
+            if os.path.exists(lstm_alt) and os.path.abspath(lstm_alt) != os.path.abspath(model_path):
                 try:
-                    self._load_model(lstm_alt)
-                    return
-                except Exception:
-                    pass
+                    self.backend = load_model_backend(lstm_alt)
+                    model_path = lstm_alt
+                except Exception as e:
+                    print(f"Failed to load posture model: {e}")
+        if self.backend is None:
+            print(f"Posture model not available ({model_path}), using geometric fallback")
             self._use_fallback = True
+            return
+        self.model = self.backend.keras_model
+        self._use_fallback = False
+        print(f"Posture model loaded from {model_path} ({self.backend.name} backend)")
 
     # -- online learning / personalisation --
 
     def enable_ml_progressive(self):
         """Enable ML model if available; removes forced geometric-only mode."""
-        if self.model is not None:
+        if self.backend is not None:
             self._use_fallback = False
             print("[PostureClassifier] ML model enabled progressively.")
         else:
@@ -345,7 +356,7 @@ class PostureClassifier:
             feature_input = np.expand_dims(features, axis=0)
             
             # Predict
-            preds = self.model.predict(feature_input, verbose=0)[0]
+            preds = self.backend.predict(feature_input)[0]
             
             status = self.classes[np.argmax(preds)]
             confidence = float(preds[np.argmax(preds)])
@@ -439,23 +450,16 @@ class PostureClassifier:
         try:
             import math
 
-            if hasattr(face_landmarks, 'landmark'):
-                lms = face_landmarks.landmark
-            elif isinstance(face_landmarks, list):
-                lms = face_landmarks
-            else:
-                return {'status': 'unknown', 'confidence': 0.0}
-
-            if len(lms) < 460:
+            # LandmarkFrame / ndarray / MediaPipe landmarks → (N, 3)
+            points = as_points(face_landmarks)
+            if points.ndim != 2 or len(points) < 460:
                 return {'status': 'unknown', 'confidence': 0.0}
 
-            left_ear  = lms[234]
-            right_ear = lms[454]
-
             # ── 1. Боковой наклон головы (угол линии ушей) ──────
-            ear_dy = right_ear.y - left_ear.y
-            ear_dx = right_ear.x - left_ear.x
-            head_tilt = abs(math.degrees(math.atan2(ear_dy, ear_dx + 1e-6)))
+            # Те же ядра, что и в признаках осанки по face mesh
+            # (src/geometry.py), без поточечного Python-кода
+            features = face_mesh_posture_features(points[None])[0]
+            head_tilt = abs(math.degrees(float(features[_EAR_LINE_ANGLE])))
             if head_tilt > 90:
                 head_tilt = 180 - head_tilt
 
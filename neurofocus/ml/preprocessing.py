@@ -6,6 +6,10 @@ Extract features from MediaPipe landmarks and images.
 import cv2
 import numpy as np
 
+# Векторные ядра EAR/MAR/осанки: те же, что в живом пайплайне
+# (поддерживают и (T, N, 3) — для офлайн-пересчёта записей и датасетов)
+from src.geometry import as_points, ear_batch, mar_batch, face_mesh_posture_features
+
 
 def extract_eye_region(frame, face_landmarks, target_size=(64, 64)):
     """
@@ -289,7 +293,7 @@ def calculate_ear_from_landmarks(face_landmarks):
     Calculate Eye Aspect Ratio from face landmarks.
     
     Args:
-        face_landmarks: MediaPipe face landmarks
+        face_landmarks: MediaPipe face landmarks (or an (N, 2|3) array)
     
     Returns:
         EAR value, or None
@@ -298,47 +302,10 @@ def calculate_ear_from_landmarks(face_landmarks):
         return None
     
     try:
-        # Handle both list and object formats
-        if hasattr(face_landmarks, 'landmark'):
-            landmarks = face_landmarks.landmark
-        elif isinstance(face_landmarks, list):
-            landmarks = face_landmarks
-        else:
+        points = as_points(face_landmarks)
+        if not len(points):
             return None
-        
-        # Helper to get x, y from landmark (handles dict, object, or array)
-        def get_coords(idx):
-            lm = landmarks[idx]
-            if isinstance(lm, dict):
-                return np.array([lm.get('x', 0), lm.get('y', 0)])
-            elif hasattr(lm, 'x'):
-                return np.array([lm.x, lm.y])
-            elif isinstance(lm, (list, tuple, np.ndarray)):
-                return np.array([lm[0], lm[1]])
-            return np.array([0, 0])
-        
-        LEFT_EYE_IDXS = [33, 133, 160, 144, 158, 153]
-        RIGHT_EYE_IDXS = [362, 263, 385, 380, 387, 373]
-        
-        def eye_aspect_ratio(indices):
-            p1 = get_coords(indices[0])
-            p4 = get_coords(indices[1])
-            p2 = get_coords(indices[2])
-            p6 = get_coords(indices[3])
-            p3 = get_coords(indices[4])
-            p5 = get_coords(indices[5])
-            
-            vertical_1 = np.linalg.norm(p2 - p6)
-            vertical_2 = np.linalg.norm(p3 - p5)
-            horizontal = np.linalg.norm(p1 - p4)
-            
-            ear = (vertical_1 + vertical_2) / (2.0 * horizontal + 1e-6)
-            return ear
-        
-        left_ear = eye_aspect_ratio(LEFT_EYE_IDXS)
-        right_ear = eye_aspect_ratio(RIGHT_EYE_IDXS)
-        
-        return (left_ear + right_ear) / 2.0
+        return float(ear_batch(points[None])[0])
         
     except Exception as e:
         print(f"Error calculating EAR: {e}")
@@ -350,7 +317,7 @@ def calculate_mar_from_landmarks(face_landmarks):
     Calculate Mouth Aspect Ratio from face landmarks.
     
     Args:
-        face_landmarks: MediaPipe face landmarks
+        face_landmarks: MediaPipe face landmarks (or an (N, 2|3) array)
     
     Returns:
         MAR value, or None
@@ -359,38 +326,29 @@ def calculate_mar_from_landmarks(face_landmarks):
         return None
     
     try:
-        # Handle both list and object formats
-        if hasattr(face_landmarks, 'landmark'):
-            landmarks = face_landmarks.landmark
-        elif isinstance(face_landmarks, list):
-            landmarks = face_landmarks
-        else:
+        points = as_points(face_landmarks)
+        if not len(points):
             return None
-        
-        # Helper to get x, y from landmark (handles dict, object, or array)
-        def get_coords(idx):
-            lm = landmarks[idx]
-            if isinstance(lm, dict):
-                return np.array([lm.get('x', 0), lm.get('y', 0)])
-            elif hasattr(lm, 'x'):
-                return np.array([lm.x, lm.y])
-            elif isinstance(lm, (list, tuple, np.ndarray)):
-                return np.array([lm[0], lm[1]])
-            return np.array([0, 0])
-        
-        MOUTH_IDXS = [61, 291, 13, 14]
-        
-        p_left = get_coords(MOUTH_IDXS[0])
-        p_right = get_coords(MOUTH_IDXS[1])
-        p_top = get_coords(MOUTH_IDXS[2])
-        p_bottom = get_coords(MOUTH_IDXS[3])
-        
-        vertical = np.linalg.norm(p_top - p_bottom)
-        horizontal = np.linalg.norm(p_left - p_right)
-        
-        mar = vertical / (horizontal + 1e-6)
-        return mar
+        return float(mar_batch(points[None])[0])
         
     except Exception as e:
         print(f"Error calculating MAR: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+def extract_face_mesh_posture_features(face_landmarks):
+    """
+    Face-mesh posture features (see posture_data_generator) for one frame
+    or a whole (T, N, 3) sequence.
+
+    Returns:
+        (7,) or (T, 7) float32 array, or None
+    """
+    if face_landmarks is None:
+        return None
+    points = as_points(face_landmarks)
+    if not len(points):
+        return None
+    if points.ndim == 2:
+        return face_mesh_posture_features(points[None])[0]
+    return face_mesh_posture_features(points)
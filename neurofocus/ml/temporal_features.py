@@ -1,22 +1,43 @@
 """
 Temporal feature extractor — maintains rolling windows of EAR, MAR, and head pose.
 Computes mean, std, min, max, trend for LSTM input and trend analysis.
+Statistics are maintained incrementally by ``src.rolling_stats`` trackers.
 """
 
-import numpy as np
 from collections import deque
 
+from src.rolling_stats import Crossings, HeadMean, MinMax, Moments, RollingWindow, TailMean
+
+# Blink rate estimation from zero-crossings below closed threshold
+EAR_CLOSED_THRESH = 0.22
+
 
 class TemporalFeatureExtractor:
-    """Rolling-window feature extraction for temporal analysis."""
+    """Rolling-window feature extraction for temporal analysis (O(1) per update)."""
 
     def __init__(self, window_size: int = 30):
         self.window_size = window_size
-        self.ear_history: deque = deque(maxlen=window_size)
-        self.mar_history: deque = deque(maxlen=window_size)
-        self.head_droop_history: deque = deque(maxlen=window_size)
+        self.ear_history = RollingWindow(window_size)
+        self.mar_history = RollingWindow(window_size)
+        self.head_droop_history = RollingWindow(window_size)
         self.timestamps: deque = deque(maxlen=window_size)
 
+        # ── EAR trackers ──────────────────────────────────────
+        ear = self.ear_history
+        self._ear_moments = ear.track(Moments(window_size))
+        self._ear_extremes = ear.track(MinMax(window_size))
+        self._ear_head = ear.track(HeadMean(window_size, min(7, window_size)))
+        self._ear_tail = ear.track(TailMean(min(7, window_size)))
+        self._ear_blinks = ear.track(Crossings(window_size, EAR_CLOSED_THRESH))
+
+        # ── MAR trackers ──────────────────────────────────────
+        mar = self.mar_history
+        self._mar_mean = mar.track(TailMean(window_size))
+        self._mar_extremes = mar.track(MinMax(window_size))
+        self._mar_recent = mar.track(MinMax(min(5, window_size)))
+        self._mar_head = mar.track(HeadMean(window_size, min(5, window_size)))
+        self._mar_tail = mar.track(TailMean(min(5, window_size)))
+
     def update(self, ear: float, mar: float, head_droop: float = 0.0,
                head_tilt: float = 0.0, current_time: float = None) -> dict:
         self.ear_history.append(ear)
@@ -24,58 +45,73 @@ class TemporalFeatureExtractor:
         self.head_droop_history.append(head_droop)
         if current_time is not None:
             self.timestamps.append(current_time)
+        else:
+            # Без времени у кадра окно по timestamps теряет смысл
+            self.timestamps.clear()
         return self._compute_features(head_tilt)
 
     def _compute_features(self, head_tilt: float) -> dict:
-        ear_arr = np.array(self.ear_history) if self.ear_history else np.array([0.3])
-        mar_arr = np.array(self.mar_history) if self.mar_history else np.array([0.15])
+        n = len(self.ear_history)
+        if n == 0:
+            return self._empty_features()
 
-        n = len(ear_arr)
+        ear_std = self._ear_moments.std
         if n >= 15:
-            ear_trend = float(np.mean(ear_arr[-7:]) - np.mean(ear_arr[:7]))
-            ear_variance_long = float(np.var(ear_arr))
+            ear_trend = float(self._ear_tail.mean - self._ear_head.mean)
+            ear_variance_long = float(self._ear_moments.var)
         else:
             ear_trend = 0.0
             ear_variance_long = 0.0
 
-        ear_stability = float(1.0 - min(1.0, np.std(ear_arr) * 10)) if n >= 5 else 1.0
+        ear_stability = float(1.0 - min(1.0, ear_std * 10)) if n >= 5 else 1.0
 
-        # Blink rate estimation from zero-crossings below closed threshold
-        ear_closed_thresh = 0.22
-        blink_count = 0
-        for i in range(1, n):
-            if ear_arr[i - 1] > ear_closed_thresh and ear_arr[i] <= ear_closed_thresh:
-                blink_count += 1
         if n >= 5:
-            # Estimate per-minute rate assuming ~30 FPS sampling
-            window_duration = n / 30.0  # seconds
-            estimated_blink_rate = int(blink_count / max(window_duration, 1.0) * 60)
+            window_duration = self._window_duration(n)  # seconds
+            estimated_blink_rate = int(self._ear_blinks.count / max(window_duration, 1.0) * 60)
         else:
             estimated_blink_rate = 0
 
         # MAR features
         if n >= 10:
-            mar_trend = float(np.mean(mar_arr[-5:]) - np.mean(mar_arr[:5]))
+            mar_trend = float(self._mar_tail.mean - self._mar_head.mean)
         else:
             mar_trend = 0.0
 
-        recent_mar = mar_arr[-5:] if n >= 5 else mar_arr
-        yawn_intensity = float(np.max(recent_mar)) if len(recent_mar) > 0 else 0.0
-        yawning = bool(np.max(recent_mar) > 0.5) if len(recent_mar) > 0 else False
-        mar_max = float(np.max(mar_arr)) if len(mar_arr) > 0 else 0.15
+        # При n < 5 «последние 5» — это всё окно
+        yawn_intensity = float(self._mar_recent.max)
 
         return {
-            'ear_mean': float(np.mean(ear_arr)),
-            'ear_std': float(np.std(ear_arr)),
-            'ear_min': float(np.min(ear_arr)),
-            'ear_max': float(np.max(ear_arr)),
+            'ear_mean': float(self._ear_moments.mean),
+            'ear_std': float(ear_std),
+            'ear_min': float(self._ear_extremes.min),
+            'ear_max': float(self._ear_extremes.max),
             'ear_trend': ear_trend,
-            'mar_mean': float(np.mean(mar_arr)),
-            'mar_max': mar_max,
+            'mar_mean': float(self._mar_mean.mean),
+            'mar_max': float(self._mar_extremes.max),
             'mar_trend': mar_trend,
-            'yawning': yawning,
+            'yawning': yawn_intensity > 0.5,
             'yawn_intensity': yawn_intensity,
             'ear_variance_long': ear_variance_long,
             'ear_stability': ear_stability,
             'estimated_blink_rate': estimated_blink_rate,
         }
+
+    def _window_duration(self, n: int) -> float:
+        """
+        Длительность окна по реальным timestamps (n · средний шаг кадра);
+        без timestamps — в предположении ~30 FPS.
+        """
+        if len(self.timestamps) == n and n >= 2:
+            span = self.timestamps[-1] - self.timestamps[0]
+            if span > 0:
+                return span * n / (n - 1)
+        return n / 30.0
+
+    @staticmethod
+    def _empty_features() -> dict:
+        return {
+            'ear_mean': 0.3, 'ear_std': 0.0, 'ear_min': 0.3, 'ear_max': 0.3,
+            'ear_trend': 0.0, 'mar_mean': 0.15, 'mar_max': 0.15, 'mar_trend': 0.0,
+            'yawning': False, 'yawn_intensity': 0.15, 'ear_variance_long': 0.0,
+            'ear_stability': 1.0, 'estimated_blink_rate': 0,
+        }
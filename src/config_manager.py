@@ -62,16 +62,43 @@ class ConfigManager:
         return {
             'camera': {
                 'index': 0,
-                'width': 640,
-                'height': 480,
-                'fps': 30
+                'width': 1280,
+                'height': 720,
+                'fps': 30,
+                # auto — DSHOW на Windows, V4L2 на Linux, AVFoundation на macOS;
+                # либо явно: dshow / msmf / v4l2 / avfoundation / any
+                'backend': 'auto',
+                # Ширина кадра, подаваемого в модели (0 — полное разрешение).
+                # Дисплей и оверлеи всегда остаются в разрешении камеры.
+                'face_inference_width': 640,
+                'hand_inference_width': 848,
+                'pose_inference_width': 256
             },
             'face': {
                 'min_detection_confidence': 0.5,
                 'yaw_threshold': 40,
                 'pitch_offset': 5.0,
                 'pitch_threshold_min': 0.0,
-                'pitch_threshold_max': 30.0
+                'pitch_threshold_max': 30.0,
+                # Поза головы: PnP с тёплым стартом от прошлого кадра
+                # (iterative / epnp / sqpnp) и One Euro фильтр углов:
+                # min_cutoff (Гц) — сглаживание в покое, beta — отзывчивость
+                'head_pose_solver': 'iterative',
+                'head_pose_warm_start': True,
+                'head_pose_smoothing': True,
+                'head_pose_min_cutoff': 1.0,
+                'head_pose_beta': 0.05,
+                # Трекер лица: face_mesh (mp.solutions) или landmarker —
+                # FaceLandmarker task (live_stream — асинхронно, video —
+                # синхронно) с blendshapes и матрицей позы вместо PnP
+                'tracker': 'face_mesh',
+                'landmarker_mode': 'live_stream',
+                'blendshapes': True,
+                'head_pose_from_matrix': True,
+                # Без MediaPipe: каскад Хаара раз в N кадров на кадре шириной
+                # fallback_detect_width, между ними — сопровождение шаблоном
+                'fallback_detect_interval': 5,
+                'fallback_detect_width': 320
             },
             'fatigue': {
                 'window_size_seconds': 30,
@@ -112,7 +139,9 @@ class ConfigManager:
             'ui': {
                 'theme': 'dark',
                 'window_width': 1280,
-                'window_height': 800
+                'window_height': 800,
+                # Landmarks в превью: off / contours / mesh (полная сетка)
+                'landmark_overlay': 'contours'
             },
             'logging': {
                 'level': 'INFO',
@@ -124,6 +153,47 @@ class ConfigManager:
                 'work_minutes': 25,
                 'break_minutes': 5,
                 'enabled': False
+            },
+            'performance': {
+                'roi_enabled': True,
+                'roi_refresh_frames': 60,
+                # ProcessingGovernor: целевой FPS, потолок CPU (доля всех ядер)
+                # и границы интервалов тяжёлого ML / трекинга рук (в кадрах)
+                'governor_enabled': True,
+                'target_fps': 30,
+                'cpu_ceiling': 0.75,
+                'ml_interval': 8,
+                'ml_interval_min': 2,
+                'ml_interval_max': 30,
+                'hand_interval': 1,
+                'hand_interval_min': 1,
+                'hand_interval_max': 4,
+                # Кадры без инференса получают экстраполированные landmarks;
+                # face_interval > 1 — face mesh раз в N кадров
+                'landmark_prediction': True,
+                'face_interval': 1,
+                'idle_enabled': True,
+                'idle_fps': 5,
+                'idle_probe_width': 320
+            },
+            'inference': {
+                # Runtime для Keras-моделей: auto (numpy → tflite → onnx →
+                # keras) / numpy / tflite / onnx / keras; сконвертированные
+                # модели — в cache_dir
+                'backend': 'auto',
+                'threads': 2,
+                'cache_dir': 'data/model_cache',
+                'parity_atol': 1e-4,
+                # LSTM усталости: streaming — шаг на кадр + пересчёт окна раз
+                # в lstm_resync_interval строк; window — точное окно
+                'lstm_mode': 'streaming',
+                'lstm_resync_interval': 30,
+                # Микро-батчинг: запросы всех моделей / потоков склеиваются
+                # в батчи за batch_latency_ms (src/inference_scheduler.py)
+                'batching': False,
+                'batch_latency_ms': 3,
+                'max_batch': 16,
+                'batch_queue_size': 64
             }
         }
     
@@ -210,6 +280,14 @@ class ConfigManager:
     @property
     def pomodoro(self) -> Dict[str, Any]:
         return self._config.get('pomodoro', {})
+    
+    @property
+    def performance(self) -> Dict[str, Any]:
+        return self._config.get('performance', {})
+
+    @property
+    def inference(self) -> Dict[str, Any]:
+        return self._config.get('inference', {})
 
 
 config_manager = ConfigManager()
@@ -3,14 +3,9 @@ import numpy as np
 import mediapipe
 from collections import deque, Counter
 
-tensorflow_available = False
-try:
-    import tensorflow as tf
-    from tensorflow.keras.models import load_model
-    tensorflow_available = True
-except (ImportError, Exception) as e:
-    print(f"TensorFlow not available: {e}")
-    print("Emotion detection will be disabled")
+from src.geometry import as_points, bbox_from_points
+
+from src.inference_backend import input_shape_of, load_model_backend
 
 class EmotionDetector:
     def __init__(self, model_path):
@@ -20,30 +15,33 @@ class EmotionDetector:
         self.EMOTIONS = ["Злость", "Отвращение", "Страх", "Счастье", "Грусть", "Удивление", "Нейтрально"]
         self.emotion_history = deque(maxlen=5) 
         
-        if not tensorflow_available:
-            self.model = None
-            return
-            
+        # InferenceBackend (TFLite / ONNX / Keras); без runtime и TensorFlow
+        # детекция эмоций отключена
         try:
-            self.model = load_model(model_path, compile=False)
-            self.target_size = self.model.input_shape[1:3] 
-            print(f"Emotion Model Loaded. Input shape: {self.target_size}")
+            self.model = load_model_backend(model_path)
+            if self.model is None:
+                print("Emotion model not available, emotion detection will be disabled")
+                return
+            # (H, W) модели → dsize (W, H) для cv2.resize
+            height, width = input_shape_of(self.model)[1:3]
+            self.target_size = (int(width), int(height))
+            print(f"Emotion Model Loaded ({self.model.name} backend). Input shape: {self.target_size}")
         except Exception as e:
             print(f"Error loading emotion model: {e}")
             self.model = None
 
-    def predict_emotion(self, frame, face_landmarks):
+    def predict_emotion(self, frame, face_landmarks, gray=None):
+        """gray — готовый grayscale всего кадра (FrameBundle.gray), если есть."""
         if self.model is None:
             return "Error", 0.0
 
         h, w, _ = frame.shape
         
-        # 1. Координаты лица
-        x_coords = [p.x for p in face_landmarks.landmark]
-        y_coords = [p.y for p in face_landmarks.landmark]
-        
-        min_x, max_x = min(x_coords), max(x_coords)
-        min_y, max_y = min(y_coords), max(y_coords)
+        # 1. Координаты лица (у LandmarkFrame bbox уже посчитан FaceProcessor)
+        bbox = getattr(face_landmarks, 'bbox', None)
+        if bbox is None:
+            bbox = bbox_from_points(as_points(face_landmarks))
+        min_x, min_y, max_x, max_y = bbox
         
         start_x, end_x = int(min_x * w), int(max_x * w)
         start_y, end_y = int(min_y * h), int(max_y * h)
@@ -62,17 +60,19 @@ class EmotionDetector:
             return "No Face", 0.0
 
         # 2. Обработка изображения
-        face_img = frame[start_y:end_y, start_x:end_x]
-        
         try:
-            face_gray = cv2.cvtColor(face_img, cv2.COLOR_BGR2GRAY)
+            if gray is not None:
+                face_gray = gray[start_y:end_y, start_x:end_x]
+            else:
+                face_img = frame[start_y:end_y, start_x:end_x]
+                face_gray = cv2.cvtColor(face_img, cv2.COLOR_BGR2GRAY)
             face_resized = cv2.resize(face_gray, self.target_size)
             face_normalized = face_resized.astype("float32") / 255.0
             face_input = np.expand_dims(face_normalized, axis=0)
             face_input = np.expand_dims(face_input, axis=-1)
 
             # 3. Предсказание нейросети
-            preds = self.model.predict(face_input, verbose=0)
+            preds = self.model.predict(face_input)
             
             best_idx = np.argmax(preds)
             current_emotion = self.EMOTIONS[best_idx]
@@ -0,0 +1,1121 @@
+"""
+Qt-free NeuroFocus processing engine.
+
+``NeuroFocusEngine`` owns everything between the camera and the UI:
+capture (``FrameGrabber``), the staged pipeline, face / hand / pose
+processors, the ML classifiers, calibration, DB logging and notification
+rules.  Results are published through plain callbacks and an optional
+queue, so the same engine runs inside the Qt app (``VideoThread`` is a
+thin adapter that re-emits callbacks as signals), on a headless box or
+in CI:
+
+    engine = NeuroFocusEngine(on_data=print, db_name=None)
+    engine.run(duration=60)          # blocks; engine.stop() from another thread
+
+Callbacks (all optional) are invoked from pipeline worker threads:
+
+    on_data(FrameResult)                analytics for every processed frame
+                                        (``result.release()`` when done with it;
+                                        ``result_queue`` gets its own copy to release)
+    on_frame(ndarray)                   BGR preview buffer (see PreviewRenderer)
+    on_calibration_progress(str, int)
+    on_calibration_done(str)
+    on_notification(title, message)     NotificationManager rule fired
+    on_error(str)
+
+Frames come from a ``FrameSource`` (``src/frame_source.py``): the
+configured camera by default, or a video file / image directory for
+replays.  A file read with ``realtime=False`` runs lossless — the grabber
+and pipeline queues block instead of dropping, and ``run()`` returns after
+the last frame has been processed.
+
+With ``record_path`` the landmarks every frame was analysed on (face,
+hand, pose) are written to a compact recording (``src/landmark_recording.py``)
+that can later be replayed through the analytics without MediaPipe.
+
+The command line entry point is ``python -m neurofocus.engine``.
+"""
+
+import queue
+import time
+from typing import Callable, Optional
+
+import cv2
+import numpy as np
+
+from build_utils import resource_path
+from src.config_manager import config_manager
+from src.frame_bundle import FrameBundlePool
+from src.frame_grabber import FrameGrabber
+from src.frame_result import FrameResult, FrameResultPool, PostureResult
+from src.frame_pipeline import FramePipeline, FramePacket
+from src.frame_source import open_source
+from src.idle_manager import IdleController, PresenceProbe
+from src.landmark_overlay import LandmarkOverlay
+from src.landmark_recording import LandmarkRecorder
+from src.logger import logger
+from src.preview import PreviewRenderer
+from src.processing_governor import ProcessingGovernor
+from src.roi_tracker import RoiTracker, crop_for_inference, remap_landmarks
+
+
+class NeuroFocusEngine:
+    """Захват, конвейер обработки, ML, БД и уведомления — без PyQt."""
+
+    def __init__(self, source=None, realtime: bool = True, loop: bool = False,
+                 db_name: Optional[str] = "session_data.db",
+                 notification_manager=None, notify_interval: float = 10.0,
+                 on_data: Optional[Callable[[FrameResult], None]] = None,
+                 on_frame: Optional[Callable[[np.ndarray], None]] = None,
+                 on_calibration_progress: Optional[Callable[[str, int], None]] = None,
+                 on_calibration_done: Optional[Callable[[str], None]] = None,
+                 on_notification: Optional[Callable[[str, str], None]] = None,
+                 on_error: Optional[Callable[[str], None]] = None,
+                 result_queue: Optional[queue.Queue] = None,
+                 record_path: Optional[str] = None, record_quantized: bool = False,
+                 face_tracker: Optional[str] = None):
+        self.source = source            # FrameSource, индекс камеры, путь (None — config)
+        self._realtime = realtime
+        self._loop = loop
+        self._lossless = False
+        self._db_name = db_name
+        self.on_data = on_data
+        self.on_frame = on_frame
+        self.on_calibration_progress = on_calibration_progress
+        self.on_calibration_done = on_calibration_done
+        self.on_notification = on_notification
+        self.on_error = on_error
+        self.result_queue = result_queue
+        self._record_path = record_path
+        self._record_quantized = record_quantized
+        self.recorder = None
+        self._frame_pose = None         # pose landmarks текущего кадра (для записи)
+        self._face_tracker = face_tracker  # face_mesh / landmarker (None — config)
+
+        self.notifications = notification_manager
+        self._notify_interval = notify_interval
+        self._last_notify_check = time.monotonic()
+
+        self._run_flag = True
+        self._paused = False          # True = анализ заморожен, камера работает
+        self._initialized = False
+        self.db = None
+        self.frame_counter = 0
+        self._init_processors()
+        
+        self.session_start_time = time.time()
+        self.face_lost_time = None
+        self._last_calibration_status = {"face": False, "hand": False}
+        self._last_face_state = True
+        self._yawn_cooldown_end = 0.0  # debounce зевка: игнорировать до этого времени
+
+        self._max_errors = 10
+        self.grabber = None
+        self.pipeline = None
+        # Переиспользуемые буферы кадра: flip/RGB/gray/canvas считаются
+        # один раз на кадр, без аллокаций по 2.7 MB на каждый cvtColor
+        self._bundle_pool = FrameBundlePool()
+        # Превью: размер и частота — от виджета и экрана, в свёрнутом
+        # окне кадры не рисуются и не отправляются. Без on_frame превью
+        # не нужно вовсе (headless).
+        self.preview = PreviewRenderer()
+        self.preview.set_visible(on_frame is not None)
+        # Landmarks рисуются на уменьшенном превью в стадии render,
+        # детализация — ui.landmark_overlay (off / contours / mesh)
+        self.overlay = LandmarkOverlay.from_config(config_manager.ui)
+
+        # Дебаунс потери лица: переключаем face_detected=False только после
+        # FACE_LOST_DEBOUNCE последовательных кадров без лица (~0.5 сек при 30fps)
+        self._face_not_detected_frames = 0
+        self._FACE_LOST_DEBOUNCE = 15
+        # Кадры подряд вообще без лица (даже повёрнутого) — для режима простоя
+        self._face_absent_frames = 0
+
+        logger.info("NeuroFocusEngine инициализирован")
+
+    @property
+    def initialized(self) -> bool:
+        return self._initialized
+
+    def _init_processors(self):
+        try:
+            from src.processors import FaceProcessor, EmotionProcessor, FatigueProcessor, PostureProcessor
+
+            self.face_processor = FaceProcessor(tracker=self._face_tracker)
+            self.emotion_processor = EmotionProcessor()
+            # Keep old processors as fallback
+            self.fatigue_processor = FatigueProcessor()
+            self.posture_processor = PostureProcessor()
+            self.hand_processor = None
+
+            self.face_detector = self.face_processor.detector
+            if self._db_name:
+                from src.database import DatabaseManager
+                self.db = DatabaseManager(self._db_name)
+
+            self.calibration_manager = None
+
+            self.last_save_time = time.time()
+            self.frame_counter = 0
+
+            # --- Performance tuning ---
+            # Интервалы подбирает ProcessingGovernor по замерам времени кадра
+            # и загрузке CPU (границы — секция performance в config.json).
+            # Стартовые значения:
+            # Тяжёлые ML-модели (LSTM, Dense posture) — каждые 8 кадров (~4 Hz)
+            # Рука/жесты — каждый кадр (30 Hz).
+            # model_complexity=0 даёт ~5 ms/frame — укладываемся в бюджет 33 ms.
+            # Interval=1 устраняет мигание landmarks (при 2 они пропадали через кадр).
+            perf_cfg = config_manager.performance
+            self.governor = ProcessingGovernor.from_config(perf_cfg)
+
+            # Режим простоя: на паузе или без лица — камера на idle_fps,
+            # вместо face mesh / рук / ML только дешёвая проверка присутствия.
+            self.presence_probe = PresenceProbe(
+                face_detector=self.face_detector,
+                width=perf_cfg.get('idle_probe_width', 320),
+            )
+            self.idle = IdleController(
+                enabled=perf_cfg.get('idle_enabled', True),
+                idle_fps=perf_cfg.get('idle_fps', 5),
+                idle_on_face_absence=self.presence_probe.available,
+                on_change=self._on_idle_change,
+            )
+            # Кэш аналитики для кадров без ML (не публикуется, обновляется на месте)
+            self._last_data = FrameResult()
+            self._result_pool = FrameResultPool()
+
+            # Разрешение инференса отдельно от разрешения отображения:
+            # каждая модель получает кадр своей ширины (0 — полный кадр).
+            cam_cfg = config_manager.camera
+            self._face_inference_width = cam_cfg.get('face_inference_width', 640)
+            self._hand_inference_width = cam_cfg.get('hand_inference_width', 848)
+            self._pose_inference_width = cam_cfg.get('pose_inference_width', 256)
+
+            # ROI: face mesh, руки и поза работают на кропах вокруг
+            # последнего положения лица/ладони, а не на всём кадре.
+            self.roi_tracker = RoiTracker(
+                enabled=perf_cfg.get('roi_enabled', True),
+                refresh_interval=perf_cfg.get('roi_refresh_frames', 60),
+            )
+            self._last_hand_data = None  # HandResult для кадров без hand update
+
+            # Кадры без инференса лица/руки получают предсказанные landmarks
+            # (LandmarkPredictor): face mesh можно запускать раз в
+            # face_interval кадров, руки — с интервалом governor, а курсор,
+            # оверлеи и EAR обновляются на каждом кадре без мигания.
+            self._predict_landmarks = perf_cfg.get('landmark_prediction', True)
+            self._face_interval = max(1, int(perf_cfg.get('face_interval', 1)))
+
+            # --- ML Classifiers (neurofocus) ---
+            self._ml_ready = False
+            try:
+                import os
+                os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+                from neurofocus.ml.fatigue_classifier import FatigueClassifier
+                from neurofocus.ml.posture_classifier import PostureClassifier
+                from neurofocus.ml.ml_coordinator import MLCoordinator
+                from neurofocus.detectors.pose_detector import PoseDetector
+
+                self.fatigue_classifier = FatigueClassifier()
+                self.posture_classifier = PostureClassifier(
+                    model_path=resource_path('models/posture_model.keras')
+                )
+                self.pose_detector = PoseDetector(
+                    model_path=resource_path('models/pose_landmarker_lite.task')
+                )
+
+                # ML Coordinator: manages warm-up, personalized thresholds, ML blend
+                self.ml_coordinator = MLCoordinator(
+                    self.fatigue_classifier, self.posture_classifier
+                )
+
+                self._ml_ready = True
+                logger.info("ML классификаторы + Online Learning загружены")
+            except Exception as ml_err:
+                logger.warning(f"ML классификаторы недоступны, используются пороговые значения: {ml_err}")
+                self.fatigue_classifier = None
+                self.posture_classifier = None
+                self.pose_detector = None
+                self.ml_coordinator = None
+
+            self._initialized = True
+
+        except Exception as e:
+            logger.error(f"Ошибка инициализации процессоров: {e}")
+            self._initialized = False
+    
+    def set_calibration_manager(self, calibration_manager):
+        self.calibration_manager = calibration_manager
+        try:
+            from src.processors import HandProcessor
+            self.hand_processor = HandProcessor(calibration_manager=calibration_manager)
+        except Exception as e:
+            logger.error(f"Ошибка инициализации HandProcessor: {e}")
+        # Передаём calibration_manager в PostureProcessor для персонального pitch
+        try:
+            if hasattr(self, 'posture_processor') and self.posture_processor:
+                self.posture_processor.set_calibration_manager(calibration_manager)
+        except Exception as e:
+            logger.error(f"Ошибка передачи calibration_manager в PostureProcessor: {e}")
+        # Передаём calibration_manager в FatigueProcessor для калибровки EAR/MAR
+        try:
+            if hasattr(self, 'fatigue_processor') and self.fatigue_processor:
+                self.fatigue_processor.set_calibration_manager(calibration_manager)
+        except Exception as e:
+            logger.error(f"Ошибка передачи calibration_manager в FatigueProcessor: {e}")
+    
+    def _get_calibration_overlay(self, frame):
+        if not self.calibration_manager:
+            return None
+        
+        try:
+            if self.calibration_manager._is_calibrating_face:
+                progress = len(self.calibration_manager._face_samples)
+                pct = int(progress / 20 * 100)
+                return {"type": "face", "progress": progress, "pct": pct}
+
+            if self.calibration_manager._is_calibrating_hand:
+                progress = len(self.calibration_manager._hand_samples)
+                pct = int(progress / 20 * 100)
+                return {"type": "hand", "progress": progress, "pct": pct}
+        except Exception as e:
+            logger.error(f"Ошибка отрисовки калибровки: {e}")
+        
+        return None
+
+    def run(self, duration: Optional[float] = None):
+        """Блокирующий цикл обработки до stop() (или duration секунд)."""
+        if not self._initialized:
+            logger.error("Engine: процессоры не инициализированы")
+            self._publish_error("Процессоры не инициализированы")
+            return
+
+        cap = None
+        try:
+            # Разрешение отображения — из секции camera (по умолчанию 720p @ 30).
+            # Модели получают уменьшенные копии (*_inference_width), так что
+            # высокое разрешение камеры не увеличивает нагрузку на инференс.
+            cap = open_source(self.source, config_manager.camera,
+                              realtime=self._realtime, loop=self._loop)
+            if not cap.open():
+                logger.error(f"Engine: не удалось открыть источник {self.source!r}")
+                self._publish_error("Не удалось открыть камеру")
+                return
+
+            # Файл без темпа реального времени: ни один кадр не теряется
+            self._lossless = not cap.is_live and not cap.realtime
+            logger.info(f"Engine: источник {cap.describe()}"
+                        f"{' (lossless)' if self._lossless else ''}")
+            # Live stream FaceLandmarker пропускает кадры — для файла без
+            # потерь нужен синхронный video-режим
+            if self._lossless and hasattr(self.face_detector, 'set_mode'):
+                self.face_detector.set_mode('video')
+            logger.info(
+                "Engine: разрешение инференса (ширина) "
+                f"face={self._face_inference_width} hands={self._hand_inference_width} "
+                f"pose={self._pose_inference_width}"
+            )
+        except Exception as e:
+            logger.error(f"Engine: ошибка инициализации камеры: {e}")
+            self._publish_error(f"Ошибка камеры: {e}")
+            return
+
+        if self._record_path:
+            try:
+                self.recorder = LandmarkRecorder(
+                    self._record_path, frame_size=(cap.width, cap.height),
+                    quantize=self._record_quantized,
+                )
+                logger.info(f"Engine: запись landmarks в {self._record_path}")
+            except Exception as e:
+                logger.error(f"Engine: не удалось открыть запись landmarks: {e}")
+                self.recorder = None
+
+        # Значения до первого ML-прогона — умолчания FrameResult
+        self._last_data.reset()
+
+        # Конвейер: захват (этот поток) → инференс landmarks → аналитика →
+        # рендер/публикация. Каждая стадия в своём потоке, очереди drop-oldest:
+        # face mesh кадра N+1 идёт параллельно с аналитикой/рендером кадра N.
+        self.pipeline = FramePipeline(on_retire=self._retire_packet,
+                                      lossless=self._lossless)
+        self.pipeline.add_stage("inference", self._stage_inference)
+        self.pipeline.add_stage("analytics", self._stage_analytics)
+        self.pipeline.add_stage("render", self._stage_render)
+
+        # Захват в отдельном потоке: конвейер всегда получает самый
+        # свежий кадр, даже если тяжёлый ML-кадр занял > 33 ms.
+        self.grabber = FrameGrabber(cap, max_errors=self._max_errors,
+                                    lossless=self._lossless)
+        self.grabber.start()
+        self.pipeline.start()
+
+        deadline = time.monotonic() + duration if duration else None
+        while self._run_flag:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            self._maybe_check_notifications()
+            try:
+                grabbed = self.grabber.read(timeout=1.0)
+                if grabbed is None:
+                    if self.grabber.failed:
+                        logger.error("Engine: слишком много ошибок чтения камеры")
+                        break
+                    if self.grabber.finished:
+                        self.pipeline.drain()
+                        break
+                    continue
+
+                bundle = self._bundle_pool.acquire(
+                    grabbed.frame, grabbed.frame_id, grabbed.timestamp
+                )
+                packet = FramePacket(
+                    grabbed.frame_id, grabbed.timestamp, bundle.bgr, bundle=bundle,
+                    media_time=grabbed.media_time,
+                )
+
+            except Exception as e:
+                logger.error(f"Engine: ошибка чтения камеры: {e}")
+                continue
+
+            self.pipeline.submit(packet)
+
+        self.pipeline.stop()
+        self.grabber.stop()
+
+        if cap:
+            try:
+                cap.release()
+            except Exception:
+                pass
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+        logger.info("Engine: завершен")
+
+    # ── Pipeline stages ─────────────────────────────────────────
+
+    def _retire_packet(self, packet):
+        """Пакет покинул конвейер — вернуть буферы кадра и неопубликованный результат в пулы."""
+        self._bundle_pool.release(packet.bundle)
+        packet.bundle = None
+        if packet.data is not None:
+            packet.data.release()
+            packet.data = None
+
+    def _on_idle_change(self, state):
+        """Смена режима простоя: частота камеры и сброс трекинга."""
+        if state == IdleController.IDLE:
+            # При прогоне файла «как можно быстрее» темп не ограничиваем
+            if self.grabber is not None and not self._lossless:
+                self.grabber.set_rate_limit(self.idle.idle_fps)
+        else:
+            if self.grabber is not None:
+                self.grabber.set_rate_limit(None)
+            self.roi_tracker.reset()
+            self._face_not_detected_frames = 0
+            self._face_absent_frames = 0
+
+    def _stage_inference(self, packet):
+        """Стадия 1: face mesh + геометрия лица."""
+        frame = packet.frame
+        bundle = packet.bundle
+
+        if self.idle.is_idle:
+            # Простой: только проверка присутствия (и та не нужна на паузе)
+            present = (not self._paused) and self.presence_probe.detect(bundle)
+            if not self.idle.update_idle(present, self._paused):
+                packet.idle = True
+                packet.preview = self.preview.claim()
+                packet.image = bundle.bgr
+                return packet
+
+        # Оверлеи рисуем, только если кадр действительно будет показан
+        packet.preview = self.preview.claim()
+        predicted = None
+        if (self._predict_landmarks and self._face_interval > 1
+                and packet.frame_id % self._face_interval):
+            predicted = self.face_processor.predicted_results(packet.media_time)
+        if predicted is not None:
+            # Кадр без face mesh: landmarks экстраполированы от прошлых
+            packet.image = bundle.canvas if packet.preview else bundle.bgr
+            packet.results = predicted
+        else:
+            try:
+                packet.image, packet.results = self.face_detector.process_frame(
+                    frame, draw=packet.preview, bundle=bundle,
+                    inference_width=self._face_inference_width,
+                    roi=self.roi_tracker.face_roi(),
+                    draw_mesh=False,
+                )
+            except Exception as e:
+                logger.error(f"Engine: ошибка обнаружения лица: {e}")
+                packet.image = bundle.canvas if packet.preview else bundle.bgr
+                packet.results = None
+
+        try:
+            packet.face_data = self.face_processor.process(
+                frame, packet.results, timestamp=packet.media_time,
+                predicted=predicted is not None,
+            )
+            packet.is_face_valid = packet.face_data.valid
+        except Exception as e:
+            logger.error(f"Engine: ошибка face_processor: {e}")
+
+        # Лицо потеряно → следующий кадр сканируется целиком
+        bbox = packet.face_data.bbox if packet.face_data else None
+        self.roi_tracker.update_face(bbox, bundle.width, bundle.height)
+
+        return packet
+
+    def _stage_analytics(self, packet):
+        """Стадия 2: дебаунс лица, тяжёлый ML, калибровка, жесты."""
+        frame = packet.frame
+        image = packet.image
+        face_data = packet.face_data
+        is_face_valid = packet.is_face_valid
+
+        if packet.idle:
+            # Режим простоя: ни рук, ни позы, ни ML — только кэш для UI
+            data = self._result_pool.acquire()
+            data.copy_from(self._last_data)
+            data.face_detected = False
+            data.hand_detected = False
+            packet.data = data
+            # Кадр обработан (пусть и в простое) — счётчик идёт в сводку CLI
+            self.frame_counter += 1
+            return packet
+
+        # Дебаунс потери лица: не переключаем на "нет лица" мгновенно,
+        # а только после FACE_LOST_DEBOUNCE последовательных пустых кадров.
+        # Это устраняет мерцание при закрытии лица рукой.
+        if is_face_valid:
+            self._face_not_detected_frames = 0
+            effective_face_detected = True
+        else:
+            self._face_not_detected_frames += 1
+            effective_face_detected = (
+                self._face_not_detected_frames < self._FACE_LOST_DEBOUNCE
+            )
+
+        if face_data and face_data.bbox is not None:
+            self._face_absent_frames = 0
+        else:
+            self._face_absent_frames += 1
+        self.idle.update_active(
+            face_present=self._face_absent_frames < self._FACE_LOST_DEBOUNCE,
+            paused=self._paused,
+        )
+
+        t_frame = time.perf_counter()
+        self._frame_pose = None
+        hand_landmarks = None
+        last_hand = self._last_hand_data
+        overlay_hand = last_hand.landmarks if last_hand is not None else None
+
+        # ---- Fatigue signals (every frame, lightweight) ----
+        # Моргания длятся 100–300 мс: на частоте тяжёлого ML (~4 Hz) их не
+        # видно, поэтому BlinkTracker / микросны / временные признаки
+        # обновляются здесь по EAR/MAR из FaceProcessor, а predict() на
+        # тяжёлом пути только принимает решение LSTM / CNN.
+        if (self._ml_ready and self.fatigue_classifier is not None
+                and is_face_valid and not self._paused):
+            try:
+                self.fatigue_classifier.observe(
+                    face_data.landmarks,
+                    timestamp=(packet.media_time if packet.media_time is not None
+                               else packet.timestamp),
+                    ear=face_data.ear, mar=face_data.mar,
+                )
+            except Exception as e:
+                logger.error(f"Engine: ошибка fatigue signals: {e}")
+
+        # Determine if this frame should run heavy ML
+        do_ml = self.governor.should_run('ml', self.frame_counter)
+
+        if do_ml:
+            t_ml = time.perf_counter()
+            data = self._run_heavy_ml(
+                frame, image, face_data, is_face_valid,
+                bundle=packet.bundle,
+            )
+            self.governor.record_stage('ml', time.perf_counter() - t_ml)
+            # Всегда синхронизируем face_detected с дебаунс-флагом
+            data.face_detected = effective_face_detected
+        else:
+            # Reuse cached analytics from last full run
+            data = self._result_pool.acquire()
+            data.copy_from(self._last_data)
+            # face_detected обновляем КАЖДЫЙ кадр (не из кэша!) — иначе
+            # 7 некэшированных кадров будут показывать устаревший статус
+            data.face_detected = effective_face_detected
+            if face_data and is_face_valid:
+                data.ear = face_data.ear
+                data.mar = face_data.mar
+                data.pitch = face_data.pitch
+
+        # ---- Calibration (every frame, lightweight) ----
+        try:
+            if self.calibration_manager and is_face_valid:
+                ear_val   = face_data.ear
+                mar_val   = face_data.mar
+                pitch_val = face_data.pitch
+
+                # Используем реальный размер руки если он уже был измерен
+                hand_size_val = (
+                    getattr(self.hand_processor, '_hand_size', None)
+                    if self.hand_processor else None
+                )
+
+                # Авто-калибровка: не мешает ручной, возвращает (face_done, hand_done)
+                was_face_calib = self.calibration_manager.face_calibration["calibrated"]
+                was_hand_calib = self.calibration_manager.hand_calibration["calibrated"]
+                face_done, hand_done = self.calibration_manager.auto_calibrate_if_needed(
+                    ear_val, mar_val, pitch_val, hand_size_val
+                )
+
+                # Сигнал о прогрессе авто-калибровки лица
+                if not was_face_calib and not self.calibration_manager._is_calibrating_face:
+                    auto_progress = len(self.calibration_manager._face_samples)
+                    if auto_progress > 0:
+                        self._calibration_progress("face_auto", auto_progress)
+                if face_done:
+                    self._calibration_done("face")
+                    logger.info("Авто-калибровка лица завершена")
+                if hand_done:
+                    self._calibration_done("hand")
+                    logger.info("Авто-калибровка руки завершена")
+
+                # Ручная калибровка лица
+                if self.calibration_manager._is_calibrating_face:
+                    self.calibration_manager.add_face_sample(ear_val, mar_val, pitch_val)
+                    progress = len(self.calibration_manager._face_samples)
+                    self._calibration_progress("face", progress)
+
+                    if progress >= 20:
+                        self.calibration_manager.finish_face_calibration()
+                        self._calibration_done("face")
+                        logger.info("Калибровка лица завершена")
+
+                # Ручная калибровка осанки
+                if self.calibration_manager._is_calibrating_posture:
+                    self.calibration_manager.add_posture_sample(pitch_val)
+                    progress = len(self.calibration_manager._posture_samples)
+                    self._calibration_progress("posture", progress)
+
+                    if progress >= 20:
+                        self.calibration_manager.finish_posture_calibration()
+                        self._calibration_done("posture")
+                        logger.info("Калибровка осанки завершена")
+        except Exception as e:
+            logger.error(f"Engine: ошибка калибровки лица: {e}")
+
+        try:
+            calib = self.calibration_manager.face_calibration["calibrated"] if self.calibration_manager else False
+            if calib != self._last_calibration_status["face"]:
+                self._last_calibration_status["face"] = calib
+        except Exception:
+            pass
+
+        try:
+            calib_info = self._get_calibration_overlay(image)
+            if calib_info:
+                data.calibration_info = calib_info
+        except Exception as e:
+            logger.error(f"Engine: ошибка отрисовки калибровки: {e}")
+
+        # ---- Hand / Gesture — каждые N кадров (интервал от governor) ----
+        # Вынесено из _run_heavy_ml: жесты должны обновляться ~15 Hz,
+        # а не 4 Hz как тяжёлые ML-модели. Иначе курсор «скачет».
+        do_hand = self.governor.should_run('hands', self.frame_counter)
+        try:
+            if self.hand_processor and do_hand:
+                t_hand = time.perf_counter()
+                hand_roi = self.roi_tracker.hand_roi()
+                hand_data = self.hand_processor.process(
+                    image, frame.shape[1], frame.shape[0],
+                    rgb=crop_for_inference(
+                        packet.bundle, hand_roi, self._hand_inference_width
+                    ),
+                    roi=hand_roi,
+                    draw=False,
+                    timestamp=packet.media_time,
+                )
+                self._last_hand_data = hand_data
+                hand_landmarks = overlay_hand = hand_data.landmarks
+                palm = (
+                    (hand_data.palm_x, hand_data.palm_y)
+                    if hand_data.palm_x is not None else None
+                )
+                self.roi_tracker.update_hand(
+                    palm, hand_data.hand_size, frame.shape[1], frame.shape[0]
+                )
+                self.governor.record_stage('hands', time.perf_counter() - t_hand)
+
+                data.hand_detected   = hand_data.detected
+                data.current_gesture = hand_data.current_gesture
+
+                # Наложение жеста на кадр
+                gesture_label = hand_data.gesture
+                if packet.preview and gesture_label and gesture_label != 'none':
+                    cv2.rectangle(image, (5, 5), (200, 35), (0, 0, 0), -1)
+                    cv2.putText(image, f"[{gesture_label.upper()}]", (10, 28),
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+
+                # Сбор сэмплов для ручной калибровки руки
+                if (self.calibration_manager
+                        and self.calibration_manager._is_calibrating_hand
+                        and hand_data.hand_size):
+                    self.calibration_manager.add_hand_sample(hand_data.hand_size)
+                    progress = len(self.calibration_manager._hand_samples)
+                    self._calibration_progress("hand", progress)
+                    if progress >= 20:
+                        self.calibration_manager.finish_hand_calibration()
+                        self._calibration_done("hand")
+                        logger.info("Калибровка руки завершена")
+
+                # Сбор сэмплов для калибровки активной зоны жестов
+                if (self.calibration_manager
+                        and self.calibration_manager._is_calibrating_zone
+                        and hand_data.palm_x is not None):
+                    px = hand_data.palm_x
+                    py = hand_data.palm_y
+                    cm = self.calibration_manager
+                    cm.add_zone_sample(px, py)
+                    step = cm._zone_step
+                    if step == 'topleft':
+                        progress = len(cm._zone_topleft_samples)
+                        self._calibration_progress("zone_topleft", progress)
+                    elif step == 'bottomright':
+                        progress = len(cm._zone_bottomright_samples)
+                        self._calibration_progress("zone_bottomright", progress)
+                        if progress >= 15:
+                            cm.finish_gesture_zone_calibration()
+                            self._calibration_done("zone")
+                            logger.info("Калибровка зоны жестов завершена")
+                            # После смены зоны сбрасываем позицию жестового контроллера,
+                            # чтобы outlier-фильтр не заморозил курсор
+                            if (self.hand_processor
+                                    and self.hand_processor.gesture_controller):
+                                gc = self.hand_processor.gesture_controller
+                                gc.prev_x = gc.screen_width  // 2
+                                gc.prev_y = gc.screen_height // 2
+                                gc._outlier_consecutive = 0
+                                gc._gesture_buf.clear()
+
+            elif self.hand_processor and last_hand is not None:
+                # Кадр без hand update: предсказанная рука двигает курсор
+                # (жест не переклассифицируется); без оценки — кэш для UI
+                predicted_hand = None
+                if self._predict_landmarks:
+                    predicted_hand = self.hand_processor.predict(
+                        frame.shape[1], frame.shape[0], packet.media_time
+                    )
+                hand_view = predicted_hand or last_hand
+                overlay_hand = hand_view.landmarks
+                data.hand_detected   = hand_view.detected
+                data.current_gesture = hand_view.current_gesture
+        except Exception as e:
+            logger.error(f"Engine: ошибка обработки руки: {e}")
+
+        if self.recorder is not None:
+            self._record_landmarks(packet, hand_landmarks)
+        # Для оверлея — предсказанная или последняя известная рука, чтобы
+        # она не мигала на кадрах без hand update
+        packet.hand_landmarks = overlay_hand
+
+        self.governor.record_frame(time.perf_counter() - t_frame)
+        self.governor.evaluate()
+
+        packet.data = data
+        self.frame_counter += 1
+        return packet
+
+    def _record_landmarks(self, packet, hand_landmarks):
+        """Записать landmarks, на которых считалась аналитика этого кадра."""
+        face_data = packet.face_data
+        try:
+            self.recorder.write(
+                packet.media_time if packet.media_time is not None else packet.timestamp,
+                packet.frame_id,
+                face=face_data.landmarks if face_data is not None else None,
+                hand=hand_landmarks,
+                pose=self._frame_pose,
+            )
+        except Exception as e:
+            logger.error(f"Engine: ошибка записи landmarks: {e}")
+
+    def _stage_render(self, packet):
+        """Стадия 3: превью в размер виджета (если его кто-то видит) и публикация данных."""
+        data = packet.data
+        try:
+            if packet.preview and self.on_frame is not None:
+                # Ресайз сразу в буфер превью, без RGB-копии и масштабирования в UI
+                buf = self.preview.render(packet.image)
+                if buf is not None:
+                    face_data = packet.face_data
+                    self.overlay.draw(buf, face=face_data.landmarks if face_data else None,
+                                      hand=packet.hand_landmarks)
+                    self.on_frame(buf)
+
+            stats = self.grabber.get_stats()
+            stats["pipeline"] = self.pipeline.get_stats()
+            stats["roi"] = self.roi_tracker.get_stats()
+            if hasattr(self.face_detector, 'get_stats'):
+                stats["face_tracker"] = self.face_detector.get_stats()
+            stats["governor"] = self.governor.get_stats()
+            stats.update(self.idle.get_stats())
+            stats["preview"] = self.preview.get_stats()
+            data.stats = stats
+            data.frame_id = packet.frame_id
+            data.media_time = packet.media_time
+
+            # Дальше результатом владеет потребитель (он вызовет release())
+            packet.data = None
+            self._publish_data(data)
+
+        except Exception as e:
+            logger.error(f"Engine: ошибка публикации кадра: {e}")
+
+        return None
+
+    # ── Publishing ──────────────────────────────────────────────
+
+    def _publish_data(self, data: FrameResult):
+        """
+        Каждый потребитель владеет своим FrameResult и сам вызывает
+        release(): при on_data и result_queue сразу очередь получает
+        копию из пула.
+        """
+        queued = data
+        if self.on_data is not None and self.result_queue is not None:
+            queued = self._result_pool.acquire()
+            queued.copy_from(data)
+            queued.stats = data.stats
+        if self.result_queue is not None:
+            try:
+                self.result_queue.put_nowait(queued)
+            except queue.Full:
+                queued.release()    # медленный потребитель не тормозит конвейер
+        if self.on_data is not None:
+            self.on_data(data)
+        elif self.result_queue is None:
+            data.release()
+
+    def _publish_error(self, message: str):
+        if self.on_error is not None:
+            self.on_error(message)
+
+    def _calibration_progress(self, calib_type: str, progress: int):
+        if self.on_calibration_progress is not None:
+            self.on_calibration_progress(calib_type, progress)
+
+    def _calibration_done(self, calib_type: str):
+        if self.on_calibration_done is not None:
+            self.on_calibration_done(calib_type)
+
+    def _maybe_check_notifications(self):
+        """Раз в notify_interval секунд проверить правила уведомлений (не на паузе)."""
+        if self.notifications is None or self._paused:
+            return
+        now = time.monotonic()
+        if now - self._last_notify_check < self._notify_interval:
+            return
+        self._last_notify_check = now
+        try:
+            result = self.notifications.check_conditions()
+        except Exception as e:
+            logger.error(f"Engine: ошибка проверки уведомлений: {e}")
+            return
+        if result and self.on_notification is not None:
+            self.on_notification(*result)
+
+    def set_overlay_level(self, level: str):
+        """Детализация landmarks в превью: off / contours / mesh."""
+        self.overlay.set_level(level)
+
+    def toggle_pause(self):
+        """Переключить паузу анализа."""
+        self._paused = not self._paused
+        return self._paused
+
+    def _run_heavy_ml(self, frame, image, face_data, is_face_valid, bundle=None):
+        """Run heavy ML models (LSTM, pose, posture, emotion) — called every N frames."""
+        data = self._result_pool.acquire()
+        # Если анализ на паузе — возвращаем кешированные данные
+        if self._paused:
+            data.copy_from(self._last_data)
+            data.analysis_paused = True
+            return data
+        current_time = time.time()
+        ear = 0.35
+        mar = 0.15
+        pitch = 0.0
+        emotion = "..."
+        pose_landmarks = None
+
+        if not is_face_valid or face_data is None:
+            # Обновляем кэш, чтобы не-ML кадры тоже получили актуальный face_detected=False
+            self._last_data.copy_from(data)
+            return data
+
+        ear = face_data.ear
+        mar = face_data.mar
+        pitch = face_data.pitch
+        data.ear = ear
+        data.mar = mar
+        data.pitch = pitch
+        data.face_detected = face_data.detected
+
+        # --- Online Learning: feed features into ML coordinator ---
+        # Передаём face_is_visible, чтобы ThresholdAdapter ставил warm-up
+        # на паузу при потере лица (не копит мусорные сэмплы).
+        if self._ml_ready and self.ml_coordinator is not None:
+            self.ml_coordinator.update(
+                ear, mar, pitch, current_time,
+                face_is_visible=is_face_valid,
+            )
+            data.ml_warmup_progress = self.ml_coordinator.get_calibration_progress()
+
+        # --- Emotion ---
+        try:
+            emotion = self.emotion_processor.process(
+                frame, face_data.landmarks,
+                gray=bundle.gray if bundle is not None else None,
+            )
+        except Exception:
+            pass
+        data.emotion = emotion
+
+        # --- Fatigue: ML (LSTM) or threshold fallback ---
+        fatigue = None
+        if self._ml_ready and self.fatigue_classifier is not None:
+            try:
+                fatigue = self.fatigue_classifier.predict(
+                    face_data.landmarks, frame,
+                    gray=bundle.gray if bundle is not None else None,
+                )
+                _f_status = fatigue.status
+
+                # Маппинг статуса на уровень (нужен online learning и update_dashboard)
+                _level_map = {'awake': 'normal', 'drowsy': 'moderate', 'sleeping': 'severe'}
+
+                # Генерация события (аналог FatigueProcessor, но из ML)
+                _f_event = None
+                # ── Зевок с debounce: один зевок = одно событие (cooldown 5 сек) ──
+                if fatigue.yawning and current_time > self._yawn_cooldown_end:
+                    _f_event = "Зевок"
+                    self._yawn_cooldown_end = current_time + 5.0  # 5 сек cooldown
+                elif fatigue.microsleep_detected:
+                    _f_event = "Сильная усталость"
+                elif _f_status == 'sleeping':
+                    _f_event = "Сильная усталость"
+                elif _f_status == 'drowsy':
+                    _f_event = "Усталость"
+
+                # ── ЗАЩИТА: подавляем ложные события усталости ──
+                # 1) При нормальном EAR (>0.28) глаза точно открыты
+                # 2) При сильном наклоне головы (|pitch| > 20°) EAR может быть
+                #    неточным из-за ракурса — не считаем это усталостью
+                if _f_event in ("Сильная усталость", "Усталость"):
+                    if ear > 0.28 or abs(pitch) > 20:
+                        _f_event = None
+
+                # Результат классификатора дополняется на месте, без копии
+                fatigue.fatigue_status = _f_status.capitalize()
+                fatigue.fatigue_level = _level_map.get(_f_status, 'normal')
+                fatigue.ear = ear
+                fatigue.mar = mar
+                fatigue.event = _f_event
+            except Exception as ml_e:
+                logger.warning(f"ML fatigue error, fallback: {ml_e}")
+                fatigue = None
+        if fatigue is None:
+            fatigue = self.fatigue_processor.process(ear, mar, pitch, emotion, current_time)
+        data.fatigue = fatigue
+
+        # --- Online Learning: collect labeled sample for background retraining ---
+        # Вызывается каждый heavy-ML кадр (~4 Hz). Фоновый поток запустит
+        # дообучение, когда наберётся 500 сэмплов (RETRAIN_THRESHOLD).
+        if self._ml_ready and self.ml_coordinator is not None:
+            try:
+                self.ml_coordinator.collect_sample(
+                    ear, mar, pitch, fatigue.fatigue_level, current_time,
+                )
+            except Exception as ol_e:
+                # Online learning не должен ломать основной цикл
+                logger.warning(f"Online learning collect error: {ol_e}")
+
+        # --- Posture: ML (Dense) with Pose or face-mesh fallback ---
+        if self._ml_ready and self.posture_classifier is not None and self.pose_detector is not None:
+            ml_weight = self.ml_coordinator.get_ml_blend_weight() if self.ml_coordinator else 0.0
+            try:
+                frame_h, frame_w = frame.shape[:2]
+                pose_roi = (
+                    self.roi_tracker.torso_roi(frame_w, frame_h)
+                    if bundle is not None else None
+                )
+                _, pose_results = self.pose_detector.process_frame(
+                    frame, draw=False,
+                    rgb=(crop_for_inference(bundle, pose_roi, self._pose_inference_width)
+                         if bundle is not None else None),
+                )
+                pose_landmarks = remap_landmarks(
+                    self.pose_detector.get_landmarks(pose_results),
+                    pose_roi, frame_w, frame_h,
+                )
+                self._frame_pose = pose_landmarks
+
+                # Проверяем, что плечи видны (nose=0, l_shoulder=11, r_shoulder=12).
+                # get_landmarks() возвращает список, поэтому hasattr(..., 'landmark') = False.
+                # Бёдра (23, 24) на вебкамере не видны — не требуем их здесь;
+                # extract_pose_features сам откажется от ML если бёдра невидны.
+                pose_usable = (
+                    pose_landmarks is not None
+                    and isinstance(pose_landmarks, list)
+                    and len(pose_landmarks) >= 13
+                    and getattr(pose_landmarks[11], 'visibility', 0) > 0.3
+                    and getattr(pose_landmarks[12], 'visibility', 0) > 0.3
+                )
+
+                if pose_usable:
+                    ml_posture = self.posture_classifier.predict(pose_landmarks, ml_weight=ml_weight)
+                    used = 'ml_progressive' if 0 < ml_weight < 1 else ('ml_pure' if ml_weight >= 1.0 else 'ml_dense')
+                    posture = PostureResult(
+                        posture_status=ml_posture.get('status', 'good').capitalize(),
+                        posture_score=int(ml_posture.get('confidence', 0) * 100),
+                        posture_level=ml_posture.get('status', 'good'),
+                        posture_alert=ml_posture.get('status') == 'bad',
+                        model_used_posture=used,
+                    )
+                else:
+                    # Pose landmarks недоступны или неполные —
+                    # используем геометрический анализ по Face Mesh
+                    # с компенсацией угла камеры из калибровки
+                    baseline_pitch = 0.0
+                    if self.calibration_manager:
+                        baseline_pitch = self.calibration_manager.posture_calibration.get(
+                            'baseline_pitch', 0.0
+                        )
+                    pm = self.posture_classifier.predict_from_face_mesh(
+                        face_data.landmarks, frame.shape[1], frame.shape[0],
+                        calibration_baseline_pitch=baseline_pitch,
+                        head_pitch=pitch,
+                    )
+                    posture = PostureResult(
+                        posture_status=pm.get('status', 'good').capitalize(),
+                        posture_score=int(pm.get('confidence', 0) * 100),
+                        posture_level=pm.get('status', 'good'),
+                        posture_alert=pm.get('status') == 'bad',
+                        model_used_posture='face_mesh_geometric',
+                    )
+            except Exception as ml_pe:
+                logger.warning(f"ML posture error, fallback: {ml_pe}")
+                posture = self.posture_processor.process(
+                    face_data.landmarks, frame.shape[1], frame.shape[0], pitch, current_time
+                )
+        else:
+            posture = self.posture_processor.process(
+                face_data.landmarks, frame.shape[1], frame.shape[0], pitch, current_time
+            )
+
+        # ── Pitch-защита: при сильном наклоне вниз/вверх переопределяем
+        # любой ML-результат, даже если ML считает осанку хорошей.
+        PITCH_FWD_THRESHOLD = 25.0  # наклон вниз (смотреть на стол)
+        PITCH_UP_THRESHOLD  = -15.0 # запрокидывание назад/вверх
+        if pitch > PITCH_FWD_THRESHOLD or pitch < PITCH_UP_THRESHOLD:
+            old_level = posture.posture_level or posture.posture_status.lower()
+            posture.posture_status = 'Bad'
+            posture.posture_score = int(max(posture.posture_score, 85))
+            posture.posture_level = 'bad'
+            posture.posture_alert = True
+            posture.pitch_alert = True
+            logger.info(
+                f"Pitch guard: pitch={pitch:.1f}° (fwd>{PITCH_FWD_THRESHOLD}° "
+                f"| up<{PITCH_UP_THRESHOLD}°), "
+                f"overrode old_level={old_level}"
+            )
+
+        # Нормализуем posture_alert: ML и PostureProcessor выставляют разные
+        # флаги и регистры статуса, сравнение — case-insensitive.
+        # ИСПРАВЛЕНО: добавлен уровень posture_alert_level ('fair' vs 'bad')
+        _ps = posture.posture_status.lower()
+        _pl = posture.posture_level.lower()
+
+        posture.posture_alert = bool(
+            posture.posture_alert
+            or posture.is_bad
+            or posture.pitch_alert
+            or _ps in ('bad', 'bad posture', 'fair')
+            or _pl in ('bad', 'fair')
+        )
+
+        # Уровень серьёзности проблемы с осанкой
+        # 'bad' = высокая опасность, 'fair' = предупреждение
+        if _ps in ('bad', 'bad posture') or _pl == 'bad':
+            posture.posture_alert_level = 'bad'
+        elif _ps == 'fair' or _pl == 'fair':
+            posture.posture_alert_level = 'fair'
+        else:
+            posture.posture_alert_level = None
+        data.posture = posture
+
+        # Выбор события для отображения в логе.
+        # Осанка имеет приоритет (у неё 30 с кулдаун), усталость — 2 с.
+        # Если осанка не выдала событие, показываем событие усталости.
+        data.event = posture.event or fatigue.event
+
+        # ── DIAGNOSTIC: log first 5 heavy-ML cycles ──────────────
+        if self.frame_counter < 40 and self.frame_counter % 8 == 0:
+            logger.info(
+                f"[DIAG] frame={self.frame_counter} | "
+                f"ear={ear:.3f} mar={mar:.3f} pitch={pitch:.2f} | "
+                f"fatigue={fatigue.fatigue_status} "
+                f"score={fatigue.fatigue_score:.0f} "
+                f"model={fatigue.model_used} | "
+                f"posture={posture.posture_status} "
+                f"level={posture.posture_level} "
+                f"model={posture.model_used_posture} | "
+                f"blink_rate={fatigue.blink_rate}"
+            )
+
+
+        # --- DB save (every ~1s) ---
+        if time.time() - self.last_save_time > 1.0:
+            posture_raw = posture.posture_status
+            posture_lower = posture_raw.lower()
+            if posture_lower == 'bad':
+                posture_db = 'Bad Posture'
+            elif posture_lower == 'fair':
+                posture_db = 'Fair Posture'
+            else:
+                posture_db = posture_raw
+
+            fatigue_raw = fatigue.fatigue_status
+            if mar > 0.6:
+                fatigue_db = 'Yawning'
+            elif fatigue_raw.lower() == 'sleeping':
+                fatigue_db = 'Eyes Closed'
+            else:
+                fatigue_db = fatigue_raw
+
+            # Добавляем информацию об использованной модели в статус
+            fatigue_db = f"{fatigue_db} [{fatigue.model_used}]"
+            posture_db = f"{posture_db} [{posture.model_used_posture}]"
+
+            if self.db is not None:
+                self.db.save_log(
+                    ear=ear, mar=mar, pitch=pitch, emotion=emotion,
+                    fatigue_status=fatigue_db, posture_status=posture_db
+                )
+            self.last_save_time = time.time()
+
+        # Cache the result for lightweight frames
+        self._last_data.copy_from(data)
+        return data
+
+    def stop(self):
+        """Остановить run() (из любого потока)."""
+        self._run_flag = False
@@ -3,6 +3,11 @@ import numpy as np
 import sys
 import os
 
+from src.frame_bundle import resize_to_width
+from src.landmark_frame import FaceResults, LandmarkFrame
+from src.landmark_overlay import OVERLAY_MESH, LandmarkOverlay
+from src.roi_tracker import crop_for_inference, remap_landmarks
+
 # Для PyInstaller frozen-режима: добавляем _internal в DLL search path
 if getattr(sys, 'frozen', False):
     try:
@@ -22,115 +27,175 @@ except (ImportError, Exception) as e:
     mediapipe_available = False
 
 
+def load_face_cascade():
+    """Haar-каскад фронтального лица из поставки OpenCV (или None)."""
+    try:
+        cascade_paths = [
+            os.path.join(cv2.data.haarcascades, 'haarcascade_frontalface_default.xml'),
+            os.path.join(os.path.dirname(cv2.__file__), 'data',
+                         'haarcascade_frontalface_default.xml'),
+        ]
+        for p in cascade_paths:
+            if os.path.exists(p):
+                cascade = cv2.CascadeClassifier(p)
+                if not cascade.empty():
+                    return cascade
+    except Exception:
+        pass
+    return None
+
+
+# ── Haar fallback ──────────────────────────────────────────────
+#
+# Шаблон 468 точек внутри бокса лица: доли ширины/высоты бокса (u, v) плюс
+# сдвиг в нормализованных координатах кадра (раскрытие глаз и рта), чтобы
+# EAR ≈ 0.18…0.3 и MAR ≈ 0.16 для открытых глаз/рта.
+
+_FALLBACK_POINTS = 468
+_EYE_OPEN = 0.008     # полураскрытие глаза → EAR ≈ 0.016 / (2 * 0.045)
+_MOUTH_OPEN = 0.006   # полураскрытие рта  → MAR ≈ 0.012 / 0.075
+
+
+def _fallback_template():
+    uv = np.full((_FALLBACK_POINTS, 2), 0.5, dtype=np.float32)
+    offset = np.zeros((_FALLBACK_POINTS, 2), dtype=np.float32)
+    layout = {
+        # Левый глаз (левый для человека → правая сторона кадра)
+        33: (0.55, 0.38), 133: (0.70, 0.38),
+        160: (0.62, 0.38), 158: (0.62, 0.38), 144: (0.62, 0.38), 153: (0.62, 0.38),
+        # Правый глаз
+        362: (0.45, 0.38), 263: (0.30, 0.38),
+        385: (0.38, 0.38), 387: (0.38, 0.38), 380: (0.38, 0.38), 373: (0.38, 0.38),
+        # Нос, рот
+        1: (0.50, 0.58),
+        61: (0.40, 0.68), 291: (0.60, 0.68), 13: (0.50, 0.68), 14: (0.50, 0.68),
+        # Подбородок, лоб, уши
+        152: (0.50, 0.95), 10: (0.50, 0.05), 234: (0.05, 0.40), 454: (0.95, 0.40),
+    }
+    for idx, pos in layout.items():
+        uv[idx] = pos
+    for idx in (160, 158, 385, 387):
+        offset[idx, 1] = -_EYE_OPEN
+    for idx in (144, 153, 380, 373):
+        offset[idx, 1] = _EYE_OPEN
+    offset[13, 1] = _MOUTH_OPEN
+    offset[14, 1] = -_MOUTH_OPEN
+    return uv, offset
+
+
+_FALLBACK_UV, _FALLBACK_OFFSET = _fallback_template()
+
+
 class _FallbackFaceDetector:
-    """OpenCV Haar Cascade fallback when MediaPipe is unavailable."""
-
-    def __init__(self):
-        self._cascade = None
-        try:
-            cascade_paths = [
-                os.path.join(cv2.data.haarcascades, 'haarcascade_frontalface_default.xml'),
-                os.path.join(os.path.dirname(cv2.__file__), 'data',
-                             'haarcascade_frontalface_default.xml'),
-            ]
-            for p in cascade_paths:
-                if os.path.exists(p):
-                    self._cascade = cv2.CascadeClassifier(p)
-                    if not self._cascade.empty():
-                        break
-                    self._cascade = None
-        except Exception:
-            pass
+    """
+    OpenCV Haar Cascade fallback when MediaPipe is unavailable.
+
+    Каскад запускается раз в detect_interval кадров на уменьшенном сером
+    кадре (detect_width); между детекциями бокс сопровождается
+    matchTemplate по патчу лица в окне вокруг _prev_bbox. Если совпадение
+    хуже track_threshold, сразу выполняется полная детекция.
+    """
+
+    def __init__(self, detect_interval: int = 5, detect_width: int = 320,
+                 track_threshold: float = 0.6, search_margin: float = 0.5):
+        self._cascade = load_face_cascade()
         self._prev_bbox = None
+        self.detect_interval = max(1, detect_interval)
+        self.detect_width = detect_width
+        self.track_threshold = track_threshold
+        self.search_margin = search_margin
 
-    def _build_mock_results(self, frame, bbox):
-        """Create a mock MediaPipe results object from a face bounding box.
-        Key landmarks produce EAR~0.3, MAR~0.15 for an open eye/mouth.
-        """
+        self._template = None         # патч лица (серый) с последней детекции
+        self._template_scale = 1.0    # пикселей кадра на пиксель патча
+        self._since_detect = 0
+        self.detections = 0
+        self.tracked = 0
+
+    def input_width(self, inference_width: int = None):
+        """Ширина серого кадра для detect(): не шире detect_width."""
+        widths = [w for w in (inference_width, self.detect_width) if w]
+        return min(widths) if widths else None
+
+    def _build_results(self, frame, bbox) -> FaceResults:
+        """Бокс лица → results с массивом 468 точек по шаблону (без Python-объектов)."""
         h, w = frame.shape[:2]
         fx, fy, fw, fh = bbox
-        # face center
-        cx_n = (fx + fw / 2) / w
-        cy_n = (fy + fh / 2) / h
-
-        class MockLandmark:
-            def __init__(self, x, y, z=0.0):
-                self.x = x
-                self.y = y
-                self.z = z
-
-        class MockLandmarkList:
-            def __init__(self, landmarks):
-                self.landmark = landmarks
-
-        def nrm(px, py):
-            """Convert pixel coords to normalized 0-1."""
-            return px / w, py / h
-
-        def pt(fx_frac, fy_frac):
-            """Point at (fx + fx_frac*fw, fy + fy_frac*fh) in normalized."""
-            return nrm(fx + fx_frac * fw, fy + fy_frac * fh)
-
-        # Fill all 468 with a default at face center
-        lm = [MockLandmark(cx_n, cy_n)] * 468
-
-        # --- Left eye (person's left → image right side) ---
-        # Eye box: 55%-70% face width, 36%-41% face height
-        le_x33, le_y = pt(0.55, 0.38)   # 33 inner (nose side)
-        le_x133 = (fx + 0.70 * fw) / w   # 133 outer (ear side)
-        ey_v = 0.008  # vertical half-opening → EAR ≈ (0.016)/(2*0.045) = 0.18
-        lx = (fx + 0.62 * fw) / w  # x center of left eye for vertical lands
-        lm[33] = MockLandmark(le_x33, le_y)
-        lm[133] = MockLandmark(le_x133, le_y)
-        lm[160] = MockLandmark(lx, le_y - ey_v)
-        lm[144] = MockLandmark(lx, le_y + ey_v)
-        lm[158] = MockLandmark(lx, le_y - ey_v)
-        lm[153] = MockLandmark(lx, le_y + ey_v)
-
-        # --- Right eye (person's right → image left side) ---
-        re_x362, re_y = pt(0.45, 0.38)  # 362 inner (nose side)
-        re_x263 = (fx + 0.30 * fw) / w  # 263 outer (ear side)
-        rx = (fx + 0.38 * fw) / w
-        lm[362] = MockLandmark(re_x362, re_y)
-        lm[263] = MockLandmark(re_x263, re_y)
-        lm[385] = MockLandmark(rx, re_y - ey_v)
-        lm[380] = MockLandmark(rx, re_y + ey_v)
-        lm[387] = MockLandmark(rx, re_y - ey_v)
-        lm[373] = MockLandmark(rx, re_y + ey_v)
-
-        # --- Nose tip ---
-        lm[1] = MockLandmark(*pt(0.50, 0.58))
-
-        # --- Mouth ---
-        my = (fy + 0.68 * fh) / h
-        mh = 0.006  # mouth vertical half-opening → MAR ≈ 0.012/0.075 = 0.16
-        lm[61] = MockLandmark(*pt(0.40, 0.68))   # left corner
-        lm[291] = MockLandmark(*pt(0.60, 0.68))  # right corner
-        lm[13] = MockLandmark(cx_n, my + mh)      # bottom lip
-        lm[14] = MockLandmark(cx_n, my - mh)      # top lip
-
-        # --- Chin & forehead & ears ---
-        lm[152] = MockLandmark(*pt(0.50, 0.95))  # chin
-        lm[10] = MockLandmark(*pt(0.50, 0.05))   # forehead
-        lm[234] = MockLandmark(*pt(0.05, 0.40))  # left ear (image left)
-        lm[454] = MockLandmark(*pt(0.95, 0.40))  # right ear (image right)
-
-        class MockResults:
-            def __init__(self, landmark_list):
-                self.multi_face_landmarks = [landmark_list]
-
-        return MockResults(MockLandmarkList(lm))
-
-    def detect(self, frame):
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        points = np.zeros((_FALLBACK_POINTS, 3), dtype=np.float32)
+        points[:, 0] = (fx + _FALLBACK_UV[:, 0] * fw) / w
+        points[:, 1] = (fy + _FALLBACK_UV[:, 1] * fh) / h
+        points[:, :2] += _FALLBACK_OFFSET
+        return FaceResults(LandmarkFrame(points, w, h))
+
+    def detect(self, frame, gray=None, roi=None):
+        """
+        gray — кадр (или кроп roi) в оттенках серого, возможно уменьшенный:
+        bbox масштабируется и сдвигается обратно в координаты кадра.
+        """
+        if gray is None:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        region_w = roi.width if roi is not None else frame.shape[1]
+        ox, oy = (roi.x0, roi.y0) if roi is not None else (0, 0)
+        scale = region_w / gray.shape[1]
+
+        bbox = None
+        # Кадр 0 — каскад, кадры 1..N-1 — сопровождение
+        if self._template is not None and self._since_detect < self.detect_interval - 1:
+            bbox = self._track(gray, scale, ox, oy)
+        if bbox is None:
+            bbox = self._detect_cascade(gray, scale, ox, oy)
+        else:
+            self._since_detect += 1
+            self.tracked += 1
+
+        self._prev_bbox = bbox
+        if bbox is None:
+            self._template = None
+            return None
+        return self._build_results(frame, bbox)
+
+    def _detect_cascade(self, gray, scale, ox, oy):
+        if self._cascade is None:
+            return None
+        min_side = max(20, int(round(60 / scale)))
         faces = self._cascade.detectMultiScale(
-            gray, scaleFactor=1.1, minNeighbors=5, minSize=(60, 60))
+            gray, scaleFactor=1.1, minNeighbors=5, minSize=(min_side, min_side))
+        self.detections += 1
+        self._since_detect = 0
         if len(faces) == 0:
-            self._prev_bbox = None
             return None
-        bbox = tuple(faces[0])
-        self._prev_bbox = bbox
-        return self._build_mock_results(frame, bbox)
+        fx, fy, fw, fh = (int(v) for v in faces[0])
+        # Патч для сопровождения — копия, буфер gray переиспользуется
+        self._template = gray[fy:fy + fh, fx:fx + fw].copy()
+        self._template_scale = scale
+        return (int(round(ox + fx * scale)), int(round(oy + fy * scale)),
+                int(round(fw * scale)), int(round(fh * scale)))
+
+    def _track(self, gray, scale, ox, oy):
+        """Поиск патча лица в окне вокруг прошлого бокса. None — потерян."""
+        template = self._template
+        if abs(scale - self._template_scale) > 1e-3:
+            # Вход другого масштаба (смена ROI / ширины) — подгоняем патч
+            k = self._template_scale / scale
+            size = (max(1, int(round(template.shape[1] * k))),
+                    max(1, int(round(template.shape[0] * k))))
+            template = cv2.resize(template, size, interpolation=cv2.INTER_AREA)
+        th, tw = template.shape[:2]
+
+        px, py, pw, ph = self._prev_bbox
+        bx, by = (px - ox) / scale, (py - oy) / scale
+        mx, my = self.search_margin * tw, self.search_margin * th
+        gh, gw = gray.shape[:2]
+        x0, y0 = max(0, int(bx - mx)), max(0, int(by - my))
+        x1, y1 = min(gw, int(bx + tw + mx)), min(gh, int(by + th + my))
+        if x1 - x0 < tw or y1 - y0 < th:
+            return None
+
+        scores = cv2.matchTemplate(gray[y0:y1, x0:x1], template, cv2.TM_CCOEFF_NORMED)
+        _, best, _, (mx_loc, my_loc) = cv2.minMaxLoc(scores)
+        if not best >= self.track_threshold:     # NaN (плоский патч) — тоже потеря
+            return None
+        return (int(round(ox + (x0 + mx_loc) * scale)), int(round(oy + (y0 + my_loc) * scale)),
+                pw, ph)
 
     def draw_bbox(self, frame, bbox):
         x, y, w, h = bbox
@@ -140,13 +205,17 @@ class _FallbackFaceDetector:
 class FaceMeshDetector:
     def __init__(self, static_image_mode=False, max_num_faces=1, 
                  refine_landmarks=True, min_detection_confidence=0.8,
-                 min_tracking_confidence=0.8):
+                 min_tracking_confidence=0.8, fallback_detect_interval=5,
+                 fallback_detect_width=320):
         self._fallback = None
 
         if not mediapipe_available:
             self.face_mesh = None
             self.mp_face_mesh = None
-            self._fallback = _FallbackFaceDetector()
+            self._fallback = _FallbackFaceDetector(
+                detect_interval=fallback_detect_interval,
+                detect_width=fallback_detect_width,
+            )
             return
             
         self.mp_face_mesh = mp.solutions.face_mesh
@@ -157,52 +226,111 @@ class FaceMeshDetector:
             min_detection_confidence=min_detection_confidence,
             min_tracking_confidence=min_tracking_confidence
         )
-        
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.mp_drawing_styles = mp.solutions.drawing_styles
 
-    def process_frame(self, frame, draw=True):
+        # Сетка рисуется векторно (см. LandmarkOverlay), без drawing_utils
+        self.overlay = LandmarkOverlay(OVERLAY_MESH)
+
+    def get_stats(self) -> dict:
+        if self._fallback is not None:
+            return {
+                'face_tracker': 'haar',
+                'face_detections': self._fallback.detections,
+                'face_tracked': self._fallback.tracked,
+            }
+        return {'face_tracker': 'face_mesh'}
+
+    @staticmethod
+    def _output_image(frame, bundle, draw):
+        if bundle is None:
+            return frame
+        return bundle.canvas if draw else bundle.bgr
+
+    def process_frame(self, frame, draw=True, bundle=None, inference_width=None,
+                      roi=None, draw_mesh=True):
+        """
+        Найти лицо на кадре.
+
+        Args:
+            frame: BGR кадр (не изменяется, если передан bundle)
+            draw: рисовать ли сетку лица
+            bundle: FrameBundle — берём готовые rgb/gray, рисуем на bundle.canvas
+                (без draw возвращается read-only bundle.bgr, canvas не копируется)
+            inference_width: ширина кадра для модели (None — полное разрешение).
+                Landmarks нормализованы (0..1), поэтому оверлеи рисуются на
+                полном кадре без пересчёта.
+            roi: Roi из RoiTracker (только вместе с bundle) — модель видит
+                кроп, landmarks переводятся обратно в координаты кадра.
+            draw_mesh: False — сетку не рисовать (draw только выбирает холст);
+                engine рисует её позже на уменьшенном превью.
+
+        Returns:
+            (image, results): image — кадр с оверлеями
+        """
         # Fallback when MediaPipe is not available
         if self.face_mesh is None:
+            image = self._output_image(frame, bundle, draw)
             if self._fallback is not None:
-                results = self._fallback.detect(frame)
+                width = self._fallback.input_width(inference_width)
+                if bundle is not None:
+                    gray = crop_for_inference(bundle, roi, width, gray=True)
+                else:
+                    roi = None
+                    gray = resize_to_width(
+                        cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), width)
+                results = self._fallback.detect(frame, gray=gray, roi=roi)
                 if results is not None and draw:
                     # draw bounding box on frame
                     self._fallback.draw_bbox(
-                        frame, self._fallback._prev_bbox)
-                return frame, results
-            return frame, None
-            
-        rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        rgb_image.flags.writeable = False
-        
-        results = self.face_mesh.process(rgb_image)
-        
-        rgb_image.flags.writeable = True
-        image = cv2.cvtColor(rgb_image, cv2.COLOR_RGB2BGR)
-
-        if results.multi_face_landmarks and draw:
+                        image, self._fallback._prev_bbox)
+                return image, results
+            return image, None
+
+        if bundle is not None:
+            # RGB уже посчитан один раз на кадр (read-only view)
+            results = self.face_mesh.process(
+                crop_for_inference(bundle, roi, inference_width))
+            if roi is not None and results.multi_face_landmarks:
+                for face_landmarks in results.multi_face_landmarks:
+                    remap_landmarks(face_landmarks.landmark, roi,
+                                    bundle.width, bundle.height)
+            image = self._output_image(frame, bundle, draw)
+        else:
+            rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            rgb_image.flags.writeable = False
+
+            results = self.face_mesh.process(resize_to_width(rgb_image, inference_width))
+
+            rgb_image.flags.writeable = True
+            image = cv2.cvtColor(rgb_image, cv2.COLOR_RGB2BGR)
+
+        if results.multi_face_landmarks and draw and draw_mesh:
             for face_landmarks in results.multi_face_landmarks:
-                self.mp_drawing.draw_landmarks(
-                    image=image,
-                    landmark_list=face_landmarks,
-                    connections=self.mp_face_mesh.FACEMESH_TESSELATION,
-                    landmark_drawing_spec=None,
-                    connection_drawing_spec=self.mp_drawing_styles.get_default_face_mesh_tesselation_style()
-                )
-                self.mp_drawing.draw_landmarks(
-                    image=image,
-                    landmark_list=face_landmarks,
-                    connections=self.mp_face_mesh.FACEMESH_CONTOURS,
-                    landmark_drawing_spec=None,
-                    connection_drawing_spec=self.mp_drawing_styles.get_default_face_mesh_contours_style()
-                )
-                self.mp_drawing.draw_landmarks(
-                    image=image,
-                    landmark_list=face_landmarks,
-                    connections=self.mp_face_mesh.FACEMESH_IRISES,
-                    landmark_drawing_spec=None,
-                    connection_drawing_spec=self.mp_drawing_styles.get_default_face_mesh_iris_connections_style()
-                )
-
-        return image, results
\ No newline at end of file
+                self.overlay.draw(image, face=face_landmarks)
+
+        return image, results
+
+
+def create_face_detector(cfg: dict, tracker: str = None):
+    """
+    Детектор лица по секции face конфига.
+
+    tracker (или cfg['tracker']): 'face_mesh' — mp.solutions.face_mesh
+    (синхронно), 'landmarker' — FaceLandmarker task (см. src/face_landmarker.py).
+    Если FaceLandmarker недоступен, используется face_mesh.
+    """
+    tracker = tracker or cfg.get('tracker', 'face_mesh')
+    if tracker == 'landmarker':
+        from src.face_landmarker import FaceLandmarkerDetector
+        detector = FaceLandmarkerDetector(
+            mode=cfg.get('landmarker_mode', 'live_stream'),
+            blendshapes=cfg.get('blendshapes', True),
+            transformation_matrix=cfg.get('head_pose_from_matrix', True),
+            min_detection_confidence=cfg.get('min_detection_confidence', 0.5),
+        )
+        if detector.available:
+            return detector
+        print("FaceLandmarker недоступен, используется Face Mesh")
+    return FaceMeshDetector(
+        fallback_detect_interval=cfg.get('fallback_detect_interval', 5),
+        fallback_detect_width=cfg.get('fallback_detect_width', 320),
+    )
@@ -0,0 +1,262 @@
+"""
+Face tracking with the MediaPipe FaceLandmarker task (``models/face_landmarker.task``).
+
+``FaceLandmarkerDetector`` is a drop-in alternative to ``FaceMeshDetector``:
+same ``process_frame(...) -> (image, results)`` signature, and ``results``
+still exposes ``multi_face_landmarks`` (478 points, normalized to the full
+frame), so ``FaceProcessor`` and everything downstream work unchanged.
+On top of that the results carry
+
+    results.blendshapes             {'eyeBlinkLeft', 'eyeBlinkRight', 'jawOpen'} → 0..1
+    results.transformation_matrix   4×4 face → camera transform (head pose
+                                    without solvePnP)
+
+Running modes:
+
+    live_stream   ``detect_async``: the frame is handed to MediaPipe and the
+                  call returns immediately with the newest finished result
+                  (usually the previous frame's), so inference never blocks
+                  the pipeline.  MediaPipe drops frames while it is busy.
+    video         ``detect_for_video``: synchronous, one result per frame —
+                  used for lossless file replays, where every frame counts.
+
+The tracker is chosen in the ``face`` config section (``tracker``:
+``face_mesh`` / ``landmarker``) or with ``--face-tracker``; without
+MediaPipe Tasks or the model file ``create_face_detector`` falls back to
+the legacy Face Mesh path.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+from build_utils import resource_path
+from src.landmark_frame import LandmarkFrame
+from src.landmark_overlay import OVERLAY_MESH, LandmarkOverlay
+from src.logger import logger
+from src.roi_tracker import crop_for_inference
+
+mp = None
+tasks_available = False
+try:
+    import mediapipe as mp
+    from mediapipe.tasks.python.core.base_options import BaseOptions
+    from mediapipe.tasks.python.vision import FaceLandmarker, FaceLandmarkerOptions, RunningMode
+    tasks_available = True
+except (ImportError, Exception) as e:
+    logger.info(f"MediaPipe Tasks not available: {e}")
+
+MODE_LIVE_STREAM = 'live_stream'
+MODE_VIDEO = 'video'
+
+# Blendshapes, которые идут в FaceProcessor (остальные 49 не нужны)
+BLENDSHAPE_NAMES = ('eyeBlinkLeft', 'eyeBlinkRight', 'jawOpen')
+
+
+class FaceLandmarkerResults:
+    """Результат FaceLandmarker в интерфейсе results FaceMesh."""
+
+    __slots__ = ('multi_face_landmarks', 'blendshapes', 'transformation_matrix', 'timestamp_ms')
+
+    def __init__(self, multi_face_landmarks=None, blendshapes=None,
+                 transformation_matrix=None, timestamp_ms: int = 0):
+        self.multi_face_landmarks = multi_face_landmarks
+        self.blendshapes = blendshapes
+        self.transformation_matrix = transformation_matrix
+        self.timestamp_ms = timestamp_ms
+
+
+def convert_result(result, roi=None, frame_w: int = 0, frame_h: int = 0,
+                   timestamp_ms: int = 0) -> FaceLandmarkerResults:
+    """FaceLandmarkerResult → FaceLandmarkerResults (первое лицо, координаты полного кадра)."""
+    faces = getattr(result, 'face_landmarks', None)
+    if not faces:
+        return FaceLandmarkerResults(timestamp_ms=timestamp_ms)
+
+    points = np.array([(p.x, p.y, p.z) for p in faces[0]], dtype=np.float32)
+    if roi is not None:
+        # То же, что remap_landmarks, но сразу над массивом
+        sx = roi.width / frame_w
+        points[:, 0] = roi.x0 / frame_w + points[:, 0] * sx
+        points[:, 1] = roi.y0 / frame_h + points[:, 1] * (roi.height / frame_h)
+        points[:, 2] *= sx
+
+    blendshapes = None
+    categories = getattr(result, 'face_blendshapes', None)
+    if categories:
+        scores = {c.category_name: c.score for c in categories[0]}
+        blendshapes = {name: float(scores.get(name, 0.0)) for name in BLENDSHAPE_NAMES}
+
+    matrix = None
+    matrixes = getattr(result, 'facial_transformation_matrixes', None)
+    if matrixes is not None and len(matrixes):
+        matrix = np.asarray(matrixes[0], dtype=np.float64)
+
+    return FaceLandmarkerResults([LandmarkFrame(points)], blendshapes, matrix, timestamp_ms)
+
+
+class FaceLandmarkerDetector:
+    """Трекинг лица через FaceLandmarker task (live stream / video)."""
+
+    def __init__(self, model_path: str = 'models/face_landmarker.task',
+                 mode: str = MODE_LIVE_STREAM, blendshapes: bool = True,
+                 transformation_matrix: bool = True,
+                 min_detection_confidence: float = 0.5,
+                 min_tracking_confidence: float = 0.5):
+        self.model_path = model_path
+        self.mode = mode if mode in (MODE_LIVE_STREAM, MODE_VIDEO) else MODE_LIVE_STREAM
+        self._blendshapes = blendshapes
+        self._matrix = transformation_matrix
+        self._min_detection = min_detection_confidence
+        self._min_tracking = min_tracking_confidence
+
+        self.overlay = LandmarkOverlay(OVERLAY_MESH)
+        self._lock = threading.Lock()
+        self._latest: Optional[FaceLandmarkerResults] = None
+        # timestamp_ms → (roi, w, h) кадров, чей результат ещё не пришёл
+        self._pending: Dict[int, tuple] = {}
+        self._last_ts = -1
+        self.submitted = 0
+        self.completed = 0
+
+        self._landmarker = self._create_landmarker()
+
+    @property
+    def available(self) -> bool:
+        return self._landmarker is not None
+
+    def _create_landmarker(self):
+        if not tasks_available:
+            return None
+        try:
+            abs_path = os.path.abspath(resource_path(self.model_path))
+            if not os.path.exists(abs_path):
+                logger.warning(f"FaceLandmarker model not found: {abs_path}")
+                return None
+            # Буфер вместо пути — как в PoseDetector (пути на Windows)
+            with open(abs_path, 'rb') as f:
+                model_buffer = f.read()
+
+            live = self.mode == MODE_LIVE_STREAM
+            options = FaceLandmarkerOptions(
+                base_options=BaseOptions(model_asset_buffer=model_buffer),
+                running_mode=RunningMode.LIVE_STREAM if live else RunningMode.VIDEO,
+                num_faces=1,
+                min_face_detection_confidence=self._min_detection,
+                min_tracking_confidence=self._min_tracking,
+                output_face_blendshapes=self._blendshapes,
+                output_facial_transformation_matrixes=self._matrix,
+                result_callback=self._on_result if live else None,
+            )
+            return FaceLandmarker.create_from_options(options)
+        except Exception as e:
+            logger.error(f"FaceLandmarker init error: {e}")
+            return None
+
+    def set_mode(self, mode: str):
+        """Сменить режим (файл без потерь → video); landmarker пересоздаётся."""
+        if mode == self.mode:
+            return
+        self.close()
+        self.mode = mode
+        with self._lock:
+            self._latest = None
+            self._pending.clear()
+        self._landmarker = self._create_landmarker()
+        logger.info(f"FaceLandmarker: режим {mode}")
+
+    def close(self):
+        if self._landmarker is not None:
+            try:
+                self._landmarker.close()
+            except Exception:
+                pass
+            self._landmarker = None
+
+    @staticmethod
+    def _mp_image(rgb: np.ndarray):
+        # mp.Image копирует пиксели: буфер bundle можно переиспользовать сразу
+        return mp.Image(image_format=mp.ImageFormat.SRGB, data=np.ascontiguousarray(rgb))
+
+    def _next_timestamp(self, bundle) -> int:
+        # MediaPipe требует строго возрастающие таймстампы (мс)
+        t = bundle.timestamp if bundle is not None else time.monotonic()
+        ts = max(int(t * 1000), self._last_ts + 1)
+        self._last_ts = ts
+        return ts
+
+    def _on_result(self, result, image, timestamp_ms: int):
+        """Колбэк live stream (поток MediaPipe)."""
+        with self._lock:
+            roi, w, h = self._pending.pop(timestamp_ms, (None, 0, 0))
+            # Кадры, пропущенные MediaPipe, результата уже не получат
+            for ts in [ts for ts in self._pending if ts < timestamp_ms]:
+                del self._pending[ts]
+        try:
+            converted = convert_result(result, roi, w, h, timestamp_ms)
+        except Exception as e:
+            logger.error(f"FaceLandmarker result error: {e}")
+            return
+        with self._lock:
+            if self._latest is None or timestamp_ms >= self._latest.timestamp_ms:
+                self._latest = converted
+            self.completed += 1
+
+    def process_frame(self, frame, draw=True, bundle=None, inference_width=None,
+                      roi=None, draw_mesh=True):
+        """
+        Интерфейс FaceMeshDetector.process_frame.
+
+        В режиме live_stream возвращается последний готовый результат
+        (None, пока не пришёл первый), сам кадр обрабатывается асинхронно.
+        """
+        if bundle is not None:
+            image = bundle.canvas if draw else bundle.bgr
+            h, w = bundle.height, bundle.width
+        else:
+            image = frame.copy() if draw else frame
+            h, w = frame.shape[:2]
+            roi = None
+        if self._landmarker is None:
+            return image, None
+
+        if bundle is not None:
+            rgb = crop_for_inference(bundle, roi, inference_width)
+        else:
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        mp_image = self._mp_image(rgb)
+        ts = self._next_timestamp(bundle)
+        self.submitted += 1
+
+        try:
+            if self.mode == MODE_LIVE_STREAM:
+                with self._lock:
+                    self._pending[ts] = (roi, w, h)
+                self._landmarker.detect_async(mp_image, ts)
+                with self._lock:
+                    results = self._latest
+            else:
+                results = convert_result(
+                    self._landmarker.detect_for_video(mp_image, ts), roi, w, h, ts)
+                self.completed += 1
+        except Exception as e:
+            logger.error(f"FaceLandmarker process error: {e}")
+            return image, None
+
+        if results is not None and results.multi_face_landmarks and draw and draw_mesh:
+            self.overlay.draw(image, face=results.multi_face_landmarks[0])
+        return image, results
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                'face_tracker': 'landmarker',
+                'face_mode': self.mode,
+                'face_submitted': self.submitted,
+                'face_completed': self.completed,
+                'face_in_flight': len(self._pending),
+            }
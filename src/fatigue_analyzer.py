@@ -21,6 +21,8 @@ import numpy as np
 from collections import deque
 import time
 
+from src.rolling_stats import HeadMean, MinMax, RollingWindow, TailMean
+
 # ── Normalisation constants ──────────────────────────────────────
 EAR_MIN_PHYSIO = 0.12   # глаза плотно закрыты
 EAR_MAX_PHYSIO = 0.40   # глаза широко открыты
@@ -33,6 +35,18 @@ BLINK_SIGMOID_SLOPE = 0.15
 TREND_MIN = 0.0
 TREND_MAX = 0.10
 
+# ── Rolling sub-windows (отсчётов) ──────────────────────────────
+HISTORY_LEN = 60
+EAR_MIN_WINDOW = 3      # минимум EAR для сглаживания ear_score
+MAR_PEAK_WINDOW = 10    # пик MAR для mar_score
+TREND_WINDOW = 15       # тренд EAR: первые 7 против последних 8
+TREND_HEAD = 7
+AVG_WINDOW = 20         # avg_ear / avg_mar
+EMOTION_WINDOW = 10
+
+_FATIGUE_KEYWORDS = ("Усталость", "Грусть", "Сонливость", "Скука")
+_POSITIVE_KEYWORDS = ("Счастье", "Радость", "Внимательность", "Нейтрально", "Спокойствие")
+
 # ── Exponential EAR scoring ────────────────────────────────────
 # При EAR >= 0.28 → score ≈ 0 (бодр)
 # При EAR = 0.22 → score ≈ 0.5
@@ -111,12 +125,25 @@ class FatigueAnalyzer:
         self._mar_max_physio   = np.clip(0.70 * ratio_mar, 0.50, 0.90)
 
         # ── Rolling histories (уменьшено для более быстрой реакции) ─
-        self.ear_history = deque(maxlen=60)
-        self.mar_history = deque(maxlen=60)
-        self.pitch_history = deque(maxlen=60)
+        # Суб-скоры читаются из трекеров за O(1), без копирования истории
+        self.ear_history = RollingWindow(HISTORY_LEN)
+        self.mar_history = RollingWindow(HISTORY_LEN)
+        self.pitch_history = RollingWindow(HISTORY_LEN)
         self.emotion_history = deque(maxlen=50)
         self.timestamps = deque(maxlen=100)
 
+        self._ear_recent = self.ear_history.track(MinMax(EAR_MIN_WINDOW))
+        self._ear_trend_head = self.ear_history.track(HeadMean(TREND_WINDOW, TREND_HEAD))
+        self._ear_trend_tail = self.ear_history.track(TailMean(TREND_WINDOW - TREND_HEAD))
+        self._ear_avg = self.ear_history.track(TailMean(AVG_WINDOW))
+        self._mar_peak = self.mar_history.track(MinMax(MAR_PEAK_WINDOW))
+        self._mar_avg = self.mar_history.track(TailMean(AVG_WINDOW))
+
+        # Флаги (усталая, позитивная) последних EMOTION_WINDOW эмоций + суммы
+        self._emotion_flags = deque(maxlen=EMOTION_WINDOW)
+        self._emotion_fatigue = 0
+        self._emotion_positive = 0
+
         # ── Blink tracking ──────────────────────────────────
         self.blink_count = 0
         self.blink_timestamps = deque(maxlen=30)
@@ -150,7 +177,7 @@ class FatigueAnalyzer:
         self.ear_history.append(ear)
         self.mar_history.append(mar)
         self.pitch_history.append(pitch)
-        self.emotion_history.append(emotion)
+        self._push_emotion(emotion)
         self.timestamps.append(current_time)
 
         self._detect_blink(ear, current_time)
@@ -211,6 +238,20 @@ class FatigueAnalyzer:
             },
         }
 
+    def _push_emotion(self, emotion: str):
+        """Добавить эмоцию в историю и обновить счётчики окна."""
+        if len(self._emotion_flags) == self._emotion_flags.maxlen:
+            old_fatigue, old_positive = self._emotion_flags[0]
+            self._emotion_fatigue -= old_fatigue
+            self._emotion_positive -= old_positive
+        label = emotion.lower()
+        is_fatigue = any(kw.lower() in label for kw in _FATIGUE_KEYWORDS)
+        is_positive = any(kw.lower() in label for kw in _POSITIVE_KEYWORDS)
+        self._emotion_flags.append((is_fatigue, is_positive))
+        self._emotion_fatigue += is_fatigue
+        self._emotion_positive += is_positive
+        self.emotion_history.append(emotion)
+
     # ── Blink detection (unchanged logic) ──────────────────────
 
     def _detect_blink(self, ear: float, current_time: float):
@@ -241,9 +282,8 @@ class FatigueAnalyzer:
         if len(self.ear_history) < 1:
             return 0.0
 
-        current_ear = float(self.ear_history[-1])
-        recent3 = list(self.ear_history)[-3:]
-        min_ear = float(min(recent3))
+        current_ear = self.ear_history.last
+        min_ear = self._ear_recent.min
 
         # Основной score — текущий EAR (нелинейный)
         current_score = _ear_to_score_exponential(
@@ -269,8 +309,7 @@ class FatigueAnalyzer:
         if len(self.mar_history) < 5:
             return 0.0
 
-        recent_mar = list(self.mar_history)[-10:]
-        max_mar = max(recent_mar)
+        max_mar = self._mar_peak.max
 
         return _min_max(max_mar, MAR_MIN_PHYSIO, self._mar_max_physio)
 
@@ -292,32 +331,13 @@ class FatigueAnalyzer:
         if len(self.emotion_history) < 3:
             return 0.1  # neutral default
 
-        emotions = list(self.emotion_history)[-10:]
-
-        fatigue_keywords = [
-            "Усталость", "Грусть",
-            "Сонливость", "Скука",
-        ]
-        positive_keywords = [
-            "Счастье", "Радость",
-            "Внимательность", "Нейтрально",
-            "Спокойствие",
-        ]
-
-        fatigue_count = sum(
-            1 for e in emotions
-            if any(kw.lower() in e.lower() for kw in fatigue_keywords)
-        )
-        positive_count = sum(
-            1 for e in emotions
-            if any(kw.lower() in e.lower() for kw in positive_keywords)
-        )
+        window = max(len(self._emotion_flags), 1)
 
         # Доля «усталых» эмоций в окне
-        ratio = fatigue_count / max(len(emotions), 1)
+        ratio = self._emotion_fatigue / window
 
         # Бонус если много позитивных (снижает скор)
-        penalty = positive_count / max(len(emotions), 1) * 0.3
+        penalty = self._emotion_positive / window * 0.3
 
         return float(np.clip(ratio - penalty, 0.0, 1.0))
 
@@ -327,12 +347,11 @@ class FatigueAnalyzer:
 
         Сравнивает среднее EAR в первой и второй половинах окна (15 отсчётов).
         """
-        if len(self.ear_history) < 15:
+        if len(self.ear_history) < TREND_WINDOW:
             return 0.0
 
-        recent = list(self.ear_history)[-15:]
-        first_half = np.mean(recent[:7])
-        second_half = np.mean(recent[7:])
+        first_half = self._ear_trend_head.mean
+        second_half = self._ear_trend_tail.mean
 
         # Отрицательное изменение = EAR падает = усталость растёт
         change = float(max(0, first_half - second_half))
@@ -343,13 +362,10 @@ class FatigueAnalyzer:
 
     def _get_ear_trend(self) -> str:
         """Направление тренда EAR."""
-        if len(self.ear_history) < 15:
+        if len(self.ear_history) < TREND_WINDOW:
             return "stable"
 
-        recent = list(self.ear_history)[-15:]
-        first_half = np.mean(recent[:7])
-        second_half = np.mean(recent[7:])
-        change = second_half - first_half
+        change = self._ear_trend_tail.mean - self._ear_trend_head.mean
 
         if change < -0.03:
             return "decreasing"
@@ -375,12 +391,12 @@ class FatigueAnalyzer:
     def _get_avg_ear(self) -> float:
         if not self.ear_history:
             return 0.35
-        return float(np.mean(list(self.ear_history)[-20:]))
+        return float(self._ear_avg.mean)
 
     def _get_avg_mar(self) -> float:
         if not self.mar_history:
             return 0.0
-        return float(np.mean(list(self.mar_history)[-20:]))
+        return float(self._mar_avg.mean)
 
     # ── State analysis ─────────────────────────────────────────
 
@@ -452,7 +468,7 @@ class FatigueAnalyzer:
         ) * 100.0))
         # ── Мгновенный штраф при низком EAR (аналогично update) ──
         if len(self.ear_history) > 0:
-            ear = self.ear_history[-1]
+            ear = self.ear_history.last
             if ear <= self._ear_closed:
                 score = max(score, 85.0)
             elif ear < self._ear_critical:
@@ -494,6 +510,9 @@ class FatigueAnalyzer:
         self.mar_history.clear()
         self.pitch_history.clear()
         self.emotion_history.clear()
+        self._emotion_flags.clear()
+        self._emotion_fatigue = 0
+        self._emotion_positive = 0
         self.timestamps.clear()
         self.blink_count = 0
         self.blink_timestamps.clear()
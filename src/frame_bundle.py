@@ -0,0 +1,218 @@
+"""
+Per-frame preprocessing shared by all detectors.
+
+A ``FrameBundle`` is filled once per captured frame from preallocated
+buffers (every OpenCV call writes through ``dst=``), and exposes the
+representations the detectors need:
+
+    bundle.bgr          mirrored BGR frame (read-only)
+    bundle.rgb          RGB for MediaPipe (read-only, computed on first use)
+    bundle.gray         grayscale for Haar / emotion / eye CNN (read-only)
+    bundle.small_rgb    downscaled RGB (read-only)
+    bundle.rgb_at(w)    RGB / gray downscaled to an inference width
+    bundle.gray_at(w)
+    bundle.canvas       writable BGR copy for UI overlays
+
+Every derived view is computed at most once per frame, so a 1280×720
+frame no longer goes through half a dozen separate ``cvtColor`` calls
+and full-size allocations.  Bundles are recycled by ``FrameBundlePool``:
+
+    pool = FrameBundlePool()
+    bundle = pool.acquire(raw_frame, frame_id, timestamp)
+    ...
+    pool.release(bundle)
+"""
+
+import threading
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from src.logger import logger
+
+
+def _readonly(arr: np.ndarray) -> np.ndarray:
+    view = arr.view()
+    view.flags.writeable = False
+    return view
+
+
+def scaled_size(width: int, height: int, target_width: int):
+    """(w, h) после уменьшения до target_width с сохранением пропорций."""
+    if not target_width or target_width >= width:
+        return width, height
+    return target_width, max(1, round(height * target_width / width))
+
+
+def resize_to_width(image: np.ndarray, target_width: Optional[int]) -> np.ndarray:
+    """Уменьшить изображение до ширины target_width (без увеличения).
+
+    Пропорции сохраняются, поэтому нормализованные (0..1) координаты
+    landmarks, полученные на уменьшенном кадре, совпадают с координатами
+    на полном кадре.
+    """
+    h, w = image.shape[:2]
+    size = scaled_size(w, h, target_width)
+    if size == (w, h):
+        return image
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+class FrameBundle:
+    """Набор представлений одного кадра на переиспользуемых буферах."""
+
+    def __init__(self, shape, small_width: int = 640):
+        h, w = shape[:2]
+        self.shape = (h, w, 3)
+        self.small_width = min(small_width, w)
+
+        self._bgr = np.empty(self.shape, dtype=np.uint8)
+        self._rgb = np.empty(self.shape, dtype=np.uint8)
+        self._gray = np.empty((h, w), dtype=np.uint8)
+        self._canvas = np.empty(self.shape, dtype=np.uint8)
+        self._canvas_rgb = np.empty(self.shape, dtype=np.uint8)
+        self._resized: Dict[tuple, np.ndarray] = {}
+
+        self.frame_id = -1
+        self.timestamp = 0.0
+        self._reset_views()
+
+    def _reset_views(self):
+        self._bgr_view = None
+        self._rgb_view = None
+        self._gray_view = None
+        self._canvas_ready = False
+        self._resized_ready: Dict[tuple, np.ndarray] = {}
+
+    # ── Fill ───────────────────────────────────────────────────
+
+    def load(self, raw: np.ndarray, frame_id: int, timestamp: float, flip: bool = True):
+        """Скопировать кадр камеры в буфер (с зеркалированием)."""
+        if flip:
+            cv2.flip(raw, 1, dst=self._bgr)
+        else:
+            np.copyto(self._bgr, raw)
+        self.frame_id = frame_id
+        self.timestamp = timestamp
+        self._reset_views()
+        self._bgr_view = _readonly(self._bgr)
+
+    # ── Read-only views ────────────────────────────────────────
+
+    @property
+    def width(self) -> int:
+        return self.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.shape[0]
+
+    @property
+    def bgr(self) -> np.ndarray:
+        return self._bgr_view
+
+    @property
+    def rgb(self) -> np.ndarray:
+        if self._rgb_view is None:
+            cv2.cvtColor(self._bgr, cv2.COLOR_BGR2RGB, dst=self._rgb)
+            self._rgb_view = _readonly(self._rgb)
+        return self._rgb_view
+
+    @property
+    def gray(self) -> np.ndarray:
+        if self._gray_view is None:
+            cv2.cvtColor(self._bgr, cv2.COLOR_BGR2GRAY, dst=self._gray)
+            self._gray_view = _readonly(self._gray)
+        return self._gray_view
+
+    @property
+    def small_rgb(self) -> np.ndarray:
+        return self.rgb_at(self.small_width)
+
+    def rgb_at(self, width: Optional[int]) -> np.ndarray:
+        """RGB, уменьшенный до заданной ширины (с сохранением пропорций)."""
+        return self._downscaled('rgb', width)
+
+    def gray_at(self, width: Optional[int]) -> np.ndarray:
+        """Grayscale, уменьшенный до заданной ширины."""
+        return self._downscaled('gray', width)
+
+    def _downscaled(self, kind: str, width: Optional[int]) -> np.ndarray:
+        source = self.rgb if kind == 'rgb' else self.gray
+        size = scaled_size(self.width, self.height, width)
+        if size == (self.width, self.height):
+            return source
+        key = (kind, size[0])
+        view = self._resized_ready.get(key)
+        if view is None:
+            buf = self._resized.get(key)
+            if buf is None:
+                buf = np.empty((size[1], size[0]) + source.shape[2:], dtype=np.uint8)
+                self._resized[key] = buf
+            cv2.resize(source, size, dst=buf, interpolation=cv2.INTER_AREA)
+            view = _readonly(buf)
+            self._resized_ready[key] = view
+        return view
+
+    # ── Writable overlay canvas ────────────────────────────────
+
+    @property
+    def canvas(self) -> np.ndarray:
+        """BGR-копия кадра, на которой рисуются оверлеи для UI."""
+        if not self._canvas_ready:
+            np.copyto(self._canvas, self._bgr)
+            self._canvas_ready = True
+        return self._canvas
+
+    def canvas_rgb(self) -> np.ndarray:
+        """Canvas в RGB для QImage (в собственный буфер, без аллокации)."""
+        cv2.cvtColor(self.canvas, cv2.COLOR_BGR2RGB, dst=self._canvas_rgb)
+        return self._canvas_rgb
+
+
+class FrameBundlePool:
+    """Потокобезопасный пул FrameBundle одного разрешения."""
+
+    def __init__(self, max_size: int = 16, small_width: int = 640):
+        self._max_size = max_size
+        self._small_width = small_width
+        self._free: List[FrameBundle] = []
+        self._lock = threading.Lock()
+        self._shape: Optional[tuple] = None
+        self.allocated = 0
+
+    def acquire(self, raw: np.ndarray, frame_id: int, timestamp: float,
+                flip: bool = True) -> FrameBundle:
+        shape = raw.shape[:2]
+        bundle = None
+        with self._lock:
+            if shape != self._shape:
+                # Разрешение камеры сменилось — старые буферы не подходят
+                if self._shape is not None:
+                    logger.info(f"FrameBundlePool: новое разрешение {shape[1]}x{shape[0]}")
+                self._shape = shape
+                self._free.clear()
+            if self._free:
+                bundle = self._free.pop()
+            else:
+                self.allocated += 1
+                if self.allocated == self._max_size + 1:
+                    logger.warning("FrameBundlePool: пул исчерпан, буферы не возвращаются")
+
+        if bundle is None:
+            bundle = FrameBundle(shape, small_width=self._small_width)
+        bundle.load(raw, frame_id, timestamp, flip=flip)
+        return bundle
+
+    def release(self, bundle: Optional[FrameBundle]):
+        if bundle is None:
+            return
+        with self._lock:
+            if bundle.shape[:2] == self._shape and len(self._free) < self._max_size:
+                self._free.append(bundle)
+
+    @property
+    def free_count(self) -> int:
+        with self._lock:
+            return len(self._free)
@@ -0,0 +1,248 @@
+"""
+Dedicated camera grabber for the video-processing loop.
+
+Camera reads run on their own daemon thread which continuously overwrites
+a single-slot "latest frame" mailbox.  The processing loop always takes the
+freshest frame, so a slow inference step (e.g. the heavy-ML frame) never
+lets the driver buffer fill up with stale images.
+
+Every published frame carries a monotonic capture timestamp and a frame id:
+
+    grabber = FrameGrabber(cap)
+    grabber.start()
+    item = grabber.read(timeout=1.0)   # GrabbedFrame or None
+    ...
+    grabber.stop()
+
+Frames overwritten before the consumer picked them up are counted as
+*dropped*; frames that were already older than ``max_frame_age`` when the
+consumer got them are counted as *stale*.  Both are exposed via
+``get_stats()``.
+
+``set_rate_limit(fps)`` throttles reads in software (idle / power-save
+mode); ``set_rate_limit(None)`` lifts the limit immediately, without
+waiting for the current pause to run out.
+
+With ``lossless=True`` (file replay as fast as possible) the grabber
+waits for the consumer instead of overwriting, so every frame of the
+source is delivered.  When a ``FrameSource`` reports ``exhausted``, the
+grabber stops quietly and ``finished`` becomes True.
+"""
+
+import threading
+import time
+from typing import Optional
+
+from src.logger import logger
+
+
+class GrabbedFrame:
+    """Кадр из почтового ящика граббера."""
+
+    __slots__ = ('frame_id', 'timestamp', 'frame', 'media_time')
+
+    def __init__(self, frame_id: int, timestamp: float, frame,
+                 media_time: Optional[float] = None):
+        self.frame_id = frame_id
+        self.timestamp = timestamp      # time.monotonic() в момент захвата
+        self.frame = frame
+        self.media_time = media_time    # время кадра в источнике (FrameSource.timestamp)
+
+    @property
+    def age(self) -> float:
+        """Сколько секунд прошло с момента захвата."""
+        return time.monotonic() - self.timestamp
+
+
+class FrameGrabber:
+    """
+    Thread-backed camera reader with a latest-frame mailbox.
+
+    • The grabber thread calls ``capture.read()`` in a tight loop and
+      replaces the mailbox contents with each new frame.
+    • ``read()`` blocks until a frame newer than the last consumed one is
+      available (or the timeout expires).
+    • After ``max_errors`` consecutive failed reads the grabber stops and
+      ``failed`` becomes True.
+    """
+
+    def __init__(self, capture, max_errors: int = 10, max_frame_age: float = 0.1,
+                 lossless: bool = False):
+        self._capture = capture
+        self._max_errors = max_errors
+        self._max_frame_age = max_frame_age
+        self._lossless = lossless
+
+        self._cond = threading.Condition()
+        self._latest: Optional[GrabbedFrame] = None
+        self._last_consumed_id = -1
+        self._next_id = 0
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._min_interval = 0.0
+        self.failed = False
+        self.finished = False           # источник закончился (конец файла)
+
+        # ── Статистика ──────────────────────────────────────
+        self._captured = 0
+        self._delivered = 0
+        self._dropped = 0
+        self._stale = 0
+        self._last_latency = 0.0
+        self._fps_window_start = time.monotonic()
+        self._fps_window_count = 0
+        self._capture_fps = 0.0
+
+    # ── Lifecycle ──────────────────────────────────────────────
+
+    def start(self):
+        """Запустить поток захвата."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._grab_loop,
+            name="NeuroFocus-Camera-Grabber",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        """Остановить поток захвата (камеру не закрывает)."""
+        self._stop_event.set()
+        self._wake_event.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def set_rate_limit(self, fps: Optional[float]):
+        """Ограничить частоту чтения камеры (None — без ограничения)."""
+        self._min_interval = 1.0 / fps if fps else 0.0
+        self._wake_event.set()
+
+    @property
+    def rate_limit(self) -> Optional[float]:
+        return 1.0 / self._min_interval if self._min_interval else None
+
+    # ── Grabber thread ─────────────────────────────────────────
+
+    def _grab_loop(self):
+        errors = 0
+        last_read = 0.0
+        while not self._stop_event.is_set():
+            # Программное ограничение частоты (режим простоя)
+            if self._min_interval:
+                remaining = last_read + self._min_interval - time.monotonic()
+                if remaining > 0:
+                    self._wake_event.wait(remaining)
+                    self._wake_event.clear()
+                    continue
+
+            if self._lossless and not self._wait_consumed():
+                break
+
+            last_read = time.monotonic()
+            try:
+                ret, frame = self._capture.read()
+            except Exception as e:
+                logger.error(f"FrameGrabber: ошибка чтения камеры: {e}")
+                ret, frame = False, None
+
+            if not ret or frame is None:
+                if getattr(self._capture, 'exhausted', False):
+                    logger.info("FrameGrabber: источник закончился")
+                    self.finished = True
+                    break
+                errors += 1
+                if errors >= self._max_errors:
+                    logger.error("FrameGrabber: слишком много ошибок чтения камеры")
+                    self.failed = True
+                    break
+                time.sleep(0.01)
+                continue
+            errors = 0
+
+            now = time.monotonic()
+            with self._cond:
+                if (self._latest is not None
+                        and self._latest.frame_id > self._last_consumed_id):
+                    # Предыдущий кадр так никто и не забрал
+                    self._dropped += 1
+                self._latest = GrabbedFrame(
+                    self._next_id, now, frame,
+                    getattr(self._capture, 'timestamp', None),
+                )
+                self._next_id += 1
+                self._captured += 1
+                self._update_fps(now)
+                self._cond.notify_all()
+
+        with self._cond:
+            self._cond.notify_all()
+
+    def _wait_consumed(self) -> bool:
+        """lossless: дождаться, пока потребитель заберёт предыдущий кадр."""
+        with self._cond:
+            while (self._latest is not None
+                   and self._latest.frame_id > self._last_consumed_id):
+                if self._stop_event.is_set():
+                    return False
+                self._cond.wait(0.5)
+        return not self._stop_event.is_set()
+
+    def _update_fps(self, now: float):
+        self._fps_window_count += 1
+        elapsed = now - self._fps_window_start
+        if elapsed >= 1.0:
+            self._capture_fps = self._fps_window_count / elapsed
+            self._fps_window_start = now
+            self._fps_window_count = 0
+
+    # ── Consumer API ───────────────────────────────────────────
+
+    def read(self, timeout: float = 1.0) -> Optional[GrabbedFrame]:
+        """
+        Забрать самый свежий ещё не прочитанный кадр.
+
+        Returns None по таймауту или если граббер остановлен.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while (self._latest is None
+                   or self._latest.frame_id <= self._last_consumed_id):
+                if self._stop_event.is_set() or self.failed or self.finished:
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+            item = self._latest
+            self._last_consumed_id = item.frame_id
+            self._delivered += 1
+            self._cond.notify_all()     # lossless-граббер ждёт этого
+            latency = time.monotonic() - item.timestamp
+            self._last_latency = latency
+            if latency > self._max_frame_age:
+                self._stale += 1
+            return item
+
+    def get_stats(self) -> dict:
+        """Счётчики захвата для UI / диагностики."""
+        with self._cond:
+            return {
+                'captured_frames': self._captured,
+                'delivered_frames': self._delivered,
+                'dropped_frames': self._dropped,
+                'stale_frames': self._stale,
+                'frame_latency_ms': round(self._last_latency * 1000.0, 1),
+                'capture_fps': round(self._capture_fps, 1),
+            }
@@ -0,0 +1,282 @@
+"""
+Staged frame-processing pipeline for the video loop.
+
+Each stage runs on its own daemon worker thread and is connected to the
+next one by a bounded queue with drop-oldest semantics, so a slow stage
+never makes the stages before it block — it simply sees fewer, fresher
+frames.  While stage N renders frame k, stage N-1 can already run
+inference on frame k+1.
+
+    pipeline = FramePipeline()
+    pipeline.add_stage("inference", run_face_mesh)
+    pipeline.add_stage("analytics", run_analytics)
+    pipeline.add_stage("render", emit_to_ui)
+    pipeline.start()
+    pipeline.submit(packet)          # never blocks
+    ...
+    pipeline.stop()
+
+A stage function receives a packet and returns it (to pass it on) or
+None (to drop it).  Every stage reports throughput, processing time,
+queue depth and drops via ``get_stats()``.
+
+``on_retire`` is called exactly once for every packet that leaves the
+pipeline — processed by the last stage, dropped from a full queue,
+filtered out or failed — so pooled frame buffers can be returned.
+
+``FramePipeline(lossless=True)`` makes full queues block the producer
+instead of dropping (replaying a file as fast as possible, where every
+frame must be processed); ``drain()`` waits until all submitted packets
+have left the pipeline.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, List, Optional
+
+from src.logger import logger
+
+
+class FramePacket:
+    """Данные одного кадра, передаваемые между стадиями."""
+
+    __slots__ = (
+        'frame_id', 'timestamp', 'frame', 'bundle', 'image', 'results',
+        'face_data', 'is_face_valid', 'data', 'idle', 'preview', 'media_time',
+        'hand_landmarks',
+    )
+
+    def __init__(self, frame_id: int, timestamp: float, frame, bundle=None,
+                 media_time=None):
+        self.frame_id = frame_id
+        self.timestamp = timestamp      # time.monotonic() захвата
+        self.media_time = media_time    # время кадра в источнике (детерминировано для файлов)
+        self.frame = frame              # чистый (отзеркаленный) BGR кадр
+        self.bundle = bundle            # FrameBundle (rgb/gray/canvas), если есть
+        self.image = frame              # кадр с оверлеями для UI
+        self.results = None
+        self.face_data = None
+        self.is_face_valid = False
+        self.data = None
+        self.idle = False               # кадр режима простоя (без анализа)
+        self.preview = False            # кадр пойдёт в превью (рисуем оверлеи)
+        self.hand_landmarks = None      # рука для оверлея превью
+
+
+class DropOldestQueue:
+    """
+    Bounded FIFO: при переполнении выбрасывается самый старый элемент
+    (block=True — put() ждёт свободного места).
+    """
+
+    def __init__(self, maxsize: int = 2, on_drop: Optional[Callable] = None,
+                 block: bool = False):
+        self._items = deque()
+        self._maxsize = max(1, maxsize)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._on_drop = on_drop
+        self._block = block
+        self.dropped = 0
+
+    def put(self, item):
+        evicted = None
+        with self._cond:
+            if self._block:
+                while len(self._items) >= self._maxsize and not self._closed:
+                    self._cond.wait(0.5)
+            if self._closed:
+                evicted = item
+            else:
+                if len(self._items) >= self._maxsize:
+                    evicted = self._items.popleft()
+                    self.dropped += 1
+                self._items.append(item)
+                self._cond.notify_all()
+        if evicted is not None and self._on_drop is not None:
+            self._on_drop(evicted)
+
+    def get(self, timeout: float = 0.5):
+        """Return the oldest item, or None on timeout / after close()."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while not self._items:
+                if self._closed:
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            item = self._items.popleft()
+            if self._block:
+                self._cond.notify_all()
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            leftover = list(self._items)
+            self._items.clear()
+            self._cond.notify_all()
+        if self._on_drop is not None:
+            for item in leftover:
+                self._on_drop(item)
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+
+class PipelineStage:
+    """Одна стадия конвейера: входная очередь + рабочий поток."""
+
+    def __init__(self, name: str, fn: Callable, queue_size: int = 2,
+                 on_retire: Optional[Callable] = None, lossless: bool = False):
+        self.name = name
+        self._fn = fn
+        self._on_retire = on_retire
+        self.in_queue = DropOldestQueue(queue_size, on_drop=self._retire, block=lossless)
+        self.next_stage: Optional['PipelineStage'] = None
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+        # ── Статистика ──────────────────────────────────────
+        self._lock = threading.Lock()
+        self._processed = 0
+        self._errors = 0
+        self._avg_ms = 0.0
+        self._fps = 0.0
+        self._window_start = time.monotonic()
+        self._window_count = 0
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._worker_loop,
+            name=f"NeuroFocus-Stage-{self.name}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop_event.set()
+        self.in_queue.close()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _worker_loop(self):
+        while not self._stop_event.is_set():
+            packet = self.in_queue.get(timeout=0.5)
+            if packet is None:
+                continue
+
+            t0 = time.perf_counter()
+            try:
+                out = self._fn(packet)
+            except Exception as e:
+                logger.error(f"Pipeline stage '{self.name}': {e}")
+                with self._lock:
+                    self._errors += 1
+                self._retire(packet)
+                continue
+            self._record(time.perf_counter() - t0)
+
+            if out is None:
+                self._retire(packet)
+            elif self.next_stage is not None:
+                self.next_stage.in_queue.put(out)
+            else:
+                self._retire(out)
+
+    def _retire(self, packet):
+        if self._on_retire is None:
+            return
+        try:
+            self._on_retire(packet)
+        except Exception as e:
+            logger.error(f"Pipeline stage '{self.name}': on_retire: {e}")
+
+    def _record(self, elapsed: float):
+        with self._lock:
+            self._processed += 1
+            ms = elapsed * 1000.0
+            # EMA: быстро реагирует, но не скачет от единичных всплесков
+            self._avg_ms = ms if self._processed == 1 else 0.9 * self._avg_ms + 0.1 * ms
+            self._window_count += 1
+            now = time.monotonic()
+            span = now - self._window_start
+            if span >= 1.0:
+                self._fps = self._window_count / span
+                self._window_start = now
+                self._window_count = 0
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                'fps': round(self._fps, 1),
+                'avg_ms': round(self._avg_ms, 2),
+                'processed': self._processed,
+                'errors': self._errors,
+                'queue_depth': len(self.in_queue),
+                'dropped': self.in_queue.dropped,
+            }
+
+
+class FramePipeline:
+    """Цепочка стадий, соединённых очередями drop-oldest."""
+
+    def __init__(self, on_retire: Optional[Callable] = None, lossless: bool = False):
+        self._stages: List[PipelineStage] = []
+        self._on_retire = on_retire
+        self._lossless = lossless
+        self._in_flight = 0
+        self._flight_cond = threading.Condition()
+
+    def _retire(self, packet):
+        try:
+            if self._on_retire is not None:
+                self._on_retire(packet)
+        finally:
+            with self._flight_cond:
+                self._in_flight -= 1
+                self._flight_cond.notify_all()
+
+    def add_stage(self, name: str, fn: Callable, queue_size: int = 2) -> PipelineStage:
+        stage = PipelineStage(name, fn, queue_size, on_retire=self._retire,
+                              lossless=self._lossless)
+        if self._stages:
+            self._stages[-1].next_stage = stage
+        self._stages.append(stage)
+        return stage
+
+    def start(self):
+        for stage in self._stages:
+            stage.start()
+
+    def stop(self, timeout: float = 2.0):
+        for stage in self._stages:
+            stage.stop(timeout)
+
+    def submit(self, packet):
+        """Положить пакет в первую стадию (не блокирует, кроме режима lossless)."""
+        if self._stages:
+            with self._flight_cond:
+                self._in_flight += 1
+            self._stages[0].in_queue.put(packet)
+
+    def drain(self, timeout: float = 10.0) -> bool:
+        """Дождаться, пока все отправленные пакеты покинут конвейер."""
+        deadline = time.monotonic() + timeout
+        with self._flight_cond:
+            while self._in_flight > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._flight_cond.wait(remaining)
+        return True
+
+    def get_stats(self) -> dict:
+        return {stage.name: stage.get_stats() for stage in self._stages}
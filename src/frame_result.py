@@ -0,0 +1,224 @@
+"""
+Typed per-frame results passed through the pipeline and to the UI.
+
+Processors and the engine used to hand around string-keyed dicts, copied
+on every frame (``dict(self._last_data)``) and read back with
+``data.get("...")``.  These ``__slots__`` dataclasses replace them:
+
+    FaceResult      FaceProcessor.process       geometry of the face
+    HandResult      HandProcessor.process       hand, gesture, palm position
+    FatigueResult   FatigueProcessor / FatigueClassifier
+    PostureResult   PostureProcessor / posture ML branch of the engine
+    FrameResult     what the engine publishes for one frame (on_data / UI)
+
+A misspelled field is an ``AttributeError`` instead of a silent default.
+``FrameResult`` objects come from a ``FrameResultPool``: the consumer that
+is done with a published result calls ``result.release()`` and the next
+frame reuses it in place.  ``FatigueResult`` / ``PostureResult`` are not
+modified once attached to a ``FrameResult``, so frames without a heavy ML
+run share the last ones by reference instead of copying them.
+
+``to_dict()`` gives the flat dict of the previous format (result sinks,
+JSON).
+"""
+
+import threading
+from dataclasses import dataclass, field, fields
+from typing import Any, List, Optional
+
+
+def _as_dict(obj) -> dict:
+    return {name: getattr(obj, name) for name in obj.__slots__}
+
+
+@dataclass(slots=True)
+class FaceResult:
+    """Геометрия лица за кадр (FaceProcessor)."""
+
+    detected: bool = False
+    valid: bool = False                 # лицо в кадре и |yaw| в пределах порога
+    landmarks: Any = None               # LandmarkFrame
+    ear: float = 0.35
+    mar: float = 0.15
+    pitch: float = 0.0
+    yaw: float = 0.0
+    roll: float = 0.0
+    bbox: Optional[tuple] = None        # (min_x, min_y, max_x, max_y), нормализованные
+    blendshapes: Optional[dict] = None
+
+    def to_dict(self) -> dict:
+        return _as_dict(self)
+
+
+@dataclass(slots=True)
+class HandResult:
+    """Рука и жест за кадр (HandProcessor)."""
+
+    detected: bool = False
+    landmarks: Any = None
+    gesture: str = 'none'
+    current_gesture: Optional[str] = None
+    hand_size: Optional[float] = None
+    palm_x: Optional[float] = None      # нормализованная позиция (0..1) для калибровки зоны
+    palm_y: Optional[float] = None
+    predicted: bool = False             # landmarks экстраполированы (LandmarkPredictor)
+
+    def to_dict(self) -> dict:
+        return _as_dict(self)
+
+
+@dataclass(slots=True)
+class FatigueResult:
+    """Усталость: геометрия (FatigueProcessor) или ML (FatigueClassifier)."""
+
+    fatigue_status: str = 'Awake'
+    fatigue_score: float = 0
+    fatigue_level: str = 'normal'
+    event: Optional[str] = None
+    cooldown_active: bool = False
+    blink_rate: float = 0
+    yawning: bool = False
+    microsleep_detected: bool = False
+    model_used: str = 'geometric'
+    # Поля FatigueClassifier
+    status: str = 'unknown'             # awake / drowsy / sleeping
+    confidence: float = 0.0
+    ear: float = 0.35
+    mar: float = 0.0
+    trend: str = 'stable'
+    microsleep_count: float = 0
+    head_droop: float = 0.0
+    head_tilt: float = 0.0
+    raw_scores: Optional[list] = None
+    temporal_features: Optional[dict] = None
+
+    def to_dict(self) -> dict:
+        return _as_dict(self)
+
+
+@dataclass(slots=True)
+class PostureResult:
+    """Осанка: PostureProcessor или ML-ветка движка."""
+
+    posture_status: str = 'Good'
+    posture_score: int = 0
+    posture_level: str = 'good'
+    posture_alert: bool = False
+    posture_alert_level: Optional[str] = None   # 'bad' / 'fair' / None
+    pitch_alert: bool = False
+    is_bad: bool = False
+    head_tilt: float = 0
+    head_forward: float = 0
+    event: Optional[str] = None
+    model_used_posture: str = 'geometric'
+
+    def to_dict(self) -> dict:
+        return _as_dict(self)
+
+
+# Общие «пустые» результаты для кадров до первого ML-прогона (не изменяются)
+EMPTY_FATIGUE = FatigueResult()
+EMPTY_POSTURE = PostureResult()
+
+
+@dataclass(slots=True)
+class FrameResult:
+    """Данные одного кадра для UI и sink'ов."""
+
+    frame_id: Optional[int] = None
+    media_time: Optional[float] = None
+    ear: float = 0.35
+    mar: float = 0.0
+    pitch: float = 0.0
+    emotion: str = '...'
+    event: Optional[str] = None
+    face_detected: bool = False
+    hand_detected: bool = False
+    current_gesture: Optional[str] = None
+    ml_warmup_progress: int = 0
+    analysis_paused: bool = False
+    calibration_info: Optional[dict] = None
+    fatigue: Optional[FatigueResult] = None     # None → EMPTY_FATIGUE
+    posture: Optional[PostureResult] = None     # None → EMPTY_POSTURE
+    stats: Optional[dict] = None                # счётчики захвата / конвейера / governor …
+    _pool: Optional['FrameResultPool'] = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.fatigue is None:
+            self.fatigue = EMPTY_FATIGUE
+        if self.posture is None:
+            self.posture = EMPTY_POSTURE
+
+    def reset(self):
+        for name, value in _FRAME_DEFAULTS:
+            setattr(self, name, value)
+        self.fatigue = EMPTY_FATIGUE
+        self.posture = EMPTY_POSTURE
+
+    def copy_from(self, other: 'FrameResult'):
+        """Скопировать данные (fatigue / posture — по ссылке, без stats)."""
+        for name in _FRAME_DATA:
+            setattr(self, name, getattr(other, name))
+        self.stats = None
+
+    def release(self):
+        """Вернуть в пул (вызывает последний потребитель результата)."""
+        pool = self._pool
+        if pool is not None:
+            pool.release(self)
+
+    def to_dict(self) -> dict:
+        """Плоский dict прежнего формата (ключи fatigue / posture на верхнем уровне)."""
+        data = _as_dict(self.fatigue)
+        data.update(_as_dict(self.posture))
+        for name in _FRAME_SCALARS:
+            data[name] = getattr(self, name)
+        if self.stats:
+            data.update(self.stats)
+        return data
+
+
+_FRAME_DEFAULTS = tuple(
+    (f.name, f.default) for f in fields(FrameResult)
+    if f.name not in ('fatigue', 'posture', '_pool')
+)
+_FRAME_DATA = tuple(f.name for f in fields(FrameResult) if f.name not in ('stats', '_pool'))
+_FRAME_SCALARS = tuple(
+    name for name in _FRAME_DATA if name not in ('fatigue', 'posture')
+)
+
+
+class FrameResultPool:
+    """Потокобезопасный пул FrameResult (как FrameBundlePool для кадров)."""
+
+    def __init__(self, max_size: int = 8):
+        self._max_size = max_size
+        self._free: List[FrameResult] = []
+        self._lock = threading.Lock()
+        self.allocated = 0
+
+    def acquire(self) -> FrameResult:
+        """FrameResult со значениями по умолчанию."""
+        with self._lock:
+            result = self._free.pop() if self._free else None
+            if result is None:
+                self.allocated += 1
+        if result is None:
+            result = FrameResult()
+        result._pool = self
+        return result
+
+    def release(self, result: Optional[FrameResult]):
+        if result is None or result._pool is not self:
+            return
+        # Повторный release() того же объекта ничего не делает
+        result._pool = None
+        result.reset()
+        with self._lock:
+            if len(self._free) < self._max_size:
+                self._free.append(result)
+
+    @property
+    def free_count(self) -> int:
+        with self._lock:
+            return len(self._free)
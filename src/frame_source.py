@@ -0,0 +1,293 @@
+"""
+Pluggable frame sources for the engine.
+
+Every source exposes the subset of the ``cv2.VideoCapture`` API the
+pipeline needs (``read()``, ``isOpened()``, ``release()``), so
+``FrameGrabber`` works with any of them:
+
+    CameraSource(index, backend="auto")      live webcam (DSHOW / MSMF / V4L2 / AVFoundation)
+    VideoFileSource("session.mp4")           recorded video (.mp4 / .avi / …)
+    ImageDirSource("frames/", fps=30)        directory of images, sorted by name
+
+    source = open_source("session.mp4", realtime=False)
+    source.open()
+    ok, frame = source.read()
+    source.timestamp                         # media time of that frame, seconds
+
+File sources have deterministic timestamps (``frame_index / fps``) and two
+modes: ``realtime=True`` paces reads at the recorded FPS, like a camera;
+``realtime=False`` returns frames as fast as they can be consumed, for
+benchmarks.  At the end of a file ``exhausted`` becomes True (or the
+source restarts if ``loop=True``).
+"""
+
+import glob
+import os
+import sys
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from src.logger import logger
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+_BACKENDS = {
+    'any': cv2.CAP_ANY,
+    'dshow': cv2.CAP_DSHOW,
+    'msmf': cv2.CAP_MSMF,
+    'v4l2': cv2.CAP_V4L2,
+    'avfoundation': cv2.CAP_AVFOUNDATION,
+}
+
+
+def default_backend() -> str:
+    """Бэкенд камеры по умолчанию для текущей ОС."""
+    if sys.platform == 'win32':
+        return 'dshow'
+    if sys.platform.startswith('linux'):
+        return 'v4l2'
+    if sys.platform == 'darwin':
+        return 'avfoundation'
+    return 'any'
+
+
+class FrameSource(ABC):
+    """Базовый источник кадров: read() как у cv2.VideoCapture + таймстамп кадра."""
+
+    is_live = False
+
+    def __init__(self, fps: float = 30.0, realtime: bool = True, loop: bool = False,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.fps = fps
+        self.realtime = realtime
+        self.loop = loop
+        self.width = 0
+        self.height = 0
+        self.frame_index = -1           # индекс последнего отданного кадра
+        self.timestamp = 0.0            # медиа-время последнего кадра, сек
+        self.exhausted = False
+        self._clock = clock
+        self._sleep = sleep
+        self._start: Optional[float] = None
+
+    # ── cv2.VideoCapture-compatible API ────────────────────────
+
+    @abstractmethod
+    def open(self) -> bool:
+        ...
+
+    @abstractmethod
+    def isOpened(self) -> bool:
+        ...
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if self.exhausted:
+            return False, None
+        ok, frame = self._read_next()
+        if not ok and self.loop and self.frame_index >= 0:
+            self._rewind()
+            ok, frame = self._read_next()
+        if not ok:
+            if not self.is_live:
+                self.exhausted = True
+            return False, None
+        self.frame_index += 1
+        self.timestamp = self._frame_time()
+        if self.realtime and not self.is_live:
+            self._pace()
+        return True, frame
+
+    def release(self):
+        pass
+
+    # ── Hooks ──────────────────────────────────────────────────
+
+    @abstractmethod
+    def _read_next(self) -> Tuple[bool, Optional[np.ndarray]]:
+        ...
+
+    @abstractmethod
+    def _rewind(self):
+        ...
+
+    def _frame_time(self) -> float:
+        return self.frame_index / self.fps if self.fps else 0.0
+
+    def _pace(self):
+        """Отдавать кадры с записанной частотой (по расписанию от первого кадра)."""
+        now = self._clock()
+        if self._start is None:
+            self._start = now - self.timestamp
+        delay = self._start + self.timestamp - now
+        if delay > 0:
+            self._sleep(delay)
+
+    def describe(self) -> str:
+        return f"{type(self).__name__} {self.width}x{self.height} @ {self.fps:.0f} FPS"
+
+
+class CameraSource(FrameSource):
+    """Живая камера через cv2.VideoCapture с выбором бэкенда."""
+
+    is_live = True
+
+    def __init__(self, index: int = 0, width: int = 1280, height: int = 720,
+                 fps: float = 30.0, backend: str = 'auto', **kwargs):
+        super().__init__(fps=fps, realtime=True, **kwargs)
+        self.index = index
+        self.backend = default_backend() if backend in (None, 'auto') else backend
+        self._req_size = (width, height)
+        self._cap = None
+
+    def open(self) -> bool:
+        api = _BACKENDS.get(self.backend, cv2.CAP_ANY)
+        self._cap = cv2.VideoCapture(self.index, api)
+        if not self._cap.isOpened():
+            return False
+        self._cap.set(cv2.CAP_PROP_FRAME_WIDTH, self._req_size[0])
+        self._cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self._req_size[1])
+        self._cap.set(cv2.CAP_PROP_FPS, self.fps)
+        self._cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)   # всегда берём самый свежий кадр
+        self.width = int(self._cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self._cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.fps = self._cap.get(cv2.CAP_PROP_FPS) or self.fps
+        self._start = self._clock()
+        return True
+
+    def isOpened(self) -> bool:
+        return self._cap is not None and self._cap.isOpened()
+
+    def _read_next(self):
+        return self._cap.read()
+
+    def _frame_time(self) -> float:
+        # У живой камеры медиа-время — время с момента открытия
+        return self._clock() - self._start
+
+    def _rewind(self):
+        pass
+
+    def release(self):
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+    def describe(self) -> str:
+        return f"camera {self.index} ({self.backend}) {self.width}x{self.height} @ {self.fps:.0f} FPS"
+
+
+class VideoFileSource(FrameSource):
+    """Видео-файл; FPS берётся из контейнера (или fps, если его там нет)."""
+
+    def __init__(self, path: str, fps: Optional[float] = None, **kwargs):
+        super().__init__(fps=fps or 30.0, **kwargs)
+        self.path = path
+        self._fps_override = fps
+        self._cap = None
+
+    def open(self) -> bool:
+        self._cap = cv2.VideoCapture(self.path)
+        if not self._cap.isOpened():
+            return False
+        if not self._fps_override:
+            self.fps = self._cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.width = int(self._cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self._cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        return True
+
+    def isOpened(self) -> bool:
+        return self._cap is not None and self._cap.isOpened()
+
+    def _read_next(self):
+        return self._cap.read()
+
+    def _rewind(self):
+        self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def _frame_time(self) -> float:
+        # Таймстамп по номеру кадра, а не CAP_PROP_POS_MSEC: одинаков
+        # на всех бэкендах и при повторных прогонах
+        return self.frame_index / self.fps
+
+    def release(self):
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+    def describe(self) -> str:
+        return f"video {self.path} {self.width}x{self.height} @ {self.fps:.0f} FPS"
+
+
+class ImageDirSource(FrameSource):
+    """Каталог изображений, отсортированных по имени файла."""
+
+    def __init__(self, path: str, fps: float = 30.0, **kwargs):
+        super().__init__(fps=fps, **kwargs)
+        self.path = path
+        self._files: List[str] = []
+        self._pos = 0
+
+    def open(self) -> bool:
+        self._files = sorted(
+            f for f in glob.glob(os.path.join(self.path, '*'))
+            if f.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self._pos = 0
+        if not self._files:
+            return False
+        first = cv2.imread(self._files[0])
+        if first is None:
+            return False
+        self.height, self.width = first.shape[:2]
+        return True
+
+    def isOpened(self) -> bool:
+        return bool(self._files)
+
+    def _read_next(self):
+        while self._pos < len(self._files):
+            path = self._files[self._pos]
+            self._pos += 1
+            frame = cv2.imread(path)
+            if frame is not None:
+                return True, frame
+            logger.warning(f"ImageDirSource: не удалось прочитать {path}")
+        return False, None
+
+    def _rewind(self):
+        self._pos = 0
+
+    def describe(self) -> str:
+        return f"images {self.path} ({len(self._files)} files) {self.width}x{self.height} @ {self.fps:.0f} FPS"
+
+
+def open_source(spec=None, camera_cfg: Optional[dict] = None,
+                realtime: bool = True, loop: bool = False) -> FrameSource:
+    """
+    Источник по описанию: FrameSource, индекс камеры, путь к видео или каталогу.
+
+    None — камера из секции camera конфига.  Источник ещё не открыт.
+    """
+    if isinstance(spec, FrameSource):
+        return spec
+    cam_cfg = camera_cfg or {}
+    if spec is None:
+        spec = cam_cfg.get('index', 0)
+    if isinstance(spec, str) and spec.isdigit():
+        spec = int(spec)
+    if isinstance(spec, int):
+        return CameraSource(
+            spec,
+            width=cam_cfg.get('width', 1280),
+            height=cam_cfg.get('height', 720),
+            fps=cam_cfg.get('fps', 30),
+            backend=cam_cfg.get('backend', 'auto'),
+        )
+    if os.path.isdir(spec):
+        return ImageDirSource(spec, fps=cam_cfg.get('fps', 30), realtime=realtime, loop=loop)
+    return VideoFileSource(spec, realtime=realtime, loop=loop)
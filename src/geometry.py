@@ -10,6 +10,174 @@ RIGHT_EYE_IDXS = [362, 263, 385, 380, 387, 373]
 # [левый уголок, правый уголок, верхняя губа, нижняя губа]
 MOUTH_IDXS = [61, 291, 13, 14]
 
+# Точки для метрик осанки (как в PostureAnalyzer)
+NOSE_IDX = 1
+FOREHEAD_IDX = 10
+CHIN_IDX = 152
+LEFT_EAR_IDX = 234      # левая скула/ухо
+RIGHT_EAR_IDX = 454
+LEFT_EYE_OUTER_IDX = 33
+RIGHT_EYE_OUTER_IDX = 263
+
+_EYE_IDXS = np.array([LEFT_EYE_IDXS, RIGHT_EYE_IDXS])
+_MOUTH_IDXS = np.array(MOUTH_IDXS)
+
+# Признаки осанки по face mesh — то же пространство признаков, что и у
+# синтетических данных neurofocus/ml/posture_data_generator.py
+FACE_MESH_POSTURE_FEATURES = (
+    'head_tilt', 'head_forward', 'face_position', 'shoulder_angle',
+    'shoulder_diff', 'head_height', 'ear_mean',
+)
+
+
+def as_points(landmarks) -> np.ndarray:
+    """
+    Landmarks в любом формате → массив (N, 3) float32.
+
+    LandmarkFrame и ndarray возвращаются без копирования; MediaPipe
+    NormalizedLandmarkList и списки точек (объекты с .x/.y, словари
+    {'x', 'y'[, 'z']}, пары / тройки координат) конвертируются одним
+    проходом.  Пустой вход → массив (0, 3).
+    """
+    points = getattr(landmarks, 'points', None)
+    if isinstance(points, np.ndarray):
+        return points
+    if isinstance(landmarks, np.ndarray):
+        return landmarks
+    seq = getattr(landmarks, 'landmark', landmarks)
+    return np.array([_point_xyz(p) for p in seq], dtype=np.float32).reshape(-1, 3)
+
+
+def _point_xyz(p):
+    if isinstance(p, dict):
+        return p['x'], p['y'], p.get('z', 0.0)
+    if hasattr(p, 'x'):
+        return p.x, p.y, getattr(p, 'z', 0.0)
+    return p[0], p[1], p[2] if len(p) > 2 else 0.0
+
+
+def bbox_from_points(points: np.ndarray):
+    """(min_x, min_y, max_x, max_y) в нормализованных координатах."""
+    xy = points[:, :2]
+    min_x, min_y = xy.min(axis=0).tolist()
+    max_x, max_y = xy.max(axis=0).tolist()
+    return min_x, min_y, max_x, max_y
+
+
+# ── Batch kernels: (T, N, 2|3) → (T,) ──────────────────────────
+#
+# Все метрики считаются за один проход NumPy по всей последовательности.
+# Покадровые функции ниже вызывают те же ядра с T=1, поэтому живой
+# анализ и офлайн-пересчёт записи дают бит-в-бит одинаковые значения.
+
+def _xy(points, idxs) -> np.ndarray:
+    """Выбранные точки (T, ..., 2) в float64."""
+    return np.asarray(points)[..., idxs, :2].astype(np.float64)
+
+
+def _dist(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    d = a - b
+    return np.hypot(d[..., 0], d[..., 1])
+
+
+def ear_batch(points) -> np.ndarray:
+    """EAR (среднее по двум глазам) для каждого кадра, (T,)."""
+    p = _xy(points, _EYE_IDXS)                      # (T, 2 глаза, 6 точек, 2)
+    vertical_1 = _dist(p[..., 2, :], p[..., 3, :])
+    vertical_2 = _dist(p[..., 4, :], p[..., 5, :])
+    horizontal = _dist(p[..., 0, :], p[..., 1, :])
+    ears = (vertical_1 + vertical_2) / (2.0 * horizontal + 1e-6)
+    return (ears[..., 0] + ears[..., 1]) / 2.0
+
+
+def mar_batch(points) -> np.ndarray:
+    """MAR для каждого кадра, (T,)."""
+    p = _xy(points, _MOUTH_IDXS)                    # (T, 4, 2)
+    vertical = _dist(p[..., 2, :], p[..., 3, :])
+    horizontal = _dist(p[..., 0, :], p[..., 1, :])
+    return vertical / (horizontal + 1e-6)
+
+
+def head_tilt_batch(points) -> np.ndarray:
+    """
+    Наклон головы вбок, градусы (±30): смещение центра глаз относительно
+    центра ушей в долях ширины головы. 0, если голова слишком узкая в кадре.
+    """
+    p = _xy(points, [LEFT_EAR_IDX, RIGHT_EAR_IDX, LEFT_EYE_OUTER_IDX, RIGHT_EYE_OUTER_IDX])
+    left_ear_x, right_ear_x = p[..., 0, 0], p[..., 1, 0]
+    eye_center_x = (p[..., 2, 0] + p[..., 3, 0]) / 2
+    ear_center_x = (left_ear_x + right_ear_x) / 2
+    dx = right_ear_x - left_ear_x
+    valid = dx >= 0.03
+    tilt_pct = (eye_center_x - ear_center_x) / np.where(valid, dx, 1.0)
+    return np.where(valid, np.clip(tilt_pct * 45, -30.0, 30.0), 0.0)
+
+
+def head_forward_batch(points) -> np.ndarray:
+    """
+    Наклон головы вперёд: смещение носа вниз от центра лица в долях высоты
+    лица (норма ~-0.05 → 0). 0, если лицо слишком маленькое.
+    """
+    p = _xy(points, [NOSE_IDX, FOREHEAD_IDX, CHIN_IDX])
+    nose_y, forehead_y, chin_y = p[..., 0, 1], p[..., 1, 1], p[..., 2, 1]
+    face_height = chin_y - forehead_y
+    valid = face_height >= 0.05
+    face_center_y = (forehead_y + chin_y) / 2
+    nose_offset = (nose_y - face_center_y) / np.where(valid, face_height, 1.0)
+    return np.where(valid, np.maximum(0.0, nose_offset + 0.05), 0.0)
+
+
+def face_position_batch(points) -> np.ndarray:
+    """Отклонение центра лица от (0.5, 0.4) кадра."""
+    p = _xy(points, [LEFT_EAR_IDX, RIGHT_EAR_IDX, NOSE_IDX, CHIN_IDX, FOREHEAD_IDX])
+    face_center_x = (p[..., 0, 0] + p[..., 1, 0]) / 2
+    face_center_y = (p[..., 2, 1] + p[..., 3, 1] + p[..., 4, 1]) / 3
+    return np.hypot(np.abs(face_center_x - 0.5), np.abs(face_center_y - 0.4))
+
+
+def face_mesh_posture_features(points) -> np.ndarray:
+    """
+    7 признаков осанки по face mesh для каждого кадра, (T, 7) float32.
+
+    Порядок — FACE_MESH_POSTURE_FEATURES; совпадает со спецификацией
+    posture_data_generator, так что реальные записи можно сравнивать
+    с синтетикой и использовать для обучения.
+    """
+    p = _xy(points, [LEFT_EAR_IDX, RIGHT_EAR_IDX, FOREHEAD_IDX, CHIN_IDX])
+    ear_dx = p[..., 1, 0] - p[..., 0, 0]
+    ear_dy = p[..., 1, 1] - p[..., 0, 1]
+    ear_width = np.hypot(ear_dx, ear_dy)
+    head_height = (p[..., 3, 1] - p[..., 2, 1]) / (ear_width + 1e-6)
+    return np.stack([
+        head_tilt_batch(points),
+        head_forward_batch(points),
+        face_position_batch(points),
+        np.arctan2(ear_dy, ear_dx + 1e-6),
+        np.abs(ear_dy),
+        head_height,
+        ear_batch(points),
+    ], axis=-1).astype(np.float32)
+
+
+# ── Per-frame wrappers (T=1) ───────────────────────────────────
+
+def ear_from_points(points: np.ndarray) -> float:
+    """EAR по массиву (N, 2|3)."""
+    return float(ear_batch(points[None])[0])
+
+
+def mar_from_points(points: np.ndarray) -> float:
+    """MAR по массиву (N, 2|3)."""
+    return float(mar_batch(points[None])[0])
+
+
+def posture_metrics_from_points(points: np.ndarray):
+    """(head_tilt, head_forward, face_position) одного кадра."""
+    batch = points[None]
+    return (float(head_tilt_batch(batch)[0]), float(head_forward_batch(batch)[0]),
+            float(face_position_batch(batch)[0]))
+
+
 def get_coords(landmarks, idx):
     """Возвращает (x, y) конкретной точки по индексу."""
     # landmarks[idx].x и .y - это относительные координаты (0.0 - 1.0)
@@ -24,46 +192,14 @@ def calculate_ear(landmarks):
     Считает EAR (Eye Aspect Ratio) для обоих глаз.
     Формула: (||p2-p6|| + ||p3-p5||) / (2 * ||p1-p4||)
     Где числитель - вертикальные линии века, знаменатель - горизонтальная линия глаза.
+    Возвращает среднее по двум глазам.
     """
-    
-    def eye_aspect_ratio(indices):
-        # Собираем координаты всех нужных точек глаза
-        p1 = get_coords(landmarks, indices[0]) # Левый уголок
-        p4 = get_coords(landmarks, indices[1]) # Правый уголок
-        
-        p2 = get_coords(landmarks, indices[2]) # Верх 1
-        p6 = get_coords(landmarks, indices[3]) # Низ 1
-        
-        p3 = get_coords(landmarks, indices[4]) # Верх 2
-        p5 = get_coords(landmarks, indices[5]) # Низ 2
-
-        # Считаем расстояния
-        vertical_1 = euclidean_distance(p2, p6)
-        vertical_2 = euclidean_distance(p3, p5)
-        horizontal = euclidean_distance(p1, p4)
-
-        # Вычисляем EAR
-        # Добавляем 1e-6 в знаменатель, чтобы избежать деления на ноль
-        ear = (vertical_1 + vertical_2) / (2.0 * horizontal + 1e-6)
-        return ear
-
-    left_ear = eye_aspect_ratio(LEFT_EYE_IDXS)
-    right_ear = eye_aspect_ratio(RIGHT_EYE_IDXS)
-
-    # Возвращаем среднее по двум глазам
-    return (left_ear + right_ear) / 2.0
+    return ear_from_points(as_points(landmarks))
+
 
 def calculate_mar(landmarks):
     """
     Считает MAR (Mouth Aspect Ratio) для детекции зевания.
     Формула: ||top_lip - bottom_lip|| / ||left_corner - right_corner||
     """
-    p_left = get_coords(landmarks, MOUTH_IDXS[0])
-    p_right = get_coords(landmarks, MOUTH_IDXS[1])
-    p_top = get_coords(landmarks, MOUTH_IDXS[2])
-    p_bottom = get_coords(landmarks, MOUTH_IDXS[3])
-
-    vertical = euclidean_distance(p_top, p_bottom)
-    horizontal = euclidean_distance(p_left, p_right)
-
-    return vertical / (horizontal + 1e-6)
\ No newline at end of file
+    return mar_from_points(as_points(landmarks))
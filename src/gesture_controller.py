@@ -161,6 +161,80 @@ class GestureController:
         self.hand_detected = True
         now = time.time()
 
+        new_x, new_y, final_x, final_y = self._cursor_target(hand_landmarks)
+
+        # ── 6. Определение жеста ───────────────────────────────────────────
+        raw_gesture = self._classify_gesture(fingers_up, hand_landmarks)
+        self._gesture_buf.append(raw_gesture)
+        confirmed = self._confirm_gesture()
+        self.current_gesture = confirmed
+
+        # ── 6b. Заморозка курсора при жестах клика ─────────────────────────
+        # При сжатии в кулак (или показе index+pinky) рука может дрогнуть
+        # или сместиться. Фиксируем позицию на последнем известном положении,
+        # чтобы не кликнуть в другом месте — даже до подтверждения жеста.
+        if raw_gesture in (self.GESTURE_LEFT_CLICK, self.GESTURE_RIGHT_CLICK):
+            new_x, new_y = self.prev_x, self.prev_y
+            final_x = int(self.prev_x)
+            final_y = int(self.prev_y)
+
+        # ── 7. Выполнение действия ─────────────────────────────────────────
+        if confirmed == self.GESTURE_CURSOR:
+            pyautogui.moveTo(final_x, final_y, _pause=False)
+            self.prev_x = new_x
+            self.prev_y = new_y
+
+        elif confirmed == self.GESTURE_LEFT_CLICK:
+            if now - self._last_click_time > self._click_cooldown:
+                pyautogui.click(button='left', _pause=False)
+                self._last_click_time = now
+
+        elif confirmed == self.GESTURE_RIGHT_CLICK:
+            if now - self._last_click_time > self._click_cooldown:
+                pyautogui.click(button='right', _pause=False)
+                self._last_click_time = now
+
+        elif confirmed == self.GESTURE_SCROLL_UP:
+            if now - self._last_scroll_time > self._scroll_cooldown:
+                pyautogui.scroll(20, _pause=False)
+                self._last_scroll_time = now
+            # Движение мыши тоже обновляем
+            self.prev_x = new_x
+            self.prev_y = new_y
+
+        elif confirmed == self.GESTURE_SCROLL_DOWN:
+            if now - self._last_scroll_time > self._scroll_cooldown:
+                pyautogui.scroll(-20, _pause=False)
+                self._last_scroll_time = now
+            self.prev_x = new_x
+            self.prev_y = new_y
+
+        else:
+            # none — просто обновляем позицию для плавного старта
+            self.prev_x = new_x
+            self.prev_y = new_y
+
+        return confirmed
+
+    def update_cursor(self, hand_landmarks) -> str:
+        """
+        Сдвинуть курсор по предсказанным landmarks (кадр без инференса руки).
+
+        Жест не переклассифицируется и не попадает в буфер подтверждения:
+        курсор двигается, только если уже подтверждён жест cursor.
+        """
+        if (not self.enabled or hand_landmarks is None
+                or self.current_gesture != self.GESTURE_CURSOR):
+            return self.current_gesture
+        new_x, new_y, final_x, final_y = self._cursor_target(hand_landmarks)
+        pyautogui.moveTo(final_x, final_y, _pause=False)
+        self.prev_x = new_x
+        self.prev_y = new_y
+        return self.current_gesture
+
+    # ── Внутренние методы ─────────────────────────────────────────────────────
+    def _cursor_target(self, hand_landmarks):
+        """Шаги 1–5: landmarks → сглаженная позиция курсора (new_x, new_y, final_x, final_y)."""
         # ── 1. Координаты из нормализованных landmarks ─────────────────────
         # Используем landmark[5] (index MCP) — стабильнее, чем кончик пальца.
         lm = hand_landmarks.landmark[5]
@@ -254,61 +328,8 @@ class GestureController:
         new_y = max(0, min(self.screen_height - 1, new_y))
         final_x = int(new_x)
         final_y = int(new_y)
+        return new_x, new_y, final_x, final_y
 
-        # ── 6. Определение жеста ───────────────────────────────────────────
-        raw_gesture = self._classify_gesture(fingers_up, hand_landmarks)
-        self._gesture_buf.append(raw_gesture)
-        confirmed = self._confirm_gesture()
-        self.current_gesture = confirmed
-
-        # ── 6b. Заморозка курсора при жестах клика ─────────────────────────
-        # При сжатии в кулак (или показе index+pinky) рука может дрогнуть
-        # или сместиться. Фиксируем позицию на последнем известном положении,
-        # чтобы не кликнуть в другом месте — даже до подтверждения жеста.
-        if raw_gesture in (self.GESTURE_LEFT_CLICK, self.GESTURE_RIGHT_CLICK):
-            new_x, new_y = self.prev_x, self.prev_y
-            final_x = int(self.prev_x)
-            final_y = int(self.prev_y)
-
-        # ── 7. Выполнение действия ─────────────────────────────────────────
-        if confirmed == self.GESTURE_CURSOR:
-            pyautogui.moveTo(final_x, final_y, _pause=False)
-            self.prev_x = new_x
-            self.prev_y = new_y
-
-        elif confirmed == self.GESTURE_LEFT_CLICK:
-            if now - self._last_click_time > self._click_cooldown:
-                pyautogui.click(button='left', _pause=False)
-                self._last_click_time = now
-
-        elif confirmed == self.GESTURE_RIGHT_CLICK:
-            if now - self._last_click_time > self._click_cooldown:
-                pyautogui.click(button='right', _pause=False)
-                self._last_click_time = now
-
-        elif confirmed == self.GESTURE_SCROLL_UP:
-            if now - self._last_scroll_time > self._scroll_cooldown:
-                pyautogui.scroll(20, _pause=False)
-                self._last_scroll_time = now
-            # Движение мыши тоже обновляем
-            self.prev_x = new_x
-            self.prev_y = new_y
-
-        elif confirmed == self.GESTURE_SCROLL_DOWN:
-            if now - self._last_scroll_time > self._scroll_cooldown:
-                pyautogui.scroll(-20, _pause=False)
-                self._last_scroll_time = now
-            self.prev_x = new_x
-            self.prev_y = new_y
-
-        else:
-            # none — просто обновляем позицию для плавного старта
-            self.prev_x = new_x
-            self.prev_y = new_y
-
-        return confirmed
-
-    # ── Внутренние методы ─────────────────────────────────────────────────────
     def _classify_gesture(self, fingers_up, hand_landmarks) -> str:
         """
         Классифицировать жест на основе подъёма пальцев.
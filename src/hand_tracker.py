@@ -3,6 +3,9 @@ import numpy as np
 import sys
 import os
 
+from src.landmark_overlay import LandmarkOverlay
+from src.roi_tracker import remap_landmarks
+
 # Для PyInstaller frozen-режима: добавляем _internal в DLL search path
 if getattr(sys, 'frozen', False):
     try:
@@ -53,8 +56,7 @@ class HandTracker:
                 min_detection_confidence=min_detection_confidence,
                 min_tracking_confidence=min_tracking_confidence,
             )
-            self.mp_draw = mp.solutions.drawing_utils
-            self.mp_draw_styles = mp.solutions.drawing_styles
+            self.overlay = LandmarkOverlay()
             self.initialized = True
         except Exception as e:
             print(f"HandTracker init error: {e}")
@@ -68,21 +70,19 @@ class HandTracker:
             return
         if self._last_results.multi_hand_landmarks:
             for hand_landmarks in self._last_results.multi_hand_landmarks:
-                self.mp_draw.draw_landmarks(
-                    frame,
-                    hand_landmarks,
-                    self.mp_hands.HAND_CONNECTIONS,
-                    self.mp_draw_styles.get_default_hand_landmarks_style(),
-                    self.mp_draw_styles.get_default_hand_connections_style()
-                )
+                self.overlay.draw(frame, hand=hand_landmarks)
 
-    def process_frame(self, frame, draw=True):
+    def process_frame(self, frame, draw=True, rgb=None, roi=None):
         """
         Обработать кадр и найти руки.
 
         Args:
-            frame: Кадр в формате BGR
+            frame: Кадр в формате BGR (на нём рисуются landmarks)
             draw: Рисовать ли landmarks
+            rgb: Готовый RGB чистого кадра (FrameBundle.rgb) — без повторной
+                конвертации и без оверлеев лица во входе модели
+            roi: Roi, из которого вырезан rgb — landmarks переводятся
+                обратно в координаты frame
 
         Returns:
             processed_frame: Обработанный кадр
@@ -91,21 +91,19 @@ class HandTracker:
         if not self.initialized:
             return frame, None
 
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        rgb_frame = rgb if rgb is not None else cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         results = self.hands.process(rgb_frame)
+        if roi is not None and results.multi_hand_landmarks:
+            h, w = frame.shape[:2]
+            for hand_landmarks in results.multi_hand_landmarks:
+                remap_landmarks(hand_landmarks.landmark, roi, w, h)
         # Кэшируем только когда рука реально обнаружена
         if results and results.multi_hand_landmarks:
             self._last_results = results
         
         if draw and results.multi_hand_landmarks:
             for hand_landmarks in results.multi_hand_landmarks:
-                self.mp_draw.draw_landmarks(
-                    frame,
-                    hand_landmarks,
-                    self.mp_hands.HAND_CONNECTIONS,
-                    self.mp_draw_styles.get_default_hand_landmarks_style(),
-                    self.mp_draw_styles.get_default_hand_connections_style()
-                )
+                self.overlay.draw(frame, hand=hand_landmarks)
         
         return frame, results
     
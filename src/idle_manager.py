@@ -0,0 +1,142 @@
+"""
+Idle / power-save mode for the video loop.
+
+NeuroFocus usually sits in the tray all day, and most of that time nobody
+is in front of the camera.  ``IdleController`` is a two-state machine:
+
+    ACTIVE ──(analysis paused, or face lost past the debounce)──▶ IDLE
+    IDLE   ──(not paused and the presence probe sees a face)───▶ ACTIVE
+
+While IDLE, the camera is read at ``idle_fps`` and each frame only gets
+a cheap ``PresenceProbe`` (Haar cascade on a small grayscale copy), so
+face mesh, hands, pose and the heavy ML are skipped entirely.  The frame
+on which the probe finds a face is already processed by the full path,
+so analysis resumes within a single frame.
+
+The controller does not touch the camera itself: state changes are
+reported through ``on_change(state)``.
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+from src.face_core import load_face_cascade
+from src.logger import logger
+
+
+class PresenceProbe:
+    """Дешёвая проверка «есть ли лицо в кадре» на уменьшенном кадре."""
+
+    def __init__(self, face_detector=None, width: int = 320):
+        self._width = width
+        self._cascade = load_face_cascade()
+        # Без каскада — face mesh на маленьком кадре (дороже, но работает)
+        self._face_detector = face_detector if self._cascade is None else None
+
+    @property
+    def available(self) -> bool:
+        return self._cascade is not None or self._face_detector is not None
+
+    def detect(self, bundle) -> bool:
+        try:
+            if self._cascade is not None:
+                faces = self._cascade.detectMultiScale(
+                    bundle.gray_at(self._width),
+                    scaleFactor=1.2, minNeighbors=4, minSize=(24, 24))
+                return len(faces) > 0
+            if self._face_detector is not None:
+                _, results = self._face_detector.process_frame(
+                    bundle.bgr, draw=False, bundle=bundle,
+                    inference_width=self._width,
+                )
+                return bool(results is not None and results.multi_face_landmarks)
+        except Exception as e:
+            logger.error(f"PresenceProbe: {e}")
+        # Проверить нельзя — считаем, что человек на месте
+        return True
+
+
+class IdleController:
+    """Переключение полного режима обработки и режима простоя."""
+
+    ACTIVE = 'active'
+    IDLE = 'idle'
+
+    def __init__(self, enabled: bool = True, idle_fps: float = 5.0,
+                 idle_on_face_absence: bool = True,
+                 on_change: Optional[Callable[[str], None]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.enabled = enabled
+        self.idle_fps = idle_fps
+        self.idle_on_face_absence = idle_on_face_absence
+        self._on_change = on_change
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self.state = self.ACTIVE
+        self.reason: Optional[str] = None
+        self._since = clock()
+        self.idle_seconds = 0.0
+        self.transitions = 0
+
+    @property
+    def is_idle(self) -> bool:
+        return self.state == self.IDLE
+
+    def update_active(self, face_present: bool, paused: bool):
+        """Вызывается на каждом кадре полного режима (после дебаунса лица)."""
+        if not self.enabled or self.is_idle:
+            return
+        if paused:
+            self._switch(self.IDLE, 'paused')
+        elif not face_present and self.idle_on_face_absence:
+            self._switch(self.IDLE, 'no_face')
+
+    def update_idle(self, face_present: bool, paused: bool) -> bool:
+        """
+        Вызывается на кадре режима простоя.
+
+        Returns True, если нужно вернуться к полной обработке этого кадра.
+        """
+        if not self.is_idle:
+            return True
+        if paused:
+            return False
+        if face_present or not self.idle_on_face_absence:
+            self._switch(self.ACTIVE, 'face' if face_present else 'resumed')
+            return True
+        return False
+
+    def wake(self, reason: str = 'manual'):
+        if self.is_idle:
+            self._switch(self.ACTIVE, reason)
+
+    def _switch(self, state: str, reason: str):
+        with self._lock:
+            if state == self.state:
+                return
+            now = self._clock()
+            if self.state == self.IDLE:
+                self.idle_seconds += now - self._since
+            self.state = state
+            self.reason = reason
+            self._since = now
+            self.transitions += 1
+        logger.info(f"IdleController: → {state} ({reason})")
+        if self._on_change is not None:
+            try:
+                self._on_change(state)
+            except Exception as e:
+                logger.error(f"IdleController: on_change: {e}")
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            idle_total = self.idle_seconds
+            if self.state == self.IDLE:
+                idle_total += self._clock() - self._since
+            return {
+                'idle': self.state == self.IDLE,
+                'idle_reason': self.reason if self.state == self.IDLE else None,
+                'idle_seconds': round(idle_total, 1),
+            }
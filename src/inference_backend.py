@@ -0,0 +1,466 @@
+"""
+Inference backends for the Keras models (fatigue LSTM, posture LSTM,
+emotion CNN).
+
+``model.predict(x, verbose=0)`` on a single sample costs milliseconds of
+Keras bookkeeping (data adapter, callbacks, tf.function dispatch) on top of
+the actual math, and needs full TensorFlow in the process.  Every model is
+now called through an ``InferenceBackend``:
+
+    backend.predict(x)   # (batch, ...) float32 → (batch, classes) np.ndarray
+
+    numpy    NumPy forward pass (``src/numpy_inference.py``) for models
+             made of LSTM / Dense / BatchNorm layers — no runtime at all
+    keras    ``model(x, training=False)`` — direct call, no predict() loop
+    tflite   TFLite interpreter (XNNPACK delegate, ``threads`` threads);
+             ``tflite_runtime`` / ``ai_edge_litert`` or ``tf.lite``
+    onnx     ONNX Runtime ``InferenceSession`` (``threads`` intra-op threads)
+
+``load_model_backend(path)`` picks the runtime from the ``inference``
+config section (``backend``: ``auto`` / ``numpy`` / ``tflite`` / ``onnx`` /
+``keras``).  At first use the ``.keras`` / ``.hdf5`` file is converted into
+``cache_dir`` (``fatigue_lstm.npz``, ``emotion_model.tflite``, …), and the
+converted model is compared with the Keras outputs on random inputs; a
+model that differs by more than ``parity_atol`` (1e-5 for NumPy) is not
+cached and the next runtime is tried.  Later starts load the cached file
+directly — TensorFlow is not imported at all when the model runs on NumPy
+or ``tflite_runtime`` / ``onnxruntime`` is installed.  Without TensorFlow
+the NumPy weights are read straight from the ``.keras`` archive.  The cache
+is rebuilt when the source model is newer.
+"""
+
+import importlib.util
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Optional, Sequence
+
+import numpy as np
+
+from src.logger import logger
+
+BACKEND_KERAS = 'keras'
+BACKEND_NUMPY = 'numpy'
+BACKEND_TFLITE = 'tflite'
+BACKEND_ONNX = 'onnx'
+BACKEND_AUTO = 'auto'
+
+# Порядок перебора для backend = auto: NumPy для маленьких LSTM / Dense
+# (микросекунды, без runtime), для CNN — TFLite / ONNX
+AUTO_ORDER = (BACKEND_NUMPY, BACKEND_TFLITE, BACKEND_ONNX, BACKEND_KERAS)
+
+DEFAULT_CACHE_DIR = os.path.join('data', 'model_cache')
+DEFAULT_PARITY_ATOL = 1e-4
+NUMPY_PARITY_ATOL = 1e-5
+PARITY_SAMPLES = 4
+
+_EXTENSIONS = {BACKEND_NUMPY: '.npz', BACKEND_TFLITE: '.tflite', BACKEND_ONNX: '.onnx'}
+
+
+def _tflite_interpreter_class():
+    """Interpreter без полного TensorFlow, если возможно."""
+    try:
+        from tflite_runtime.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    import tensorflow as tf
+    return tf.lite.Interpreter
+
+
+def _module_available(name: str) -> bool:
+    # find_spec не импортирует пакет (TensorFlow — секунды)
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def keras_available() -> bool:
+    return _module_available('tensorflow')
+
+
+def tflite_available() -> bool:
+    return any(_module_available(m) for m in ('tflite_runtime', 'ai_edge_litert', 'tensorflow'))
+
+
+def onnx_available() -> bool:
+    return _module_available('onnxruntime')
+
+
+# ── Backends ──────────────────────────────────────────────────────────
+
+class InferenceBackend(ABC):
+    """Общий интерфейс: predict() на батче, close() освобождает runtime."""
+
+    name = 'base'
+
+    # Keras-модель, из которой построен backend (None — загружен из кэша
+    # без TensorFlow).  Нужна только для дообучения.
+    keras_model = None
+
+    @abstractmethod
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        ...
+
+    def close(self):
+        pass
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name}>"
+
+
+class KerasBackend(InferenceBackend):
+    """Прямой вызов model(x, training=False) — без цикла Model.predict()."""
+
+    name = BACKEND_KERAS
+
+    def __init__(self, model):
+        self.keras_model = model
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        out = self.keras_model(np.asarray(x, dtype=np.float32), training=False)
+        return out.numpy() if hasattr(out, 'numpy') else np.asarray(out)
+
+
+class NumpyBackend(InferenceBackend):
+    """NumpyModel из .npz — без TensorFlow и runtime'ов."""
+
+    name = BACKEND_NUMPY
+
+    def __init__(self, model, keras_model=None):
+        self.model = model
+        self.keras_model = keras_model
+
+    @classmethod
+    def load(cls, model_path: str, keras_model=None) -> 'NumpyBackend':
+        from src.numpy_inference import NumpyModel
+        return cls(NumpyModel.load(model_path), keras_model)
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        return self.model.predict(x)
+
+
+class TFLiteBackend(InferenceBackend):
+    """
+    TFLite interpreter.  Модель сконвертирована с batch = 1 (LSTM
+    сворачивается в один fused-оператор).  Для батча больше единицы вход
+    переразмечается под batch (resize_tensor_input); если модель этого не
+    допускает — прогон по одному сэмплу.  Interpreter не потокобезопасен —
+    вызовы под lock.
+    """
+
+    name = BACKEND_TFLITE
+
+    def __init__(self, model_path: str, threads: int = 2, keras_model=None):
+        Interpreter = _tflite_interpreter_class()
+        # XNNPACK — делегат по умолчанию для float-моделей; num_threads
+        # задаёт его пул потоков
+        self._interpreter = Interpreter(model_path=model_path, num_threads=max(1, int(threads)))
+        self._interpreter.allocate_tensors()
+        inp = self._interpreter.get_input_details()[0]
+        self._input_index = inp['index']
+        self._input_shape = tuple(inp['shape'])
+        self._input_dtype = inp['dtype']
+        self._output_index = self._interpreter.get_output_details()[0]['index']
+        self._batch = self._input_shape[0]      # текущий размер батча тензоров
+        self._resizable = True
+        self._lock = threading.Lock()
+        self.model_path = model_path
+        self.keras_model = keras_model
+
+    def _invoke(self, x: np.ndarray) -> np.ndarray:
+        self._interpreter.set_tensor(self._input_index, x)
+        self._interpreter.invoke()
+        return self._interpreter.get_tensor(self._output_index)
+
+    def _resize(self, batch: int) -> bool:
+        if batch == self._batch:
+            return True
+        if not self._resizable:
+            return False
+        try:
+            self._interpreter.resize_tensor_input(
+                self._input_index, [batch] + list(self._input_shape[1:]), strict=False,
+            )
+            self._interpreter.allocate_tensors()
+            self._batch = batch
+            return True
+        except Exception as e:
+            logger.info(f"{os.path.basename(self.model_path)}: no batched TFLite ({e})")
+            self._resizable = False
+            self._interpreter.resize_tensor_input(self._input_index, list(self._input_shape))
+            self._interpreter.allocate_tensors()
+            self._batch = self._input_shape[0]
+            return False
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        x = np.ascontiguousarray(x, dtype=self._input_dtype)
+        with self._lock:
+            if self._resize(x.shape[0]):
+                return self._invoke(x)
+            return np.concatenate([self._invoke(x[i:i + 1]) for i in range(x.shape[0])])
+
+    def close(self):
+        self._interpreter = None
+
+
+class OnnxBackend(InferenceBackend):
+    """ONNX Runtime на CPU, intra-op потоки = threads."""
+
+    name = BACKEND_ONNX
+
+    def __init__(self, model_path: str, threads: int = 2, keras_model=None):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = max(1, int(threads))
+        options.inter_op_num_threads = 1
+        self._session = ort.InferenceSession(
+            model_path, sess_options=options, providers=['CPUExecutionProvider'],
+        )
+        self._input_name = self._session.get_inputs()[0].name
+        self.model_path = model_path
+        self.keras_model = keras_model
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        return self._session.run(None, {self._input_name: x})[0]
+
+    def close(self):
+        self._session = None
+
+
+def _open_converted(kind: str, path: str, threads: int, keras_model=None) -> InferenceBackend:
+    if kind == BACKEND_NUMPY:
+        return NumpyBackend.load(path, keras_model=keras_model)
+    if kind == BACKEND_TFLITE:
+        return TFLiteBackend(path, threads=threads, keras_model=keras_model)
+    if kind == BACKEND_ONNX:
+        return OnnxBackend(path, threads=threads, keras_model=keras_model)
+    raise ValueError(f"Unknown inference backend: {kind}")
+
+
+# ── Conversion ────────────────────────────────────────────────────────
+
+def _write_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def convert_to_tflite(keras_model, out_path: str):
+    """Keras → .tflite (batch = 1, только builtin-операторы)."""
+    import tensorflow as tf
+    input_shape = [1] + list(keras_model.input_shape[1:])
+    call = tf.function(lambda x: keras_model(x, training=False))
+    concrete = call.get_concrete_function(tf.TensorSpec(input_shape, tf.float32))
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([concrete], keras_model)
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS]
+    _write_atomic(out_path, converter.convert())
+
+
+def convert_to_onnx(keras_model, out_path: str):
+    """Keras → .onnx через tf2onnx (динамический batch)."""
+    import tensorflow as tf
+    import tf2onnx
+    spec = (tf.TensorSpec((None,) + tuple(keras_model.input_shape[1:]), tf.float32, name='input'),)
+    model_proto, _ = tf2onnx.convert.from_keras(keras_model, input_signature=spec, opset=13)
+    _write_atomic(out_path, model_proto.SerializeToString())
+
+
+def convert_to_numpy(keras_model, out_path: str):
+    """Keras → .npz (только LSTM / Dense / BatchNorm / Dropout)."""
+    from src.numpy_inference import export_keras_model
+    export_keras_model(keras_model, out_path)
+
+
+_CONVERTERS = {
+    BACKEND_NUMPY: convert_to_numpy,
+    BACKEND_TFLITE: convert_to_tflite,
+    BACKEND_ONNX: convert_to_onnx,
+}
+
+
+def cached_model_path(model_path: str, kind: str, cache_dir: str = DEFAULT_CACHE_DIR) -> str:
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    return os.path.join(cache_dir, stem + _EXTENSIONS[kind])
+
+
+def cache_is_fresh(cached_path: str, model_path: str) -> bool:
+    """Кэш есть и не старше исходной модели."""
+    if not os.path.exists(cached_path):
+        return False
+    if not os.path.exists(model_path):
+        return True
+    return os.path.getmtime(cached_path) >= os.path.getmtime(model_path)
+
+
+# ── Parity ────────────────────────────────────────────────────────────
+
+def parity_inputs(input_shape: Sequence, samples: int = PARITY_SAMPLES, seed: int = 0) -> np.ndarray:
+    """Случайные входы [0, 1) формы (samples, *input_shape[1:])."""
+    rng = np.random.default_rng(seed)
+    shape = (samples,) + tuple(int(d) for d in input_shape[1:])
+    return rng.random(shape, dtype=np.float32)
+
+
+def parity_error(backend: InferenceBackend, reference: InferenceBackend, inputs: np.ndarray) -> float:
+    """Максимальное абсолютное расхождение выходов двух backend'ов."""
+    expected = np.asarray(reference.predict(inputs), dtype=np.float32)
+    actual = np.asarray(backend.predict(inputs), dtype=np.float32)
+    if actual.shape != expected.shape:
+        return float('inf')
+    return float(np.max(np.abs(actual - expected)))
+
+
+def check_parity(backend: InferenceBackend, reference: InferenceBackend, input_shape: Sequence,
+                 atol: float = DEFAULT_PARITY_ATOL) -> bool:
+    error = parity_error(backend, reference, parity_inputs(input_shape))
+    if error > atol:
+        logger.warning(f"{backend.name}: max |Δ| = {error:.2e} vs Keras (> {atol:g}), using Keras")
+        return False
+    logger.info(f"{backend.name}: parity with Keras OK (max |Δ| = {error:.2e})")
+    return True
+
+
+# ── Factory ───────────────────────────────────────────────────────────
+
+def inference_config() -> dict:
+    try:
+        from src.config_manager import config_manager
+        return config_manager.inference
+    except Exception:
+        return {}
+
+
+def _load_keras(model_path: str):
+    import tensorflow as tf
+    return tf.keras.models.load_model(model_path, compile=False)
+
+
+def backend_from_keras(keras_model, model_path: str, kinds: Sequence[str], threads: int,
+                       cache_dir: str, parity_atol: float) -> InferenceBackend:
+    """
+    Сконвертировать уже загруженную Keras-модель (первый запуск или после
+    дообучения) в первый подходящий runtime из kinds, с проверкой паритета.
+    """
+    reference = KerasBackend(keras_model)
+    for kind in kinds:
+        if kind == BACKEND_KERAS:
+            break
+        cached = cached_model_path(model_path, kind, cache_dir)
+        try:
+            _CONVERTERS[kind](keras_model, cached)
+            backend = _open_converted(kind, cached, threads, keras_model)
+        except Exception as e:
+            logger.warning(f"{os.path.basename(model_path)}: {kind} conversion failed: {e}")
+            continue
+        atol = min(parity_atol, NUMPY_PARITY_ATOL) if kind == BACKEND_NUMPY else parity_atol
+        if check_parity(backend, reference, keras_model.input_shape, atol):
+            logger.info(f"{os.path.basename(model_path)} → {cached}")
+            return backend
+        backend.close()
+        try:
+            os.remove(cached)
+        except OSError:
+            pass
+    return reference
+
+
+def _resolve_kinds(backend: Optional[str]) -> tuple:
+    if backend in (None, BACKEND_AUTO):
+        return AUTO_ORDER
+    if backend not in (BACKEND_KERAS, BACKEND_NUMPY, BACKEND_TFLITE, BACKEND_ONNX):
+        logger.warning(f"Unknown inference backend '{backend}', using auto")
+        return AUTO_ORDER
+    if backend == BACKEND_KERAS:
+        return (BACKEND_KERAS,)
+    return (backend, BACKEND_KERAS)
+
+
+def load_model_backend(model_path: str, backend: Optional[str] = None, threads: Optional[int] = None,
+                       cache_dir: Optional[str] = None, parity_atol: Optional[float] = None,
+                       keras_model=None) -> Optional[InferenceBackend]:
+    """
+    Backend для Keras-модели model_path (None, если модель недоступна).
+
+    Параметры по умолчанию — из секции ``inference`` конфига.  Сначала
+    ищется свежий сконвертированный файл в cache_dir (без TensorFlow),
+    иначе модель загружается через Keras и конвертируется.  При
+    ``inference.batching`` backend обёрнут в ScheduledBackend
+    (src/inference_scheduler.py).
+    """
+    from src.inference_scheduler import scheduled
+    return scheduled(_load_model_backend(model_path, backend, threads, cache_dir,
+                                         parity_atol, keras_model))
+
+
+def _load_model_backend(model_path: str, backend: Optional[str], threads: Optional[int],
+                        cache_dir: Optional[str], parity_atol: Optional[float],
+                        keras_model) -> Optional[InferenceBackend]:
+    cfg = inference_config()
+    kinds = _resolve_kinds(backend or cfg.get('backend', BACKEND_AUTO))
+    threads = int(threads or cfg.get('threads', 2))
+    cache_dir = cache_dir or cfg.get('cache_dir', DEFAULT_CACHE_DIR)
+    atol = float(parity_atol if parity_atol is not None else cfg.get('parity_atol', DEFAULT_PARITY_ATOL))
+
+    available = {BACKEND_NUMPY: lambda: True, BACKEND_TFLITE: tflite_available,
+                 BACKEND_ONNX: onnx_available, BACKEND_KERAS: lambda: True}
+    kinds = tuple(k for k in kinds if available[k]())
+
+    if keras_model is None:
+        for kind in kinds:
+            if kind == BACKEND_KERAS:
+                break
+            cached = cached_model_path(model_path, kind, cache_dir)
+            if not cache_is_fresh(cached, model_path):
+                continue
+            try:
+                backend_obj = _open_converted(kind, cached, threads)
+                logger.info(f"{os.path.basename(model_path)}: {kind} backend ({cached})")
+                return backend_obj
+            except Exception as e:
+                logger.warning(f"Cached {cached} unusable: {e}")
+
+        if not os.path.exists(model_path):
+            return None
+        if BACKEND_NUMPY in kinds and not keras_available():
+            # Без TensorFlow: веса прямо из .keras-архива (h5py)
+            from src.numpy_inference import export_keras_file
+            cached = cached_model_path(model_path, BACKEND_NUMPY, cache_dir)
+            try:
+                model = export_keras_file(model_path, cached)
+                logger.info(f"{os.path.basename(model_path)} → {cached} (numpy, without TensorFlow)")
+                return NumpyBackend(model)
+            except Exception as e:
+                logger.info(f"{os.path.basename(model_path)}: no NumPy export ({e})")
+        try:
+            keras_model = _load_keras(model_path)
+        except Exception as e:
+            logger.warning(f"Failed to load {model_path}: {e}")
+            return None
+
+    return backend_from_keras(keras_model, model_path, kinds, threads, cache_dir, atol)
+
+
+def input_shape_of(backend: InferenceBackend) -> Optional[tuple]:
+    """Форма входа (с batch) — для подготовки данных (emotion target_size)."""
+    backend = getattr(backend, 'inner', backend)      # ScheduledBackend
+    if backend.keras_model is not None:
+        return tuple(backend.keras_model.input_shape)
+    if isinstance(backend, NumpyBackend):
+        return backend.model.input_shape
+    shape = getattr(backend, '_input_shape', None)
+    if shape is not None:
+        return tuple(shape)
+    session = getattr(backend, '_session', None)
+    if session is not None:
+        return tuple(session.get_inputs()[0].shape)
+    return None
@@ -0,0 +1,293 @@
+"""
+Micro-batching scheduler for model inference.
+
+On a heavy frame the emotion CNN, the fatigue CNN / LSTM and the posture
+Dense model each run a single-sample ``predict``, and every extra stream
+(or replay worker) repeats those calls.  Per call, most of the time goes
+to fixed costs (runtime dispatch, tensor setup, small GEMMs that leave the
+CPU idle), so eight samples in one call cost little more than one.
+``InferenceScheduler`` collects requests from all classifiers and streams
+and merges them into one batch per model:
+
+    future = scheduler.submit(backend, x)   # x: (n, ...) like backend.predict
+    probs = future.result()                 # (n, classes)
+
+A single worker thread takes requests from a bounded queue (``submit``
+blocks while it is full).  Requests for the same backend and input shape
+that arrive within ``latency_budget`` (3 ms by default) of the oldest
+waiting request, up to ``max_batch`` samples, run as one ``predict`` call.
+The results are split back to the callers' futures.  While only one
+thread submits, there is nothing to wait for, so queued requests run at
+once without spending the budget.
+
+``ScheduledBackend`` wraps an ``InferenceBackend`` so that classifiers keep
+calling ``predict`` unchanged.  ``load_model_backend`` applies it when
+``inference.batching`` is enabled in the config, and all models then share
+``default_scheduler()``.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.inference_backend import InferenceBackend, inference_config
+from src.logger import logger
+
+DEFAULT_LATENCY_BUDGET = 0.003      # с
+DEFAULT_MAX_BATCH = 16
+DEFAULT_QUEUE_SIZE = 64
+
+# Источники запросов, замеченные за это время, считаются «одновременными»
+_ACTIVE_WINDOW = 1.0
+
+_STOP = object()
+
+
+class _Request:
+    __slots__ = ('backend', 'x', 'future', 'submitted')
+
+    def __init__(self, backend, x, future, submitted):
+        self.backend = backend
+        self.x = x
+        self.future = future
+        self.submitted = submitted
+
+
+class InferenceScheduler:
+    """Очередь запросов + поток, склеивающий их в батчи по моделям."""
+
+    def __init__(self, latency_budget: float = DEFAULT_LATENCY_BUDGET,
+                 max_batch: int = DEFAULT_MAX_BATCH, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.latency_budget = max(0.0, float(latency_budget))
+        self.max_batch = max(1, int(max_batch))
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._submitters: Dict[int, float] = {}     # thread id → последний submit
+
+        # ── Статистика ──────────────────────────────────────
+        self._requests = 0
+        self._batches = 0
+        self._samples = 0
+        self._largest_batch = 0
+        self._wait_total = 0.0
+
+    # ── Lifecycle ──────────────────────────────────────────────
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("InferenceScheduler is closed")
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="NeuroFocus-Inference-Scheduler",
+                    daemon=True,
+                )
+                self._thread.start()
+
+    def close(self, timeout: float = 2.0):
+        """Дождаться уже поставленных запросов и остановить поток."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout=timeout)
+
+    # ── Public API ─────────────────────────────────────────────
+
+    def submit(self, backend: InferenceBackend, x: np.ndarray) -> Future:
+        """
+        Поставить x (batch, ...) для backend в очередь; Future вернёт
+        выход backend.predict(x).  Блокирует, пока очередь полна.
+        """
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        future: Future = Future()
+        self._ensure_worker()
+        now = time.monotonic()
+        with self._lock:
+            self._submitters[threading.get_ident()] = now
+            self._requests += 1
+        self._queue.put(_Request(backend, x, future, now))
+        return future
+
+    def predict(self, backend: InferenceBackend, x: np.ndarray) -> np.ndarray:
+        """Синхронный вариант submit()."""
+        return self.submit(backend, x).result()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            batches = max(self._batches, 1)
+            return {
+                'requests': self._requests,
+                'batches': self._batches,
+                'mean_batch': round(self._samples / batches, 2),
+                'max_batch': self._largest_batch,
+                'mean_wait_ms': round(self._wait_total / max(self._requests, 1) * 1000.0, 2),
+                'queued': self._queue.qsize(),
+            }
+
+    # ── Worker ─────────────────────────────────────────────────
+
+    def _concurrent(self) -> bool:
+        """Есть ли больше одного активного источника запросов."""
+        now = time.monotonic()
+        with self._lock:
+            stale = [k for k, t in self._submitters.items() if now - t > _ACTIVE_WINDOW]
+            for k in stale:
+                del self._submitters[k]
+            return len(self._submitters) > 1
+
+    def _run(self):
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            groups: Dict[tuple, List[_Request]] = {}
+            sizes: Dict[tuple, int] = {}
+            full = self._add(groups, sizes, first)
+
+            # Попутчиков ждём не дольше бюджета от самого старого запроса;
+            # с одним источником ждать некого.  Уже стоящие в очереди
+            # запросы забираются всегда — и после дедлайна (очередь
+            # под нагрузкой), иначе батчи вырождаются в единичные.
+            deadline = first.submitted + self.latency_budget if self._concurrent() else 0.0
+            while not full:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        request = self._queue.get(timeout=remaining)
+                    else:
+                        request = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is _STOP:
+                    stop = True
+                    break
+                full = self._add(groups, sizes, request)
+
+            for requests in groups.values():
+                self._execute(requests)
+
+        # Запросы, успевшие встать после close(), не остаются без ответа
+        leftovers: Dict[tuple, List[_Request]] = {}
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is not _STOP:
+                self._add(leftovers, {}, request)
+        for requests in leftovers.values():
+            self._execute(requests)
+
+    def _add(self, groups, sizes, request) -> bool:
+        """Добавить запрос в группу модели; True — группа набрала max_batch."""
+        key = (id(request.backend), request.x.shape[1:])
+        groups.setdefault(key, []).append(request)
+        sizes[key] = sizes.get(key, 0) + request.x.shape[0]
+        return sizes[key] >= self.max_batch
+
+    def _execute(self, requests: List[_Request]):
+        requests = [r for r in requests if r.future.set_running_or_notify_cancel()]
+        if not requests:
+            return
+        started = time.monotonic()
+        backend = requests[0].backend
+        try:
+            if len(requests) == 1:
+                outputs = [np.asarray(backend.predict(requests[0].x))]
+            else:
+                batch = np.concatenate([r.x for r in requests])
+                out = np.asarray(backend.predict(batch))
+                bounds = np.cumsum([r.x.shape[0] for r in requests])[:-1]
+                outputs = np.split(out, bounds)
+        except Exception as e:
+            logger.warning(f"InferenceScheduler: {backend.name} batch failed: {e}")
+            for r in requests:
+                r.future.set_exception(e)
+            return
+
+        samples = sum(r.x.shape[0] for r in requests)
+        with self._lock:
+            self._batches += 1
+            self._samples += samples
+            self._largest_batch = max(self._largest_batch, samples)
+            self._wait_total += sum(started - r.submitted for r in requests)
+        for r, out in zip(requests, outputs):
+            r.future.set_result(out)
+
+
+class ScheduledBackend(InferenceBackend):
+    """
+    Backend, чьи predict() идут через InferenceScheduler.  Атрибуты
+    исходного backend (model, keras_model) доступны как раньше — LSTMStream
+    по-прежнему видит NumPy-слои для пошагового режима.
+    """
+
+    def __init__(self, backend: InferenceBackend, scheduler: InferenceScheduler):
+        self.inner = backend
+        self.scheduler = scheduler
+        self.name = backend.name
+
+    @property
+    def keras_model(self):
+        return self.inner.keras_model
+
+    @keras_model.setter
+    def keras_model(self, model):
+        self.inner.keras_model = model
+
+    @property
+    def model(self):
+        return getattr(self.inner, 'model', None)
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        return self.scheduler.predict(self.inner, x)
+
+    def predict_async(self, x: np.ndarray) -> Future:
+        return self.scheduler.submit(self.inner, x)
+
+    def close(self):
+        self.inner.close()
+
+    def __repr__(self):
+        return f"<ScheduledBackend {self.inner!r}>"
+
+
+# ── Shared scheduler ──────────────────────────────────────────────────
+
+_default_scheduler: Optional[InferenceScheduler] = None
+_default_lock = threading.Lock()
+
+
+def default_scheduler() -> InferenceScheduler:
+    """Общий планировщик всех моделей процесса (параметры из ``inference``)."""
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            cfg = inference_config()
+            _default_scheduler = InferenceScheduler(
+                latency_budget=float(cfg.get('batch_latency_ms', DEFAULT_LATENCY_BUDGET * 1000.0)) / 1000.0,
+                max_batch=int(cfg.get('max_batch', DEFAULT_MAX_BATCH)),
+                queue_size=int(cfg.get('batch_queue_size', DEFAULT_QUEUE_SIZE)),
+            )
+        return _default_scheduler
+
+
+def scheduled(backend: Optional[InferenceBackend]) -> Optional[InferenceBackend]:
+    """Обернуть backend в ScheduledBackend, если включён inference.batching."""
+    if backend is None or isinstance(backend, ScheduledBackend):
+        return backend
+    if not inference_config().get('batching', False):
+        return backend
+    return ScheduledBackend(backend, default_scheduler())
@@ -0,0 +1,126 @@
+"""
+One NumPy-backed landmark set per frame, shared by all consumers.
+
+``FaceProcessor`` converts the MediaPipe face mesh once into a
+``LandmarkFrame``: a contiguous ``(N, 3)`` float32 array (normalized
+x, y, z) plus the frame size.  Derived values are computed lazily and
+cached on the object, so fatigue, posture, emotion and logging read the
+same bbox / EAR / MAR / head pose instead of recomputing them:
+
+    lf = LandmarkFrame.from_landmarks(results.multi_face_landmarks[0], w, h)
+    lf.bbox                  # (min_x, min_y, max_x, max_y)
+    lf.ear, lf.mar
+    lf.head_pose(estimator)  # (pitch, yaw, roll), one solvePnP per frame
+    lf.pixels([1, 152])      # selected points in pixels, (k, 2) float64
+
+For code that still expects MediaPipe objects, ``lf.landmark[i].x`` and
+iteration keep working (points are materialized on access).
+"""
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.geometry import as_points, bbox_from_points, ear_from_points, mar_from_points
+
+
+class _Point:
+    __slots__ = ('x', 'y', 'z')
+
+    def __init__(self, x, y, z):
+        self.x, self.y, self.z = x, y, z
+
+
+class LandmarkFrame:
+    """Массив landmarks кадра (N, 3) float32 с кэшем производных метрик."""
+
+    __slots__ = ('points', 'width', 'height', '_bbox', '_ear', '_mar', '_pose')
+
+    def __init__(self, points: np.ndarray, width: int = 0, height: int = 0):
+        self.points = points
+        self.width = width
+        self.height = height
+        self._bbox = None
+        self._ear = None
+        self._mar = None
+        self._pose = None
+
+    @classmethod
+    def from_landmarks(cls, landmarks, width: int = 0, height: int = 0) -> 'LandmarkFrame':
+        """MediaPipe landmarks / список точек / массив / LandmarkFrame → LandmarkFrame."""
+        if isinstance(landmarks, LandmarkFrame) and (width, height) == (landmarks.width, landmarks.height):
+            return landmarks
+        return cls(as_points(landmarks), width, height)
+
+    @classmethod
+    def from_results(cls, results, width: int = 0, height: int = 0) -> Optional['LandmarkFrame']:
+        """Первое лицо из results FaceMesh или None."""
+        faces = getattr(results, 'multi_face_landmarks', None)
+        if not faces:
+            return None
+        return cls.from_landmarks(faces[0], width, height)
+
+    # ── Cached metrics ─────────────────────────────────────────
+
+    @property
+    def bbox(self) -> Tuple[float, float, float, float]:
+        if self._bbox is None:
+            self._bbox = bbox_from_points(self.points)
+        return self._bbox
+
+    @property
+    def ear(self) -> float:
+        if self._ear is None:
+            self._ear = ear_from_points(self.points)
+        return self._ear
+
+    @property
+    def mar(self) -> float:
+        if self._mar is None:
+            self._mar = mar_from_points(self.points)
+        return self._mar
+
+    def head_pose(self, estimator, timestamp: Optional[float] = None,
+                  matrix: Optional[np.ndarray] = None) -> Tuple[float, float, float]:
+        """(pitch, yaw, roll) от HeadPoseEstimator, считается один раз на кадр.
+
+        matrix — facial transformation matrix FaceLandmarker: поза берётся
+        из неё, solvePnP не нужен.
+        """
+        if self._pose is None:
+            if matrix is not None:
+                self._pose = estimator.get_pose_from_matrix(matrix, timestamp)
+            else:
+                self._pose = estimator.get_pose_from_points(
+                    self.points, self.width, self.height, timestamp
+                )
+        return self._pose
+
+    def pixels(self, indices: Sequence[int]) -> np.ndarray:
+        """Выбранные точки в пикселях кадра, (k, 2) float64."""
+        return self.points[indices, :2] * np.array([self.width, self.height], dtype=np.float64)
+
+    # ── MediaPipe-compatible access ────────────────────────────
+
+    @property
+    def landmark(self) -> 'LandmarkFrame':
+        return self
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def __getitem__(self, idx: int) -> _Point:
+        return _Point(*self.points[idx].tolist())
+
+    def __iter__(self):
+        for x, y, z in self.points.tolist():
+            yield _Point(x, y, z)
+
+
+class FaceResults:
+    """Минимальная замена results FaceMesh (multi_face_landmarks) для FaceProcessor."""
+
+    __slots__ = ('multi_face_landmarks',)
+
+    def __init__(self, face: Optional[LandmarkFrame]):
+        self.multi_face_landmarks = [face] if face is not None else None
@@ -0,0 +1,198 @@
+"""
+Landmark overlays drawn with a handful of vectorized OpenCV calls.
+
+MediaPipe's ``drawing_utils.draw_landmarks`` walks every connection in
+Python (≈2,500 edges for the face tesselation, three passes per face, one
+more for the hand).  ``LandmarkOverlay`` keeps each connection set as a
+precomputed ``(E, 2)`` index array and draws a whole layer with a single
+``cv2.polylines`` call:
+
+    overlay = LandmarkOverlay('contours')
+    overlay.draw(preview_buf, face=landmark_frame, hand=hand_landmarks)
+
+Detail levels:
+
+    off         nothing is drawn
+    contours    face oval, eyes, brows, lips, irises + hand skeleton
+    mesh        full face tesselation under the contours (needs MediaPipe
+                for the tesselation table, otherwise same as contours)
+
+Landmarks are normalized (0..1), so the overlay is drawn straight onto the
+downscaled preview buffer at its own size; coordinates are passed to
+OpenCV in 1/16 px fixed point so the thin lines stay smooth when small.
+"""
+
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from src.geometry import as_points
+from src.logger import logger
+
+OVERLAY_OFF = 'off'
+OVERLAY_CONTOURS = 'contours'
+OVERLAY_MESH = 'mesh'
+OVERLAY_LEVELS = (OVERLAY_OFF, OVERLAY_CONTOURS, OVERLAY_MESH)
+
+# Субпиксельные координаты для cv2.polylines (shift=4 → 1/16 px)
+_SHIFT = 4
+_ONE = float(1 << _SHIFT)
+
+# ── Connection tables (MediaPipe FaceMesh / Hands indices) ─────
+
+FACE_OVAL = [
+    (10, 338), (338, 297), (297, 332), (332, 284), (284, 251), (251, 389),
+    (389, 356), (356, 454), (454, 323), (323, 361), (361, 288), (288, 397),
+    (397, 365), (365, 379), (379, 378), (378, 400), (400, 377), (377, 152),
+    (152, 148), (148, 176), (176, 149), (149, 150), (150, 136), (136, 172),
+    (172, 58), (58, 132), (132, 93), (93, 234), (234, 127), (127, 162),
+    (162, 21), (21, 54), (54, 103), (103, 67), (67, 109), (109, 10),
+]
+FACE_LIPS = [
+    (61, 146), (146, 91), (91, 181), (181, 84), (84, 17), (17, 314),
+    (314, 405), (405, 321), (321, 375), (375, 291), (61, 185), (185, 40),
+    (40, 39), (39, 37), (37, 0), (0, 267), (267, 269), (269, 270),
+    (270, 409), (409, 291), (78, 95), (95, 88), (88, 178), (178, 87),
+    (87, 14), (14, 317), (317, 402), (402, 318), (318, 324), (324, 308),
+    (78, 191), (191, 80), (80, 81), (81, 82), (82, 13), (13, 312),
+    (312, 311), (311, 310), (310, 415), (415, 308),
+]
+FACE_LEFT_EYE = [
+    (263, 249), (249, 390), (390, 373), (373, 374), (374, 380), (380, 381),
+    (381, 382), (382, 362), (263, 466), (466, 388), (388, 387), (387, 386),
+    (386, 385), (385, 384), (384, 398), (398, 362),
+]
+FACE_RIGHT_EYE = [
+    (33, 7), (7, 163), (163, 144), (144, 145), (145, 153), (153, 154),
+    (154, 155), (155, 133), (33, 246), (246, 161), (161, 160), (160, 159),
+    (159, 158), (158, 157), (157, 173), (173, 133),
+]
+FACE_LEFT_EYEBROW = [
+    (276, 283), (283, 282), (282, 295), (295, 285), (300, 293), (293, 334),
+    (334, 296), (296, 336),
+]
+FACE_RIGHT_EYEBROW = [
+    (46, 53), (53, 52), (52, 65), (65, 55), (70, 63), (63, 105),
+    (105, 66), (66, 107),
+]
+FACE_IRISES = [
+    (474, 475), (475, 476), (476, 477), (477, 474),
+    (469, 470), (470, 471), (471, 472), (472, 469),
+]
+HAND_CONNECTIONS = [
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+]
+
+# Цвета (BGR) — как в стилях MediaPipe по умолчанию
+_MESH_COLOR = (192, 192, 192)
+_CONTOUR_COLOR = (224, 224, 224)
+_IRIS_COLOR = (48, 255, 48)
+_HAND_LINE_COLOR = (224, 224, 224)
+_HAND_POINT_COLOR = (48, 48, 255)
+
+
+def connection_array(*groups) -> np.ndarray:
+    """Наборы пар (a, b) → один массив индексов (E, 2) int32."""
+    pairs = [pair for group in groups for pair in group]
+    return np.array(pairs, dtype=np.int32).reshape(-1, 2)
+
+
+def _mediapipe_tesselation() -> Optional[np.ndarray]:
+    try:
+        from mediapipe.python.solutions.face_mesh_connections import FACEMESH_TESSELATION
+    except Exception as e:
+        logger.info(f"LandmarkOverlay: таблица тесселяции недоступна ({e}), mesh = contours")
+        return None
+    return connection_array(sorted(FACEMESH_TESSELATION))
+
+
+class LandmarkOverlay:
+    """Отрисовка face mesh / руки слоями: один cv2.polylines на слой."""
+
+    _tesselation = None          # общая для всех экземпляров, грузится один раз
+    _tesselation_loaded = False
+
+    def __init__(self, level: str = OVERLAY_CONTOURS, thickness: int = 1):
+        self.thickness = thickness
+        self._contours = connection_array(
+            FACE_OVAL, FACE_LIPS, FACE_LEFT_EYE, FACE_RIGHT_EYE,
+            FACE_LEFT_EYEBROW, FACE_RIGHT_EYEBROW,
+        )
+        self._irises = connection_array(FACE_IRISES)
+        self._hand = connection_array(HAND_CONNECTIONS)
+        self._face_layers: List[Tuple[np.ndarray, tuple]] = []
+        self.level = OVERLAY_OFF
+        self.set_level(level)
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> 'LandmarkOverlay':
+        """Уровень детализации из секции ui конфига."""
+        return cls(level=cfg.get('landmark_overlay', OVERLAY_CONTOURS))
+
+    def set_level(self, level: str):
+        if level not in OVERLAY_LEVELS:
+            logger.warning(f"LandmarkOverlay: неизвестный уровень '{level}', используется contours")
+            level = OVERLAY_CONTOURS
+        layers = []
+        if level == OVERLAY_MESH:
+            mesh = self._load_tesselation()
+            if mesh is not None:
+                layers.append((mesh, _MESH_COLOR))
+        if level != OVERLAY_OFF:
+            layers.append((self._contours, _CONTOUR_COLOR))
+            layers.append((self._irises, _IRIS_COLOR))
+        self._face_layers = layers
+        self.level = level
+
+    @classmethod
+    def _load_tesselation(cls) -> Optional[np.ndarray]:
+        if not cls._tesselation_loaded:
+            cls._tesselation = _mediapipe_tesselation()
+            cls._tesselation_loaded = True
+        return cls._tesselation
+
+    # ── Drawing ────────────────────────────────────────────────
+
+    def draw(self, image: np.ndarray, face=None, hand=None) -> np.ndarray:
+        """
+        Нарисовать landmarks на image (на месте) и вернуть его.
+
+        face / hand — LandmarkFrame, массив (N, 2|3) или MediaPipe landmarks
+        в нормализованных координатах; None — слой пропускается.
+        """
+        if self.level == OVERLAY_OFF:
+            return image
+        h, w = image.shape[:2]
+        scale = np.array([w * _ONE, h * _ONE], dtype=np.float32)
+
+        if face is not None and self._face_layers:
+            pix = self._fixed_point(as_points(face), scale)
+            for edges, color in self._face_layers:
+                # Таблица на 478 точек (с радужками), а лицо может быть из 468
+                if edges.max() < len(pix):
+                    self._draw_edges(image, pix, edges, color)
+
+        if hand is not None:
+            pix = self._fixed_point(as_points(hand), scale)
+            if len(pix) >= 21:
+                self._draw_edges(image, pix, self._hand, _HAND_LINE_COLOR, self.thickness + 1)
+                # Суставы — отрезки нулевой длины: толстая линия с круглыми концами = точка
+                dots = np.repeat(pix[:21, None, :], 2, axis=1)
+                cv2.polylines(image, dots, False, _HAND_POINT_COLOR,
+                              self.thickness + 4, cv2.LINE_AA, _SHIFT)
+        return image
+
+    @staticmethod
+    def _fixed_point(points: np.ndarray, scale: np.ndarray) -> np.ndarray:
+        """Нормализованные точки → пиксели (int32, фиксированная точка 1/16)."""
+        return np.rint(points[:, :2] * scale).astype(np.int32)
+
+    def _draw_edges(self, image, pix, edges, color, thickness=None):
+        # pix[edges] — (E, 2, 2): E отрезков, рисуются одним вызовом
+        cv2.polylines(image, pix[edges], False, color,
+                      thickness or self.thickness, cv2.LINE_AA, _SHIFT)
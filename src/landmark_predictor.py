@@ -0,0 +1,77 @@
+"""
+Landmark estimates for frames where inference did not run.
+
+Face mesh and hands do not have to run on every displayed frame: the
+governor may skip hand frames, ``performance.face_interval`` skips face
+mesh frames.  ``LandmarkPredictor`` tracks one landmark set (face 478×3,
+hand 21×3, …) as a NumPy array and fills the gaps with a constant-velocity
+prediction:
+
+    predictor.update(points, t)   # inference result of frame t (returned as is)
+    predictor.predict(t)          # estimate for a later frame, or None
+
+The velocity of every coordinate is the finite difference between two
+observations, low-passed like the derivative of a One Euro filter
+(``d_cutoff``), so single-frame detection noise does not throw predictions
+off.  Extrapolation is capped at ``max_horizon`` seconds past the last
+observation; after ``max_age`` without a new observation there is no
+estimate at all and the caller has to run inference.
+"""
+
+import math
+from typing import Optional
+
+import numpy as np
+
+
+class LandmarkPredictor:
+    """Сглаженная скорость + экстраполяция для одного набора landmarks (N, D)."""
+
+    __slots__ = ('d_cutoff', 'max_horizon', 'max_age', '_points', '_velocity', '_t')
+
+    def __init__(self, d_cutoff: float = 2.0, max_horizon: float = 0.1, max_age: float = 0.25):
+        self.d_cutoff = d_cutoff
+        self.max_horizon = max_horizon
+        self.max_age = max_age
+        self.reset()
+
+    def reset(self):
+        self._points = None
+        self._velocity = None
+        self._t = None
+
+    @property
+    def last_time(self) -> Optional[float]:
+        return self._t
+
+    def update(self, points: np.ndarray, t: float) -> np.ndarray:
+        """Наблюдение (результат инференса) в момент t."""
+        points = np.asarray(points, dtype=np.float32)
+        if self._points is None or self._points.shape != points.shape:
+            self._velocity = np.zeros_like(points)
+        else:
+            dt = t - self._t
+            if dt <= 0:
+                # Тот же момент (повтор результата) — только позиция
+                self._points = points
+                return points
+            if dt > self.max_age:
+                self._velocity.fill(0.0)
+            else:
+                tau = 1.0 / (2.0 * math.pi * self.d_cutoff)
+                a = 1.0 / (1.0 + tau / dt)
+                self._velocity += a * ((points - self._points) / dt - self._velocity)
+        self._points = points
+        self._t = t
+        return points
+
+    def predict(self, t: float) -> Optional[np.ndarray]:
+        """Оценка landmarks в момент t или None (нет наблюдений / слишком давно)."""
+        if self._points is None:
+            return None
+        age = t - self._t
+        if age > self.max_age:
+            return None
+        if age <= 0:
+            return self._points
+        return self._points + self._velocity * min(age, self.max_horizon)
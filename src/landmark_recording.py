@@ -0,0 +1,415 @@
+"""
+Compact landmark-stream recording with memory-mapped replay.
+
+``LandmarkRecorder`` stores what the models saw, per frame: capture
+timestamp, frame id, face mesh (468/478 points), one hand (21 points) and
+pose (33 points with visibility), plus presence flags.  A full-day session
+takes tens of MB instead of GBs of video.
+
+File layout (little-endian, append-only):
+
+    header   64 bytes   magic, version, point counts, frame size, record size
+    chunk    16 bytes   b'CHNK' + record count
+             N fixed-size records (numpy structured dtype)
+    chunk    ...
+
+Every chunk is also listed in a sidecar index ``<path>.idx`` (rows of
+``offset, first_record, count`` as uint64).  If the index is missing or
+shorter than the data (e.g. after a crash) the reader rebuilds it by
+scanning chunk headers.
+
+``LandmarkRecording`` maps each chunk with ``np.memmap`` for zero-copy
+random access.  Coordinates are stored as float32 or, with
+``quantize=True``, as int16 with a fixed 1/8192 step (≈0.0001 of the
+frame, well below landmark jitter).
+
+``LandmarkRecording.face_array()`` returns the whole face track as one
+``(T, N, 3)`` array for the batch kernels in ``src/geometry.py``
+(``ear_batch``, ``mar_batch``, ``face_mesh_posture_features``, …).
+
+``replay_analytics`` feeds a recording straight into ``FaceProcessor`` /
+``FatigueClassifier`` / ``PostureClassifier`` without MediaPipe, so
+analytics-only benchmarks run far faster than real time.
+"""
+
+import os
+import struct
+import time
+from typing import Callable, Iterator, List, Optional
+
+import numpy as np
+
+from src.landmark_frame import FaceResults, LandmarkFrame
+from src.logger import logger
+
+MAGIC = b'NFLMREC1'
+CHUNK_MAGIC = b'CHNK'
+VERSION = 1
+HEADER_SIZE = 64
+CHUNK_HEADER_SIZE = 16
+QUANT_SCALE = 8192.0
+
+HAND_POINTS = 21
+POSE_POINTS = 33
+
+FLAG_FACE = 1
+FLAG_HAND = 2
+FLAG_POSE = 4
+
+_HEADER = struct.Struct('<8sHBxHHHIII')     # + нули до HEADER_SIZE
+_CHUNK = struct.Struct('<4sI8x')
+_INDEX_DTYPE = np.dtype('<u8')
+
+
+def record_dtype(face_points: int = 478, quantized: bool = False) -> np.dtype:
+    coord = '<i2' if quantized else '<f4'
+    return np.dtype([
+        ('timestamp', '<f8'),
+        ('frame_id', '<i8'),
+        ('flags', 'u1'),
+        ('n_face', '<u2'),
+        ('face', coord, (face_points, 3)),
+        ('hand', coord, (HAND_POINTS, 3)),
+        ('pose', coord, (POSE_POINTS, 4)),
+    ])
+
+
+def landmarks_to_array(landmarks, with_visibility: bool = False) -> np.ndarray:
+    """MediaPipe landmarks (или (N, 3|4) массив) → float32 массив (N, 3|4)."""
+    points = getattr(landmarks, 'points', landmarks)     # LandmarkFrame
+    if isinstance(points, np.ndarray):
+        return points.astype(np.float32, copy=False)
+    points = getattr(landmarks, 'landmark', landmarks)
+    if with_visibility:
+        return np.array([(p.x, p.y, p.z, getattr(p, 'visibility', 0.0)) for p in points],
+                        dtype=np.float32)
+    return np.array([(p.x, p.y, p.z) for p in points], dtype=np.float32)
+
+
+# ── Writer ─────────────────────────────────────────────────────
+
+class LandmarkRecorder:
+    """Буферизованная запись потока landmarks чанками по chunk_size кадров."""
+
+    def __init__(self, path: str, frame_size=(0, 0), face_points: int = 478,
+                 quantize: bool = False, chunk_size: int = 256):
+        self.path = path
+        self.face_points = face_points
+        self.quantized = quantize
+        self.dtype = record_dtype(face_points, quantize)
+        self._chunk_size = max(1, chunk_size)
+        self._buffer = np.zeros(self._chunk_size, dtype=self.dtype)
+        self._fill = 0
+        self.count = 0
+
+        self._file = open(path, 'wb')
+        self._index = open(path + '.idx', 'wb')
+        header = _HEADER.pack(MAGIC, VERSION, int(quantize), face_points,
+                              HAND_POINTS, POSE_POINTS, int(frame_size[0]),
+                              int(frame_size[1]), self.dtype.itemsize)
+        self._file.write(header.ljust(HEADER_SIZE, b'\0'))
+
+    def _encode(self, dst: np.ndarray, values: np.ndarray):
+        rows = min(len(values), len(dst))
+        if self.quantized:
+            dst[:rows] = np.clip(np.rint(values[:rows] * QUANT_SCALE), -32768, 32767)
+        else:
+            dst[:rows] = values[:rows]
+        dst[rows:] = 0
+
+    def write(self, timestamp: float, frame_id: int = -1, face=None, hand=None, pose=None):
+        """Добавить кадр. face / hand / pose — landmarks MediaPipe, массивы или None."""
+        if self._file is None:
+            return
+        rec = self._buffer[self._fill]
+        rec['timestamp'] = timestamp
+        rec['frame_id'] = frame_id
+        flags = 0
+        n_face = 0
+        if face is not None:
+            values = landmarks_to_array(face)
+            n_face = min(len(values), self.face_points)
+            self._encode(rec['face'], values)
+            flags |= FLAG_FACE
+        else:
+            rec['face'] = 0
+        if hand is not None:
+            self._encode(rec['hand'], landmarks_to_array(hand))
+            flags |= FLAG_HAND
+        else:
+            rec['hand'] = 0
+        if pose is not None:
+            self._encode(rec['pose'], landmarks_to_array(pose, with_visibility=True))
+            flags |= FLAG_POSE
+        else:
+            rec['pose'] = 0
+        rec['flags'] = flags
+        rec['n_face'] = n_face
+
+        self._fill += 1
+        self.count += 1
+        if self._fill >= self._chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Записать накопленные кадры отдельным чанком."""
+        if self._file is None or not self._fill:
+            return
+        self._file.write(_CHUNK.pack(CHUNK_MAGIC, self._fill))
+        offset = self._file.tell()
+        self._file.write(self._buffer[:self._fill].tobytes())
+        self._file.flush()
+        first = self.count - self._fill
+        self._index.write(np.array([offset, first, self._fill], dtype=_INDEX_DTYPE).tobytes())
+        self._index.flush()
+        self._fill = 0
+
+    def close(self):
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._index.close()
+        self._file = None
+        self._index = None
+        logger.info(f"LandmarkRecorder: {self.count} кадров записано в {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ── Reader ─────────────────────────────────────────────────────
+
+class _Point:
+    """Landmark с интерфейсом MediaPipe (x, y, z, visibility)."""
+
+    __slots__ = ('x', 'y', 'z', 'visibility')
+
+    def __init__(self, x, y, z, visibility=0.0):
+        self.x, self.y, self.z, self.visibility = x, y, z, visibility
+
+
+class _LandmarkList:
+    __slots__ = ('landmark',)
+
+    def __init__(self, points: List[_Point]):
+        self.landmark = points
+
+
+class ReplayFrame:
+    """Один кадр записи: массивы landmarks + адаптеры под интерфейс MediaPipe."""
+
+    __slots__ = ('timestamp', 'frame_id', 'flags', 'face', 'hand', 'pose')
+
+    def __init__(self, timestamp, frame_id, flags, face, hand, pose):
+        self.timestamp = timestamp
+        self.frame_id = frame_id
+        self.flags = flags
+        self.face = face            # (n, 3) float32 или None
+        self.hand = hand            # (21, 3) float32 или None
+        self.pose = pose            # (33, 4) float32 или None
+
+    @property
+    def has_face(self) -> bool:
+        return self.face is not None
+
+    @property
+    def has_hand(self) -> bool:
+        return self.hand is not None
+
+    @property
+    def has_pose(self) -> bool:
+        return self.pose is not None
+
+    def face_landmarks(self) -> Optional[LandmarkFrame]:
+        # FaceProcessor принимает массив как есть — без объектов на точку
+        if self.face is None:
+            return None
+        return LandmarkFrame(self.face)
+
+    def face_results(self) -> FaceResults:
+        return FaceResults(self.face_landmarks())
+
+    def hand_landmarks(self) -> Optional[_LandmarkList]:
+        if self.hand is None:
+            return None
+        return _LandmarkList([_Point(x, y, z) for x, y, z in self.hand.tolist()])
+
+    def pose_landmarks(self) -> Optional[List[_Point]]:
+        if self.pose is None:
+            return None
+        return [_Point(x, y, z, v) for x, y, z, v in self.pose.tolist()]
+
+
+class LandmarkRecording:
+    """Чтение записи через np.memmap: случайный доступ без копирования."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            raw = f.read(HEADER_SIZE)
+        if len(raw) < HEADER_SIZE or raw[:8] != MAGIC:
+            raise ValueError(f"{path}: не файл записи landmarks")
+        (_, version, quantized, face_points, hand_points, pose_points,
+         frame_w, frame_h, record_size) = _HEADER.unpack_from(raw)
+        if version != VERSION:
+            raise ValueError(f"{path}: неподдерживаемая версия {version}")
+        self.quantized = bool(quantized)
+        self.face_points = face_points
+        self.frame_size = (frame_w, frame_h)
+        self.dtype = record_dtype(face_points, self.quantized)
+        if self.dtype.itemsize != record_size:
+            raise ValueError(f"{path}: размер записи {record_size} != {self.dtype.itemsize}")
+
+        index = self._load_index()
+        self._chunks = [
+            np.memmap(path, dtype=self.dtype, mode='r', offset=int(offset), shape=(int(count),))
+            for offset, _, count in index
+        ]
+        self._starts = np.array([int(first) for _, first, _ in index], dtype=np.int64)
+        self._length = int(sum(int(count) for _, _, count in index))
+
+    def _load_index(self) -> List[tuple]:
+        data_size = os.path.getsize(self.path)
+        idx_path = self.path + '.idx'
+        if os.path.exists(idx_path):
+            rows = np.fromfile(idx_path, dtype=_INDEX_DTYPE)
+            rows = rows[:len(rows) // 3 * 3].reshape(-1, 3)
+            if len(rows):
+                end = int(rows[-1, 0]) + int(rows[-1, 2]) * self.dtype.itemsize
+                if end == data_size:
+                    return [tuple(r) for r in rows]
+        logger.warning(f"LandmarkRecording: индекс {idx_path} устарел, сканируем чанки")
+        return self._scan_chunks(data_size)
+
+    def _scan_chunks(self, data_size: int) -> List[tuple]:
+        index = []
+        first = 0
+        pos = HEADER_SIZE
+        with open(self.path, 'rb') as f:
+            while pos + CHUNK_HEADER_SIZE <= data_size:
+                f.seek(pos)
+                magic, count = _CHUNK.unpack(f.read(CHUNK_HEADER_SIZE))
+                offset = pos + CHUNK_HEADER_SIZE
+                end = offset + count * self.dtype.itemsize
+                if magic != CHUNK_MAGIC or end > data_size:
+                    break       # недописанный хвост после сбоя
+                index.append((offset, first, count))
+                first += count
+                pos = end
+        return index
+
+    def __len__(self) -> int:
+        return self._length
+
+    def record(self, i: int) -> np.void:
+        """Сырая запись i (view в memmap)."""
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError(i)
+        chunk = int(np.searchsorted(self._starts, i, side='right')) - 1
+        return self._chunks[chunk][i - self._starts[chunk]]
+
+    def _decode(self, values: np.ndarray) -> np.ndarray:
+        if self.quantized:
+            return values.astype(np.float32) / QUANT_SCALE
+        return values
+
+    def __getitem__(self, i: int) -> ReplayFrame:
+        rec = self.record(i)
+        flags = int(rec['flags'])
+        face = self._decode(rec['face'][:int(rec['n_face'])]) if flags & FLAG_FACE else None
+        hand = self._decode(rec['hand']) if flags & FLAG_HAND else None
+        pose = self._decode(rec['pose']) if flags & FLAG_POSE else None
+        return ReplayFrame(float(rec['timestamp']), int(rec['frame_id']), flags,
+                           face, hand, pose)
+
+    def __iter__(self) -> Iterator[ReplayFrame]:
+        for i in range(self._length):
+            yield self[i]
+
+    def column(self, name: str) -> np.ndarray:
+        """Одно поле по всей записи (timestamp, flags, …)."""
+        if not self._chunks:
+            return np.empty(0, dtype=self.dtype[name])
+        return np.concatenate([chunk[name] for chunk in self._chunks])
+
+    def face_array(self, start: int = 0, stop: Optional[int] = None):
+        """
+        Точки лица кадров [start, stop) одним массивом (T, face_points, 3)
+        float32 + маска кадров с лицом — вход для geometry.*_batch.
+        """
+        flags = self.column('flags')[start:stop]
+        face = self.column('face')[start:stop]
+        return self._decode(face).astype(np.float32, copy=False), (flags & FLAG_FACE) != 0
+
+    @property
+    def duration(self) -> float:
+        if not self._length:
+            return 0.0
+        return float(self.record(-1)['timestamp'] - self.record(0)['timestamp'])
+
+
+# ── Replay ─────────────────────────────────────────────────────
+
+def replay_analytics(recording: LandmarkRecording, face_processor,
+                     fatigue_classifier=None, posture_classifier=None,
+                     on_result: Optional[Callable[[dict], None]] = None) -> dict:
+    """
+    Прогнать запись через аналитику без MediaPipe.
+
+    Возвращает статистику прогона: кадры, время, FPS и ускорение
+    относительно реального времени записи.
+    """
+    frame_w, frame_h = recording.frame_size
+    # FaceProcessor / HeadPoseEstimator смотрят только на frame.shape
+    frame = np.broadcast_to(np.zeros(1, dtype=np.uint8), (frame_h or 720, frame_w or 1280, 3))
+
+    started = time.perf_counter()
+    count = 0
+    for item in recording:
+        face_data = face_processor.process(frame, item.face_results(), timestamp=item.timestamp)
+        result = {
+            'frame_id': item.frame_id,
+            'media_time': item.timestamp,
+            'face_detected': face_data.detected,
+            'ear': face_data.ear,
+            'mar': face_data.mar,
+            'pitch': face_data.pitch,
+        }
+        if fatigue_classifier is not None and face_data.valid:
+            # Сигнальная стадия — по времени записи, воспроизведение детерминировано
+            fatigue_classifier.observe(
+                face_data.landmarks, timestamp=item.timestamp,
+                ear=face_data.ear, mar=face_data.mar,
+            )
+            fatigue = fatigue_classifier.predict(face_data.landmarks)
+            result['fatigue_status'] = fatigue.status
+            result['fatigue_score'] = fatigue.fatigue_score
+        if posture_classifier is not None:
+            if item.has_pose:
+                posture = posture_classifier.predict(item.pose_landmarks())
+            elif face_data.landmarks is not None:
+                posture = posture_classifier.predict_from_face_mesh(
+                    face_data.landmarks, frame.shape[1], frame.shape[0],
+                    head_pitch=face_data.pitch,
+                )
+            else:
+                posture = {}
+            result['posture_status'] = posture.get('status')
+        if on_result is not None:
+            on_result(result)
+        count += 1
+
+    elapsed = time.perf_counter() - started
+    duration = recording.duration
+    return {
+        'frames': count,
+        'elapsed_s': round(elapsed, 3),
+        'fps': round(count / elapsed, 1) if elapsed > 0 else 0.0,
+        'speedup': round(duration / elapsed, 1) if elapsed > 0 and duration else None,
+    }
@@ -0,0 +1,162 @@
+"""
+Streaming inference for the windowed fatigue LSTM.
+
+The LSTM is trained on windows of the last 30 feature rows, and the old
+``_predict_lstm`` rebuilt that ``(30, 16)`` matrix from a deque of dicts
+and ran all 30 timesteps on every call, although only one row was new.
+``LSTMStream`` keeps the rows in a preallocated ring buffer:
+
+    stream.push(row)      # one new (16,) feature row
+    stream.predict()      # class probabilities for the current window, or None
+
+Modes:
+
+    streaming   (NumPy backend) every ``push`` advances the hidden / cell
+                state of each LSTM layer by one step, ``predict`` only runs
+                the Dense head.  The state carries history beyond the
+                window, so every ``resync_interval`` rows it is recomputed
+                from zero over the ring buffer; right after a resync (and
+                when the window first fills) the output equals the
+                windowed model exactly, in between the older rows have
+                mostly been forgotten by the LSTM anyway.
+    window      ``predict`` runs the exact 30-step window from the ring
+                buffer (any backend).  Output is identical to the windowed
+                model; cost is paid only when a prediction is requested.
+
+A backend without NumPy layers (TFLite / ONNX / Keras) always uses
+``window``.
+"""
+
+from typing import List, Optional
+
+import numpy as np
+
+from src.numpy_inference import LSTMLayer
+
+MODE_STREAMING = 'streaming'
+MODE_WINDOW = 'window'
+
+
+def _split_recurrent(model):
+    """(LSTM-слои, головные слои) или None, если модель не «LSTM… → голова»."""
+    layers = list(getattr(model, 'layers', ()))
+    n = 0
+    while n < len(layers) and isinstance(layers[n], LSTMLayer):
+        n += 1
+    if n == 0:
+        return None
+    lstms, head = layers[:n], layers[n:]
+    if any(not l.return_sequences for l in lstms[:-1]) or lstms[-1].return_sequences:
+        return None
+    return lstms, head
+
+
+class LSTMStream:
+    """Кольцевой буфер признаков + пошаговое состояние LSTM."""
+
+    def __init__(self, backend, window: int = 30, features: int = 16,
+                 mode: str = MODE_STREAMING, resync_interval: int = 30):
+        self.window = window
+        self.features = features
+        self.requested_mode = mode
+        self.resync_interval = max(1, int(resync_interval))
+        self._ring = np.zeros((window, features), np.float32)
+        self._batch = np.empty((1, window, features), np.float32)
+        self._pending_backend = None
+        self._set_backend(backend)
+        self.reset()
+
+    # -- backend --
+
+    def _set_backend(self, backend):
+        self.backend = backend
+        split = _split_recurrent(getattr(backend, 'model', None))
+        if self.requested_mode == MODE_STREAMING and split is not None:
+            self.mode = MODE_STREAMING
+            self._lstms, self._head = split
+        else:
+            self.mode = MODE_WINDOW
+            self._lstms, self._head = [], []
+
+    def set_backend(self, backend):
+        """
+        Подменить backend (после дообучения).  Можно звать из другого
+        потока: применяется на следующем push / predict.
+        """
+        self._pending_backend = backend
+
+    def _apply_pending(self):
+        backend = self._pending_backend
+        if backend is not None:
+            self._pending_backend = None
+            self._set_backend(backend)
+            self._states = [l.initial_state(1) for l in self._lstms]
+            if self._count and self.mode == MODE_STREAMING:
+                self._resync()
+            self._output = None
+
+    # -- state --
+
+    def reset(self):
+        self._pos = 0           # индекс следующей записи в кольце
+        self._count = 0
+        self._since_resync = 0
+        self._states: List = [l.initial_state(1) for l in self._lstms]
+        self._output: Optional[np.ndarray] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._count >= self.window
+
+    def window_array(self) -> np.ndarray:
+        """Окно в хронологическом порядке, форма (1, window, features)."""
+        pos = self._pos
+        tail = self.window - pos
+        self._batch[0, :tail] = self._ring[pos:]
+        self._batch[0, tail:] = self._ring[:pos]
+        return self._batch
+
+    def _resync(self):
+        """Состояние с нуля по окну — ровно как у оконной модели."""
+        # До заполнения окна кольцо ещё не провернулось: строки 0..count-1
+        x = self.window_array() if self.ready else self._ring[None, :self._count]
+        states = []
+        for layer in self._lstms:
+            x, state = layer.run(x)
+            states.append(state)
+        self._states = states
+        self._since_resync = 0
+
+    def push(self, row: np.ndarray):
+        self._apply_pending()
+        self._ring[self._pos] = row
+        self._pos = (self._pos + 1) % self.window
+        self._count += 1
+        self._output = None
+        if self.mode != MODE_STREAMING:
+            return
+        x = self._ring[self._pos - 1][None, :]
+        for n, layer in enumerate(self._lstms):
+            self._states[n] = layer.step(x, self._states[n])
+            x = self._states[n][0]
+        self._since_resync += 1
+        if self._count == self.window:
+            # Первое заполнение окна уже точное (старт с нуля ровно window шагов назад)
+            self._since_resync = 0
+        elif self._count > self.window and self._since_resync >= self.resync_interval:
+            self._resync()
+
+    def predict(self) -> Optional[np.ndarray]:
+        """Вероятности классов (classes,) для текущего окна или None."""
+        self._apply_pending()
+        if not self.ready:
+            return None
+        if self._output is None:
+            if self.mode == MODE_STREAMING:
+                x = self._states[-1][0]
+                for layer in self._head:
+                    x = layer(x)
+                self._output = x[0]
+            else:
+                self._output = np.asarray(self.backend.predict(self.window_array()))[0]
+        return self._output
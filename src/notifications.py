@@ -1,27 +1,9 @@
 import sys
-import json
-import os
 from PyQt6.QtWidgets import (QWidget, QLabel, QVBoxLayout, QHBoxLayout,
                              QPushButton, QApplication, QGraphicsOpacityEffect, QFrame)
 from PyQt6.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve
 from PyQt6.QtGui import QFont, QCursor
-from sqlalchemy import create_engine, text
-import datetime
-
-# --- КОНФИГУРАЦИЯ ПО УМОЛЧАНИЮ ---
-DEFAULT_SETTINGS = {
-    "work_limit_minutes": 45,
-    "posture_window_minutes": 3,
-    "posture_bad_percent": 30,
-    "posture_cooldown": 30,
-    "posture_toast_cooldown": 5,
-    "yawn_limit": 4,
-    "yawn_window_minutes": 10,
-    "fatigue_cooldown": 2,
-    "fatigue_toast_cooldown": 10,
-    "sound_enabled": True
-}
-SETTINGS_PATH = os.path.join("data", "settings.json")
+from src.notification_manager import DEFAULT_SETTINGS, SETTINGS_PATH, NotificationManager  # noqa: F401
 
 # Цветовая палитра в едином стиле приложения
 _COLORS = {
@@ -150,158 +132,3 @@ class ToastNotification(QWidget):
     def _close_now(self):
         self._close_timer.stop()
         self.fade_out()
-
-# --- 2. МЕНЕДЖЕР ЛОГИКИ ---
-class NotificationManager:
-    def __init__(self, db_path="session_data.db"):
-        self.db_uri = f"sqlite:///data/{db_path}"
-        self.engine = create_engine(self.db_uri)
-        
-        # Настройки
-        self.settings = DEFAULT_SETTINGS.copy()
-        self.load_settings()
-        
-        # Время начала работы (для таймера перерыва)
-        self.session_start = datetime.datetime.now()
-        
-        # Кулдауны (чтобы не спамить уведомлениями каждые 5 секунд)
-        self.last_alert_time = {
-            "posture":  datetime.datetime.min,
-            "fatigue":  datetime.datetime.min,   # зевки
-            "drowsy":   datetime.datetime.min,   # LSTM Drowsy/Sleeping
-            "break":    datetime.datetime.min
-        }
-
-    def load_settings(self):
-        """Загрузить настройки из data/settings.json (мерж с DEFAULT_SETTINGS)."""
-        try:
-            if os.path.exists(SETTINGS_PATH):
-                with open(SETTINGS_PATH, "r", encoding="utf-8") as f:
-                    saved = json.load(f)
-                # Обновляем только те ключи, что есть в DEFAULT_SETTINGS
-                for k in DEFAULT_SETTINGS:
-                    if k in saved:
-                        self.settings[k] = saved[k]
-        except Exception as e:
-            print(f"Ошибка загрузки настроек: {e}")
-
-    def save_settings(self):
-        """Сохранить текущие настройки в data/settings.json."""
-        try:
-            os.makedirs(os.path.dirname(SETTINGS_PATH), exist_ok=True)
-            with open(SETTINGS_PATH, "w", encoding="utf-8") as f:
-                json.dump(self.settings, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Ошибка сохранения настроек: {e}")
-
-    def update_settings(self, new_settings):
-        """Обновление настроек из GUI + автосохранение."""
-        self.settings.update(new_settings)
-        self.save_settings()
-
-    def check_conditions(self):
-        """
-        Главный метод анализа. Вызывается раз в минуту (или чаще).
-        Возвращает (Title, Message) или None.
-        """
-        now = datetime.datetime.now()
-        conn = self.engine.connect()
-        alert = None
-
-        try:
-            # 1. ПРОВЕРКА ВРЕМЕНИ РАБОТЫ (Time Limit)
-            # Если прошло больше времени, чем указано в настройках
-            work_duration = (now - self.session_start).total_seconds() / 60
-            if self.settings["work_limit_minutes"] > 0 and work_duration > self.settings["work_limit_minutes"]:
-                break_cd = self.settings.get("posture_toast_cooldown", 5) * 60
-                if (now - self.last_alert_time["break"]).total_seconds() > break_cd:
-                    self.last_alert_time["break"] = now
-                    # Сбрасываем таймер сессии, будто человек отдохнул (условно)
-                    # Либо просто напоминаем
-                    return "Пора отдохнуть", f"Вы работаете уже {int(work_duration)} минут без перерыва. Сделайте разминку."
-
-            # 2. АНАЛИЗ ОСАНКИ (За последние N минут)
-            window_min = self.settings["posture_window_minutes"]
-            time_threshold = now - datetime.timedelta(minutes=window_min)
-            
-            sql_posture = text("""
-                SELECT posture_status FROM face_logs 
-                WHERE timestamp > :thresh
-            """)
-            result = conn.execute(sql_posture, {"thresh": time_threshold}).fetchall()
-            
-            if result:
-                total_records = len(result)
-                # В БД хранится "Bad Posture [model_name]" или "Fair [model_name]"
-                bad_count = sum(1 for r in result if str(r[0]).startswith('Bad Posture'))
-                fair_count = sum(1 for r in result if str(r[0]).startswith('Fair'))
-                bad_percent = (bad_count / total_records) * 100
-                fair_percent = (fair_count / total_records) * 100
-
-                # Если процент плохой осанки выше порога
-                if bad_percent > self.settings["posture_bad_percent"]:
-                    posture_toast_cd = self.settings.get("posture_toast_cooldown", 5) * 60
-                    if (now - self.last_alert_time["posture"]).total_seconds() > posture_toast_cd:
-                        self.last_alert_time["posture"] = now
-                        return "Следите за осанкой", f"За последние {window_min} мин вы сутулились {int(bad_percent)}% времени."
-
-                # ИСПРАВЛЕНО: если процент средней осанки выше порога — предупреждение
-                elif fair_percent > 40:  # 40% времени в среднем положении
-                    posture_toast_cd = self.settings.get("posture_toast_cooldown", 5) * 60
-                    if (now - self.last_alert_time["posture"]).total_seconds() > posture_toast_cd:
-                        self.last_alert_time["posture"] = now
-                        return "Следите за осанкой", f"За последние {window_min} мин ваша осанка была средней {int(fair_percent)}% времени. Выпрямитесь."
-
-            # 3. АНАЛИЗ УСТАЛОСТИ (Зевки)
-            window_yawn = self.settings["yawn_window_minutes"]
-            time_threshold_yawn = now - datetime.timedelta(minutes=window_yawn)
-            
-            sql_yawn = text("""
-                SELECT COUNT(*) FROM face_logs
-                WHERE timestamp > :thresh AND fatigue_status LIKE 'Yawning%'
-            """)
-            yawn_count = conn.execute(sql_yawn, {"thresh": time_threshold_yawn}).scalar()
-            
-            if yawn_count >= self.settings["yawn_limit"]:
-                fatigue_toast_cd = self.settings.get("fatigue_toast_cooldown", 10) * 60
-                if (now - self.last_alert_time["fatigue"]).total_seconds() > fatigue_toast_cd:
-                    self.last_alert_time["fatigue"] = now
-                    return "Обнаружена усталость", f"Вы часто зеваете ({yawn_count} раз за {window_yawn} мин). Рекомендуется проветрить помещение."
-
-            # 4. АНАЛИЗ СОНЛИВОСТИ через LSTM (Drowsy / Sleeping / Eyes Closed)
-            # Смотрим последние 5 минут: если >25% записей — сонливость/засыпание
-            drowsy_window = 5  # минут
-            thresh_drowsy = now - datetime.timedelta(minutes=drowsy_window)
-
-            sql_drowsy_total = text("""
-                SELECT COUNT(*) FROM face_logs WHERE timestamp > :thresh
-            """)
-            sql_drowsy = text("""
-                SELECT COUNT(*) FROM face_logs
-                WHERE timestamp > :thresh AND (
-                    fatigue_status LIKE 'Drowsy%'
-                    OR fatigue_status LIKE 'Sleeping%'
-                    OR fatigue_status LIKE 'Eyes Closed%'
-                )
-            """)
-            total_5m   = conn.execute(sql_drowsy_total, {"thresh": thresh_drowsy}).scalar() or 0
-            drowsy_cnt = conn.execute(sql_drowsy,       {"thresh": thresh_drowsy}).scalar() or 0
-
-            if total_5m >= 30:   # минимум ~30 секунд данных (1 запись/сек)
-                drowsy_pct = drowsy_cnt / total_5m * 100
-                if drowsy_pct > 25:
-                    fatigue_toast_cd = self.settings.get("fatigue_toast_cooldown", 10) * 60
-                    if (now - self.last_alert_time["drowsy"]).total_seconds() > fatigue_toast_cd:
-                        self.last_alert_time["drowsy"] = now
-                        return (
-                            "⚠️ Сильная усталость",
-                            f"Признаки сонливости обнаружены {int(drowsy_pct)}% времени "
-                            f"за последние {drowsy_window} мин. Рекомендуется сделать перерыв."
-                        )
-
-        except Exception as e:
-            print(f"Ошибка анализатора: {e}")
-        finally:
-            conn.close()
-        
-        return None
\ No newline at end of file
@@ -0,0 +1,391 @@
+"""
+NumPy forward pass for the small Keras models (fatigue LSTM, posture Dense).
+
+The fatigue LSTM (input ``(30, 16)``: LSTM 64 → LSTM 32 → Dense 32 →
+Dense 3) and the posture model (7 features: Dense 64 → BatchNorm →
+Dense 32 → Dense 16 → Dense 3) are a few thousand multiply-adds — a
+TensorFlow import costs seconds and hundreds of MB for them.  Their weights
+are exported to ``.npz`` and run with plain NumPy:
+
+    export_keras_file('models/fatigue_lstm.keras', 'data/model_cache/fatigue_lstm.npz')
+    model = NumpyModel.load('data/model_cache/fatigue_lstm.npz')
+    model.predict(x)              # (batch, 30, 16) → (batch, 3)
+
+``export_keras_file`` reads ``config.json`` and ``model.weights.h5``
+straight from the ``.keras`` archive with h5py, so it works without
+TensorFlow; ``export_keras_model`` exports an already loaded (e.g.
+fine-tuned) Keras model.  Supported layers: LSTM, Dense, BatchNormalization,
+Dropout (identity at inference); anything else raises ``UnsupportedModel``.
+
+Verification against Keras (max |Δ| ≤ 1e-5 on random inputs):
+
+    python -m src.numpy_inference models/fatigue_lstm.keras models/posture_lstm.keras --verify
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import zipfile
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+PARITY_ATOL = 1e-5
+
+
+class UnsupportedModel(ValueError):
+    """Модель содержит слои, для которых нет NumPy-реализации."""
+
+
+# ── Kernels ───────────────────────────────────────────────────────────
+
+def sigmoid(x: np.ndarray) -> np.ndarray:
+    # Через tanh: без overflow в exp для больших |x|
+    return 0.5 * (np.tanh(0.5 * x) + 1.0)
+
+
+def relu(x: np.ndarray) -> np.ndarray:
+    return np.maximum(x, 0.0)
+
+
+def softmax(x: np.ndarray, axis: int = -1) -> np.ndarray:
+    e = np.exp(x - np.max(x, axis=axis, keepdims=True))
+    return e / np.sum(e, axis=axis, keepdims=True)
+
+
+def linear(x: np.ndarray) -> np.ndarray:
+    return x
+
+
+ACTIVATIONS = {
+    'linear': linear,
+    'relu': relu,
+    'sigmoid': sigmoid,
+    'tanh': np.tanh,
+    'softmax': softmax,
+}
+
+
+def _activation(name: Optional[str]):
+    name = name or 'linear'
+    if name not in ACTIVATIONS:
+        raise UnsupportedModel(f"activation '{name}'")
+    return ACTIVATIONS[name]
+
+
+class DenseLayer:
+    __slots__ = ('kernel', 'bias', 'activation')
+
+    def __init__(self, kernel: np.ndarray, bias: Optional[np.ndarray], activation: str = 'linear'):
+        self.kernel = np.ascontiguousarray(kernel, dtype=np.float32)
+        self.bias = None if bias is None else np.asarray(bias, dtype=np.float32)
+        self.activation = activation
+        _activation(activation)
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        y = x @ self.kernel
+        if self.bias is not None:
+            y += self.bias
+        return ACTIVATIONS[self.activation](y)
+
+    def arrays(self) -> dict:
+        out = {'kernel': self.kernel}
+        if self.bias is not None:
+            out['bias'] = self.bias
+        return out
+
+    def spec(self) -> dict:
+        return {'type': 'dense', 'activation': self.activation}
+
+
+class BatchNormLayer:
+    """BatchNormalization в режиме инференса, свёрнутая в y = x·scale + offset."""
+
+    __slots__ = ('scale', 'offset')
+
+    def __init__(self, scale: np.ndarray, offset: np.ndarray):
+        self.scale = np.asarray(scale, dtype=np.float32)
+        self.offset = np.asarray(offset, dtype=np.float32)
+
+    @classmethod
+    def from_moments(cls, gamma, beta, mean, variance, epsilon: float = 1e-3) -> 'BatchNormLayer':
+        gamma = np.ones_like(mean) if gamma is None else gamma
+        beta = np.zeros_like(mean) if beta is None else beta
+        scale = np.asarray(gamma, np.float64) / np.sqrt(np.asarray(variance, np.float64) + epsilon)
+        offset = np.asarray(beta, np.float64) - np.asarray(mean, np.float64) * scale
+        return cls(scale, offset)
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        return x * self.scale + self.offset
+
+    def arrays(self) -> dict:
+        return {'scale': self.scale, 'offset': self.offset}
+
+    def spec(self) -> dict:
+        return {'type': 'batch_norm'}
+
+
+class LSTMLayer:
+    """
+    Keras LSTM (гейты i, f, c, o; activation tanh, recurrent sigmoid).
+    ``step`` — один временной шаг для потокового режима.
+    """
+
+    __slots__ = ('kernel', 'recurrent_kernel', 'bias', 'units', 'return_sequences',
+                 'activation', 'recurrent_activation')
+
+    def __init__(self, kernel, recurrent_kernel, bias, return_sequences: bool = False,
+                 activation: str = 'tanh', recurrent_activation: str = 'sigmoid'):
+        self.kernel = np.ascontiguousarray(kernel, dtype=np.float32)
+        self.recurrent_kernel = np.ascontiguousarray(recurrent_kernel, dtype=np.float32)
+        self.units = self.recurrent_kernel.shape[0]
+        self.bias = (np.zeros(4 * self.units, np.float32) if bias is None
+                     else np.asarray(bias, dtype=np.float32))
+        self.return_sequences = bool(return_sequences)
+        self.activation = activation
+        self.recurrent_activation = recurrent_activation
+        _activation(activation)
+        _activation(recurrent_activation)
+
+    def initial_state(self, batch: int = 1):
+        zeros = np.zeros((batch, self.units), np.float32)
+        return zeros, zeros.copy()
+
+    def _cell(self, z: np.ndarray, c: np.ndarray):
+        u = self.units
+        act = ACTIVATIONS[self.activation]
+        rec = ACTIVATIONS[self.recurrent_activation]
+        i = rec(z[:, :u])
+        f = rec(z[:, u:2 * u])
+        g = act(z[:, 2 * u:3 * u])
+        o = rec(z[:, 3 * u:])
+        c = f * c + i * g
+        return o * act(c), c
+
+    def step(self, x_t: np.ndarray, state):
+        """x_t (batch, features), state (h, c) → (h, c)."""
+        h, c = state
+        z = x_t @ self.kernel + h @ self.recurrent_kernel + self.bias
+        return self._cell(z, c)
+
+    def run(self, x: np.ndarray, state=None):
+        """x (batch, steps, features) → (выход слоя, конечное состояние (h, c))."""
+        batch, steps = x.shape[0], x.shape[1]
+        h, c = state if state is not None else self.initial_state(batch)
+        # Входная проекция всех шагов одним matmul
+        xw = x @ self.kernel + self.bias
+        outputs = np.empty((batch, steps, self.units), np.float32) if self.return_sequences else None
+        for t in range(steps):
+            h, c = self._cell(xw[:, t] + h @ self.recurrent_kernel, c)
+            if outputs is not None:
+                outputs[:, t] = h
+        return (outputs if outputs is not None else h), (h, c)
+
+    def __call__(self, x: np.ndarray, state=None) -> np.ndarray:
+        return self.run(x, state)[0]
+
+    def arrays(self) -> dict:
+        return {'kernel': self.kernel, 'recurrent_kernel': self.recurrent_kernel, 'bias': self.bias}
+
+    def spec(self) -> dict:
+        return {'type': 'lstm', 'return_sequences': self.return_sequences,
+                'activation': self.activation, 'recurrent_activation': self.recurrent_activation}
+
+
+class NumpyModel:
+    """Последовательная модель из NumPy-слоёв."""
+
+    def __init__(self, layers: List, input_shape: Sequence):
+        self.layers = layers
+        self.input_shape = tuple(None if d is None else int(d) for d in input_shape)
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float32)
+        for layer in self.layers:
+            x = layer(x)
+        return x
+
+    __call__ = predict
+
+    def save(self, path: str):
+        arrays = {}
+        for n, layer in enumerate(self.layers):
+            for key, value in layer.arrays().items():
+                arrays[f'{n}.{key}'] = value
+        meta = {'input_shape': list(self.input_shape), 'layers': [l.spec() for l in self.layers]}
+        arrays['__model__'] = np.array(json.dumps(meta))
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp.npz'
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'NumpyModel':
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['__model__']))
+            layers = []
+            for n, spec in enumerate(meta['layers']):
+                kind = spec.pop('type')
+                arrays = {key.split('.', 1)[1]: data[key] for key in data.files
+                          if key.startswith(f'{n}.')}
+                if kind == 'dense':
+                    layers.append(DenseLayer(arrays['kernel'], arrays.get('bias'), **spec))
+                elif kind == 'batch_norm':
+                    layers.append(BatchNormLayer(arrays['scale'], arrays['offset']))
+                elif kind == 'lstm':
+                    layers.append(LSTMLayer(arrays['kernel'], arrays['recurrent_kernel'],
+                                            arrays['bias'], **spec))
+                else:
+                    raise UnsupportedModel(f"layer type '{kind}' in {path}")
+        return cls(layers, meta['input_shape'])
+
+
+# ── Export ────────────────────────────────────────────────────────────
+
+def _build_layer(class_name: str, config: dict, weights: List[np.ndarray]):
+    """NumPy-слой из класса / конфига / весов Keras (None — слой-тождество)."""
+    if class_name in ('Dropout', 'InputLayer', 'GaussianNoise', 'SpatialDropout1D'):
+        return None
+    if class_name == 'Dense':
+        bias = weights[1] if config.get('use_bias', True) else None
+        return DenseLayer(weights[0], bias, config.get('activation', 'linear'))
+    if class_name == 'BatchNormalization':
+        axis = config.get('axis', -1)
+        axis = axis[0] if isinstance(axis, (list, tuple)) and len(axis) == 1 else axis
+        if axis not in (-1, 1):
+            raise UnsupportedModel(f"BatchNormalization axis {axis}")
+        weights = list(weights)
+        gamma = weights.pop(0) if config.get('scale', True) else None
+        beta = weights.pop(0) if config.get('center', True) else None
+        mean, variance = weights[0], weights[1]
+        return BatchNormLayer.from_moments(gamma, beta, mean, variance, config.get('epsilon', 1e-3))
+    if class_name == 'LSTM':
+        for key in ('go_backwards', 'stateful', 'return_state'):
+            if config.get(key):
+                raise UnsupportedModel(f"LSTM {key}=True")
+        bias = weights[2] if config.get('use_bias', True) else None
+        return LSTMLayer(weights[0], weights[1], bias,
+                         return_sequences=config.get('return_sequences', False),
+                         activation=config.get('activation', 'tanh'),
+                         recurrent_activation=config.get('recurrent_activation', 'sigmoid'))
+    raise UnsupportedModel(f"layer '{class_name}'")
+
+
+def export_keras_model(keras_model, npz_path: Optional[str] = None) -> NumpyModel:
+    """Загруженная Keras-модель → NumpyModel (и .npz, если задан путь)."""
+    layers = []
+    for layer in keras_model.layers:
+        built = _build_layer(type(layer).__name__, layer.get_config(), layer.get_weights())
+        if built is not None:
+            layers.append(built)
+    model = NumpyModel(layers, keras_model.input_shape)
+    if npz_path:
+        model.save(npz_path)
+    return model
+
+
+def _snake_case(name: str) -> str:
+    out = []
+    for i, ch in enumerate(name):
+        if ch.isupper() and i and (not name[i - 1].isupper()
+                                   or (i + 1 < len(name) and name[i + 1].islower())):
+            out.append('_')
+        out.append(ch.lower())
+    return ''.join(out)
+
+
+def _read_h5_vars(weights_file) -> dict:
+    """{'layers/dense_1': [kernel, bias], …} из model.weights.h5 (разделители / или \\)."""
+    import h5py
+
+    found = {}
+
+    def visit(name, obj):
+        if isinstance(obj, h5py.Dataset):
+            group, _, index = name.replace('\\', '/').rpartition('/vars/')
+            if group:
+                found.setdefault(group, {})[int(index)] = obj[()]
+
+    with h5py.File(weights_file, 'r') as h5:
+        h5.visititems(visit)
+    return {group: [v[i] for i in sorted(v)] for group, v in found.items()}
+
+
+def export_keras_file(keras_path: str, npz_path: Optional[str] = None) -> NumpyModel:
+    """
+    ``.keras``-архив → NumpyModel без TensorFlow: конфиг из config.json,
+    веса из model.weights.h5 (группы layers/<snake_case класса>[_N] в
+    порядке слоёв; у LSTM — layers/lstm/cell).
+    """
+    if not zipfile.is_zipfile(keras_path):
+        raise UnsupportedModel(f"{keras_path} is not a .keras archive")
+    with zipfile.ZipFile(keras_path) as archive:
+        config = json.loads(archive.read('config.json'))
+        h5_vars = _read_h5_vars(io.BytesIO(archive.read('model.weights.h5')))
+
+    if config.get('class_name') != 'Sequential':
+        raise UnsupportedModel(f"{config.get('class_name')} model")
+    layer_configs = config['config']['layers']
+    input_shape = config['config'].get('build_input_shape')
+    counters = {}
+    layers = []
+    for entry in layer_configs:
+        class_name, layer_cfg = entry['class_name'], entry['config']
+        if class_name == 'InputLayer':
+            input_shape = layer_cfg.get('batch_input_shape') or layer_cfg.get('batch_shape')
+            continue
+        base = _snake_case(class_name)
+        n = counters.get(base, 0)
+        counters[base] = n + 1
+        group = f"layers/{base}" + (f"_{n}" if n else '')
+        weights = h5_vars.get(group) or h5_vars.get(group + '/cell') or []
+        built = _build_layer(class_name, layer_cfg, weights)
+        if built is not None:
+            layers.append(built)
+    if input_shape is None:
+        raise UnsupportedModel(f"{keras_path}: no input shape")
+    model = NumpyModel(layers, input_shape)
+    if npz_path:
+        model.save(npz_path)
+    return model
+
+
+def max_abs_error(model: NumpyModel, keras_model, samples: int = 8, seed: int = 0) -> float:
+    """Максимальное |Δ| между NumPy и Keras на случайных входах [0, 1)."""
+    rng = np.random.default_rng(seed)
+    x = rng.random((samples,) + tuple(keras_model.input_shape[1:]), dtype=np.float32)
+    expected = np.asarray(keras_model(x, training=False))
+    return float(np.max(np.abs(model.predict(x) - expected)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export .keras weights to .npz for NumPy inference")
+    parser.add_argument('models', nargs='+', help=".keras files")
+    parser.add_argument('--out-dir', default=os.path.join('data', 'model_cache'))
+    parser.add_argument('--verify', action='store_true',
+                        help=f"compare with Keras outputs (needs TensorFlow), max |Δ| ≤ {PARITY_ATOL:g}")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for path in args.models:
+        out = os.path.join(args.out_dir, os.path.splitext(os.path.basename(path))[0] + '.npz')
+        try:
+            model = export_keras_file(path, out)
+        except Exception as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            failed = True
+            continue
+        line = f"{path} → {out} ({len(model.layers)} layers, input {model.input_shape})"
+        if args.verify:
+            import tensorflow as tf
+            error = max_abs_error(model, tf.keras.models.load_model(path, compile=False))
+            line += f", max |Δ| = {error:.2e}"
+            failed |= error > PARITY_ATOL
+        print(line)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
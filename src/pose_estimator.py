@@ -1,8 +1,96 @@
+"""
+Head pose (pitch, yaw, roll) from face mesh landmarks via PnP.
+
+``HeadPoseEstimator`` keeps per-stream state so consecutive frames are cheap
+and stable:
+
+    * camera intrinsics are built once per resolution and cached;
+    * ``solvePnP`` (ITERATIVE) starts from the previous frame's rvec/tvec
+      (``useExtrinsicGuess``) and converges in a couple of iterations;
+    * Euler angles pass through a One Euro filter — strong smoothing while
+      the head is still, little lag when it moves;
+    * ``reset()`` drops the state when the face is lost.
+
+With the FaceLandmarker task the pose comes for free:
+``get_pose_from_matrix`` converts its facial transformation matrix
+(OpenGL camera axes) to the same angles and passes them through the same
+filter, with no PnP solve at all.
+
+``estimate_batch`` runs the same warm-started, filtered chain over a
+``(T, N, 3)`` landmark tensor with its own state, for replays of recorded
+sessions.  Filtering and solver are configured in the ``face`` config
+section (``head_pose_*``).
+"""
+
+import math
+import time
+from typing import Callable, Optional, Tuple
+
 import cv2
 import numpy as np
 
+from src.geometry import as_points
+
+# MediaPipe FaceMesh: нос, подбородок, внешние углы глаз, углы рта
+POSE_LANDMARK_IDXS = [1, 152, 33, 263, 61, 291]
+
+_SOLVERS = {
+    'iterative': cv2.SOLVEPNP_ITERATIVE,
+    'epnp': cv2.SOLVEPNP_EPNP,
+    'sqpnp': getattr(cv2, 'SOLVEPNP_SQPNP', cv2.SOLVEPNP_EPNP),
+}
+
+# Оси камеры OpenGL (y вверх, взгляд вдоль -z) → OpenCV (y вниз, взгляд вдоль +z)
+_GL_TO_CV = np.diag([1.0, -1.0, -1.0])
+
+
+class OneEuroFilter:
+    """
+    One Euro filter для вектора значений.
+
+    Частота среза растёт со скоростью сигнала: min_cutoff (Гц) подавляет
+    дрожание в покое, beta уменьшает запаздывание при быстрых движениях.
+    """
+
+    def __init__(self, min_cutoff: float = 1.0, beta: float = 0.05, d_cutoff: float = 1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self._x = None
+        self._dx = None
+        self._t = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2.0 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, x: np.ndarray, t: float) -> np.ndarray:
+        if self._x is None:
+            self._x = x
+            self._dx = np.zeros_like(x)
+            self._t = t
+            return x
+        dt = t - self._t
+        if dt <= 0:
+            return self._x
+        self._t = t
+
+        a_d = self._alpha(self.d_cutoff, dt)
+        self._dx = a_d * (x - self._x) / dt + (1.0 - a_d) * self._dx
+        cutoff = self.min_cutoff + self.beta * np.abs(self._dx)
+        a = self._alpha(cutoff, dt)
+        self._x = a * x + (1.0 - a) * self._x
+        return self._x
+
+
 class HeadPoseEstimator:
-    def __init__(self):
+    def __init__(self, warm_start: bool = True, solver: str = 'iterative',
+                 smoothing: bool = True, min_cutoff: float = 1.0, beta: float = 0.05,
+                 clock: Callable[[], float] = time.monotonic):
         # 3D координаты стандартной модели лица (мм)
         # Точки: нос, подбородок, левый глаз, правый глаз, левый рот, правый рот
         self.model_points = np.array([
@@ -13,6 +101,52 @@ class HeadPoseEstimator:
             (-150.0, -150.0, -125.0),    # Левый угол рта
             (150.0, -150.0, -125.0)      # Правый угол рта
         ])
+        self._dist = np.zeros((4, 1), dtype=np.float64)
+        self._cameras = {}               # (w, h) → матрица камеры
+
+        self.solver = solver if solver in _SOLVERS else 'iterative'
+        # Начальное приближение поддерживает только ITERATIVE
+        self.warm_start = warm_start and self.solver == 'iterative'
+        self._rvec = None
+        self._tvec = None
+
+        self._smoothing = smoothing
+        self._filter_params = (min_cutoff, beta)
+        self._filter = OneEuroFilter(min_cutoff, beta) if smoothing else None
+        self._clock = clock
+
+    @classmethod
+    def from_config(cls, cfg: dict, **kwargs) -> 'HeadPoseEstimator':
+        """Параметры из секции face конфига."""
+        return cls(
+            warm_start=cfg.get('head_pose_warm_start', True),
+            solver=cfg.get('head_pose_solver', 'iterative'),
+            smoothing=cfg.get('head_pose_smoothing', True),
+            min_cutoff=cfg.get('head_pose_min_cutoff', 1.0),
+            beta=cfg.get('head_pose_beta', 0.05),
+            **kwargs,
+        )
+
+    def reset(self):
+        """Лицо потеряно: следующий кадр решается с нуля, фильтр сбрасывается."""
+        self._rvec = None
+        self._tvec = None
+        if self._filter is not None:
+            self._filter.reset()
+
+    def camera_matrix(self, img_w: int, img_h: int) -> np.ndarray:
+        """Матрица камеры (cx = img_w/2, cy = img_h/2, f = img_w), кэш по разрешению."""
+        key = (img_w, img_h)
+        cam = self._cameras.get(key)
+        if cam is None:
+            focal_length = 1.0 * img_w
+            cam = np.array([
+                [focal_length, 0,          img_w / 2],
+                [0,          focal_length, img_h / 2],
+                [0,          0,            1]
+            ], dtype=np.float64)
+            self._cameras[key] = cam
+        return cam
 
     def get_pose(self, frame, landmarks):
         """
@@ -24,48 +158,95 @@ class HeadPoseEstimator:
         roll:  наклон головы к плечу
         """
         img_h, img_w, _ = frame.shape
+        return self.get_pose_from_points(as_points(landmarks), img_w, img_h)
 
-        # MediaPipe FaceMesh indices → 2D pixel coords
-        face_2d = []
-        for idx in [1, 152, 33, 263, 61, 291]:
-            x = int(landmarks.landmark[idx].x * img_w)
-            y = int(landmarks.landmark[idx].y * img_h)
-            face_2d.append([x, y])
-
-        face_2d = np.array(face_2d, dtype=np.float64)
-
-        # Матрица камеры (правильный порядок: cx = img_w/2, cy = img_h/2)
-        focal_length = 1.0 * img_w
-        cam_matrix = np.array([
-            [focal_length, 0,          img_w / 2],
-            [0,          focal_length, img_h / 2],
-            [0,          0,            1]
-        ])
+    def get_pose_from_points(self, points, img_w, img_h,
+                             timestamp: Optional[float] = None) -> Tuple[float, float, float]:
+        """То же по массиву landmarks (N, 2|3) и размеру кадра.
 
-        dist_matrix = np.zeros((4, 1), dtype=np.float64)
+        timestamp — время кадра для фильтра (по умолчанию часы estimator'а;
+        для файлов передаётся медиа-время, чтобы прогон был детерминированным).
+        """
+        face_2d = self._image_points(points, img_w, img_h)
+        angles = self._solve(face_2d, self.camera_matrix(img_w, img_h))
+        if angles is None:
+            self.reset()
+            return 0.0, 0.0, 0.0
+        return self._smooth(angles, timestamp)
+
+    def get_pose_from_matrix(self, matrix, timestamp: Optional[float] = None
+                             ) -> Tuple[float, float, float]:
+        """Поза из facial transformation matrix FaceLandmarker (4×4), без solvePnP."""
+        rmat = _GL_TO_CV @ np.asarray(matrix, dtype=np.float64)[:3, :3]
+        return self._smooth(self._euler(rmat), timestamp)
+
+    def estimate_batch(self, points, img_w, img_h, timestamps=None,
+                       fps: float = 30.0) -> np.ndarray:
+        """
+        Поза головы для последовательности (T, N, 3) → (T, 3) [pitch, yaw, roll].
 
-        # SolvePnP
-        success, rot_vec, trans_vec = cv2.solvePnP(
-            self.model_points, face_2d, cam_matrix, dist_matrix,
-            flags=cv2.SOLVEPNP_ITERATIVE
+        Отдельное состояние (тёплый старт + фильтр), живой поток не затрагивается;
+        timestamps по умолчанию — t / fps.
+        """
+        points = np.asarray(points)
+        replay = HeadPoseEstimator(
+            warm_start=self.warm_start, solver=self.solver, smoothing=self._smoothing,
+            min_cutoff=self._filter_params[0], beta=self._filter_params[1],
         )
+        replay._cameras = self._cameras
+        if timestamps is None:
+            timestamps = np.arange(len(points)) / fps
+        out = np.empty((len(points), 3), dtype=np.float64)
+        for t in range(len(points)):
+            out[t] = replay.get_pose_from_points(points[t], img_w, img_h, float(timestamps[t]))
+        return out
 
-        if not success:
-            return 0.0, 0.0, 0.0
+    # ── Internals ──────────────────────────────────────────────
 
-        # Rodrigues → rotation matrix
-        rmat, jac = cv2.Rodrigues(rot_vec)
+    def _smooth(self, angles: np.ndarray, timestamp: Optional[float]) -> Tuple[float, float, float]:
+        if self._filter is not None:
+            t = self._clock() if timestamp is None else timestamp
+            angles = self._filter(angles, t)
+        pitch, yaw, roll = angles.tolist()
+        return pitch, yaw, roll
 
+    @staticmethod
+    def _euler(rmat: np.ndarray) -> np.ndarray:
+        """Матрица поворота → [pitch, yaw, roll] в градусах, свёрнутые в [-90, 90]."""
         # Rotation matrix → Euler angles (RQ decomposition)
-        angles = cv2.RQDecomp3x3(rmat)[0]
+        angles = np.asarray(cv2.RQDecomp3x3(rmat)[0], dtype=np.float64)
+        return ((angles + 90) % 180) - 90
 
-        pitch = float(angles[0])
-        yaw   = float(angles[1])
-        roll  = float(angles[2])
+    @staticmethod
+    def _image_points(points, img_w, img_h) -> np.ndarray:
+        # MediaPipe FaceMesh indices → 2D pixel coords (целые пиксели, как раньше)
+        return np.trunc(
+            points[POSE_LANDMARK_IDXS, :2].astype(np.float64) * (img_w, img_h)
+        )
+
+    def _solve(self, face_2d: np.ndarray, cam_matrix: np.ndarray) -> Optional[np.ndarray]:
+        """SolvePnP (с тёплым стартом) → сырые углы [pitch, yaw, roll] или None."""
+        if self.warm_start and self._rvec is not None:
+            success, rot_vec, trans_vec = cv2.solvePnP(
+                self.model_points, face_2d, cam_matrix, self._dist,
+                rvec=self._rvec.copy(), tvec=self._tvec.copy(),
+                useExtrinsicGuess=True, flags=cv2.SOLVEPNP_ITERATIVE
+            )
+            # Решение «за камерой» — приближение увело не туда, решаем с нуля
+            if not success or trans_vec[2, 0] <= 0:
+                self._rvec = None
+                return self._solve(face_2d, cam_matrix)
+        else:
+            success, rot_vec, trans_vec = cv2.solvePnP(
+                self.model_points, face_2d, cam_matrix, self._dist,
+                flags=_SOLVERS[self.solver]
+            )
 
-        # Fold angles into [-90, 90]
-        pitch = ((pitch + 90) % 180) - 90
-        yaw   = ((yaw + 90) % 180) - 90
-        roll  = ((roll + 90) % 180) - 90
+        if not success:
+            return None
+        if self.warm_start:
+            self._rvec, self._tvec = rot_vec, trans_vec
 
-        return pitch, yaw, roll
\ No newline at end of file
+        # Rodrigues → rotation matrix
+        rmat, jac = cv2.Rodrigues(rot_vec)
+        return self._euler(rmat)
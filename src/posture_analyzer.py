@@ -1,7 +1,8 @@
 import numpy as np
 from collections import deque
 import time
-import math
+
+from src.geometry import as_points, posture_metrics_from_points
 
 
 class PostureAnalyzer:
@@ -13,6 +14,8 @@ class PostureAnalyzer:
     - Forward head: наклон головы вперёд (по положению носа относительно центра)
     - Head tilt: наклон головы вбок (по symmetry лица)
     - Face confidence: насколько лицо находится в центре кадра
+    
+    Формулы — ядра src/geometry.py (*_batch), общие с офлайн-пересчётом записей.
     """
     
     def __init__(self, window_size_seconds=5, bad_threshold=60):
@@ -46,20 +49,10 @@ class PostureAnalyzer:
             return self._get_default_metrics()
         
         try:
-            nose = face_landmarks.landmark[1]
-            left_ear = face_landmarks.landmark[234]
-            right_ear = face_landmarks.landmark[454]
-            forehead = face_landmarks.landmark[10]
-            chin = face_landmarks.landmark[152]
-            left_eye = face_landmarks.landmark[33]
-            right_eye = face_landmarks.landmark[263]
-            
-            face_center_x = (left_ear.x + right_ear.x) / 2
-            face_center_y = (nose.y + chin.y + forehead.y) / 3
-            
-            head_tilt = self._calculate_head_tilt(left_ear, right_ear, left_eye, right_eye)
-            head_forward = self._calculate_head_forward(nose, forehead, chin)
-            face_position_score = self._calculate_face_position(face_center_x, face_center_y)
+            # Те же ядра, что и в офлайн-пересчёте (geometry.*_batch), с T=1
+            head_tilt, head_forward, face_position_score = posture_metrics_from_points(
+                as_points(face_landmarks)
+            )
             
             self.head_tilt_history.append(head_tilt)
             self.head_forward_history.append(head_forward)
@@ -79,58 +72,9 @@ class PostureAnalyzer:
                 'is_bad': is_bad,
             }
             
-        except (AttributeError, IndexError) as e:
+        except (AttributeError, IndexError, TypeError) as e:
             return self._get_default_metrics()
     
-    def _calculate_head_tilt(self, left_ear, right_ear, left_eye, right_eye):
-        """
-        Рассчитать наклон головы вбок (градусы).
-        Использует угол линии глаз относительно линии ушей.
-        """
-        try:
-            eye_center_x = (left_eye.x + right_eye.x) / 2
-            ear_center_x = (left_ear.x + right_ear.x) / 2
-            dx = right_ear.x - left_ear.x
-
-            if dx < 0.03:
-                return 0
-
-            # Наклон = смещение центра глаз относительно центра ушей
-            # в процентах от ширины головы, затем маппинг в градусы
-            tilt_pct = (eye_center_x - ear_center_x) / dx
-            return float(np.clip(tilt_pct * 45, -30.0, 30.0))
-        except:
-            return 0
-
-    def _calculate_head_forward(self, nose, forehead, chin):
-        """
-        Рассчитать выдвижение/наклон головы вперёд.
-        Использует вертикальное смещение носа относительно центра лица.
-        """
-        try:
-            face_height = chin.y - forehead.y
-            if face_height < 0.05:
-                return 0
-            # Центр лица по вертикали
-            face_center_y = (forehead.y + chin.y) / 2
-            # Насколько нос смещён вниз от центра (чем больше наклон вперёд,
-            # тем ниже нос относительно центра лица)
-            nose_offset = (nose.y - face_center_y) / face_height
-            # Норма: нос чуть выше центра (~-0.05). Отклонение > 0 = наклон вперёд
-            forward_score = max(0, nose_offset + 0.05)
-            return float(forward_score)
-        except:
-            return 0
-    
-    def _calculate_face_position(self, face_center_x, face_center_y):
-        """
-        Насколько лицо смещено от центра кадра.
-        """
-        dx = abs(face_center_x - 0.5)
-        dy = abs(face_center_y - 0.4)
-        
-        return math.sqrt(dx**2 + dy**2)
-    
     def _calculate_posture_score(self, head_tilt, head_forward, face_position):
         """
         Рассчитать общий скор осанки (0-100, где 100 = очень плохая осанка).
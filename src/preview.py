@@ -0,0 +1,143 @@
+"""
+Preview frames for the video widget, produced only when someone can see them.
+
+``PreviewRenderer`` sits between the pipeline's render stage and the Qt
+UI and decides, per frame, whether a preview is needed at all:
+
+    claim()        before inference — True if this frame will be shown
+                   (window visible, display refresh interval elapsed,
+                   a display buffer is free).  Frames that are not
+                   claimed skip overlay drawing entirely.
+    render(bgr)    resize straight into a preallocated BGR buffer of the
+                   widget's size (``cv2.resize`` + ``INTER_AREA``, no RGB
+                   copy, no ``QImage.scaled``); the UI wraps it as
+                   ``QImage.Format_BGR888``.
+    release()      called by the UI once the buffer has been converted to
+                   a pixmap, so the buffer may be reused.
+
+Buffers form a small ring: at most ``buffers`` previews are in flight
+between the video thread and the UI, and the ring slot handed out next is
+always one the UI has already released.  If the UI falls behind, frames
+are simply not claimed.  The class is Qt-free; ``MainWindow`` feeds it the
+widget size, screen refresh rate and window visibility.
+"""
+
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+def fit_size(src_w: int, src_h: int, dst_w: int, dst_h: int) -> Tuple[int, int]:
+    """Наибольший размер с пропорциями src, который помещается в dst."""
+    if src_w <= 0 or src_h <= 0:
+        return max(1, dst_w), max(1, dst_h)
+    scale = min(dst_w / src_w, dst_h / src_h)
+    return max(1, int(round(src_w * scale))), max(1, int(round(src_h * scale)))
+
+
+class PreviewRenderer:
+    """Готовит превью нужного размера с нужной частотой и только для видимого окна."""
+
+    def __init__(self, size: Tuple[int, int] = (800, 600), max_fps: float = 60.0,
+                 buffers: int = 3, clock: Callable[[], float] = time.monotonic):
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._target = (max(1, size[0]), max(1, size[1]))
+        self._interval = 1.0 / max_fps if max_fps else 0.0
+        self._visible = True
+
+        self._ring_size = max(1, buffers)
+        self._ring: List[np.ndarray] = []
+        self._stale: List[np.ndarray] = []
+        self._ring_shape = None
+        self._next_slot = 0
+        self._in_flight = 0
+        self._last_claim = float('-inf')
+
+        self.rendered = 0
+        self.skipped = 0
+
+    # ── UI side ────────────────────────────────────────────────
+
+    def set_visible(self, visible: bool):
+        with self._lock:
+            self._visible = bool(visible)
+
+    def set_target_size(self, width: int, height: int):
+        with self._lock:
+            self._target = (max(1, int(width)), max(1, int(height)))
+
+    def set_max_fps(self, fps: Optional[float]):
+        with self._lock:
+            self._interval = 1.0 / fps if fps else 0.0
+
+    def release(self):
+        """UI забрал кадр (QPixmap.fromImage скопировал данные)."""
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            if not self._in_flight:
+                self._stale.clear()
+
+    @property
+    def visible(self) -> bool:
+        return self._visible
+
+    # ── Video thread side ──────────────────────────────────────
+
+    def claim(self) -> bool:
+        """Будет ли этот кадр показан. Вызывается до отрисовки оверлеев."""
+        now = self._clock()
+        with self._lock:
+            if not self._visible:
+                return False
+            # Небольшой допуск: камера 30 fps и экран 30 Hz не должны
+            # терять каждый второй кадр из-за дрожания таймстампов
+            if now - self._last_claim < 0.8 * self._interval:
+                self.skipped += 1
+                return False
+            if self._in_flight >= self._ring_size:
+                self.skipped += 1
+                return False
+            self._last_claim = now
+            return True
+
+    def render(self, image: np.ndarray) -> Optional[np.ndarray]:
+        """BGR кадр → буфер размера виджета (с сохранением пропорций) или None."""
+        with self._lock:
+            if not self._visible or self._in_flight >= self._ring_size:
+                return None
+            src_h, src_w = image.shape[:2]
+            out_w, out_h = fit_size(src_w, src_h, *self._target)
+            shape = (out_h, out_w, 3)
+            if shape != self._ring_shape:
+                # Новый размер виджета: кольцо пересоздаётся, а старые буферы
+                # живут, пока UI не отпустит все QImage, которые на них смотрят
+                if self._in_flight:
+                    self._stale.extend(self._ring)
+                self._ring = [np.empty(shape, dtype=np.uint8)
+                              for _ in range(self._ring_size)]
+                self._ring_shape = shape
+                self._next_slot = 0
+            buf = self._ring[self._next_slot]
+            self._next_slot = (self._next_slot + 1) % self._ring_size
+            self._in_flight += 1
+            self.rendered += 1
+
+        if (out_w, out_h) == (src_w, src_h):
+            np.copyto(buf, image)
+        else:
+            interpolation = cv2.INTER_AREA if out_w < src_w else cv2.INTER_LINEAR
+            cv2.resize(image, (out_w, out_h), dst=buf, interpolation=interpolation)
+        return buf
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                'preview_visible': self._visible,
+                'preview_size': self._target,
+                'preview_rendered': self.rendered,
+                'preview_skipped': self.skipped,
+            }
@@ -0,0 +1,232 @@
+"""
+Load-adaptive cadence governor for the analytics stage.
+
+The video loop runs two optional workloads at a frame interval:
+heavy ML (LSTM, pose, posture, emotion) and hand tracking.  Fixed
+intervals are either too slow for strong machines or too heavy for weak
+ones, so the governor measures and adapts:
+
+    governor = ProcessingGovernor.from_config(config_manager.performance)
+    if governor.should_run('ml', frame_counter):
+        t0 = time.perf_counter(); ...; governor.record_stage('ml', time.perf_counter() - t0)
+    governor.record_frame(analytics_seconds)
+    decision = governor.evaluate()        # dict or None
+
+Every ``evaluate_period`` seconds the rolling window of per-frame cost
+(relative to the ``1 / target_fps`` budget) and process CPU usage
+(relative to ``cpu_ceiling``) is classified as overloaded, underloaded
+or fine.  Only after ``hysteresis`` consecutive identical verdicts is one
+interval changed by one step:
+
+    overloaded  → raise the ML interval first, then the hand interval
+    underloaded → lower the hand interval first, then the ML interval
+
+Intervals never leave their configured ``[min, max]`` range.  Decisions
+are logged, kept in ``decisions`` and reported by ``get_stats()``.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+from src.logger import logger
+
+
+class StageCadence:
+    """Интервал запуска одной нагрузки + скользящее среднее её времени."""
+
+    def __init__(self, name: str, interval: int, min_interval: int, max_interval: int,
+                 window: int = 30):
+        self.name = name
+        self.min_interval = max(1, min_interval)
+        self.max_interval = max(self.min_interval, max_interval)
+        self.interval = min(max(interval, self.min_interval), self.max_interval)
+        self._times = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self._times.append(seconds)
+
+    @property
+    def mean_time(self) -> float:
+        return sum(self._times) / len(self._times) if self._times else 0.0
+
+    @property
+    def amortized_cost(self) -> float:
+        """Средняя стоимость нагрузки в пересчёте на один кадр."""
+        return self.mean_time / self.interval
+
+
+class ProcessingGovernor:
+    """Подбирает интервалы тяжёлых нагрузок под целевой FPS и потолок CPU."""
+
+    OVERLOADED = 'overloaded'
+    UNDERLOADED = 'underloaded'
+    STEADY = 'steady'
+
+    # Порядок «жертв» при перегрузке; при запасе — обратный
+    _RAISE_ORDER = ('ml', 'hands')
+
+    def __init__(self, target_fps: float = 30.0, cpu_ceiling: float = 0.75,
+                 ml_interval: int = 8, ml_interval_min: int = 2, ml_interval_max: int = 30,
+                 hand_interval: int = 1, hand_interval_min: int = 1, hand_interval_max: int = 4,
+                 window: int = 60, evaluate_period: float = 1.0, hysteresis: int = 3,
+                 enabled: bool = True,
+                 on_decision: Optional[Callable[[dict], None]] = None,
+                 cpu_time: Callable[[], float] = time.process_time,
+                 clock: Callable[[], float] = time.monotonic):
+        self.enabled = enabled
+        self.target_fps = target_fps
+        self.cpu_ceiling = cpu_ceiling
+        self._budget = 1.0 / target_fps
+        self._evaluate_period = evaluate_period
+        self._hysteresis = hysteresis
+        self._on_decision = on_decision
+        self._cpu_time = cpu_time
+        self._clock = clock
+        self._cores = os.cpu_count() or 1
+
+        self.stages: Dict[str, StageCadence] = {
+            'ml': StageCadence('ml', ml_interval, ml_interval_min, ml_interval_max),
+            'hands': StageCadence('hands', hand_interval, hand_interval_min, hand_interval_max),
+        }
+
+        self._lock = threading.Lock()
+        self._frame_costs = deque(maxlen=window)
+        self._last_eval = clock()
+        self._last_cpu = cpu_time()
+        self._verdict = self.STEADY
+        self._streak = 0
+        self.cpu_load = 0.0
+        self.frame_load = 0.0
+        self.decisions = deque(maxlen=20)
+
+    @classmethod
+    def from_config(cls, cfg: dict, **kwargs) -> 'ProcessingGovernor':
+        keys = (
+            'target_fps', 'cpu_ceiling',
+            'ml_interval', 'ml_interval_min', 'ml_interval_max',
+            'hand_interval', 'hand_interval_min', 'hand_interval_max',
+            'hysteresis',
+        )
+        params = {k: cfg[k] for k in keys if k in cfg}
+        params['enabled'] = cfg.get('governor_enabled', True)
+        params.update(kwargs)
+        return cls(**params)
+
+    # ── Hot path ───────────────────────────────────────────────
+
+    def interval(self, name: str) -> int:
+        return self.stages[name].interval
+
+    def should_run(self, name: str, frame_counter: int) -> bool:
+        return frame_counter % self.stages[name].interval == 0
+
+    def record_stage(self, name: str, seconds: float):
+        with self._lock:
+            self.stages[name].record(seconds)
+
+    def record_frame(self, seconds: float):
+        """Полное время аналитики одного кадра (включая ML/руки, если запускались)."""
+        with self._lock:
+            self._frame_costs.append(seconds)
+
+    # ── Evaluation ─────────────────────────────────────────────
+
+    def evaluate(self) -> Optional[dict]:
+        """Раз в evaluate_period секунд оценить нагрузку; вернуть решение или None."""
+        now = self._clock()
+        elapsed = now - self._last_eval
+        if elapsed < self._evaluate_period:
+            return None
+
+        cpu_now = self._cpu_time()
+        with self._lock:
+            self.cpu_load = max(0.0, (cpu_now - self._last_cpu) / (elapsed * self._cores))
+            self._last_cpu = cpu_now
+            self._last_eval = now
+            if not self._frame_costs:
+                return None
+            mean_cost = sum(self._frame_costs) / len(self._frame_costs)
+            self.frame_load = mean_cost / self._budget
+
+            verdict = self._classify(mean_cost)
+            if verdict == self._verdict:
+                self._streak += 1
+            else:
+                self._verdict = verdict
+                self._streak = 1
+
+            if not self.enabled or verdict == self.STEADY or self._streak < self._hysteresis:
+                return None
+
+            decision = self._step(verdict, mean_cost)
+            # После изменения ждём полного нового окна гистерезиса
+            self._streak = 0
+            if decision is not None:
+                self._frame_costs.clear()
+                self.decisions.append(decision)
+
+        if decision is not None:
+            logger.info(
+                f"Governor: {decision['stage']} interval {decision['old']} → "
+                f"{decision['new']} ({decision['reason']}, frame_load="
+                f"{decision['frame_load']:.2f}, cpu={decision['cpu_load']:.2f})"
+            )
+            if self._on_decision is not None:
+                try:
+                    self._on_decision(decision)
+                except Exception as e:
+                    logger.error(f"Governor: on_decision: {e}")
+        return decision
+
+    def _classify(self, mean_cost: float) -> str:
+        if mean_cost > 0.9 * self._budget or self.cpu_load > self.cpu_ceiling:
+            return self.OVERLOADED
+        if mean_cost < 0.6 * self._budget and self.cpu_load < 0.8 * self.cpu_ceiling:
+            return self.UNDERLOADED
+        return self.STEADY
+
+    def _step(self, verdict: str, mean_cost: float) -> Optional[dict]:
+        if verdict == self.OVERLOADED:
+            for name in self._RAISE_ORDER:
+                stage = self.stages[name]
+                if stage.interval < stage.max_interval:
+                    return self._apply(stage, stage.interval + 1, verdict)
+            return None
+
+        for name in reversed(self._RAISE_ORDER):
+            stage = self.stages[name]
+            if stage.interval <= stage.min_interval:
+                continue
+            # Прогноз: уложимся ли в бюджет, если запускать чаще
+            extra = stage.mean_time / (stage.interval - 1) - stage.amortized_cost
+            if mean_cost + extra < 0.8 * self._budget:
+                return self._apply(stage, stage.interval - 1, verdict)
+        return None
+
+    def _apply(self, stage: StageCadence, new_interval: int, reason: str) -> dict:
+        old = stage.interval
+        stage.interval = new_interval
+        return {
+            'time': time.time(),
+            'stage': stage.name,
+            'old': old,
+            'new': new_interval,
+            'reason': reason,
+            'frame_load': self.frame_load,
+            'cpu_load': self.cpu_load,
+        }
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            last = self.decisions[-1] if self.decisions else None
+            return {
+                'ml_interval': self.stages['ml'].interval,
+                'hand_interval': self.stages['hands'].interval,
+                'frame_load': round(self.frame_load, 2),
+                'cpu_load': round(self.cpu_load, 2),
+                'verdict': self._verdict,
+                'last_decision': dict(last) if last else None,
+            }
@@ -1,7 +1,6 @@
 from .face_processor import FaceProcessor, EmotionProcessor
 from .fatigue_processor import FatigueProcessor
 from .posture_processor import PostureProcessor
-from .hand_processor import HandProcessor
 
 __all__ = [
     'FaceProcessor',
@@ -10,3 +9,12 @@ __all__ = [
     'PostureProcessor',
     'HandProcessor'
 ]
+
+
+def __getattr__(name):
+    # HandProcessor тянет gesture_controller → pyautogui, которому на Linux
+    # нужен X-дисплей: импортируем только по запросу (headless-движок без рук)
+    if name == 'HandProcessor':
+        from .hand_processor import HandProcessor
+        return HandProcessor
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,69 +1,94 @@
+import time
 from typing import Optional, Tuple
 import numpy as np
-from src.face_core import FaceMeshDetector
+from src.face_core import create_face_detector
+from src.frame_result import FaceResult
 from src.pose_estimator import HeadPoseEstimator
-from src.geometry import calculate_ear, calculate_mar
+from src.landmark_frame import FaceResults, LandmarkFrame
+from src.landmark_predictor import LandmarkPredictor
 from src.config_manager import config_manager
 from src.logger import logger
 from build_utils import resource_path
 
 
 class FaceProcessor:
-    def __init__(self):
-        self.detector = FaceMeshDetector()
-        self.pose_estimator = HeadPoseEstimator()
-        
+    def __init__(self, tracker: Optional[str] = None):
         self._config = config_manager.face
+        # face_mesh (синхронный граф) или landmarker (FaceLandmarker task)
+        self.detector = create_face_detector(self._config, tracker)
+        # Тёплый старт PnP + сглаживание углов между кадрами
+        self.pose_estimator = HeadPoseEstimator.from_config(self._config)
+        # Оценка landmarks для кадров, на которых face mesh не запускался
+        self.predictor = LandmarkPredictor()
         self._yaw_threshold = self._config.get('yaw_threshold', 40)
         self._pitch_offset = self._config.get('pitch_offset', 5.0)
         self._pitch_min = self._config.get('pitch_threshold_min', 0.0)
         self._pitch_max = self._config.get('pitch_threshold_max', 30.0)
     
-    def process(self, frame, results) -> dict:
-        data = {
-            'detected': False,
-            'valid': False,
-            'landmarks': None,
-            'ear': 0.35,
-            'mar': 0.15,
-            'pitch': 0.0,
-            'yaw': 0.0,
-            'roll': 0.0,
-            'emotion': 'No Face'
-        }
+    def predicted_results(self, timestamp: Optional[float] = None) -> Optional[FaceResults]:
+        """Results с предсказанными landmarks для кадра без инференса (или None)."""
+        points = self.predictor.predict(time.monotonic() if timestamp is None else timestamp)
+        return FaceResults(LandmarkFrame(points)) if points is not None else None
+
+    def process(self, frame, results, timestamp: Optional[float] = None,
+                predicted: bool = False) -> FaceResult:
+        """
+        Геометрия лица по results FaceMesh.
+
+        timestamp — время кадра (медиа-время для файлов) для фильтра позы
+        головы; None — монотонные часы.
+
+        С FaceLandmarker в results есть blendshapes (моргание / челюсть,
+        0..1 — в FaceResult.blendshapes) и матрица позы: тогда поза берётся
+        из неё без solvePnP.
+
+        predicted — results из predicted_results(): в предсказатель не
+        возвращаются.
+        """
+        data = FaceResult()
         
         try:
             if results is None or not hasattr(results, 'multi_face_landmarks') or not results.multi_face_landmarks:
+                # Лицо потеряно — поза следующего лица решается с нуля
+                self.pose_estimator.reset()
+                self.predictor.reset()
                 return data
             
-            landmarks = results.multi_face_landmarks[0]
-            lm_points = landmarks.landmark
-            
-            x_coords = [p.x for p in lm_points]
-            y_coords = [p.y for p in lm_points]
-            
-            min_x, max_x = min(x_coords), max(x_coords)
-            min_y, max_y = min(y_coords), max(y_coords)
+            # Один массив landmarks на кадр: bbox / EAR / MAR / поза считаются
+            # из него и кэшируются для fatigue, posture и emotion
+            img_h, img_w = frame.shape[:2]
+            landmarks = LandmarkFrame.from_landmarks(
+                results.multi_face_landmarks[0], img_w, img_h
+            )
+            if not predicted:
+                self.predictor.update(
+                    landmarks.points, time.monotonic() if timestamp is None else timestamp
+                )
+            min_x, min_y, max_x, max_y = landmarks.bbox
             
             is_detected = not (min_x < 0.01 or max_x > 0.99 or min_y < 0.01 or max_y > 0.99)
             
-            raw_pitch, yaw, roll = self.pose_estimator.get_pose(frame, landmarks)
+            raw_pitch, yaw, roll = landmarks.head_pose(
+                self.pose_estimator, timestamp,
+                matrix=getattr(results, 'transformation_matrix', None),
+            )
             pitch = raw_pitch + self._pitch_offset
             
             is_face_valid = is_detected and abs(yaw) <= self._yaw_threshold
             
-            data['detected'] = is_detected
-            data['valid'] = is_face_valid
-            data['landmarks'] = landmarks
-            data['pitch'] = pitch
-            data['yaw'] = yaw
-            data['roll'] = roll
+            data.detected = is_detected
+            # Бокс лица в нормализованных координатах — для RoiTracker
+            data.bbox = (min_x, min_y, max_x, max_y)
+            data.valid = is_face_valid
+            data.landmarks = landmarks
+            data.pitch = pitch
+            data.yaw = yaw
+            data.roll = roll
+            data.blendshapes = getattr(results, 'blendshapes', None)
             
             if is_face_valid:
-                ear = calculate_ear(lm_points)
-                mar = calculate_mar(lm_points)
-                data['ear'] = ear
-                data['mar'] = mar
+                data.ear = landmarks.ear
+                data.mar = landmarks.mar
             
             logger.debug(f"Face processed: detected={is_detected}, valid={is_face_valid}")
             
@@ -90,7 +115,7 @@ class EmotionProcessor:
             logger.warning(f"Could not initialize emotion detector: {e}")
             self.emotion_ai = None
     
-    def process(self, frame, landmarks) -> str:
+    def process(self, frame, landmarks, gray=None) -> str:
         if self.emotion_ai is None:
             return self._current_emotion
         
@@ -98,7 +123,7 @@ class EmotionProcessor:
             self._frame_counter += 1
             
             if self._frame_counter % 10 == 0:
-                emo, _ = self.emotion_ai.predict_emotion(frame, landmarks)
+                emo, _ = self.emotion_ai.predict_emotion(frame, landmarks, gray=gray)
                 if emo and emo not in ["Error", "No Face"]:
                     self._current_emotion = emo
             
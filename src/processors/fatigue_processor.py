@@ -1,6 +1,7 @@
 from typing import Optional
 from src.fatigue_analyzer import FatigueAnalyzer
 from src.config_manager import config_manager
+from src.frame_result import FatigueResult
 from src.logger import logger
 
 
@@ -18,21 +19,15 @@ class FatigueProcessor:
         self._yawn_limit = None
     
     def process(self, ear: float, mar: float, pitch: float, emotion: str,
-                current_time: float) -> dict:
-        result = {
-            'fatigue_score': 0,
-            'fatigue_level': 'normal',
-            'fatigue_status': 'Normal',
-            'event': None,
-            'cooldown_active': False
-        }
+                current_time: float) -> FatigueResult:
+        result = FatigueResult(fatigue_status='Normal', ear=ear, mar=mar)
         
         try:
             fatigue_data = self.analyzer.update(ear, mar, pitch, emotion, current_time)
             
-            result['fatigue_score'] = fatigue_data.get("fatigue_score", 0)
-            result['fatigue_level'] = fatigue_data.get("fatigue_level", "normal")
-            result['fatigue_status'] = fatigue_data.get("fatigue_level", "normal").capitalize()
+            result.fatigue_score = fatigue_data.get("fatigue_score", 0)
+            result.fatigue_level = fatigue_data.get("fatigue_level", "normal")
+            result.fatigue_status = result.fatigue_level.capitalize()
             
             # Yawn cooldown зависит от лимита зевков пользователя
             if self._yawn_limit is not None:
@@ -42,22 +37,22 @@ class FatigueProcessor:
             
             if mar > self._config.get('mar_threshold_yawn', 0.6):
                 if current_time - self._last_event_time >= cooldown:
-                    result['event'] = "Зевок"
-                    result['fatigue_status'] = "Yawning"
+                    result.event = "Зевок"
+                    result.fatigue_status = "Yawning"
                     self._last_event_time = current_time
             else:
                 fatigue_event = self.analyzer.get_fatigue_event(current_time)
                 if fatigue_event is not None:
-                    result['event'] = fatigue_event
-                    result['fatigue_status'] = fatigue_event
+                    result.event = fatigue_event
+                    result.fatigue_status = fatigue_event
                     if fatigue_event == "Сильная усталость":
-                        result['fatigue_status'] = "Fatigued"
+                        result.fatigue_status = "Fatigued"
                     elif fatigue_event == "Умеренная усталость":
-                        result['fatigue_status'] = "Tired"
+                        result.fatigue_status = "Tired"
                     elif fatigue_event == "Лёгкая усталость (снижение)":
-                        result['fatigue_status'] = "Mild"
+                        result.fatigue_status = "Mild"
             
-            logger.debug(f"Fatigue: level={result['fatigue_level']}, score={result['fatigue_score']}")
+            logger.debug(f"Fatigue: level={result.fatigue_level}, score={result.fatigue_score}")
             
         except Exception as e:
             logger.error(f"Error in FatigueProcessor: {e}")
@@ -1,8 +1,13 @@
 from src.hand_tracker import HandTracker
 from src.gesture_controller import GestureController
 from src.config_manager import config_manager
+from src.frame_result import HandResult
+from src.geometry import as_points
+from src.landmark_frame import LandmarkFrame
+from src.landmark_predictor import LandmarkPredictor
 from src.logger import logger
 import math
+import time
 
 
 class HandProcessor:
@@ -25,6 +30,8 @@ class HandProcessor:
 
         self._last_hand_position = None
         self._hand_size = None
+        # Оценка руки для кадров без инференса (интервал hands > 1)
+        self.predictor = LandmarkPredictor()
 
         # По умолчанию ВЫКЛЮЧЕНО
         self._enabled = self._config.get('enabled', False)
@@ -35,22 +42,17 @@ class HandProcessor:
         middle_tip = hand_landmarks.landmark[12]
         return math.sqrt((wrist.x - middle_tip.x)**2 + (wrist.y - middle_tip.y)**2)
     
-    def process(self, frame, frame_width, frame_height) -> dict:
-        result = {
-            'detected': False,
-            'landmarks': None,
-            'gesture': 'none',
-            'current_gesture': None,
-            'hand_size': None,
-            'palm_x': None,   # нормализованная позиция (0..1) для калибровки зоны
-            'palm_y': None,
-        }
+    def process(self, frame, frame_width, frame_height, rgb=None, roi=None,
+                draw=True, timestamp=None) -> HandResult:
+        result = HandResult()
         
         try:
-            hand_frame, hand_results = self.tracker.process_frame(frame, draw=True)
+            hand_frame, hand_results = self.tracker.process_frame(
+                frame, draw=draw, rgb=rgb, roi=roi
+            )
             hand_detected = self.tracker.is_hand_present(hand_results)
             
-            result['detected'] = hand_detected
+            result.detected = hand_detected
             
             # Всегда вычисляем hand_size и позицию ладони — даже когда жесты выключены
             # (нужно для калибровки зоны жестов и калибровки размера руки)
@@ -59,17 +61,24 @@ class HandProcessor:
                 hand_landmarks = self.tracker.get_landmarks(hand_results)
                 if hand_landmarks:
                     hand_size = self._calculate_hand_size(hand_landmarks[0])
-                    result['hand_size'] = hand_size
+                    result.hand_size = hand_size
                     self._hand_size = hand_size
                     # Нормализованная позиция landmark[9] (ладонь) — для зонной калибровки
-                    result['palm_x'] = hand_landmarks[0].landmark[9].x
-                    result['palm_y'] = hand_landmarks[0].landmark[9].y
+                    result.palm_x = hand_landmarks[0].landmark[9].x
+                    result.palm_y = hand_landmarks[0].landmark[9].y
+                    result.landmarks = hand_landmarks[0]
+                    self.predictor.update(
+                        as_points(hand_landmarks[0]),
+                        time.monotonic() if timestamp is None else timestamp,
+                    )
+            else:
+                self.predictor.reset()
 
             if hand_detected and self._enabled and hand_landmarks:
                 fingers_up = self.tracker.get_fingers_up(hand_landmarks[0])
 
-                palm_norm_x = result['palm_x']
-                palm_norm_y = result['palm_y']
+                palm_norm_x = result.palm_x
+                palm_norm_y = result.palm_y
 
                 # Вычисляем позицию руки для сглаживания
                 hand_x = palm_norm_x * frame_width
@@ -84,8 +93,8 @@ class HandProcessor:
                     hand_y=hand_y,
                     hand_size=hand_size
                 )
-                result['gesture'] = gesture
-                result['current_gesture'] = gesture
+                result.gesture = gesture
+                result.current_gesture = gesture
                 
                 self._last_hand_position = (hand_x, hand_y)
             
@@ -96,6 +105,30 @@ class HandProcessor:
         
         return result
     
+    def predict(self, frame_width, frame_height, timestamp=None):
+        """
+        Рука на кадре без инференса: предсказанные landmarks + движение курсора.
+
+        Возвращает HandResult (predicted=True) или None, если оценки нет (руки не
+        было или последнее наблюдение слишком старое).
+        """
+        points = self.predictor.predict(time.monotonic() if timestamp is None else timestamp)
+        if points is None:
+            return None
+        landmarks = LandmarkFrame(points, frame_width, frame_height)
+        gesture = self.gesture_controller.current_gesture
+        try:
+            if self._enabled:
+                gesture = self.gesture_controller.update_cursor(landmarks)
+        except Exception as e:
+            logger.error(f"Error in HandProcessor.predict: {e}")
+        palm_x, palm_y = points[9, :2].tolist()
+        return HandResult(
+            detected=True, landmarks=landmarks, gesture=gesture,
+            current_gesture=gesture, hand_size=self._hand_size,
+            palm_x=palm_x, palm_y=palm_y, predicted=True,
+        )
+
     def toggle_gesture_control(self) -> bool:
         self._enabled = self.gesture_controller.toggle()
         return self._enabled
@@ -1,6 +1,7 @@
 import time
 from src.posture_analyzer import PostureAnalyzer
 from src.config_manager import config_manager
+from src.frame_result import PostureResult
 from src.logger import logger
 
 
@@ -38,17 +39,9 @@ class PostureProcessor:
         self._last_event_time = 0
         self._cooldown = 1.0
     
-    def process(self, landmarks, frame_width, frame_height, pitch: float, current_time: float) -> dict:
-        result = {
-            'is_bad': False,
-            'posture_score': 0,
-            'posture_level': 'good',
-            'posture_status': 'Good',
-            'head_tilt': 0,
-            'head_forward': 0,
-            'event': None,
-            'pitch_alert': False
-        }
+    def process(self, landmarks, frame_width, frame_height, pitch: float,
+                current_time: float) -> PostureResult:
+        result = PostureResult()
         
         try:
             if landmarks:
@@ -59,24 +52,24 @@ class PostureProcessor:
                     current_time=current_time
                 )
                 
-                result['posture_score'] = posture_data.get("posture_score", 0)
-                result['posture_level'] = posture_data.get("posture_level", "good")
-                result['head_tilt'] = posture_data.get("head_tilt", 0)
-                result['head_forward'] = posture_data.get("head_forward", 0)
+                result.posture_score = posture_data.get("posture_score", 0)
+                result.posture_level = posture_data.get("posture_level", "good")
+                result.head_tilt = posture_data.get("head_tilt", 0)
+                result.head_forward = posture_data.get("head_forward", 0)
 
                 if posture_data.get("is_bad", False):
-                    result['is_bad'] = True
-                    result['posture_status'] = "Bad Posture"
+                    result.is_bad = True
+                    result.posture_status = "Bad Posture"
                     
-                    tilt = result['head_tilt']
-                    forward = result['head_forward']
+                    tilt = result.head_tilt
+                    forward = result.head_forward
                     
                     if tilt > 15:
-                        result['event'] = f"Наклон головы ({int(tilt)}°)"
+                        result.event = f"Наклон головы ({int(tilt)}°)"
                     elif forward > self._config.get('head_forward_threshold', 0.08):
-                        result['event'] = "Голова вперёд"
+                        result.event = "Голова вперёд"
                     else:
-                        result['event'] = "Плохая осанка"
+                        result.event = "Плохая осанка"
                     
                     if current_time - self._last_event_time >= self._cooldown:
                         self._last_event_time = current_time
@@ -87,15 +80,15 @@ class PostureProcessor:
                 if self._posture_start_time is None:
                     self._posture_start_time = current_time
                 elif current_time - self._posture_start_time > self._time_trigger:
-                    result['is_bad'] = True
-                    result['pitch_alert'] = True
-                    result['posture_status'] = "Bad Posture"
-                    if result['event'] is None:
-                        result['event'] = f"Наклон головы ({int(pitch)}°)"
+                    result.is_bad = True
+                    result.pitch_alert = True
+                    result.posture_status = "Bad Posture"
+                    if result.event is None:
+                        result.event = f"Наклон головы ({int(pitch)}°)"
             else:
                 self._posture_start_time = None
             
-            logger.debug(f"Posture: level={result['posture_level']}, bad={result['is_bad']}")
+            logger.debug(f"Posture: level={result.posture_level}, bad={result.is_bad}")
             
         except Exception as e:
             logger.error(f"Error in PostureProcessor: {e}")
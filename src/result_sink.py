@@ -0,0 +1,133 @@
+"""
+Output sinks for engine results (headless runs, benchmarks, soak tests).
+
+    sink = open_sink("run.jsonl")        # or "run.sqlite" / fmt="sqlite"
+    engine = NeuroFocusEngine(on_data=sink.write)
+    ...
+    sink.close()
+
+``write()`` takes a ``FrameResult`` (flattened with ``to_dict()``) or a
+plain dict.  ``JsonlSink`` writes one JSON object per processed frame.  ``SqliteSink``
+stores the main fields in columns plus the full payload as JSON, so long
+runs can be queried without loading everything into memory.  Both are
+safe to call from pipeline worker threads.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+def _as_dict(data) -> dict:
+    return data.to_dict() if hasattr(data, 'to_dict') else data
+
+
+def to_json(data) -> str:
+    return json.dumps(_as_dict(data), ensure_ascii=False, default=_json_default)
+
+
+class JsonlSink:
+    """Результаты по строке JSON на кадр."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "w", encoding="utf-8")
+        self.count = 0
+
+    def write(self, data):
+        line = to_json(data)
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line + "\n")
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class SqliteSink:
+    """Результаты в таблице engine_results (основные поля + полный JSON)."""
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS engine_results (
+            id INTEGER PRIMARY KEY,
+            ts REAL,
+            frame_id INTEGER,
+            face_detected INTEGER,
+            emotion TEXT,
+            fatigue_status TEXT,
+            posture_status TEXT,
+            payload TEXT
+        )
+    """
+
+    def __init__(self, path: str, commit_every: int = 100):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(self._SCHEMA)
+        self._commit_every = commit_every
+        self._pending = 0
+        self.count = 0
+
+    def write(self, data):
+        data = _as_dict(data)
+        row = (
+            time.time(),
+            data.get("frame_id"),
+            int(bool(data.get("face_detected"))),
+            data.get("emotion"),
+            data.get("fatigue_status"),
+            data.get("posture_status"),
+            to_json(data),
+        )
+        with self._lock:
+            if self._conn is None:
+                return
+            self._conn.execute(
+                "INSERT INTO engine_results (ts, frame_id, face_detected, emotion, "
+                "fatigue_status, posture_status, payload) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                row,
+            )
+            self.count += 1
+            self._pending += 1
+            if self._pending >= self._commit_every:
+                self._conn.commit()
+                self._pending = 0
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.commit()
+                self._conn.close()
+                self._conn = None
+
+
+def open_sink(path: str, fmt: Optional[str] = None):
+    """Sink по формату (jsonl / sqlite) или по расширению файла."""
+    if fmt is None:
+        ext = os.path.splitext(path)[1].lower()
+        fmt = "sqlite" if ext in (".sqlite", ".sqlite3", ".db") else "jsonl"
+    if fmt == "sqlite":
+        return SqliteSink(path)
+    if fmt == "jsonl":
+        return JsonlSink(path)
+    raise ValueError(f"Неизвестный формат вывода: {fmt}")
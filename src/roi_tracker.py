@@ -0,0 +1,262 @@
+"""
+Region-of-interest engine shared by the face, pose and hand models.
+
+A user sitting at a desk barely moves between frames, so scanning the
+whole 1280×720 frame with every model is wasted work.  ``RoiTracker``
+keeps the last face box and palm position and derives crops from them:
+
+    face   expanded face box             → next face-mesh call
+    torso  wide box from the face down   → PoseLandmarker
+    hand   square around the last palm   → Hands
+
+A ROI is *sticky*: it only moves when the target gets close to its
+border or becomes much smaller than the crop, so MediaPipe's internal
+frame-to-frame tracking sees a stable image.  When a target is lost the
+next call runs on the full frame (re-acquisition), and every
+``refresh_interval`` frames a full-frame pass is forced anyway.
+
+Landmarks produced on a crop are normalized to that crop;
+``remap_landmarks`` converts them back to full-frame coordinates in place,
+so all downstream code keeps working with full-frame values.
+
+The face ROI and ``reset()`` (on idle) are called from the inference
+stage, the hand and torso ROIs from the analytics stage, so all tracker
+state is guarded by one lock.
+"""
+
+import threading
+from typing import Iterable, Optional
+
+import numpy as np
+
+from src.frame_bundle import resize_to_width
+
+
+class Roi:
+    """Прямоугольник в пикселях полного кадра: [x0, x1) × [y0, y1)."""
+
+    __slots__ = ('x0', 'y0', 'x1', 'y1')
+
+    def __init__(self, x0: int, y0: int, x1: int, y1: int):
+        self.x0, self.y0, self.x1, self.y1 = x0, y0, x1, y1
+
+    @classmethod
+    def around(cls, cx: float, cy: float, half_w: float, half_h: float,
+               frame_w: int, frame_h: int) -> 'Roi':
+        """Прямоугольник с центром (cx, cy), обрезанный по границам кадра."""
+        x0 = int(max(0, cx - half_w))
+        y0 = int(max(0, cy - half_h))
+        x1 = int(min(frame_w, cx + half_w))
+        y1 = int(min(frame_h, cy + half_h))
+        return cls(x0, y0, max(x1, x0 + 1), max(y1, y0 + 1))
+
+    @property
+    def width(self) -> int:
+        return self.x1 - self.x0
+
+    @property
+    def height(self) -> int:
+        return self.y1 - self.y0
+
+    @property
+    def area(self) -> int:
+        return self.width * self.height
+
+    def contains(self, other: 'Roi') -> bool:
+        return (self.x0 <= other.x0 and self.y0 <= other.y0
+                and self.x1 >= other.x1 and self.y1 >= other.y1)
+
+    def crop(self, image: np.ndarray) -> np.ndarray:
+        return image[self.y0:self.y1, self.x0:self.x1]
+
+    def as_tuple(self):
+        return self.x0, self.y0, self.x1, self.y1
+
+    def __repr__(self):
+        return f"Roi({self.x0}, {self.y0}, {self.x1}, {self.y1})"
+
+
+def crop_for_inference(bundle, roi: Optional[Roi], inference_width: Optional[int],
+                       gray: bool = False) -> np.ndarray:
+    """
+    Вход модели: кроп ROI из кадра полного разрешения (или весь кадр).
+
+    Кроп копируется в непрерывный массив (MediaPipe этого требует) и
+    уменьшается, только если он шире inference_width.
+    """
+    if roi is None:
+        return bundle.gray_at(inference_width) if gray else bundle.rgb_at(inference_width)
+    source = bundle.gray if gray else bundle.rgb
+    return resize_to_width(np.ascontiguousarray(roi.crop(source)), inference_width)
+
+
+def remap_landmarks(landmarks: Iterable, roi: Optional[Roi], frame_w: int, frame_h: int):
+    """Перевести нормализованные координаты кропа в координаты полного кадра (in place)."""
+    if roi is None or landmarks is None:
+        return landmarks
+    sx = roi.width / frame_w
+    sy = roi.height / frame_h
+    ox = roi.x0 / frame_w
+    oy = roi.y0 / frame_h
+    for lm in landmarks:
+        lm.x = ox + lm.x * sx
+        lm.y = oy + lm.y * sy
+        # z в MediaPipe масштабирован так же, как x
+        lm.z = lm.z * sx
+    return landmarks
+
+
+class _StickyRoi:
+    """ROI одной цели с гистерезисом и периодическим полным сканированием."""
+
+    def __init__(self, refresh_interval: int):
+        self.roi: Optional[Roi] = None
+        self._refresh_interval = refresh_interval
+        self._frames_since_full = 0
+        self.full_passes = 0
+        self.roi_passes = 0
+
+    def next_roi(self) -> Optional[Roi]:
+        roi = self.roi
+        self._frames_since_full += 1
+        if roi is None or (self._refresh_interval
+                           and self._frames_since_full >= self._refresh_interval):
+            self._frames_since_full = 0
+            self.full_passes += 1
+            return None
+        self.roi_passes += 1
+        return roi
+
+    def update(self, inner: Optional[Roi], outer: Optional[Roi]):
+        """
+        inner — минимальная область, которая должна оставаться внутри ROI;
+        outer — ROI, который ставится при пересчёте.
+        """
+        if inner is None:
+            self.roi = None
+            return
+        if (self.roi is None
+                or not self.roi.contains(inner)
+                or self.roi.area > 2.0 * outer.area):
+            self.roi = outer
+
+    def reset(self):
+        self.roi = None
+        self._frames_since_full = 0
+
+
+class RoiTracker:
+    """
+    Общий трекер областей интереса для моделей лица, позы и рук.
+
+    Все боксы принимаются в нормализованных координатах полного кадра
+    (как их отдаёт MediaPipe), ROI возвращаются в пикселях.  Методы
+    потокобезопасны: стадии конвейера зовут их из разных потоков.
+    """
+
+    def __init__(self, enabled: bool = True, refresh_interval: int = 60,
+                 face_margin: float = 0.6, hand_scale: float = 3.0,
+                 min_hand_side: int = 160):
+        self.enabled = enabled
+        self._face_margin = face_margin
+        self._hand_scale = hand_scale
+        self._min_hand_side = min_hand_side
+
+        self._face = _StickyRoi(refresh_interval)
+        self._hand = _StickyRoi(refresh_interval)
+        self._face_bbox = None          # (min_x, min_y, max_x, max_y), норм.
+        self._lock = threading.Lock()
+
+    # ── Face ───────────────────────────────────────────────────
+
+    def face_roi(self) -> Optional[Roi]:
+        """ROI для следующего вызова face mesh (None — весь кадр)."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            return self._face.next_roi()
+
+    def update_face(self, bbox, frame_w: int, frame_h: int):
+        """bbox — (min_x, min_y, max_x, max_y) лица или None, если лицо потеряно."""
+        if bbox is None:
+            with self._lock:
+                self._face_bbox = None
+                self._face.update(None, None)
+            return
+        min_x, min_y, max_x, max_y = bbox
+        cx = (min_x + max_x) / 2 * frame_w
+        cy = (min_y + max_y) / 2 * frame_h
+        half_w = (max_x - min_x) / 2 * frame_w
+        half_h = (max_y - min_y) / 2 * frame_h
+        # Внутренняя зона — лицо с половиной запаса: ROI двигаем, только
+        # когда лицо подошло к краю кропа.
+        m = self._face_margin
+        inner = Roi.around(cx, cy, half_w * (1 + m / 2), half_h * (1 + m / 2),
+                           frame_w, frame_h)
+        outer = Roi.around(cx, cy, half_w * (1 + m), half_h * (1 + m),
+                           frame_w, frame_h)
+        with self._lock:
+            self._face_bbox = bbox
+            self._face.update(inner, outer)
+
+    # ── Torso (pose) ───────────────────────────────────────────
+
+    def torso_roi(self, frame_w: int, frame_h: int) -> Optional[Roi]:
+        """
+        Кроп для PoseLandmarker: от лба вниз до края кадра, ±3 ширины лица.
+
+        Лицо остаётся в кропе — детектор BlazePose ищет человека по лицу.
+        """
+        with self._lock:
+            bbox = self._face_bbox
+        if not self.enabled or bbox is None:
+            return None
+        min_x, min_y, max_x, max_y = bbox
+        face_w = (max_x - min_x) * frame_w
+        face_h = (max_y - min_y) * frame_h
+        cx = (min_x + max_x) / 2 * frame_w
+        x0 = max(0, int(cx - 3.0 * face_w))
+        x1 = min(frame_w, int(cx + 3.0 * face_w))
+        y0 = max(0, int(min_y * frame_h - 0.5 * face_h))
+        if x1 - x0 < 2 or frame_h - y0 < 2:
+            return None
+        return Roi(x0, y0, x1, frame_h)
+
+    # ── Hand ───────────────────────────────────────────────────
+
+    def hand_roi(self) -> Optional[Roi]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            return self._hand.next_roi()
+
+    def update_hand(self, palm, hand_size, frame_w: int, frame_h: int):
+        """palm — (x, y) ладони, hand_size — запястье↔средний палец (норм.)."""
+        if palm is None or not hand_size:
+            with self._lock:
+                self._hand.update(None, None)
+            return
+        cx, cy = palm[0] * frame_w, palm[1] * frame_h
+        side = max(self._min_hand_side, self._hand_scale * hand_size * frame_w)
+        inner = Roi.around(cx, cy, side / 4, side / 4, frame_w, frame_h)
+        outer = Roi.around(cx, cy, side / 2, side / 2, frame_w, frame_h)
+        with self._lock:
+            self._hand.update(inner, outer)
+
+    # ── Misc ───────────────────────────────────────────────────
+
+    def reset(self):
+        with self._lock:
+            self._face.reset()
+            self._hand.reset()
+            self._face_bbox = None
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            face, hand = self._face.roi, self._hand.roi
+            return {
+                'roi_face': face.as_tuple() if face else None,
+                'roi_hand': hand.as_tuple() if hand else None,
+                'roi_passes': self._face.roi_passes + self._hand.roi_passes,
+                'full_frame_passes': self._face.full_passes + self._hand.full_passes,
+            }
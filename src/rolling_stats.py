@@ -0,0 +1,293 @@
+"""
+Rolling-window statistics with constant cost per sample.
+
+``TemporalFeatureExtractor`` and ``FatigueAnalyzer`` used to turn their
+deques into arrays on every update and recompute mean / std / min / max /
+trend over the whole window (plus a Python loop for blink crossings).
+Here a ``RollingWindow`` keeps the samples in a preallocated float32 ring
+buffer, and trackers registered on it update their statistic from the
+sample that entered and the one that left — O(1) per ``append``:
+
+    ear = RollingWindow(30)
+    moments = ear.track(Moments(30))        # mean / var / std (Welford, Kahan sum)
+    extremes = ear.track(MinMax(3))         # min / max of the last 3 (monotonic deques)
+    blinks = ear.track(Crossings(30, 0.22)) # downward crossings inside the window
+    head = ear.track(HeadMean(15, 7))       # mean of the first 7 of the last 15
+    tail = ear.track(TailMean(8))           # mean of the last 8
+    ear.append(0.31)
+
+Each tracker covers the last ``span`` samples (fewer until that many have
+arrived), so one history can feed statistics over several sub-windows.
+``RollingWindow`` also behaves like the deque it replaces: ``len``,
+indexing, iteration, ``extend``, ``clear``.
+"""
+
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+
+class RollingWindow:
+    """Кольцевой буфер последних capacity отсчётов + зарегистрированные трекеры."""
+
+    def __init__(self, capacity: int, dtype=np.float32):
+        self.capacity = int(capacity)
+        # +1: трекерам с span == capacity нужен только что вытесненный отсчёт
+        self._ring = np.zeros(self.capacity + 1, dtype)
+        self._size = self.capacity + 1
+        self._pos = 0           # индекс следующей записи
+        self.count = 0          # всего отсчётов с последнего clear()
+        self._trackers: List = []
+
+    def track(self, tracker):
+        """Зарегистрировать трекер (только на пустом окне); возвращает его же."""
+        if tracker.span > self.capacity:
+            raise ValueError(f"span {tracker.span} > capacity {self.capacity}")
+        if self.count:
+            raise ValueError("trackers must be registered before the first append")
+        tracker.reset()
+        self._trackers.append(tracker)
+        return tracker
+
+    def append(self, value: float):
+        self._ring[self._pos] = value
+        self._pos = (self._pos + 1) % self._size
+        self.count += 1
+        for tracker in self._trackers:
+            tracker.push(self)
+
+    def extend(self, values: Iterable[float]):
+        for value in values:
+            self.append(value)
+
+    def ago(self, j: int) -> float:
+        """Отсчёт j шагов назад (0 — последний); j ≤ capacity."""
+        return float(self._ring[(self._pos - 1 - j) % self._size])
+
+    def clear(self):
+        self._pos = 0
+        self.count = 0
+        for tracker in self._trackers:
+            tracker.reset()
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def __bool__(self) -> bool:
+        return self.count > 0
+
+    def __getitem__(self, index: int) -> float:
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError('RollingWindow index out of range')
+        return self.ago(n - 1 - index)
+
+    def values(self) -> np.ndarray:
+        """Копия окна в хронологическом порядке."""
+        n = len(self)
+        idx = (self._pos - n + np.arange(n)) % self._size
+        return self._ring[idx]
+
+    def __iter__(self):
+        return iter(self.values().tolist())
+
+    @property
+    def last(self) -> Optional[float]:
+        return self.ago(0) if self.count else None
+
+
+class _Tracker(ABC):
+    span = 1
+
+    def reset(self):
+        pass
+
+    @abstractmethod
+    def push(self, window: RollingWindow):
+        ...
+
+
+class Moments(_Tracker):
+    """
+    Среднее и дисперсия (популяционная, как np.var) последних span отсчётов:
+    Welford с добавлением / удалением, сумма для среднего — по Кэхэну.
+    Раз в REFRESH шагов пересчёт с нуля гасит накопленную ошибку.
+    """
+
+    REFRESH = 4096
+
+    def __init__(self, span: int):
+        self.span = int(span)
+        self.reset()
+
+    def reset(self):
+        self.n = 0
+        self._sum = 0.0
+        self._comp = 0.0        # компенсация Кэхэна
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._steps = 0
+
+    def _kahan_add(self, value: float):
+        y = value - self._comp
+        t = self._sum + y
+        self._comp = (t - self._sum) - y
+        self._sum = t
+
+    def push(self, window: RollingWindow):
+        x = window.ago(0)
+        if window.count > self.span:
+            old = window.ago(self.span)
+            # Замена old → x при неизменном n
+            self._kahan_add(x)
+            self._kahan_add(-old)
+            new_mean = self._sum / self.n
+            self._m2 += (x - old) * (x - new_mean + old - self._mean)
+            self._mean = new_mean
+        else:
+            self.n += 1
+            self._kahan_add(x)
+            delta = x - self._mean
+            self._mean = self._sum / self.n
+            self._m2 += delta * (x - self._mean)
+        self._steps += 1
+        if self._steps >= self.REFRESH:
+            self._refresh(window)
+
+    def _refresh(self, window: RollingWindow):
+        values = np.array([window.ago(j) for j in range(self.n)], np.float64)
+        self._sum = float(values.sum())
+        self._comp = 0.0
+        self._mean = self._sum / self.n
+        self._m2 = float(((values - self._mean) ** 2).sum())
+        self._steps = 0
+
+    @property
+    def mean(self) -> float:
+        return self._mean if self.n else 0.0
+
+    @property
+    def var(self) -> float:
+        return max(0.0, self._m2 / self.n) if self.n else 0.0
+
+    @property
+    def std(self) -> float:
+        return self.var ** 0.5
+
+
+class MinMax(_Tracker):
+    """Минимум / максимум последних span отсчётов (монотонные очереди)."""
+
+    def __init__(self, span: int):
+        self.span = int(span)
+        self.reset()
+
+    def reset(self):
+        self._min = deque()     # (seq, value), значения возрастают
+        self._max = deque()     # (seq, value), значения убывают
+
+    def push(self, window: RollingWindow):
+        seq, x = window.count, window.ago(0)
+        lo, hi = self._min, self._max
+        while lo and lo[-1][1] >= x:
+            lo.pop()
+        lo.append((seq, x))
+        while hi and hi[-1][1] <= x:
+            hi.pop()
+        hi.append((seq, x))
+        oldest = seq - self.span
+        if lo[0][0] <= oldest:
+            lo.popleft()
+        if hi[0][0] <= oldest:
+            hi.popleft()
+
+    @property
+    def min(self) -> Optional[float]:
+        return self._min[0][1] if self._min else None
+
+    @property
+    def max(self) -> Optional[float]:
+        return self._max[0][1] if self._max else None
+
+
+class Crossings(_Tracker):
+    """
+    Пересечения порога сверху вниз (prev > threshold >= cur) между соседними
+    отсчётами внутри последних span отсчётов.
+    """
+
+    def __init__(self, span: int, threshold: float):
+        self.span = int(span)
+        self.threshold = float(threshold)
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+
+    def _crossed(self, prev: float, cur: float) -> bool:
+        return prev > self.threshold and cur <= self.threshold
+
+    def push(self, window: RollingWindow):
+        if window.count >= 2 and self._crossed(window.ago(1), window.ago(0)):
+            self.count += 1
+        if window.count > self.span:
+            # Старейшая пара окна (ago(span), ago(span-1)) ушла вместе с ago(span)
+            if self._crossed(window.ago(self.span), window.ago(self.span - 1)):
+                self.count -= 1
+
+
+class TailMean(_Tracker):
+    """Среднее последних span отсчётов (np.mean(arr[-span:]))."""
+
+    def __init__(self, span: int):
+        self.span = int(span)
+        self.reset()
+
+    def reset(self):
+        self.n = 0
+        self._sum = 0.0
+
+    def push(self, window: RollingWindow):
+        self._sum += window.ago(0)
+        if window.count > self.span:
+            self._sum -= window.ago(self.span)
+        else:
+            self.n += 1
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self.n if self.n else 0.0
+
+
+class HeadMean(_Tracker):
+    """
+    Среднее первых length отсчётов окна из последних span
+    (np.mean(arr[-span:][:length])).
+    """
+
+    def __init__(self, span: int, length: int):
+        if length > span:
+            raise ValueError("length > span")
+        self.span = int(span)
+        self.length = int(length)
+        self.reset()
+
+    def reset(self):
+        self.n = 0
+        self._sum = 0.0
+
+    def push(self, window: RollingWindow):
+        if window.count <= self.length:
+            self._sum += window.ago(0)
+            self.n += 1
+        elif window.count > self.span:
+            # Окно сдвинулось: голову покидает ago(span), входит ago(span - length)
+            self._sum += window.ago(self.span - self.length) - window.ago(self.span)
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self.n if self.n else 0.0
@@ -212,15 +212,15 @@ class TestFatigueProcessorYawnLimit:
 
         # Первый зевок (mar=0.7 > 0.6) — должен сработать
         result = fp.process(0.30, 0.70, 5.0, "Neutral", 100.0)
-        assert result['event'] == "Зевок"
+        assert result.event == "Зевок"
 
         # Второй сразу — cooldown=4.0 (2*2), ещё не прошёл
         result = fp.process(0.30, 0.70, 5.0, "Neutral", 101.0)
-        assert result['event'] is None  # cooldown активен
+        assert result.event is None  # cooldown активен
 
         # Через 5 сек — должно сработать снова
         result = fp.process(0.30, 0.70, 5.0, "Neutral", 105.0)
-        assert result['event'] == "Зевок"  # cooldown прошёл
+        assert result.event == "Зевок"  # cooldown прошёл
 
     def test_default_yawn_cooldown(self):
         """Без set_yawn_limit — стандартный cooldown 2 сек."""
@@ -228,15 +228,15 @@ class TestFatigueProcessorYawnLimit:
         fp = FatigueProcessor()
 
         result = fp.process(0.30, 0.70, 5.0, "Neutral", 100.0)
-        assert result['event'] == "Зевок"
+        assert result.event == "Зевок"
 
         # Через 1 сек — cooldown=2 ещё не прошёл
         result = fp.process(0.30, 0.70, 5.0, "Neutral", 101.0)
-        assert result['event'] is None
+        assert result.event is None
 
         # Через 3 сек — прошёл
         result = fp.process(0.30, 0.70, 5.0, "Neutral", 103.0)
-        assert result['event'] == "Зевок"
+        assert result.event == "Зевок"
 
 
 # ── Fix 3: FatigueProcessor calibration_manager ────────────────────
@@ -0,0 +1,93 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.face_core import _FallbackFaceDetector
+from src.geometry import ear_from_points, mar_from_points
+
+W, H = 640, 360
+
+
+class _CountingCascade:
+    """Возвращает заданный бокс (в координатах переданного gray) и считает вызовы."""
+
+    def __init__(self, box):
+        self.box = box
+        self.calls = 0
+
+    def detectMultiScale(self, gray, **kwargs):
+        self.calls += 1
+        return np.array([self.box]) if self.box is not None else np.empty((0, 4))
+
+
+def _scene(shift=(0, 0), seed=0):
+    """Серый кадр: шум + текстурный «лицевой» патч 80×80 в (200, 100) + shift."""
+    rng = np.random.default_rng(seed)
+    gray = rng.integers(0, 60, (H, W), dtype=np.uint8)
+    # Гладкая текстура: корреляция переживает уменьшение кадра
+    yy, xx = np.mgrid[0:80, 0:80]
+    face = (127 + 60 * np.sin(xx / 6.0) * np.cos(yy / 9.0) + yy).astype(np.uint8)
+    x, y = 200 + shift[0], 100 + shift[1]
+    gray[y:y + 80, x:x + 80] = face
+    return gray
+
+
+def _detector(interval=5):
+    det = _FallbackFaceDetector(detect_interval=interval)
+    det._cascade = _CountingCascade((200, 100, 80, 80))
+    return det
+
+
+class TestFallbackFaceDetector:
+    def test_landmarks_are_numpy_and_keep_mock_geometry(self):
+        det = _detector()
+        frame = np.zeros((H, W, 3), np.uint8)
+        results = det.detect(frame, gray=_scene())
+        face = results.multi_face_landmarks[0]
+        assert face.points.shape == (468, 3) and face.points.dtype == np.float32
+        assert face.landmark[1].x == pytest.approx((200 + 0.5 * 80) / W)
+        assert face.landmark[1].y == pytest.approx((100 + 0.58 * 80) / H)
+        assert face.landmark[160].y == pytest.approx((100 + 0.38 * 80) / H - 0.008)
+        assert face.landmark[13].y - face.landmark[14].y == pytest.approx(0.012, abs=1e-6)
+        assert np.isfinite(ear_from_points(face.points))
+        assert np.isfinite(mar_from_points(face.points))
+
+    def test_tracks_between_detections(self):
+        det = _detector(interval=5)
+        frame = np.zeros((H, W, 3), np.uint8)
+        det.detect(frame, gray=_scene())
+        for step in range(1, 5):
+            det.detect(frame, gray=_scene(shift=(3 * step, -2 * step), seed=step))
+            assert det._prev_bbox == (200 + 3 * step, 100 - 2 * step, 80, 80)
+        assert det._cascade.calls == 1
+        assert det.tracked == 4
+        # Интервал исчерпан — снова каскад
+        det.detect(frame, gray=_scene(shift=(12, -8)))
+        assert det._cascade.calls == 2
+
+    def test_lost_track_falls_back_to_detection(self):
+        det = _detector()
+        frame = np.zeros((H, W, 3), np.uint8)
+        det.detect(frame, gray=_scene())
+        det._cascade.box = None
+        noise = np.random.default_rng(5).integers(0, 60, (H, W), dtype=np.uint8)
+        assert det.detect(frame, gray=noise) is None
+        assert det._cascade.calls == 2
+        assert det._prev_bbox is None
+
+    def test_tracking_across_scale_change(self):
+        # Детекция на 640, сопровождение на кадре вдвое меньше
+        det = _detector()
+        frame = np.zeros((H, W, 3), np.uint8)
+        det.detect(frame, gray=_scene())
+        small = cv2.resize(_scene(), (W // 2, H // 2), interpolation=cv2.INTER_AREA)
+        det.detect(frame, gray=small)
+        assert det._cascade.calls == 1
+        x, y, _, _ = det._prev_bbox
+        assert abs(x - 200) <= 2 and abs(y - 100) <= 2
+
+    def test_input_width(self):
+        det = _FallbackFaceDetector(detect_width=320)
+        assert det.input_width(640) == 320
+        assert det.input_width(None) == 320
+        assert det.input_width(256) == 256
@@ -0,0 +1,122 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.face_landmarker import (
+    MODE_LIVE_STREAM, MODE_VIDEO, FaceLandmarkerDetector, convert_result,
+)
+from src.pose_estimator import POSE_LANDMARK_IDXS, HeadPoseEstimator
+from src.roi_tracker import Roi
+
+
+class _Lm:
+    def __init__(self, x, y, z=0.0):
+        self.x, self.y, self.z = x, y, z
+
+
+class _Category:
+    def __init__(self, name, score):
+        self.category_name, self.score = name, score
+
+
+class _Result:
+    """Форма FaceLandmarkerResult из mediapipe.tasks."""
+
+    def __init__(self, n=478, matrix=None):
+        self.face_landmarks = [[_Lm(0.25 + 0.5 * i / n, 0.5, -0.01) for i in range(n)]]
+        self.face_blendshapes = [[_Category('eyeBlinkLeft', 0.9), _Category('browInnerUp', 0.2),
+                                  _Category('jawOpen', 0.4)]]
+        self.facial_transformation_matrixes = [np.eye(4) if matrix is None else matrix]
+
+
+class _FakeLandmarker:
+    def __init__(self):
+        self.async_calls = []
+
+    def detect_async(self, image, ts):
+        self.async_calls.append(ts)
+
+    def detect_for_video(self, image, ts):
+        return _Result()
+
+    def close(self):
+        pass
+
+
+class _Detector(FaceLandmarkerDetector):
+    def _create_landmarker(self):
+        return _FakeLandmarker()
+
+    @staticmethod
+    def _mp_image(rgb):
+        return rgb
+
+
+class TestConvertResult:
+    def test_landmarks_blendshapes_matrix(self):
+        results = convert_result(_Result(), timestamp_ms=42)
+        points = results.multi_face_landmarks[0].points
+        assert points.shape == (478, 3) and points.dtype == np.float32
+        assert results.blendshapes == {'eyeBlinkLeft': pytest.approx(0.9),
+                                       'eyeBlinkRight': 0.0, 'jawOpen': pytest.approx(0.4)}
+        assert results.transformation_matrix.shape == (4, 4)
+        assert results.timestamp_ms == 42
+
+    def test_roi_remap(self):
+        roi = Roi(100, 50, 300, 150)
+        points = convert_result(_Result(), roi, 400, 200).multi_face_landmarks[0].points
+        x0 = convert_result(_Result()).multi_face_landmarks[0].points
+        np.testing.assert_allclose(points[:, 0], 0.25 + x0[:, 0] * 0.5, rtol=1e-6)
+        np.testing.assert_allclose(points[:, 1], 0.25 + 0.5 * 0.5, rtol=1e-6)
+
+    def test_no_face(self):
+        result = _Result()
+        result.face_landmarks = []
+        assert convert_result(result).multi_face_landmarks is None
+
+
+class TestFaceLandmarkerDetector:
+    def test_live_stream_returns_latest_without_blocking(self):
+        det = _Detector(mode=MODE_LIVE_STREAM)
+        frame = np.zeros((48, 64, 3), np.uint8)
+        _, results = det.process_frame(frame, draw=False)
+        assert results is None                       # первый результат ещё не готов
+        ts = det._landmarker.async_calls[-1]
+        det._on_result(_Result(), None, ts)
+        _, results = det.process_frame(frame, draw=False)
+        assert results.timestamp_ms == ts
+        calls = det._landmarker.async_calls
+        assert calls == sorted(set(calls))           # строго возрастающие таймстампы
+        assert det.get_stats()['face_in_flight'] == 1
+
+    def test_stale_callback_does_not_replace_newer(self):
+        det = _Detector()
+        det._on_result(_Result(), None, 20)
+        det._on_result(_Result(n=10), None, 10)
+        assert det._latest.timestamp_ms == 20
+
+    def test_video_mode_is_synchronous(self):
+        det = _Detector(mode=MODE_VIDEO)
+        image, results = det.process_frame(np.zeros((48, 64, 3), np.uint8), draw=True)
+        assert len(results.multi_face_landmarks[0]) == 478
+        assert image.any()                           # сетка нарисована
+        det.set_mode(MODE_LIVE_STREAM)
+        assert det.mode == MODE_LIVE_STREAM and det.available
+
+
+class TestPoseFromMatrix:
+    def test_matches_pnp_angles(self):
+        est = HeadPoseEstimator(smoothing=False, warm_start=False)
+        w, h = 1280, 720
+        rvec = np.radians([[12.0], [-7.0], [3.0]])
+        tvec = np.array([[0.0], [0.0], [2500.0]])
+        img, _ = cv2.projectPoints(est.model_points, rvec, tvec, est.camera_matrix(w, h),
+                                   np.zeros(4))
+        points = np.full((478, 3), 0.5, np.float32)
+        points[POSE_LANDMARK_IDXS, :2] = img.reshape(-1, 2) / (w, h)
+        pnp = est.get_pose_from_points(points, w, h)
+
+        # Та же поворотная часть в осях OpenGL, как отдаёт FaceLandmarker
+        matrix = np.eye(4)
+        matrix[:3, :3] = np.diag([1.0, -1.0, -1.0]) @ cv2.Rodrigues(rvec)[0]
+        assert est.get_pose_from_matrix(matrix) == pytest.approx(pnp, abs=1.5)
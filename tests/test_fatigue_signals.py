@@ -0,0 +1,73 @@
+import pytest
+
+pytest.importorskip('mediapipe')     # neurofocus.ml тянет mediapipe при импорте пакета
+
+from neurofocus.ml.fatigue_signals import FatigueSignals
+from neurofocus.ml.temporal_features import TemporalFeatureExtractor
+
+FPS = 30.0
+
+
+def _feed(signals, seconds, blink_every=3.0, blink_frames=4, start=1000.0):
+    """EAR 0.32 с морганиями (0.15) по blink_frames кадров каждые blink_every с."""
+    period = int(blink_every * FPS)
+    for i in range(int(seconds * FPS)):
+        ear = 0.15 if i % period < blink_frames else 0.32
+        signals.update(ear, 0.1, timestamp=start + i / FPS)
+
+
+class TestFatigueSignals:
+    def test_counts_short_blinks_at_frame_rate(self):
+        signals = FatigueSignals()
+        _feed(signals, 30.0)
+        # 10 морганий по ~130 мс за 30 с → ~20 в минуту
+        assert len(signals.blink_tracker.blink_timestamps) == 10
+        assert 18 <= signals.blink_rate() <= 23
+
+    def test_rates_use_frame_clock(self):
+        """Время кадров файла (с нуля), а не time.time()."""
+        signals = FatigueSignals()
+        _feed(signals, 10.0, start=0.0)
+        assert signals.recent_blinks(5.0) >= 1
+        assert signals.blink_rate() > 0
+
+    def test_microsleep_detected_from_frame_times(self):
+        signals = FatigueSignals()
+        for i in range(90):
+            signals.update(0.32 if i < 10 or i >= 70 else 0.12, 0.1, timestamp=i / FPS)
+        assert signals.microsleep_statistics()['microsleeps_per_minute'] == 1
+
+    def test_latest_frame_state(self):
+        signals = FatigueSignals()
+        features = signals.update(0.3, 0.2, head_droop=5.0, timestamp=1.0)
+        assert signals.ear == 0.3 and signals.mar == 0.2 and signals.head_droop == 5.0
+        assert signals.temporal_features is features and signals.frames == 1
+
+    def test_temporal_window_is_measured_in_time(self):
+        """30 отсчётов окна — ~7.5 с при любом FPS, а не 30 кадров."""
+        for fps in (25.0, 30.0, 60.0):
+            signals = FatigueSignals()
+            for i in range(int(20 * fps)):
+                signals.update(0.3, 0.1, timestamp=i / fps)
+            timestamps = signals.temporal_extractor.timestamps
+            assert len(timestamps) == 30
+            assert timestamps[-1] - timestamps[0] == pytest.approx(29 * 0.25, abs=1.0 / fps)
+            assert signals.frames == int(20 * fps)
+
+
+class TestTemporalBlinkRate:
+    def test_uses_real_timestamps(self):
+        fast, slow = TemporalFeatureExtractor(), TemporalFeatureExtractor()
+        for i in range(30):
+            ear = 0.15 if i % 10 == 0 else 0.32
+            fast_features = fast.update(ear, 0.1, current_time=i / 30.0)
+            slow_features = slow.update(ear, 0.1, current_time=i / 10.0)
+        # Те же 2 пересечения за 1 с и за 3 с
+        assert fast_features['estimated_blink_rate'] == 120
+        assert slow_features['estimated_blink_rate'] == 40
+
+    def test_falls_back_to_30_fps_without_timestamps(self):
+        extractor = TemporalFeatureExtractor()
+        for i in range(30):
+            features = extractor.update(0.15 if i % 10 == 0 else 0.32, 0.1)
+        assert features['estimated_blink_rate'] == 120
@@ -0,0 +1,113 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.frame_bundle import FrameBundle, FrameBundlePool, resize_to_width, scaled_size
+
+
+@pytest.fixture
+def raw_frame():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, size=(72, 128, 3), dtype=np.uint8)
+
+
+class TestFrameBundle:
+    def test_views_match_opencv(self, raw_frame):
+        bundle = FrameBundle(raw_frame.shape, small_width=64)
+        bundle.load(raw_frame, 7, 1.5)
+
+        flipped = cv2.flip(raw_frame, 1)
+        assert bundle.frame_id == 7
+        assert np.array_equal(bundle.bgr, flipped)
+        assert np.array_equal(bundle.rgb, cv2.cvtColor(flipped, cv2.COLOR_BGR2RGB))
+        assert np.array_equal(bundle.gray, cv2.cvtColor(flipped, cv2.COLOR_BGR2GRAY))
+        assert bundle.small_rgb.shape == (36, 64, 3)
+
+    def test_views_are_read_only(self, raw_frame):
+        bundle = FrameBundle(raw_frame.shape)
+        bundle.load(raw_frame, 0, 0.0)
+        for view in (bundle.bgr, bundle.rgb, bundle.gray, bundle.small_rgb):
+            with pytest.raises(ValueError):
+                view[0, 0] = 0
+
+    def test_derived_views_computed_once(self, raw_frame):
+        bundle = FrameBundle(raw_frame.shape)
+        bundle.load(raw_frame, 0, 0.0)
+        assert bundle.rgb is bundle.rgb
+        assert bundle.gray is bundle.gray
+        assert bundle.rgb_at(64) is bundle.rgb_at(64)
+
+    def test_canvas_is_independent_copy(self, raw_frame):
+        bundle = FrameBundle(raw_frame.shape)
+        bundle.load(raw_frame, 0, 0.0)
+        canvas = bundle.canvas
+        canvas[:] = 0
+        assert bundle.bgr.any()
+        assert bundle.canvas is canvas
+        assert not bundle.canvas_rgb().any()
+
+    def test_reload_reuses_buffers(self, raw_frame):
+        bundle = FrameBundle(raw_frame.shape)
+        bundle.load(raw_frame, 0, 0.0)
+        rgb_ptr = bundle.rgb.__array_interface__['data'][0]
+
+        other = 255 - raw_frame
+        bundle.load(other, 1, 0.1)
+        assert np.array_equal(bundle.bgr, cv2.flip(other, 1))
+        assert bundle.rgb.__array_interface__['data'][0] == rgb_ptr
+
+
+class TestFrameBundlePool:
+    def test_release_and_reuse(self, raw_frame):
+        pool = FrameBundlePool(max_size=4)
+        first = pool.acquire(raw_frame, 0, 0.0)
+        pool.release(first)
+        second = pool.acquire(raw_frame, 1, 0.1)
+        assert second is first
+        assert pool.allocated == 1
+
+    def test_resolution_change_drops_old_buffers(self, raw_frame):
+        pool = FrameBundlePool(max_size=4)
+        pool.release(pool.acquire(raw_frame, 0, 0.0))
+        bigger = np.zeros((144, 256, 3), dtype=np.uint8)
+        bundle = pool.acquire(bigger, 1, 0.1)
+        assert bundle.shape == (144, 256, 3)
+        assert pool.allocated == 2
+
+
+class TestInferenceResolution:
+    def test_scaled_size_keeps_aspect(self):
+        assert scaled_size(1280, 720, 640) == (640, 360)
+        assert scaled_size(1280, 720, 0) == (1280, 720)
+        assert scaled_size(640, 480, 1280) == (640, 480)
+
+    def test_resize_to_width_never_upscales(self, raw_frame):
+        assert resize_to_width(raw_frame, 256) is raw_frame
+        assert resize_to_width(raw_frame, 64).shape == (36, 64, 3)
+
+    def test_bundle_inference_views(self, raw_frame):
+        bundle = FrameBundle(raw_frame.shape)
+        bundle.load(raw_frame, 0, 0.0)
+        assert bundle.rgb_at(None) is bundle.rgb
+        assert bundle.rgb_at(32).shape == (18, 32, 3)
+        assert bundle.gray_at(32).shape == (18, 32)
+        assert bundle.gray_at(32) is bundle.gray_at(32)
+
+    def test_fallback_bbox_mapped_to_full_frame(self):
+        from src.face_core import _FallbackFaceDetector
+
+        class FakeCascade:
+            def detectMultiScale(self, gray, **kwargs):
+                self.min_size = kwargs['minSize']
+                return np.array([[100, 50, 80, 80]])
+
+        detector = _FallbackFaceDetector()
+        detector._cascade = FakeCascade()
+        frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+        gray = np.zeros((360, 640), dtype=np.uint8)
+
+        results = detector.detect(frame, gray=gray)
+        assert detector._prev_bbox == (200, 100, 160, 160)
+        assert detector._cascade.min_size == (30, 30)
+        nose = results.multi_face_landmarks[0].landmark[1]
+        assert nose.x == pytest.approx((200 + 0.5 * 160) / 1280)
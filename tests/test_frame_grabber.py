@@ -0,0 +1,100 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.frame_grabber import FrameGrabber
+
+
+class FakeCapture:
+    """Имитация cv2.VideoCapture: отдаёт пронумерованные кадры."""
+
+    def __init__(self, fail_after=None, delay=0.002):
+        self.count = 0
+        self.fail_after = fail_after
+        self.delay = delay
+
+    def read(self):
+        time.sleep(self.delay)
+        if self.fail_after is not None and self.count >= self.fail_after:
+            return False, None
+        frame = np.full((4, 4, 3), self.count % 256, dtype=np.uint8)
+        self.count += 1
+        return True, frame
+
+
+@pytest.fixture
+def grabber():
+    g = FrameGrabber(FakeCapture(), max_errors=3)
+    g.start()
+    yield g
+    g.stop()
+
+
+class TestFrameGrabber:
+    def test_read_returns_frame_with_metadata(self, grabber):
+        item = grabber.read(timeout=1.0)
+        assert item is not None
+        assert item.frame.shape == (4, 4, 3)
+        assert item.timestamp <= time.monotonic()
+
+    def test_frame_ids_strictly_increase(self, grabber):
+        ids = []
+        for _ in range(5):
+            ids.append(grabber.read(timeout=1.0).frame_id)
+        assert ids == sorted(set(ids))
+
+    def test_slow_consumer_drops_frames(self, grabber):
+        first = grabber.read(timeout=1.0)
+        time.sleep(0.05)   # "тяжёлый" кадр
+        second = grabber.read(timeout=1.0)
+        assert second.frame_id > first.frame_id + 1
+        stats = grabber.get_stats()
+        assert stats['dropped_frames'] >= second.frame_id - first.frame_id - 1
+
+    def test_same_frame_not_delivered_twice(self):
+        g = FrameGrabber(FakeCapture(fail_after=1), max_errors=1000)
+        g.start()
+        try:
+            assert g.read(timeout=1.0) is not None
+            assert g.read(timeout=0.05) is None
+        finally:
+            g.stop()
+
+    def test_stale_frames_counted(self):
+        g = FrameGrabber(FakeCapture(fail_after=1), max_errors=1000,
+                         max_frame_age=0.01)
+        g.start()
+        try:
+            time.sleep(0.05)
+            assert g.read(timeout=1.0) is not None
+            assert g.get_stats()['stale_frames'] == 1
+        finally:
+            g.stop()
+
+    def test_failed_after_max_errors(self):
+        g = FrameGrabber(FakeCapture(fail_after=0), max_errors=3)
+        g.start()
+        try:
+            assert g.read(timeout=1.0) is None
+            assert g.failed
+        finally:
+            g.stop()
+
+    def test_rate_limit_throttles_and_lifts(self):
+        capture = FakeCapture(delay=0.001)
+        g = FrameGrabber(capture, max_errors=3)
+        g.set_rate_limit(20)
+        g.start()
+        try:
+            assert g.rate_limit == pytest.approx(20)
+            time.sleep(0.3)
+            throttled = capture.count
+            assert throttled <= 10
+            g.set_rate_limit(None)
+            assert g.rate_limit is None
+            time.sleep(0.1)
+            assert capture.count - throttled > 20
+        finally:
+            g.stop()
@@ -0,0 +1,156 @@
+import threading
+import time
+
+import pytest
+
+from src.frame_pipeline import DropOldestQueue, FramePacket, FramePipeline
+
+
+def _wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+@pytest.fixture
+def pipeline():
+    p = FramePipeline()
+    yield p
+    p.stop()
+
+
+class TestDropOldestQueue:
+    def test_fifo_order(self):
+        q = DropOldestQueue(maxsize=3)
+        for i in range(3):
+            q.put(i)
+        assert [q.get(timeout=0.1) for _ in range(3)] == [0, 1, 2]
+
+    def test_overflow_drops_oldest(self):
+        q = DropOldestQueue(maxsize=2)
+        for i in range(5):
+            q.put(i)
+        assert len(q) == 2
+        assert q.dropped == 3
+        assert q.get(timeout=0.1) == 3
+        assert q.get(timeout=0.1) == 4
+
+    def test_get_timeout_and_close(self):
+        q = DropOldestQueue(maxsize=1)
+        assert q.get(timeout=0.05) is None
+        q.put(1)
+        q.close()
+        assert q.get(timeout=0.05) is None
+        q.put(2)
+        assert len(q) == 0
+
+
+class TestFramePipeline:
+    def test_packets_flow_through_all_stages_in_order(self, pipeline):
+        seen = []
+        done = threading.Event()
+
+        def sink(packet):
+            seen.append(packet.frame_id)
+            if packet.frame_id == 4:
+                done.set()
+
+        pipeline.add_stage("a", lambda p: p, queue_size=8)
+        pipeline.add_stage("b", lambda p: p, queue_size=8)
+        pipeline.add_stage("sink", sink, queue_size=8)
+        pipeline.start()
+        for i in range(5):
+            pipeline.submit(FramePacket(i, time.monotonic(), None))
+
+        assert done.wait(2.0)
+        assert seen == [0, 1, 2, 3, 4]
+
+    def test_stages_overlap(self, pipeline):
+        """Пока вторая стадия занята кадром N, первая уже берёт кадр N+1."""
+        first_started = []
+        release = threading.Event()
+
+        def slow_second(packet):
+            release.wait(1.0)
+            return packet
+
+        pipeline.add_stage("first", lambda p: first_started.append(p.frame_id) or p)
+        pipeline.add_stage("second", slow_second)
+        pipeline.start()
+        pipeline.submit(FramePacket(0, time.monotonic(), None))
+        assert _wait_until(lambda: first_started == [0])
+        pipeline.submit(FramePacket(1, time.monotonic(), None))
+        assert _wait_until(lambda: first_started == [0, 1])
+        release.set()
+
+    def test_slow_stage_drops_oldest(self, pipeline):
+        processed = []
+
+        def slow(packet):
+            time.sleep(0.05)
+            processed.append(packet.frame_id)
+
+        pipeline.add_stage("slow", slow, queue_size=1)
+        pipeline.start()
+        for i in range(10):
+            pipeline.submit(FramePacket(i, time.monotonic(), None))
+        assert _wait_until(lambda: processed and processed[-1] == 9)
+
+        stats = pipeline.get_stats()["slow"]
+        assert stats["dropped"] > 0
+        assert stats["processed"] == len(processed)
+        assert 9 in processed
+
+    def test_stage_error_does_not_stop_worker(self, pipeline):
+        processed = []
+
+        def flaky(packet):
+            if packet.frame_id == 0:
+                raise RuntimeError("boom")
+            processed.append(packet.frame_id)
+
+        pipeline.add_stage("flaky", flaky)
+        pipeline.start()
+        pipeline.submit(FramePacket(0, time.monotonic(), None))
+        pipeline.submit(FramePacket(1, time.monotonic(), None))
+
+        assert _wait_until(lambda: processed == [1])
+        assert pipeline.get_stats()["flaky"]["errors"] == 1
+
+    def test_every_packet_retired_once(self):
+        retired = []
+        done = threading.Event()
+
+        def slow(packet):
+            time.sleep(0.02)
+            return packet if packet.frame_id % 2 else None
+
+        def on_retire(packet):
+            retired.append(packet.frame_id)
+            if len(retired) == 20:
+                done.set()
+
+        p = FramePipeline(on_retire=on_retire)
+        p.add_stage("slow", slow, queue_size=1)
+        p.add_stage("sink", lambda pk: pk)
+        p.start()
+        try:
+            for i in range(20):
+                p.submit(FramePacket(i, time.monotonic(), None))
+                time.sleep(0.005)
+            assert done.wait(2.0)
+        finally:
+            p.stop()
+        assert sorted(retired) == list(range(20))
+
+    def test_stats_keys(self, pipeline):
+        pipeline.add_stage("inference", lambda p: p)
+        pipeline.add_stage("render", lambda p: None)
+        stats = pipeline.get_stats()
+        assert list(stats) == ["inference", "render"]
+        for s in stats.values():
+            assert {"fps", "avg_ms", "processed", "errors",
+                    "queue_depth", "dropped"} <= set(s)
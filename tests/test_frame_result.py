@@ -0,0 +1,111 @@
+import pytest
+
+from src.frame_result import (
+    EMPTY_FATIGUE, EMPTY_POSTURE, FatigueResult, FrameResult, FrameResultPool,
+    PostureResult,
+)
+
+
+class TestFrameResult:
+    def test_defaults_match_pre_ml_frame(self):
+        data = FrameResult()
+        assert (data.ear, data.mar, data.pitch, data.emotion) == (0.35, 0.0, 0.0, '...')
+        assert data.fatigue is EMPTY_FATIGUE and data.posture is EMPTY_POSTURE
+        assert data.fatigue.fatigue_status == 'Awake'
+        assert data.posture.posture_status == 'Good'
+
+    def test_misspelled_field_raises(self):
+        data = FrameResult()
+        with pytest.raises(AttributeError):
+            data.status = 'Awake'
+        with pytest.raises(AttributeError):
+            data.fatigue.fatigue_stauts
+
+    def test_to_dict_is_flat(self):
+        data = FrameResult(frame_id=3, ear=0.3, event='Зевок',
+                           fatigue=FatigueResult(fatigue_status='Yawning', event='Зевок'),
+                           posture=PostureResult(posture_alert_level='fair'),
+                           stats={'dropped_frames': 2, 'pipeline': {}})
+        flat = data.to_dict()
+        assert flat['frame_id'] == 3 and flat['ear'] == 0.3
+        assert flat['fatigue_status'] == 'Yawning'
+        assert flat['posture_alert_level'] == 'fair'
+        assert flat['dropped_frames'] == 2
+        assert 'fatigue' not in flat and 'stats' not in flat and '_pool' not in flat
+
+    def test_copy_from_shares_ml_results(self):
+        cached = FrameResult(ear=0.28, fatigue=FatigueResult(fatigue_score=40),
+                             stats={'pipeline': {}})
+        data = FrameResult()
+        data.copy_from(cached)
+        assert data.ear == 0.28
+        assert data.fatigue is cached.fatigue
+        assert data.stats is None
+
+
+class TestFrameResultPool:
+    def test_release_reuses_and_resets(self):
+        pool = FrameResultPool()
+        data = pool.acquire()
+        data.ear = 0.2
+        data.fatigue = FatigueResult(fatigue_score=80)
+        data.stats = {'dropped_frames': 1}
+        data.release()
+        again = pool.acquire()
+        assert again is data
+        assert again.ear == 0.35 and again.fatigue is EMPTY_FATIGUE and again.stats is None
+        assert pool.allocated == 1
+
+    def test_double_release_is_ignored(self):
+        pool = FrameResultPool()
+        data = pool.acquire()
+        data.release()
+        data.release()
+        assert pool.free_count == 1
+        assert pool.acquire() is data
+        assert pool.acquire() is not data
+
+    def test_unreleased_results_are_allocated(self):
+        pool = FrameResultPool(max_size=2)
+        held = [pool.acquire() for _ in range(4)]
+        assert pool.allocated == 4
+        for data in held:
+            data.release()
+        assert pool.free_count == 2
+
+    def test_result_without_pool_release_is_noop(self):
+        data = FrameResult(ear=0.2)
+        data.release()
+        assert data.ear == 0.2
+
+
+class TestEnginePublish:
+    def _engine(self, on_data=None, result_queue=None):
+        from src.engine import NeuroFocusEngine
+        engine = NeuroFocusEngine.__new__(NeuroFocusEngine)
+        engine.on_data = on_data
+        engine.result_queue = result_queue
+        engine._result_pool = FrameResultPool()
+        return engine
+
+    def test_queue_gets_own_copy_when_callback_releases(self):
+        import queue
+        q = queue.Queue()
+        engine = self._engine(on_data=lambda r: r.release(), result_queue=q)
+        data = engine._result_pool.acquire()
+        data.frame_id, data.ear, data.stats = 7, 0.21, {'fps': 30}
+        engine._publish_data(data)
+        queued = q.get_nowait()
+        assert queued is not data
+        assert queued.frame_id == 7 and queued.ear == 0.21 and queued.stats == {'fps': 30}
+
+    def test_full_queue_releases_its_copy(self):
+        import queue
+        q = queue.Queue(maxsize=1)
+        q.put_nowait(None)
+        engine = self._engine(on_data=lambda r: r.release(), result_queue=q)
+        engine._publish_data(engine._result_pool.acquire())
+        # Оригинал и копия вернулись в пул — новых объектов не нужно
+        engine._result_pool.acquire()
+        engine._result_pool.acquire()
+        assert engine._result_pool.allocated == 2
@@ -0,0 +1,139 @@
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from src.frame_grabber import FrameGrabber
+from src.frame_pipeline import FramePipeline
+from src.frame_source import (CameraSource, ImageDirSource, VideoFileSource,
+                              default_backend, open_source)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def image_dir(tmp_path):
+    for i in range(5):
+        cv2.imwrite(str(tmp_path / f"frame_{i:03d}.png"),
+                    np.full((48, 64, 3), i * 40, dtype=np.uint8))
+    (tmp_path / "notes.txt").write_text("not an image")
+    return tmp_path
+
+
+@pytest.fixture
+def video_file(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 25, (64, 48))
+    for i in range(10):
+        writer.write(np.full((48, 64, 3), i * 20, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def read_all(source):
+    frames = []
+    while True:
+        ok, frame = source.read()
+        if not ok:
+            break
+        frames.append((source.frame_index, source.timestamp, frame))
+    return frames
+
+
+class TestFrameSources:
+    def test_image_dir_sorted_with_deterministic_timestamps(self, image_dir):
+        source = ImageDirSource(str(image_dir), fps=10, realtime=False)
+        assert source.open()
+        assert (source.width, source.height) == (64, 48)
+        frames = read_all(source)
+        assert [f[0] for f in frames] == [0, 1, 2, 3, 4]
+        assert [f[1] for f in frames] == pytest.approx([0.0, 0.1, 0.2, 0.3, 0.4])
+        assert [int(f[2][0, 0, 0]) for f in frames] == [0, 40, 80, 120, 160]
+        assert source.exhausted
+
+    def test_loop_restarts_and_keeps_time_monotonic(self, image_dir):
+        source = ImageDirSource(str(image_dir), fps=10, realtime=False, loop=True)
+        source.open()
+        stamps = []
+        for _ in range(7):
+            ok, _ = source.read()
+            assert ok
+            stamps.append(source.timestamp)
+        assert stamps == sorted(stamps)
+        assert not source.exhausted
+
+    def test_video_file_fps_from_container(self, video_file):
+        source = VideoFileSource(video_file, realtime=False)
+        assert source.open()
+        assert source.fps == pytest.approx(25)
+        frames = read_all(source)
+        assert len(frames) == 10
+        assert frames[-1][1] == pytest.approx(9 / 25)
+        source.release()
+
+    def test_realtime_pacing_follows_schedule(self, image_dir):
+        clock = FakeClock()
+        source = ImageDirSource(str(image_dir), fps=10, realtime=True,
+                                clock=clock.clock, sleep=clock.sleep)
+        source.open()
+        read_all(source)
+        assert clock.sleeps == pytest.approx([0.1, 0.1, 0.1, 0.1])
+
+    def test_open_source_dispatch(self, image_dir, video_file):
+        assert isinstance(open_source(str(image_dir)), ImageDirSource)
+        assert isinstance(open_source(video_file), VideoFileSource)
+        camera = open_source("1", {"width": 640, "height": 480, "backend": "auto"})
+        assert isinstance(camera, CameraSource)
+        assert camera.index == 1
+        assert camera.backend == default_backend()
+        assert isinstance(open_source(None, {"index": 2}), CameraSource)
+
+
+class TestLosslessReplay:
+    def test_grabber_delivers_every_frame_and_finishes(self, image_dir):
+        source = ImageDirSource(str(image_dir), realtime=False)
+        source.open()
+        grabber = FrameGrabber(source, lossless=True)
+        grabber.start()
+        try:
+            media = []
+            while True:
+                item = grabber.read(timeout=1.0)
+                if item is None:
+                    break
+                media.append(item.media_time)
+            assert len(media) == 5
+            assert grabber.finished and not grabber.failed
+            assert grabber.get_stats()['dropped_frames'] == 0
+        finally:
+            grabber.stop()
+
+    def test_lossless_pipeline_processes_everything(self):
+        retired = []
+        pipeline = FramePipeline(on_retire=retired.append, lossless=True)
+        def slow(packet):
+            time.sleep(0.002)
+            return packet
+
+        pipeline.add_stage("slow", slow, queue_size=1)
+        pipeline.start()
+        try:
+            for i in range(20):
+                pipeline.submit(i)
+            assert pipeline.drain(timeout=5.0)
+        finally:
+            pipeline.stop()
+        assert retired == list(range(20))
+        assert pipeline.get_stats()["slow"]["dropped"] == 0
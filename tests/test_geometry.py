@@ -0,0 +1,119 @@
+import math
+
+import numpy as np
+import pytest
+
+from src.geometry import (
+    FACE_MESH_POSTURE_FEATURES, as_points, ear_batch, ear_from_points, face_mesh_posture_features,
+    head_forward_batch, head_tilt_batch, mar_batch, mar_from_points,
+    posture_metrics_from_points,
+)
+from src.landmark_recording import LandmarkRecorder, LandmarkRecording
+
+
+def _faces(t=50, n=478, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0.2, 0.8, (t, n, 3)).astype(np.float32)
+
+
+def _legacy_tilt(p):
+    # PostureAnalyzer._calculate_head_tilt до векторизации
+    left_ear, right_ear, left_eye, right_eye = p[234], p[454], p[33], p[263]
+    dx = right_ear[0] - left_ear[0]
+    if dx < 0.03:
+        return 0.0
+    tilt_pct = ((left_eye[0] + right_eye[0]) / 2 - (left_ear[0] + right_ear[0]) / 2) / dx
+    return float(np.clip(tilt_pct * 45, -30.0, 30.0))
+
+
+def _legacy_forward(p):
+    nose, forehead, chin = p[1], p[10], p[152]
+    face_height = chin[1] - forehead[1]
+    if face_height < 0.05:
+        return 0.0
+    nose_offset = (nose[1] - (forehead[1] + chin[1]) / 2) / face_height
+    return max(0.0, nose_offset + 0.05)
+
+
+class TestBatchGeometry:
+    def test_per_frame_is_bit_identical_to_batch(self):
+        faces = _faces()
+        ears, mars = ear_batch(faces), mar_batch(faces)
+        tilts, forwards = head_tilt_batch(faces), head_forward_batch(faces)
+        for t in range(len(faces)):
+            assert ear_from_points(faces[t]) == ears[t]
+            assert mar_from_points(faces[t]) == mars[t]
+            tilt, forward, _ = posture_metrics_from_points(faces[t])
+            assert (tilt, forward) == (tilts[t], forwards[t])
+
+    def test_matches_scalar_formulas(self):
+        faces = _faces(t=20, seed=1).astype(np.float64)
+        # Гарантируем обе ветки: узкая голова / маленькое лицо → 0
+        faces[0, 454, 0] = faces[0, 234, 0] + 0.01
+        faces[1, 152, 1] = faces[1, 10, 1] + 0.01
+        for t, face in enumerate(faces):
+            pts = face.tolist()
+            assert head_tilt_batch(face[None])[0] == pytest.approx(_legacy_tilt(pts), abs=1e-12)
+            assert head_forward_batch(face[None])[0] == pytest.approx(_legacy_forward(pts), abs=1e-12)
+        assert head_tilt_batch(faces[:1])[0] == 0.0
+        assert head_forward_batch(faces[1:2])[0] == 0.0
+
+    def test_ear_formula(self):
+        face = _faces(t=1, seed=2)[0].astype(np.float64)
+
+        def ratio(idx):
+            p = face[idx, :2]
+            return (math.dist(p[2], p[3]) + math.dist(p[4], p[5])) / (2.0 * math.dist(p[0], p[1]) + 1e-6)
+
+        expected = (ratio([33, 133, 160, 144, 158, 153]) + ratio([362, 263, 385, 380, 387, 373])) / 2
+        assert ear_from_points(face) == pytest.approx(expected, rel=1e-12)
+
+    def test_posture_features_shape(self):
+        feats = face_mesh_posture_features(_faces(t=7))
+        assert feats.shape == (7, len(FACE_MESH_POSTURE_FEATURES))
+        assert feats.dtype == np.float32
+        assert np.all(np.isfinite(feats))
+
+    def test_recording_face_array(self, tmp_path):
+        faces = _faces(t=6, seed=3)
+        path = str(tmp_path / "s.nflm")
+        with LandmarkRecorder(path, chunk_size=4) as rec:
+            for t, face in enumerate(faces):
+                rec.write(t / 30.0, t, face=face if t != 2 else None)
+        points, has_face = LandmarkRecording(path).face_array()
+        assert points.shape == (6, 478, 3)
+        assert has_face.tolist() == [True, True, False, True, True, True]
+        np.testing.assert_array_equal(ear_batch(points[has_face]), ear_batch(faces[has_face]))
+
+
+class TestLandmarkFormats:
+    """Списки словарей и пар координат дают те же метрики, что и массив."""
+
+    def _formats(self, face):
+        dicts = [{'x': float(x), 'y': float(y)} for x, y, _ in face]
+        pairs = [(float(x), float(y)) for x, y, _ in face]
+        return dicts, pairs
+
+    def test_as_points_accepts_dicts_and_pairs(self):
+        face = _faces(t=1, seed=4)[0]
+        for landmarks in self._formats(face):
+            points = as_points(landmarks)
+            assert points.shape == face.shape
+            np.testing.assert_array_equal(points[:, :2], face[:, :2])
+        assert as_points([]).shape == (0, 3)
+
+    def test_preprocessing_functions(self):
+        pytest.importorskip('mediapipe')     # neurofocus.ml тянет mediapipe при импорте пакета
+        from neurofocus.ml.preprocessing import (
+            calculate_ear_from_landmarks, calculate_mar_from_landmarks,
+            extract_face_mesh_posture_features,
+        )
+
+        face = _faces(t=1, seed=5)[0]
+        for landmarks in self._formats(face):
+            assert calculate_ear_from_landmarks(landmarks) == pytest.approx(ear_from_points(face))
+            assert calculate_mar_from_landmarks(landmarks) == pytest.approx(mar_from_points(face))
+            np.testing.assert_allclose(extract_face_mesh_posture_features(landmarks),
+                                       face_mesh_posture_features(face[None])[0], atol=1e-6)
+        assert calculate_ear_from_landmarks([]) is None
+        assert extract_face_mesh_posture_features([]) is None
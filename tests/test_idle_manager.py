@@ -0,0 +1,127 @@
+import numpy as np
+import pytest
+
+from src.frame_bundle import FrameBundle
+from src.idle_manager import IdleController, PresenceProbe
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeCascade:
+    def __init__(self, faces):
+        self.faces = faces
+        self.shapes = []
+
+    def detectMultiScale(self, gray, **kwargs):
+        self.shapes.append(gray.shape)
+        return np.array(self.faces).reshape(-1, 4)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def bundle():
+    b = FrameBundle((720, 1280, 3))
+    b.load(np.zeros((720, 1280, 3), dtype=np.uint8), 0, 0.0)
+    return b
+
+
+class TestIdleController:
+    def test_face_absence_enters_idle(self, clock):
+        changes = []
+        idle = IdleController(clock=clock, on_change=changes.append)
+        idle.update_active(face_present=True, paused=False)
+        assert not idle.is_idle
+        idle.update_active(face_present=False, paused=False)
+        assert idle.is_idle
+        assert idle.get_stats()['idle_reason'] == 'no_face'
+        assert changes == [IdleController.IDLE]
+
+    def test_face_resumes_on_same_frame(self, clock):
+        changes = []
+        idle = IdleController(clock=clock, on_change=changes.append)
+        idle.update_active(face_present=False, paused=False)
+        assert idle.update_idle(face_present=False, paused=False) is False
+        assert idle.update_idle(face_present=True, paused=False) is True
+        assert not idle.is_idle
+        assert changes == [IdleController.IDLE, IdleController.ACTIVE]
+
+    def test_pause_keeps_idle_until_resumed(self, clock):
+        idle = IdleController(clock=clock)
+        idle.update_active(face_present=True, paused=True)
+        assert idle.get_stats()['idle_reason'] == 'paused'
+        assert idle.update_idle(face_present=True, paused=True) is False
+        assert idle.update_idle(face_present=True, paused=False) is True
+
+    def test_without_probe_only_pause_idles(self, clock):
+        idle = IdleController(clock=clock, idle_on_face_absence=False)
+        idle.update_active(face_present=False, paused=False)
+        assert not idle.is_idle
+        idle.update_active(face_present=False, paused=True)
+        assert idle.is_idle
+        # Лицо проверить нечем — снятие паузы сразу возвращает полный режим
+        assert idle.update_idle(face_present=False, paused=False) is True
+
+    def test_disabled_controller_never_idles(self, clock):
+        idle = IdleController(enabled=False, clock=clock)
+        idle.update_active(face_present=False, paused=True)
+        assert not idle.is_idle
+
+    def test_idle_seconds_accumulate(self, clock):
+        idle = IdleController(clock=clock)
+        idle.update_active(face_present=False, paused=False)
+        clock.now += 4.0
+        assert idle.get_stats()['idle_seconds'] == pytest.approx(4.0)
+        idle.wake()
+        clock.now += 10.0
+        stats = idle.get_stats()
+        assert stats['idle'] is False
+        assert stats['idle_seconds'] == pytest.approx(4.0)
+
+
+class TestPresenceProbe:
+    def test_cascade_on_small_gray(self, bundle):
+        probe = PresenceProbe(width=320)
+        probe._cascade = FakeCascade([[10, 10, 40, 40]])
+        assert probe.available
+        assert probe.detect(bundle) is True
+        assert probe._cascade.shapes == [(180, 320)]
+
+    def test_no_face(self, bundle):
+        probe = PresenceProbe(width=320)
+        probe._cascade = FakeCascade([])
+        assert probe.detect(bundle) is False
+
+    def test_unavailable_probe_assumes_presence(self, bundle):
+        probe = PresenceProbe()
+        probe._cascade = None
+        probe._face_detector = None
+        assert not probe.available
+        assert probe.detect(bundle) is True
+
+
+class TestEngineIdleFrames:
+    def test_idle_frames_are_counted(self):
+        from src.engine import NeuroFocusEngine
+        from src.frame_pipeline import FramePacket
+        from src.frame_result import FrameResult, FrameResultPool
+
+        engine = NeuroFocusEngine.__new__(NeuroFocusEngine)
+        engine._result_pool = FrameResultPool()
+        engine._last_data = FrameResult()
+        engine.frame_counter = 0
+        for i in range(3):
+            packet = FramePacket(i, 0.0, None)
+            packet.idle = True
+            engine._stage_analytics(packet)
+            assert packet.data is not None and not packet.data.face_detected
+        assert engine.frame_counter == 3
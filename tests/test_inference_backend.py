@@ -0,0 +1,148 @@
+import os
+
+import numpy as np
+import pytest
+
+from src import inference_backend as ib
+
+
+class _FakeKeras:
+    """Keras-подобная модель: softmax(x·W) с input_shape."""
+
+    input_shape = (None, 30, 16)
+
+    def __init__(self):
+        self.calls = []
+        self._w = np.linspace(-1.0, 1.0, 16 * 3, dtype=np.float32).reshape(16, 3)
+
+    def __call__(self, x, training=None):
+        self.calls.append(training)
+        logits = np.asarray(x).mean(axis=1) @ self._w
+        e = np.exp(logits - logits.max(axis=-1, keepdims=True))
+        return e / e.sum(axis=-1, keepdims=True)
+
+
+class _OffsetBackend(ib.InferenceBackend):
+    name = ib.BACKEND_TFLITE
+
+    def __init__(self, model, offset=0.0):
+        self.keras_model = model
+        self.offset = offset
+        self.closed = False
+
+    def predict(self, x):
+        return np.asarray(self.keras_model(x)) + self.offset
+
+    def close(self):
+        self.closed = True
+
+
+def _fake_conversion(monkeypatch, offset):
+    opened = []
+
+    def convert(model, path):
+        with open(path, 'wb') as f:
+            f.write(b'model')
+
+    def open_converted(kind, path, threads, keras_model=None):
+        opened.append(_OffsetBackend(keras_model, offset))
+        return opened[-1]
+
+    monkeypatch.setitem(ib._CONVERTERS, ib.BACKEND_TFLITE, convert)
+    monkeypatch.setattr(ib, '_open_converted', open_converted)
+    return opened
+
+
+class TestKerasBackend:
+    def test_direct_call_in_inference_mode(self):
+        model = _FakeKeras()
+        out = ib.KerasBackend(model).predict(np.zeros((2, 30, 16)))
+        assert out.shape == (2, 3)
+        assert model.calls == [False]
+
+
+class TestParity:
+    def test_identical_outputs_pass(self):
+        model = _FakeKeras()
+        assert ib.check_parity(_OffsetBackend(model), ib.KerasBackend(model), model.input_shape)
+
+    def test_drift_fails(self):
+        model = _FakeKeras()
+        backend = _OffsetBackend(model, offset=1e-3)
+        error = ib.parity_error(backend, ib.KerasBackend(model), ib.parity_inputs(model.input_shape))
+        assert error == pytest.approx(1e-3, rel=1e-3)
+        assert not ib.check_parity(backend, ib.KerasBackend(model), model.input_shape, atol=1e-4)
+
+    def test_parity_inputs_shape(self):
+        x = ib.parity_inputs((None, 48, 48, 1), samples=3)
+        assert x.shape == (3, 48, 48, 1) and x.dtype == np.float32
+
+
+class TestCache:
+    def test_cached_path(self, tmp_path):
+        path = ib.cached_model_path('models/fatigue_lstm.keras', ib.BACKEND_TFLITE, str(tmp_path))
+        assert path == os.path.join(str(tmp_path), 'fatigue_lstm.tflite')
+        assert ib.cached_model_path('models/emotion_model.hdf5', ib.BACKEND_ONNX).endswith('emotion_model.onnx')
+
+    def test_stale_cache(self, tmp_path):
+        source = tmp_path / 'm.keras'
+        cached = tmp_path / 'm.tflite'
+        source.write_bytes(b'k')
+        assert not ib.cache_is_fresh(str(cached), str(source))
+        cached.write_bytes(b't')
+        os.utime(source, (100, 100))
+        os.utime(cached, (200, 200))
+        assert ib.cache_is_fresh(str(cached), str(source))
+        os.utime(source, (300, 300))
+        assert not ib.cache_is_fresh(str(cached), str(source))
+
+
+class TestFactory:
+    def test_resolve_kinds(self):
+        assert ib._resolve_kinds('auto') == ib.AUTO_ORDER
+        assert ib._resolve_kinds('keras') == (ib.BACKEND_KERAS,)
+        assert ib._resolve_kinds('onnx') == (ib.BACKEND_ONNX, ib.BACKEND_KERAS)
+        assert ib._resolve_kinds('numpy') == (ib.BACKEND_NUMPY, ib.BACKEND_KERAS)
+        assert ib.AUTO_ORDER[0] == ib.BACKEND_NUMPY
+        assert ib._resolve_kinds('bogus') == ib.AUTO_ORDER
+
+    def test_missing_model_gives_none(self, tmp_path):
+        assert ib.load_model_backend(str(tmp_path / 'absent.keras'), backend='keras') is None
+
+    def test_keras_backend_requested(self, tmp_path):
+        model = _FakeKeras()
+        backend = ib.load_model_backend(str(tmp_path / 'm.keras'), backend='keras', keras_model=model)
+        assert isinstance(backend, ib.KerasBackend) and backend.keras_model is model
+
+    def test_converted_backend_is_cached(self, tmp_path, monkeypatch):
+        opened = _fake_conversion(monkeypatch, offset=0.0)
+        model = _FakeKeras()
+        backend = ib.backend_from_keras(model, str(tmp_path / 'm.keras'), (ib.BACKEND_TFLITE, ib.BACKEND_KERAS),
+                                        threads=2, cache_dir=str(tmp_path), parity_atol=1e-4)
+        assert backend is opened[0]
+        assert (tmp_path / 'm.tflite').exists()
+
+    def test_parity_failure_falls_back_to_keras(self, tmp_path, monkeypatch):
+        opened = _fake_conversion(monkeypatch, offset=0.1)
+        model = _FakeKeras()
+        backend = ib.backend_from_keras(model, str(tmp_path / 'm.keras'), (ib.BACKEND_TFLITE, ib.BACKEND_KERAS),
+                                        threads=2, cache_dir=str(tmp_path), parity_atol=1e-4)
+        assert isinstance(backend, ib.KerasBackend)
+        assert opened[0].closed
+        assert not (tmp_path / 'm.tflite').exists()
+
+    def test_failed_conversion_falls_back_to_keras(self, tmp_path, monkeypatch):
+        def convert(model, path):
+            raise RuntimeError('unsupported op')
+        monkeypatch.setitem(ib._CONVERTERS, ib.BACKEND_TFLITE, convert)
+        backend = ib.backend_from_keras(_FakeKeras(), str(tmp_path / 'm.keras'),
+                                        (ib.BACKEND_TFLITE, ib.BACKEND_KERAS),
+                                        threads=2, cache_dir=str(tmp_path), parity_atol=1e-4)
+        assert isinstance(backend, ib.KerasBackend)
+
+    def test_numpy_backend_from_keras_archive(self, tmp_path):
+        backend = ib.load_model_backend('models/posture_lstm.keras', backend='numpy', cache_dir=str(tmp_path))
+        assert isinstance(backend, ib.NumpyBackend)
+        assert (tmp_path / 'posture_lstm.npz').exists()
+        assert ib.input_shape_of(backend) == (None, 7)
+        assert backend.predict(np.zeros((2, 7), np.float32)).shape == (2, 3)
@@ -0,0 +1,166 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.inference_backend import InferenceBackend, NumpyBackend, input_shape_of
+from src.inference_scheduler import InferenceScheduler, ScheduledBackend, scheduled
+from src.lstm_stream import MODE_STREAMING, LSTMStream
+from src.numpy_inference import DenseLayer, LSTMLayer, NumpyModel
+
+
+class _RecordingBackend(InferenceBackend):
+    """x → x.sum(axis=1, keepdims=True); запоминает размеры батчей."""
+
+    name = 'recording'
+
+    def __init__(self, delay=0.0):
+        self.batches = []
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def predict(self, x):
+        with self._lock:
+            self.batches.append(x.shape[0])
+        if self.delay:
+            time.sleep(self.delay)
+        return x.sum(axis=1, keepdims=True)
+
+
+class _FailingBackend(InferenceBackend):
+    name = 'failing'
+
+    def predict(self, x):
+        raise ValueError('boom')
+
+
+def _submit_from_threads(scheduler, backend, n_threads, per_thread=1):
+    futures, inputs = [None] * n_threads, [None] * n_threads
+    barrier = threading.Barrier(n_threads)
+
+    def worker(i):
+        inputs[i] = np.full((per_thread, 4), float(i), np.float32)
+        barrier.wait()
+        futures[i] = scheduler.submit(backend, inputs[i])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return futures, inputs
+
+
+@pytest.fixture
+def scheduler():
+    s = InferenceScheduler(latency_budget=0.05, max_batch=64)
+    yield s
+    s.close()
+
+
+class TestInferenceScheduler:
+    def test_concurrent_requests_are_batched(self, scheduler):
+        backend = _RecordingBackend()
+        # Разогрев: оба потока «активны», планировщик ждёт попутчиков
+        for future in _submit_from_threads(scheduler, backend, 2)[0]:
+            future.result(timeout=5)
+        backend.batches.clear()
+        futures, inputs = _submit_from_threads(scheduler, backend, 8)
+        for future, x in zip(futures, inputs):
+            np.testing.assert_array_equal(future.result(timeout=5), x.sum(axis=1, keepdims=True))
+        assert sum(backend.batches) == 8
+        assert len(backend.batches) < 8
+        assert scheduler.get_stats()['max_batch'] > 1
+
+    def test_backlog_is_batched_after_deadline(self):
+        """Под нагрузкой дедлайн уже прошёл — стоящие запросы всё равно склеиваются."""
+        scheduler = InferenceScheduler(latency_budget=0.0005, max_batch=16)
+        backend = _RecordingBackend(delay=0.005)
+
+        def worker():
+            for _ in range(15):
+                scheduler.predict(backend, np.ones((1, 4), np.float32))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        try:
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        finally:
+            scheduler.close()
+        assert sum(backend.batches) == 120
+        assert scheduler.get_stats()['mean_batch'] >= 3
+
+    def test_single_submitter_does_not_wait(self):
+        scheduler = InferenceScheduler(latency_budget=1.0)
+        try:
+            backend = _RecordingBackend()
+            started = time.monotonic()
+            for _ in range(3):
+                scheduler.predict(backend, np.ones((1, 4), np.float32))
+            assert time.monotonic() - started < 0.5
+        finally:
+            scheduler.close()
+
+    def test_batches_are_per_model(self, scheduler):
+        a, b = _RecordingBackend(), _RecordingBackend()
+        x = np.ones((1, 4), np.float32)
+        futures = [scheduler.submit(backend, x) for backend in (a, b, a, b)]
+        for future in futures:
+            assert future.result(timeout=5).shape == (1, 1)
+        assert sum(a.batches) == 2 and sum(b.batches) == 2
+
+    def test_max_batch_caps_batch_size(self):
+        scheduler = InferenceScheduler(latency_budget=0.05, max_batch=3)
+        try:
+            backend = _RecordingBackend(delay=0.02)
+            futures, _ = _submit_from_threads(scheduler, backend, 9)
+            for future in futures:
+                future.result(timeout=5)
+            assert max(backend.batches) <= 3
+        finally:
+            scheduler.close()
+
+    def test_errors_reach_every_future(self, scheduler):
+        backend = _FailingBackend()
+        futures = [scheduler.submit(backend, np.ones((1, 2), np.float32)) for _ in range(3)]
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result(timeout=5)
+
+    def test_closed_scheduler_rejects_requests(self):
+        scheduler = InferenceScheduler()
+        scheduler.predict(_RecordingBackend(), np.ones((1, 2), np.float32))
+        scheduler.close()
+        with pytest.raises(RuntimeError):
+            scheduler.submit(_RecordingBackend(), np.ones((1, 2), np.float32))
+
+
+class TestScheduledBackend:
+    def _model(self):
+        rng = np.random.default_rng(0)
+        return NumpyModel([
+            LSTMLayer(rng.normal(0, 0.5, (4, 16)), rng.normal(0, 0.5, (4, 16)), rng.normal(0, 0.1, 16)),
+            DenseLayer(rng.normal(0, 1.0, (4, 3)), np.zeros(3), 'softmax'),
+        ], (None, 5, 4))
+
+    def test_matches_wrapped_backend(self, scheduler):
+        inner = NumpyBackend(self._model())
+        backend = ScheduledBackend(inner, scheduler)
+        x = np.random.default_rng(1).random((2, 5, 4), dtype=np.float32)
+        np.testing.assert_allclose(backend.predict(x), inner.predict(x), atol=1e-6)
+        np.testing.assert_allclose(backend.predict_async(x).result(timeout=5), inner.predict(x), atol=1e-6)
+        assert backend.name == inner.name
+        assert input_shape_of(backend) == (None, 5, 4)
+
+    def test_lstm_stream_keeps_streaming_mode(self, scheduler):
+        backend = ScheduledBackend(NumpyBackend(self._model()), scheduler)
+        stream = LSTMStream(backend, window=5, features=4)
+        assert stream.mode == MODE_STREAMING
+
+    def test_scheduled_is_noop_when_batching_disabled(self):
+        backend = _RecordingBackend()
+        assert scheduled(backend) is backend
+        assert scheduled(None) is None
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from src.geometry import calculate_ear, calculate_mar
+from src.landmark_frame import LandmarkFrame
+from src.pose_estimator import HeadPoseEstimator
+from src.posture_analyzer import PostureAnalyzer
+
+
+class _Lm:
+    def __init__(self, x, y, z=0.0):
+        self.x, self.y, self.z = x, y, z
+
+
+class _LmList:
+    def __init__(self, points):
+        self.landmark = [_Lm(*p) for p in points.tolist()]
+
+
+def _face_points(seed=0, n=478):
+    rng = np.random.default_rng(seed)
+    pts = rng.uniform(0.3, 0.7, (n, 3)).astype(np.float32)
+    pts[:, 2] *= 0.1
+    return pts
+
+
+def _legacy_ear(lms):
+    def ratio(idx):
+        p = [np.array([lms[i].x, lms[i].y]) for i in idx]
+        return (np.linalg.norm(p[2] - p[3]) + np.linalg.norm(p[4] - p[5])) / (
+            2.0 * np.linalg.norm(p[0] - p[1]) + 1e-6)
+    return (ratio([33, 133, 160, 144, 158, 153]) + ratio([362, 263, 385, 380, 387, 373])) / 2.0
+
+
+class TestLandmarkFrame:
+    def test_from_mediapipe_matches_legacy_metrics(self):
+        pts = _face_points()
+        mp_like = _LmList(pts)
+        lf = LandmarkFrame.from_landmarks(mp_like, 640, 480)
+        assert lf.points.shape == (478, 3) and lf.points.dtype == np.float32
+        assert lf.ear == pytest.approx(_legacy_ear(mp_like.landmark), rel=1e-12)
+        assert lf.ear == calculate_ear(mp_like.landmark)
+        assert lf.mar == calculate_mar(mp_like)
+        xs = [p.x for p in mp_like.landmark]
+        ys = [p.y for p in mp_like.landmark]
+        assert lf.bbox == (min(xs), min(ys), max(xs), max(ys))
+
+    def test_pose_is_cached_and_matches_frame_api(self):
+        lf = LandmarkFrame(_face_points(1), 640, 480)
+        estimator = HeadPoseEstimator()
+        calls = []
+        original = estimator.get_pose_from_points
+
+        def counting(*args):
+            calls.append(1)
+            return original(*args)
+
+        estimator.get_pose_from_points = counting
+        first = lf.head_pose(estimator)
+        assert lf.head_pose(estimator) == first
+        assert len(calls) == 1
+        frame = np.zeros((480, 640, 3), np.uint8)
+        assert HeadPoseEstimator().get_pose(frame, _LmList(lf.points)) == pytest.approx(first)
+
+    def test_mediapipe_style_access(self):
+        pts = _face_points(2)
+        lf = LandmarkFrame(pts)
+        assert len(lf.landmark) == 478
+        assert lf.landmark[10].y == pytest.approx(float(pts[10, 1]))
+        assert sum(1 for _ in lf) == 478
+        assert LandmarkFrame.from_landmarks(lf) is lf
+
+    def test_posture_analyzer_accepts_frame(self):
+        pts = _face_points(3)
+        a = PostureAnalyzer().update_from_face_mesh(LandmarkFrame(pts))
+        b = PostureAnalyzer().update_from_face_mesh(_LmList(pts))
+        assert a == b
+        assert a['posture_level'] != 'unknown'
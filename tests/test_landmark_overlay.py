@@ -0,0 +1,71 @@
+import cv2
+import numpy as np
+
+from src.landmark_frame import LandmarkFrame
+from src.landmark_overlay import (
+    FACE_OVAL, HAND_CONNECTIONS, OVERLAY_CONTOURS, OVERLAY_MESH, OVERLAY_OFF,
+    LandmarkOverlay, connection_array,
+)
+
+
+def _face(n=478, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0.3, 0.7, (n, 3)).astype(np.float32)
+
+
+def _hand():
+    t = np.linspace(0.2, 0.8, 21, dtype=np.float32)
+    return np.stack([t, t[::-1], np.zeros_like(t)], axis=1)
+
+
+class TestLandmarkOverlay:
+    def test_off_draws_nothing(self):
+        img = np.zeros((120, 160, 3), np.uint8)
+        LandmarkOverlay(OVERLAY_OFF).draw(img, face=_face(), hand=_hand())
+        assert not img.any()
+
+    def test_one_polylines_call_per_layer(self, monkeypatch):
+        calls = []
+        real = cv2.polylines
+
+        def counting(img, pts, *args):
+            calls.append(len(pts))
+            return real(img, pts, *args)
+
+        monkeypatch.setattr(cv2, 'polylines', counting)
+        overlay = LandmarkOverlay(OVERLAY_CONTOURS)
+        overlay.draw(np.zeros((120, 160, 3), np.uint8), face=LandmarkFrame(_face()))
+        # контуры + радужки, независимо от числа рёбер
+        assert len(calls) == len(overlay._face_layers) == 2
+        assert calls[0] > 100
+
+    def test_draws_in_target_resolution(self):
+        # Те же нормализованные точки на превью любого размера
+        face = np.zeros((478, 3), np.float32)
+        face[:, :2] = 0.5
+        face[10, :2] = (0.25, 0.25)
+        face[338, :2] = (0.75, 0.25)
+        overlay = LandmarkOverlay(OVERLAY_CONTOURS)
+        for w, h in ((160, 120), (640, 480)):
+            img = np.zeros((h, w, 3), np.uint8)
+            overlay.draw(img, face=face)
+            assert img[h // 4, w // 2].any()      # ребро 10-338 (верх овала)
+            assert not img[h - 5, 5].any()
+
+    def test_hand_and_short_face(self):
+        img = np.zeros((120, 160, 3), np.uint8)
+        # 468 точек (без радужек): слой радужек пропускается без ошибки
+        LandmarkOverlay().draw(img, face=_face(n=468), hand=_hand())
+        assert img[60, 80].any()                  # диагональ руки через центр
+
+    def test_unknown_level_and_mesh_fallback(self):
+        overlay = LandmarkOverlay('bogus')
+        assert overlay.level == OVERLAY_CONTOURS
+        overlay.set_level(OVERLAY_MESH)
+        assert overlay.level == OVERLAY_MESH
+        assert len(overlay._face_layers) >= 2
+
+    def test_connection_array(self):
+        edges = connection_array(FACE_OVAL, HAND_CONNECTIONS)
+        assert edges.shape == (len(FACE_OVAL) + len(HAND_CONNECTIONS), 2)
+        assert edges.dtype == np.int32
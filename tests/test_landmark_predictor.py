@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from src.landmark_predictor import LandmarkPredictor
+
+
+def _points(x, y, n=21):
+    points = np.zeros((n, 3), np.float32)
+    points[:, 0] = x + np.linspace(0.0, 0.1, n)
+    points[:, 1] = y
+    return points
+
+
+class TestLandmarkPredictor:
+    def test_no_data_no_prediction(self):
+        assert LandmarkPredictor().predict(1.0) is None
+
+    def test_constant_velocity_extrapolation(self):
+        pred = LandmarkPredictor()
+        # 0.3 кадра/с по x, наблюдения 30 FPS
+        for i in range(30):
+            pred.update(_points(0.2 + 0.3 * i / 30, 0.5), i / 30)
+        t_last = 29 / 30
+        estimate = pred.predict(t_last + 1 / 30)
+        np.testing.assert_allclose(estimate, _points(0.2 + 0.3 * 30 / 30, 0.5), atol=1e-3)
+
+    def test_horizon_cap(self):
+        pred = LandmarkPredictor(max_horizon=0.05, max_age=1.0)
+        for i in range(30):
+            pred.update(_points(0.3 * i / 30, 0.5), i / 30)
+        t_last = 29 / 30
+        near = pred.predict(t_last + 0.05)
+        far = pred.predict(t_last + 0.5)
+        np.testing.assert_array_equal(near, far)
+
+    def test_stale_observation_gives_none(self):
+        pred = LandmarkPredictor(max_age=0.25)
+        pred.update(_points(0.5, 0.5), 1.0)
+        assert pred.predict(1.2) is not None
+        assert pred.predict(1.3) is None
+
+    def test_reset(self):
+        pred = LandmarkPredictor()
+        pred.update(_points(0.5, 0.5), 1.0)
+        pred.reset()
+        assert pred.last_time is None
+        assert pred.predict(1.0) is None
+
+    def test_repeated_timestamp_updates_position_only(self):
+        pred = LandmarkPredictor()
+        pred.update(_points(0.5, 0.5), 1.0)
+        pred.update(_points(0.6, 0.5), 1.0)   # dt = 0 — скорость не трогаем
+        np.testing.assert_allclose(pred.predict(1.05), _points(0.6, 0.5))
+
+    def test_noise_is_damped(self):
+        # Неподвижная рука с дрожанием детектора: экстраполяция от последнего
+        # наблюдения заметно меньше, чем по сырой разности двух кадров
+        rng = np.random.default_rng(0)
+        pred = LandmarkPredictor()
+        observed = []
+        for i in range(60):
+            noise = rng.normal(0.0, 0.003, (21, 3)).astype(np.float32)
+            observed.append(pred.update(_points(0.5, 0.5) + noise, i / 30))
+        shift = pred.predict(59 / 30 + 0.1) - observed[-1]
+        raw_shift = (observed[-1] - observed[-2]) * 30 * 0.1
+        assert np.abs(shift).mean() < 0.5 * np.abs(raw_shift).mean()
+
+    def test_shape_change_restarts_velocity(self):
+        pred = LandmarkPredictor()
+        pred.update(_points(0.2, 0.5), 0.0)
+        pred.update(_points(0.3, 0.5, n=478), 0.03)
+        assert pred.predict(0.06) == pytest.approx(_points(0.3, 0.5, n=478))
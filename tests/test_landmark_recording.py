@@ -0,0 +1,109 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.frame_result import FaceResult
+from src.landmark_recording import (
+    LandmarkRecorder, LandmarkRecording, QUANT_SCALE, replay_analytics,
+)
+
+
+class _Lm:
+    def __init__(self, x, y, z, visibility=0.0):
+        self.x, self.y, self.z, self.visibility = x, y, z, visibility
+
+
+def _face(seed, n=478):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0.0, 1.0, (n, 3)).astype(np.float32)
+
+
+def _write(path, frames=10, chunk_size=4, quantize=False):
+    with LandmarkRecorder(str(path), frame_size=(640, 480), quantize=quantize,
+                          chunk_size=chunk_size) as rec:
+        for i in range(frames):
+            hand = [_Lm(0.1 * j / 21, 0.5, -0.01) for j in range(21)] if i % 2 else None
+            pose = [_Lm(0.5, 0.5, 0.0, 0.9) for _ in range(33)] if i % 3 == 0 else None
+            rec.write(i / 30.0, 100 + i, face=_face(i) if i != 5 else None,
+                      hand=hand, pose=pose)
+    return rec
+
+
+class TestLandmarkRecording:
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "s.nflm"
+        _write(path)
+        recording = LandmarkRecording(str(path))
+        assert len(recording) == 10
+        assert recording.frame_size == (640, 480)
+        frame = recording[3]
+        assert frame.frame_id == 103
+        assert frame.timestamp == pytest.approx(0.1)
+        np.testing.assert_array_equal(frame.face, _face(3))
+        assert frame.has_hand and frame.has_pose
+        assert frame.pose[0, 3] == pytest.approx(0.9)
+        assert not recording[5].has_face
+        assert not recording[4].has_hand
+        assert recording.duration == pytest.approx(9 / 30.0)
+
+    def test_random_access_across_chunks(self, tmp_path):
+        path = tmp_path / "s.nflm"
+        _write(path, frames=10, chunk_size=3)
+        recording = LandmarkRecording(str(path))
+        assert [recording[i].frame_id for i in (9, 0, 4, -1)] == [109, 100, 104, 109]
+        np.testing.assert_allclose(recording.column('timestamp'), np.arange(10) / 30.0)
+        with pytest.raises(IndexError):
+            recording[10]
+
+    def test_quantized_is_smaller_and_close(self, tmp_path):
+        plain, quant = tmp_path / "f.nflm", tmp_path / "q.nflm"
+        _write(plain)
+        _write(quant, quantize=True)
+        assert os.path.getsize(quant) < 0.6 * os.path.getsize(plain)
+        face = LandmarkRecording(str(quant))[2].face
+        np.testing.assert_allclose(face, _face(2), atol=1.0 / QUANT_SCALE)
+
+    def test_shim_matches_mediapipe_interface(self, tmp_path):
+        path = tmp_path / "s.nflm"
+        _write(path)
+        frame = LandmarkRecording(str(path))[0]
+        results = frame.face_results()
+        point = results.multi_face_landmarks[0].landmark[1]
+        assert point.x == pytest.approx(float(_face(0)[1, 0]))
+        assert frame.pose_landmarks()[11].visibility == pytest.approx(0.9)
+        assert LandmarkRecording(str(path))[5].face_results().multi_face_landmarks is None
+
+    def test_index_rebuilt_after_crash(self, tmp_path):
+        path = tmp_path / "s.nflm"
+        _write(path, frames=10, chunk_size=4)
+        os.remove(str(path) + ".idx")
+        with open(path, "ab") as f:
+            f.write(b"CHNK\x04\x00\x00\x00" + b"\0" * 20)   # недописанный чанк
+        recording = LandmarkRecording(str(path))
+        assert len(recording) == 10
+        assert recording[9].frame_id == 109
+
+    def test_rejects_foreign_file(self, tmp_path):
+        path = tmp_path / "x.bin"
+        path.write_bytes(b"\0" * 128)
+        with pytest.raises(ValueError):
+            LandmarkRecording(str(path))
+
+
+class _FakeFaceProcessor:
+    def process(self, frame, results, timestamp=None):
+        detected = bool(results.multi_face_landmarks)
+        return FaceResult(detected=detected, valid=detected, ear=0.3, mar=0.1)
+
+
+class TestReplayAnalytics:
+    def test_every_frame_reaches_processor(self, tmp_path):
+        path = tmp_path / "s.nflm"
+        _write(path)
+        results = []
+        stats = replay_analytics(LandmarkRecording(str(path)), _FakeFaceProcessor(),
+                                 on_result=results.append)
+        assert stats['frames'] == 10
+        assert [r['frame_id'] for r in results] == list(range(100, 110))
+        assert [r['face_detected'] for r in results].count(False) == 1
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from src.inference_backend import InferenceBackend, NumpyBackend
+from src.lstm_stream import MODE_STREAMING, MODE_WINDOW, LSTMStream
+from src.numpy_inference import DenseLayer, LSTMLayer, NumpyModel
+
+WINDOW, FEATURES = 10, 4
+
+
+def _model(seed=0):
+    rng = np.random.default_rng(seed)
+    return NumpyModel([
+        LSTMLayer(rng.normal(0, 0.5, (FEATURES, 32)), rng.normal(0, 0.5, (8, 32)),
+                  rng.normal(0, 0.1, 32), return_sequences=True),
+        LSTMLayer(rng.normal(0, 0.5, (8, 16)), rng.normal(0, 0.5, (4, 16)), rng.normal(0, 0.1, 16)),
+        DenseLayer(rng.normal(0, 1.0, (4, 3)), np.zeros(3), 'softmax'),
+    ], (None, WINDOW, FEATURES))
+
+
+def _rows(n, seed=1):
+    return np.random.default_rng(seed).random((n, FEATURES), dtype=np.float32)
+
+
+def _windowed(model, rows, i):
+    return model.predict(rows[i - WINDOW + 1:i + 1][None])[0]
+
+
+class _OpaqueBackend(InferenceBackend):
+    """Backend без NumPy-слоёв (как TFLite / ONNX)."""
+
+    def __init__(self, model):
+        self._model = model
+        self.calls = 0
+
+    def predict(self, x):
+        self.calls += 1
+        return self._model.predict(x)
+
+
+class TestLSTMStream:
+    def test_not_ready_until_window_fills(self):
+        stream = LSTMStream(NumpyBackend(_model()), WINDOW, FEATURES)
+        for row in _rows(WINDOW - 1):
+            stream.push(row)
+            assert stream.predict() is None
+        stream.push(_rows(1)[0])
+        assert stream.ready and stream.predict().shape == (3,)
+
+    def test_window_mode_is_exact(self):
+        model = _model()
+        stream = LSTMStream(NumpyBackend(model), WINDOW, FEATURES, mode=MODE_WINDOW)
+        rows = _rows(35)
+        for i, row in enumerate(rows):
+            stream.push(row)
+            if i >= WINDOW - 1:
+                np.testing.assert_allclose(stream.predict(), _windowed(model, rows, i), atol=1e-6)
+
+    def test_streaming_exact_at_fill_and_resync(self):
+        model = _model()
+        stream = LSTMStream(NumpyBackend(model), WINDOW, FEATURES, mode=MODE_STREAMING,
+                            resync_interval=5)
+        assert stream.mode == MODE_STREAMING
+        rows = _rows(40)
+        for i, row in enumerate(rows):
+            stream.push(row)
+            if i == WINDOW - 1 or (i >= WINDOW and (i - WINDOW + 1) % 5 == 0):
+                np.testing.assert_allclose(stream.predict(), _windowed(model, rows, i), atol=1e-6)
+
+    def test_resync_every_row_matches_window(self):
+        model = _model()
+        stream = LSTMStream(NumpyBackend(model), WINDOW, FEATURES, resync_interval=1)
+        rows = _rows(25)
+        for i, row in enumerate(rows):
+            stream.push(row)
+            if i >= WINDOW - 1:
+                np.testing.assert_allclose(stream.predict(), _windowed(model, rows, i), atol=1e-6)
+
+    def test_prediction_cached_until_next_push(self):
+        backend = _OpaqueBackend(_model())
+        stream = LSTMStream(backend, WINDOW, FEATURES)
+        assert stream.mode == MODE_WINDOW
+        for row in _rows(WINDOW):
+            stream.push(row)
+        stream.predict()
+        stream.predict()
+        assert backend.calls == 1
+
+    def test_backend_swap_recomputes_state(self):
+        old, new = _model(0), _model(5)
+        stream = LSTMStream(NumpyBackend(old), WINDOW, FEATURES, resync_interval=100)
+        rows = _rows(WINDOW + 3)
+        for row in rows:
+            stream.push(row)
+        stream.set_backend(NumpyBackend(new))
+        np.testing.assert_allclose(stream.predict(), _windowed(new, rows, len(rows) - 1), atol=1e-6)
+
+    def test_reset(self):
+        stream = LSTMStream(NumpyBackend(_model()), WINDOW, FEATURES)
+        for row in _rows(WINDOW):
+            stream.push(row)
+        stream.reset()
+        assert not stream.ready and stream.predict() is None
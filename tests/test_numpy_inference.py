@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from src.numpy_inference import (
+    PARITY_ATOL, BatchNormLayer, DenseLayer, LSTMLayer, NumpyModel, UnsupportedModel,
+    export_keras_file, max_abs_error, sigmoid, softmax,
+)
+
+FATIGUE_LSTM = 'models/fatigue_lstm.keras'
+POSTURE_MODEL = 'models/posture_lstm.keras'
+
+
+def _reference_lstm(x, kernel, recurrent_kernel, bias):
+    """Покомпонентная формула Keras LSTM в float64."""
+    units = recurrent_kernel.shape[0]
+    h = np.zeros(units)
+    c = np.zeros(units)
+    sig = lambda v: 1.0 / (1.0 + np.exp(-v))
+    for x_t in x:
+        z = x_t @ kernel + h @ recurrent_kernel + bias
+        i, f = sig(z[:units]), sig(z[units:2 * units])
+        g, o = np.tanh(z[2 * units:3 * units]), sig(z[3 * units:])
+        c = f * c + i * g
+        h = o * np.tanh(c)
+    return h
+
+
+class TestKernels:
+    def test_sigmoid_and_softmax(self):
+        x = np.array([-100.0, -1.0, 0.0, 2.0, 100.0], np.float32)
+        np.testing.assert_allclose(sigmoid(x), 1.0 / (1.0 + np.exp(-x.astype(np.float64))), atol=1e-7)
+        p = softmax(np.array([[1.0, 2.0, 1000.0]], np.float32))
+        assert np.isfinite(p).all() and p.sum() == pytest.approx(1.0)
+
+    def test_lstm_matches_reference(self):
+        rng = np.random.default_rng(1)
+        kernel = rng.normal(0, 0.3, (16, 4 * 8)).astype(np.float32)
+        recurrent = rng.normal(0, 0.3, (8, 4 * 8)).astype(np.float32)
+        bias = rng.normal(0, 0.1, 4 * 8).astype(np.float32)
+        x = rng.random((2, 30, 16), dtype=np.float32)
+        layer = LSTMLayer(kernel, recurrent, bias)
+        out = layer(x)
+        for b in range(2):
+            np.testing.assert_allclose(out[b], _reference_lstm(x[b], kernel, recurrent, bias), atol=1e-5)
+
+    def test_lstm_step_equals_sequence(self):
+        rng = np.random.default_rng(2)
+        layer = LSTMLayer(rng.normal(0, 0.3, (4, 12)), rng.normal(0, 0.3, (3, 12)), None,
+                          return_sequences=True)
+        x = rng.random((1, 5, 4), dtype=np.float32)
+        state = layer.initial_state()
+        for t in range(5):
+            state = layer.step(x[:, t], state)
+            np.testing.assert_allclose(state[0], layer(x)[:, t], atol=1e-6)
+
+    def test_batch_norm_folding(self):
+        gamma, beta = np.array([2.0, 0.5]), np.array([0.1, -0.2])
+        mean, var = np.array([1.0, -1.0]), np.array([4.0, 0.25])
+        x = np.array([[3.0, 0.0]], np.float32)
+        expected = gamma * (x - mean) / np.sqrt(var + 1e-3) + beta
+        np.testing.assert_allclose(BatchNormLayer.from_moments(gamma, beta, mean, var)(x), expected, atol=1e-6)
+
+    def test_unknown_activation_rejected(self):
+        with pytest.raises(UnsupportedModel):
+            DenseLayer(np.eye(2), None, 'gelu')
+
+
+class TestExport:
+    def test_fatigue_lstm_structure(self):
+        model = export_keras_file(FATIGUE_LSTM)
+        assert model.input_shape == (None, 30, 16)
+        assert [type(l).__name__ for l in model.layers] == ['LSTMLayer', 'LSTMLayer', 'DenseLayer', 'DenseLayer']
+        assert model.layers[0].return_sequences and not model.layers[1].return_sequences
+        probs = model.predict(np.full((3, 30, 16), 0.2, np.float32))
+        assert probs.shape == (3, 3) and probs.dtype == np.float32
+        np.testing.assert_allclose(probs.sum(axis=1), 1.0, atol=1e-6)
+
+    def test_posture_model_structure(self):
+        model = export_keras_file(POSTURE_MODEL)
+        assert model.input_shape == (None, 7)
+        assert [type(l).__name__ for l in model.layers] == [
+            'DenseLayer', 'BatchNormLayer', 'DenseLayer', 'DenseLayer', 'DenseLayer']
+
+    def test_npz_roundtrip(self, tmp_path):
+        path = str(tmp_path / 'fatigue_lstm.npz')
+        exported = export_keras_file(FATIGUE_LSTM, path)
+        loaded = NumpyModel.load(path)
+        x = np.random.default_rng(0).random((2, 30, 16), dtype=np.float32)
+        np.testing.assert_array_equal(loaded.predict(x), exported.predict(x))
+
+    def test_non_archive_rejected(self):
+        with pytest.raises(UnsupportedModel):
+            export_keras_file('models/emotion_model.hdf5')
+
+    @pytest.mark.parametrize('path', [FATIGUE_LSTM, POSTURE_MODEL])
+    def test_parity_with_keras(self, path):
+        tf = pytest.importorskip('tensorflow')
+        keras_model = tf.keras.models.load_model(path, compile=False)
+        assert max_abs_error(export_keras_file(path), keras_model) <= PARITY_ATOL
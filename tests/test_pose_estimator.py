@@ -0,0 +1,80 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.pose_estimator import POSE_LANDMARK_IDXS, HeadPoseEstimator, OneEuroFilter
+
+W, H = 1280, 720
+
+
+def _face(pitch_deg=10.0, yaw_deg=5.0, noise=0.0, rng=None):
+    """478 точек, у которых 6 опорных — проекция модели лица с заданной позой."""
+    est = HeadPoseEstimator(smoothing=False)
+    rvec, _ = cv2.Rodrigues(
+        cv2.Rodrigues(np.radians([pitch_deg, 0.0, 0.0]))[0]
+        @ cv2.Rodrigues(np.radians([0.0, yaw_deg, 0.0]))[0]
+    )
+    tvec = np.array([[0.0], [0.0], [2500.0]])
+    img, _ = cv2.projectPoints(est.model_points, rvec, tvec, est.camera_matrix(W, H),
+                               np.zeros(4))
+    img = img.reshape(-1, 2)
+    if noise:
+        img = img + rng.normal(0, noise, img.shape)
+    points = np.full((478, 3), 0.5, dtype=np.float32)
+    points[POSE_LANDMARK_IDXS, 0] = img[:, 0] / W
+    points[POSE_LANDMARK_IDXS, 1] = img[:, 1] / H
+    return points
+
+
+class TestHeadPoseEstimator:
+    def test_recovers_pitch_and_yaw(self):
+        est = HeadPoseEstimator(smoothing=False)
+        pitch, yaw, _ = est.get_pose_from_points(_face(12.0, -8.0), W, H)
+        # Пиксели округляются до целых, как и раньше
+        assert abs(abs(pitch) - 12.0) < 1.5
+        assert abs(abs(yaw) - 8.0) < 1.5
+
+    def test_warm_start_matches_cold_solve(self):
+        warm = HeadPoseEstimator(smoothing=False)
+        cold = HeadPoseEstimator(smoothing=False, warm_start=False)
+        for pitch in (0.0, 3.0, 6.0, 9.0):
+            face = _face(pitch, 4.0)
+            assert warm.get_pose_from_points(face, W, H) == pytest.approx(
+                cold.get_pose_from_points(face, W, H), abs=0.05)
+
+    def test_intrinsics_cached_per_resolution(self):
+        est = HeadPoseEstimator()
+        assert est.camera_matrix(W, H) is est.camera_matrix(W, H)
+        assert est.camera_matrix(640, 480)[0, 2] == 320
+
+    def test_smoothing_reduces_jitter(self):
+        rng = np.random.default_rng(0)
+        faces = [_face(10.0, 0.0, noise=1.5, rng=rng) for _ in range(60)]
+        raw = HeadPoseEstimator(smoothing=False).estimate_batch(faces, W, H)
+        smooth = HeadPoseEstimator().estimate_batch(faces, W, H)
+        assert smooth[10:, 0].std() < 0.6 * raw[10:, 0].std()
+
+    def test_batch_matches_live_chain(self):
+        faces = np.stack([_face(p, 2.0) for p in np.linspace(0, 15, 20)])
+        live = HeadPoseEstimator()
+        expected = [live.get_pose_from_points(f, W, H, t / 30.0) for t, f in enumerate(faces)]
+        batch = HeadPoseEstimator().estimate_batch(faces, W, H)
+        np.testing.assert_array_equal(batch, np.array(expected))
+
+    def test_reset_restarts_filter(self):
+        est = HeadPoseEstimator()
+        est.get_pose_from_points(_face(0.0, 0.0), W, H, 0.0)
+        est.reset()
+        first = est.get_pose_from_points(_face(20.0, 0.0), W, H, 0.033)
+        assert first == HeadPoseEstimator().get_pose_from_points(_face(20.0, 0.0), W, H)
+
+
+class TestOneEuroFilter:
+    def test_follows_step_and_keeps_constant(self):
+        f = OneEuroFilter(min_cutoff=1.0, beta=0.05)
+        x = np.array([0.0])
+        for i in range(10):
+            assert f(x, i / 30.0)[0] == 0.0
+        out = [f(np.array([10.0]), (10 + i) / 30.0)[0] for i in range(60)]
+        assert 0.0 < out[0] < 10.0
+        assert out[-1] == pytest.approx(10.0, abs=0.1)
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from src.preview import PreviewRenderer, fit_size
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def frame():
+    img = np.zeros((720, 1280, 3), dtype=np.uint8)
+    img[:, :640] = (255, 0, 0)
+    return img
+
+
+def test_fit_size_keeps_aspect():
+    assert fit_size(1280, 720, 800, 600) == (800, 450)
+    assert fit_size(1280, 720, 400, 600) == (400, 225)
+    assert fit_size(1280, 720, 1600, 450) == (800, 450)
+
+
+class TestPreviewRenderer:
+    def test_render_into_widget_sized_bgr_buffer(self, clock, frame):
+        preview = PreviewRenderer(size=(800, 600), clock=clock)
+        assert preview.claim()
+        buf = preview.render(frame)
+        assert buf.shape == (450, 800, 3)
+        # Без перестановки каналов: левая половина остаётся синей (BGR)
+        assert tuple(buf[10, 10]) == (255, 0, 0)
+        assert tuple(buf[10, 790]) == (0, 0, 0)
+
+    def test_hidden_window_claims_nothing(self, clock, frame):
+        preview = PreviewRenderer(clock=clock)
+        preview.set_visible(False)
+        assert not preview.claim()
+        assert preview.render(frame) is None
+        preview.set_visible(True)
+        assert preview.claim()
+
+    def test_refresh_rate_limits_claims(self, clock):
+        preview = PreviewRenderer(max_fps=20, clock=clock)
+        claims = []
+        for _ in range(30):            # 1 секунда камеры 30 fps
+            claims.append(preview.claim())
+            clock.now += 1 / 30
+        assert sum(claims) == 15
+
+    def test_matching_rates_keep_every_frame(self, clock):
+        preview = PreviewRenderer(max_fps=30, clock=clock)
+        claims = []
+        for i in range(30):
+            clock.now = i / 30 + (0.002 if i % 2 else -0.002)
+            claims.append(preview.claim())
+            preview.release()
+        assert all(claims)
+
+    def test_buffers_not_reused_until_released(self, clock, frame):
+        preview = PreviewRenderer(max_fps=None, buffers=2, clock=clock)
+        first = preview.render(frame)
+        second = preview.render(frame)
+        assert first is not second
+        assert not preview.claim()
+        assert preview.render(frame) is None
+        preview.release()
+        assert preview.claim()
+        assert preview.render(frame) is first
+
+    def test_resize_reallocates_ring(self, clock, frame):
+        preview = PreviewRenderer(size=(800, 600), max_fps=None, clock=clock)
+        old = preview.render(frame)
+        preview.set_target_size(320, 240)
+        buf = preview.render(frame)
+        assert buf.shape == (180, 320, 3)
+        assert any(b is old for b in preview._stale)
+        preview.release()
+        preview.release()
+        assert preview._stale == []
@@ -0,0 +1,130 @@
+import pytest
+
+from src.processing_governor import ProcessingGovernor
+
+BUDGET = 1.0 / 30
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.cpu = 0.0
+
+    def clock(self):
+        return self.now
+
+    def cpu_time(self):
+        return self.cpu
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_governor(clock, **kwargs):
+    params = dict(clock=clock.clock, cpu_time=clock.cpu_time, hysteresis=2)
+    params.update(kwargs)
+    gov = ProcessingGovernor(**params)
+    gov._cores = 1
+    return gov
+
+
+def run_window(gov, clock, frame_cost, cpu_fraction=0.1, frames=30,
+               ml_time=0.02, hand_time=0.005):
+    """Одна секунда работы: frames кадров стоимостью frame_cost."""
+    for i in range(frames):
+        if gov.should_run('ml', i):
+            gov.record_stage('ml', ml_time)
+        if gov.should_run('hands', i):
+            gov.record_stage('hands', hand_time)
+        gov.record_frame(frame_cost)
+    clock.now += 1.0
+    clock.cpu += cpu_fraction
+    return gov.evaluate()
+
+
+class TestProcessingGovernor:
+    def test_initial_intervals_clamped_to_config(self, clock):
+        gov = make_governor(clock, ml_interval=50, ml_interval_max=30,
+                            hand_interval=0, hand_interval_min=1)
+        assert gov.interval('ml') == 30
+        assert gov.interval('hands') == 1
+
+    def test_should_run(self, clock):
+        gov = make_governor(clock, ml_interval=4)
+        assert [gov.should_run('ml', i) for i in range(8)] == [
+            True, False, False, False, True, False, False, False]
+
+    def test_overload_raises_ml_interval_after_hysteresis(self, clock):
+        gov = make_governor(clock, ml_interval=8)
+        assert run_window(gov, clock, BUDGET * 1.2) is None
+        decision = run_window(gov, clock, BUDGET * 1.2)
+        assert decision is not None
+        assert decision['stage'] == 'ml'
+        assert (decision['old'], decision['new']) == (8, 9)
+        assert gov.decisions[-1] is decision
+
+    def test_cpu_ceiling_counts_as_overload(self, clock):
+        gov = make_governor(clock, cpu_ceiling=0.5)
+        run_window(gov, clock, BUDGET * 0.7, cpu_fraction=0.9)
+        decision = run_window(gov, clock, BUDGET * 0.7, cpu_fraction=0.9)
+        assert decision['reason'] == ProcessingGovernor.OVERLOADED
+
+    def test_hands_raised_only_when_ml_at_ceiling(self, clock):
+        gov = make_governor(clock, ml_interval=30, ml_interval_max=30)
+        run_window(gov, clock, BUDGET * 1.5)
+        decision = run_window(gov, clock, BUDGET * 1.5)
+        assert decision['stage'] == 'hands'
+        assert gov.interval('hands') == 2
+
+    def test_underload_lowers_hands_first(self, clock):
+        gov = make_governor(clock, hand_interval=3, ml_interval=8)
+        run_window(gov, clock, BUDGET * 0.3)
+        decision = run_window(gov, clock, BUDGET * 0.3)
+        assert decision['stage'] == 'hands'
+        assert gov.interval('hands') == 2
+
+    def test_underload_lowers_ml_when_prediction_fits(self, clock):
+        gov = make_governor(clock, hand_interval=1, ml_interval=8)
+        run_window(gov, clock, BUDGET * 0.3)
+        decision = run_window(gov, clock, BUDGET * 0.3)
+        assert decision['stage'] == 'ml'
+        assert gov.interval('ml') == 7
+
+    def test_underload_respects_budget_prediction(self, clock):
+        gov = make_governor(clock, ml_interval=2, ml_interval_min=1)
+        # ML дорогой: при интервале 1 не влезет в бюджет
+        run_window(gov, clock, BUDGET * 0.5, ml_time=BUDGET)
+        assert run_window(gov, clock, BUDGET * 0.5, ml_time=BUDGET) is None
+        assert gov.interval('ml') == 2
+
+    def test_steady_load_changes_nothing(self, clock):
+        gov = make_governor(clock)
+        for _ in range(5):
+            assert run_window(gov, clock, BUDGET * 0.75) is None
+        assert gov.get_stats()['verdict'] == ProcessingGovernor.STEADY
+
+    def test_floor_and_ceiling_respected(self, clock):
+        gov = make_governor(clock, ml_interval=2, ml_interval_min=2,
+                            hand_interval=1, hand_interval_min=1, hysteresis=1)
+        for _ in range(3):
+            run_window(gov, clock, BUDGET * 0.1, ml_time=0.0001)
+        assert gov.interval('ml') == 2
+        assert gov.interval('hands') == 1
+
+    def test_disabled_governor_measures_but_keeps_intervals(self, clock):
+        gov = make_governor(clock, enabled=False)
+        for _ in range(4):
+            assert run_window(gov, clock, BUDGET * 2) is None
+        assert gov.interval('ml') == 8
+        assert gov.get_stats()['frame_load'] == pytest.approx(2.0)
+
+    def test_from_config(self):
+        gov = ProcessingGovernor.from_config({
+            'governor_enabled': False, 'ml_interval': 5, 'hand_interval_max': 3,
+            'roi_enabled': True,
+        })
+        assert not gov.enabled
+        assert gov.interval('ml') == 5
+        assert gov.stages['hands'].max_interval == 3
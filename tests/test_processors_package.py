@@ -0,0 +1,15 @@
+import subprocess
+import sys
+
+
+class TestProcessorsPackage:
+    def test_import_does_not_load_gesture_controller(self):
+        """pyautogui (через gesture_controller) требует X-дисплей — headless-движок без рук."""
+        code = (
+            "import sys, src.processors\n"
+            "from src.processors import FaceProcessor, FatigueProcessor, PostureProcessor\n"
+            "assert 'src.gesture_controller' not in sys.modules\n"
+            "assert 'src.processors.hand_processor' not in sys.modules\n"
+        )
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
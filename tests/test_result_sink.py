@@ -0,0 +1,76 @@
+import json
+import sqlite3
+
+import numpy as np
+import pytest
+
+from src.frame_result import FatigueResult, FrameResult
+from src.result_sink import JsonlSink, SqliteSink, open_sink
+
+
+SAMPLE = {
+    "frame_id": 7, "face_detected": True, "emotion": "Нейтрально",
+    "fatigue_status": "Awake", "posture_status": "Good",
+    "ear": np.float32(0.31), "roi": {"roi_face": (1, 2, 3, 4)},
+}
+
+
+class TestResultSinks:
+    def test_jsonl_one_object_per_line(self, tmp_path):
+        path = tmp_path / "run.jsonl"
+        sink = JsonlSink(str(path))
+        sink.write(SAMPLE)
+        sink.write({"frame_id": 8})
+        sink.close()
+        rows = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+        assert len(rows) == 2
+        assert rows[0]["ear"] == pytest.approx(0.31)
+        assert rows[0]["roi"]["roi_face"] == [1, 2, 3, 4]
+        assert rows[0]["emotion"] == "Нейтрально"
+
+    def test_sqlite_columns_and_payload(self, tmp_path):
+        path = tmp_path / "run.sqlite"
+        sink = SqliteSink(str(path), commit_every=1000)
+        sink.write(SAMPLE)
+        sink.close()
+        conn = sqlite3.connect(path)
+        frame_id, face, posture, payload = conn.execute(
+            "SELECT frame_id, face_detected, posture_status, payload FROM engine_results"
+        ).fetchone()
+        conn.close()
+        assert (frame_id, face, posture) == (7, 1, "Good")
+        assert json.loads(payload)["fatigue_status"] == "Awake"
+
+    def test_frame_result_is_flattened(self, tmp_path):
+        path = tmp_path / "run.sqlite"
+        sink = SqliteSink(str(path))
+        sink.write(FrameResult(frame_id=9, face_detected=True,
+                               fatigue=FatigueResult(fatigue_status='Drowsy')))
+        sink.close()
+        conn = sqlite3.connect(path)
+        frame_id, face, fatigue, payload = conn.execute(
+            "SELECT frame_id, face_detected, fatigue_status, payload FROM engine_results"
+        ).fetchone()
+        conn.close()
+        assert (frame_id, face, fatigue) == (9, 1, "Drowsy")
+        assert json.loads(payload)["posture_status"] == "Good"
+
+    def test_write_after_close_is_ignored(self, tmp_path):
+        sink = JsonlSink(str(tmp_path / "run.jsonl"))
+        sink.close()
+        sink.write(SAMPLE)
+        assert sink.count == 0
+
+    def test_open_sink_by_extension(self, tmp_path):
+        jsonl = open_sink(str(tmp_path / "a.jsonl"))
+        sqlite = open_sink(str(tmp_path / "a.db"))
+        forced = open_sink(str(tmp_path / "a.out"), fmt="sqlite")
+        try:
+            assert isinstance(jsonl, JsonlSink)
+            assert isinstance(sqlite, SqliteSink)
+            assert isinstance(forced, SqliteSink)
+        finally:
+            for sink in (jsonl, sqlite, forced):
+                sink.close()
+        with pytest.raises(ValueError):
+            open_sink(str(tmp_path / "a.csv"), fmt="csv")
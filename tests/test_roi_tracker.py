@@ -0,0 +1,155 @@
+import threading
+
+import numpy as np
+import pytest
+
+from src.frame_bundle import FrameBundle
+from src.roi_tracker import Roi, RoiTracker, crop_for_inference, remap_landmarks
+
+W, H = 1280, 720
+FACE_BOX = (0.45, 0.30, 0.55, 0.50)
+
+
+class _Lm:
+    def __init__(self, x, y, z=0.0):
+        self.x, self.y, self.z = x, y, z
+
+
+@pytest.fixture
+def tracker():
+    return RoiTracker(refresh_interval=10)
+
+
+class TestRoi:
+    def test_around_is_clamped_to_frame(self):
+        roi = Roi.around(10, 700, 50, 50, W, H)
+        assert roi.as_tuple() == (0, 650, 60, 720)
+
+    def test_remap_landmarks_to_full_frame(self):
+        roi = Roi(640, 360, 960, 720)
+        lms = [_Lm(0.0, 0.0), _Lm(1.0, 1.0, 0.4), _Lm(0.5, 0.5)]
+        remap_landmarks(lms, roi, W, H)
+        assert (lms[0].x, lms[0].y) == pytest.approx((0.5, 0.5))
+        assert (lms[1].x, lms[1].y) == pytest.approx((0.75, 1.0))
+        assert lms[1].z == pytest.approx(0.4 * 320 / W)
+        assert (lms[2].x, lms[2].y) == pytest.approx((0.625, 0.75))
+
+    def test_remap_without_roi_is_noop(self):
+        lms = [_Lm(0.3, 0.4)]
+        remap_landmarks(lms, None, W, H)
+        assert (lms[0].x, lms[0].y) == (0.3, 0.4)
+
+    def test_crop_for_inference(self):
+        bundle = FrameBundle((H, W, 3))
+        bundle.load(np.zeros((H, W, 3), dtype=np.uint8), 0, 0.0)
+        roi = Roi(100, 100, 500, 400)
+        assert crop_for_inference(bundle, roi, 640).shape == (300, 400, 3)
+        assert crop_for_inference(bundle, roi, 200).shape == (150, 200, 3)
+        assert crop_for_inference(bundle, roi, 0, gray=True).shape == (300, 400)
+        assert crop_for_inference(bundle, None, 640).shape == (360, 640, 3)
+
+
+class TestRoiTracker:
+    def test_full_frame_until_face_found(self, tracker):
+        assert tracker.face_roi() is None
+        tracker.update_face(FACE_BOX, W, H)
+        roi = tracker.face_roi()
+        assert roi is not None
+        face = Roi(int(0.45 * W), int(0.30 * H), int(0.55 * W), int(0.50 * H))
+        assert roi.contains(face)
+
+    def test_roi_is_sticky_for_small_moves(self, tracker):
+        tracker.update_face(FACE_BOX, W, H)
+        first = tracker.face_roi()
+        tracker.update_face((0.46, 0.31, 0.56, 0.51), W, H)
+        assert tracker.face_roi() is first
+
+    def test_roi_recentres_on_large_move(self, tracker):
+        tracker.update_face(FACE_BOX, W, H)
+        first = tracker.face_roi()
+        tracker.update_face((0.70, 0.30, 0.80, 0.50), W, H)
+        assert tracker.face_roi() is not first
+
+    def test_lost_face_triggers_full_frame(self, tracker):
+        tracker.update_face(FACE_BOX, W, H)
+        tracker.update_face(None, W, H)
+        assert tracker.face_roi() is None
+        assert tracker.torso_roi(W, H) is None
+
+    def test_periodic_full_frame_refresh(self, tracker):
+        tracker.update_face(FACE_BOX, W, H)
+        rois = [tracker.face_roi() for _ in range(20)]
+        assert sum(r is None for r in rois) == 2
+        stats = tracker.get_stats()
+        assert stats['full_frame_passes'] == 2
+        assert stats['roi_passes'] == 18
+
+    def test_torso_roi_keeps_face_and_reaches_bottom(self, tracker):
+        tracker.update_face(FACE_BOX, W, H)
+        torso = tracker.torso_roi(W, H)
+        assert torso.y1 == H
+        assert torso.y0 < int(0.30 * H)
+        assert torso.x0 < int(0.45 * W) and torso.x1 > int(0.55 * W)
+
+    def test_hand_roi_follows_palm(self, tracker):
+        assert tracker.hand_roi() is None
+        tracker.update_hand((0.2, 0.6), 0.15, W, H)
+        roi = tracker.hand_roi()
+        assert roi is not None
+        cx, cy = 0.2 * W, 0.6 * H
+        assert roi.x0 < cx < roi.x1 and roi.y0 < cy < roi.y1
+        tracker.update_hand(None, None, W, H)
+        assert tracker.hand_roi() is None
+
+    def test_disabled_tracker_always_full_frame(self):
+        tracker = RoiTracker(enabled=False)
+        tracker.update_face(FACE_BOX, W, H)
+        assert tracker.face_roi() is None
+        assert tracker.torso_roi(W, H) is None
+
+    def test_reset_from_another_thread(self, tracker):
+        """reset() (idle) и рука (аналитика) из разных потоков не ломают состояние."""
+        stop = threading.Event()
+        errors = []
+
+        def idle():
+            while not stop.is_set():
+                tracker.update_face(FACE_BOX, W, H)
+                tracker.reset()
+
+        def analytics():
+            try:
+                for _ in range(2000):
+                    tracker.update_hand((0.2, 0.6), 0.15, W, H)
+                    roi = tracker.hand_roi()
+                    assert roi is None or roi.x0 < 0.2 * W < roi.x1
+                    tracker.torso_roi(W, H)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                stop.set()
+
+        threads = [threading.Thread(target=idle), threading.Thread(target=analytics)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=10)
+        assert not errors
+        tracker.reset()
+        assert tracker.hand_roi() is None and tracker.get_stats()['roi_hand'] is None
+
+
+def test_fallback_detect_offsets_bbox_by_roi():
+    from src.face_core import _FallbackFaceDetector
+
+    class FakeCascade:
+        def detectMultiScale(self, gray, **kwargs):
+            return np.array([[10, 20, 100, 100]])
+
+    detector = _FallbackFaceDetector()
+    detector._cascade = FakeCascade()
+    frame = np.zeros((H, W, 3), dtype=np.uint8)
+    roi = Roi(400, 100, 800, 500)
+
+    detector.detect(frame, gray=np.zeros((400, 400), dtype=np.uint8), roi=roi)
+    assert detector._prev_bbox == (410, 120, 100, 100)
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from src.fatigue_analyzer import FatigueAnalyzer
+from src.rolling_stats import Crossings, HeadMean, MinMax, Moments, RollingWindow, TailMean
+
+CAPACITY = 30
+
+
+def _stream(n=200, seed=0):
+    """EAR-подобный ряд с провалами ниже 0.22."""
+    rng = np.random.default_rng(seed)
+    x = 0.3 + rng.normal(0, 0.03, n)
+    x[rng.random(n) < 0.15] = 0.15
+    return x.astype(np.float32)
+
+
+def _window(values, i, span):
+    return values[max(0, i + 1 - span):i + 1].astype(np.float64)
+
+
+class TestRollingWindow:
+    def test_behaves_like_bounded_deque(self):
+        window = RollingWindow(5)
+        window.extend([1, 2, 3, 4, 5, 6, 7])
+        assert len(window) == 5
+        assert list(window) == [3, 4, 5, 6, 7]
+        assert window[0] == 3 and window[-1] == 7 and window.last == 7
+        with pytest.raises(IndexError):
+            window[5]
+        window.clear()
+        assert len(window) == 0 and not window and window.last is None
+
+    def test_track_requires_empty_window(self):
+        window = RollingWindow(5)
+        with pytest.raises(ValueError):
+            window.track(Moments(6))
+        window.append(1.0)
+        with pytest.raises(ValueError):
+            window.track(Moments(5))
+
+    def test_trackers_match_numpy(self):
+        values = _stream()
+        window = RollingWindow(CAPACITY)
+        moments = window.track(Moments(CAPACITY))
+        extremes = window.track(MinMax(3))
+        blinks = window.track(Crossings(CAPACITY, 0.22))
+        head = window.track(HeadMean(15, 7))
+        tail = window.track(TailMean(8))
+        for i, value in enumerate(values):
+            window.append(value)
+            full = _window(values, i, CAPACITY)
+            assert moments.mean == pytest.approx(np.mean(full), abs=1e-9)
+            assert moments.var == pytest.approx(np.var(full), abs=1e-9)
+            last3 = _window(values, i, 3)
+            assert extremes.min == last3.min() and extremes.max == last3.max()
+            expected_blinks = int(np.sum((full[:-1] > 0.22) & (full[1:] <= 0.22)))
+            assert blinks.count == expected_blinks
+            assert head.mean == pytest.approx(np.mean(_window(values, i, 15)[:7]), abs=1e-9)
+            assert tail.mean == pytest.approx(np.mean(_window(values, i, 8)), abs=1e-9)
+
+    def test_moments_stay_accurate_over_long_streams(self):
+        values = (1000.0 + np.random.default_rng(3).normal(0, 0.01, 20000)).astype(np.float32)
+        window = RollingWindow(CAPACITY)
+        moments = window.track(Moments(CAPACITY))
+        window.extend(values)
+        tail = values[-CAPACITY:].astype(np.float64)
+        assert moments.mean == pytest.approx(np.mean(tail), abs=1e-9)
+        assert moments.std == pytest.approx(np.std(tail), rel=1e-3)
+
+    def test_clear_resets_trackers(self):
+        window = RollingWindow(10)
+        moments = window.track(Moments(10))
+        extremes = window.track(MinMax(10))
+        window.extend([5.0, 6.0, 7.0])
+        window.clear()
+        window.append(1.0)
+        assert moments.mean == 1.0 and moments.var == 0.0
+        assert extremes.max == 1.0
+
+
+class TestFatigueAnalyzerRollingStats:
+    def test_sub_scores_match_full_window_formulas(self):
+        fa = FatigueAnalyzer()
+        ears, mars = _stream(120, seed=1), _stream(120, seed=2) * 1.5
+        for i, (ear, mar) in enumerate(zip(ears, mars)):
+            fa.update(float(ear), float(mar), 0.0, "Нейтрально", float(i))
+            assert fa._get_avg_ear() == pytest.approx(np.mean(_window(ears, i, 20)), abs=1e-6)
+            assert fa._get_avg_mar() == pytest.approx(np.mean(_window(mars, i, 20)), abs=1e-6)
+            if i >= 4:
+                peak = float(_window(mars, i, 10).max())
+                assert fa._get_mar_score() == pytest.approx(min(1.0, peak / fa._mar_max_physio), abs=1e-6)
+            if i >= 14:
+                recent = _window(ears, i, 15)
+                change = float(np.mean(recent[7:]) - np.mean(recent[:7]))
+                expected = "decreasing" if change < -0.03 else "increasing" if change > 0.03 else "stable"
+                assert fa._get_ear_trend() == expected
+
+    def test_emotion_score_counts_last_ten(self):
+        fa = FatigueAnalyzer()
+        for i in range(12):
+            fa.update(0.3, 0.1, 0.0, "Радость", float(i))
+        for i in range(4):
+            fa.update(0.3, 0.1, 0.0, "Усталость", float(12 + i))
+        # 4 «усталых» и 6 позитивных из последних 10
+        assert fa._get_emotion_score() == pytest.approx(0.4 - 0.6 * 0.3)
+        fa.reset()
+        assert fa._get_emotion_score() == pytest.approx(0.1)